@@ -1,2 +1,13 @@
 """Content Delivery Network."""
 # :license: MIT, see LICENSE for more details.
+
+
+def read_urls(lines):
+    """Yields the URLs of a file, skipping blank lines and comments.
+
+    :param lines: the lines of the file
+    """
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
@@ -1,18 +1,68 @@
 """Cache one or more files on all edge nodes."""
 # :license: MIT, see LICENSE for more details.
+import itertools
 
 import SoftLayer
+from SoftLayer.CLI import cdn as cdn_mod
 from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.managers import cdn
+from SoftLayer import utils
 
 import click
 
 
-@click.command()
+@click.command(epilog="""URLs can be given as arguments and/or read, one per
+line, from a file or from stdin with '--file -'. Blank lines and lines
+starting with '#' are skipped. Duplicate URLs are only submitted once.
+
+With --normalize, URLs which only differ by the case of the scheme or host, a
+default port or a fragment are submitted once, in their normalized form.""")
 @click.argument('account_id')
 @click.argument('content_url', nargs=-1)
+@click.option('--file', '-f', 'url_file',
+              type=click.File('r'),
+              help="Read URLs from a file, '-' for stdin")
+@click.option('--workers',
+              default=utils.DEFAULT_MAX_WORKERS,
+              type=click.INT,
+              help="Number of concurrent API calls")
+@click.option('--rate',
+              type=click.FLOAT,
+              help="Maximum number of API calls per second")
+@click.option('--retries',
+              default=cdn.DEFAULT_RETRIES,
+              type=click.INT,
+              help="Number of times a failed call is retried")
+@click.option('--normalize',
+              is_flag=True,
+              help="Normalize the URLs before submitting them")
 @environment.pass_env
-def cli(env, account_id, content_url):
+def cli(env, account_id, content_url, url_file, workers, rate, retries,
+        normalize):
     """Cache one or more files on all edge nodes."""
 
+    urls = content_url
+    if url_file is not None:
+        urls = itertools.chain(content_url, cdn_mod.read_urls(url_file))
+
     manager = SoftLayer.CDNManager(env.client)
-    manager.load_content(account_id, content_url)
+    chunks = manager.submit_content(account_id, urls, 'load',
+                                    max_workers=workers,
+                                    rate=rate,
+                                    retries=retries,
+                                    normalize=normalize)
+
+    table = formatting.Table(['urls', 'attempts', 'error'])
+    table.align['urls'] = 'l'
+    for chunk in chunks:
+        if not chunk['success']:
+            table.add_row([formatting.listing(chunk['urls'], separator='\n'),
+                           chunk['attempts'],
+                           str(chunk['error'] or chunk['result'])])
+
+    if table.rows:
+        env.out(env.fmt(table))
+        raise exceptions.CLIAbort('Unable to load %d chunks of URLs'
+                                  % len(table.rows))
@@ -7,6 +7,7 @@
 """
 from __future__ import print_function
 import logging
+import os.path
 import sys
 import types
 
@@ -14,6 +15,8 @@ import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import formatting
+from SoftLayer.managers import image
+from SoftLayer.managers import locations
 
 import click
 # pylint: disable=too-many-public-methods, broad-except, unused-argument
@@ -29,6 +32,11 @@ DEBUG_LOGGING_MAP = {
     3: logging.DEBUG
 }
 
+# Datacenters and images are saved here so that commands don't each fetch
+# them
+LOCATION_CACHE_FILE = '~/.softlayer_locations'
+IMAGE_CACHE_FILE = '~/.softlayer_images'
+
 VALID_FORMATS = ['table', 'raw', 'json']
 DEFAULT_FORMAT = 'raw'
 if sys.stdout.isatty():
@@ -149,6 +157,11 @@ def cli(ctx,
             config_file=config,
             transport=wrapped_transport,
         )
+        if not fixtures:
+            locations.get_location_registry(
+                env.client, path=os.path.expanduser(LOCATION_CACHE_FILE))
+            image.get_image_index(
+                env.client, path=os.path.expanduser(IMAGE_CACHE_FILE))
 
 
 @cli.resultcallback()
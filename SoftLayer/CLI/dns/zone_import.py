@@ -1,19 +1,14 @@
 """Import zone based off a BIND zone file."""
 # :license: MIT, see LICENSE for more details.
-import re
-
 import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import helpers
+from SoftLayer.managers import dns
+from SoftLayer import zonefile
 
 import click
 
-RECORD_REGEX = re.compile(r"""^((?P<domain>([\w-]+(\.)?)*|\@)?\s+
-                               (?P<ttl>\d+)?\s+
-                               (?P<class>\w+)?)?\s+
-                               (?P<type>\w+)\s+
-                               (?P<data>.*)""", re.X)
 RECORD_FMT = "type={type}, record={record}, data={data}, ttl={ttl}"
 
 
@@ -21,15 +16,25 @@ RECORD_FMT = "type={type}, record={record}, data={data}, ttl={ttl}"
 @click.argument('zonefile',
                 type=click.Path(exists=True, readable=True, resolve_path=True))
 @click.option('--dry-run', is_flag=True, help="Don't actually create records")
+@click.option('--batch-size',
+              type=click.IntRange(1, None),
+              default=dns.RECORD_BATCH_SIZE,
+              help="Number of records to create per API call")
+@click.option('--checkpoint',
+              type=click.Path(dir_okay=False, writable=True,
+                              resolve_path=True),
+              help="File to record created records in. Records already in it "
+                   "are skipped, so a failed import can be resumed")
 @environment.pass_env
-def cli(env, zonefile, dry_run):
+def cli(env, zonefile, dry_run, batch_size, checkpoint):
     """Import zone based off a BIND zone file."""
 
     manager = SoftLayer.DNSManager(env.client)
     with open(zonefile) as zone_f:
-        zone_contents = zone_f.read()
+        zone, records, bad_lines = parse_zone_file(zone_f)
 
-    zone, records, bad_lines = parse_zone_details(zone_contents)
+    if zone is None:
+        raise exceptions.CLIAbort("The zone file has no $ORIGIN")
 
     env.out("Parsed: zone=%s" % zone)
     for record in records:
@@ -49,69 +54,69 @@ def cli(env, zonefile, dry_run):
         zone_id = manager.create_zone(zone)['id']
         env.out(click.style("Created: %s" % zone, fg='green'))
 
-    # Attempt to create each record
-    for record in records:
-        try:
-            manager.create_record(zone_id,
-                                  record['record'],
-                                  record['type'],
-                                  record['data'],
-                                  record['ttl'])
+    results = manager.create_records(zone_id, record_templates(records),
+                                     batch_size=batch_size,
+                                     checkpoint=checkpoint)
 
+    for record, result in zip(records, results):
+        if result['skipped']:
+            env.out("Skipped: %s" % RECORD_FMT.format(**record))
+        elif result['success']:
             env.out(click.style("Created: %s" % RECORD_FMT.format(**record),
                                 fg='green'))
-        except SoftLayer.SoftLayerAPIError as ex:
+        else:
             env.out(click.style("Failed: %s" % RECORD_FMT.format(**record),
                                 fg='red'))
-            env.out(click.style(str(ex), fg='red'))
+            env.out(click.style(str(result['error']), fg='red'))
 
     env.out(click.style("Finished", fg='green'))
 
 
-def parse_zone_details(zone_contents):
-    """Parses a zone file into python data-structures."""
-    records = []
-    bad_lines = []
-    zone_lines = [line.strip() for line in zone_contents.split('\n')]
+def parse_zone_file(zone_file):
+    """Parses a zone file into python data-structures.
 
-    zone_search = re.search(r'^\$ORIGIN (?P<zone>.*)\.', zone_lines[0])
-    zone = zone_search.group('zone')
+    SOA records are left out, SoftLayer manages them.
 
-    for line in zone_lines[1:]:
-        record_search = re.search(RECORD_REGEX, line)
-        if record_search is None:
-            bad_lines.append(line)
+    :param zone_file: an open zone file, or any iterable of lines
+    :returns: a tuple of the zone name, the records and the entries which
+              couldn't be parsed
+    """
+    parser = zonefile.ZoneFileParser(zone_file)
+    records = []
+    for record in parser:
+        if record['type'] == 'SOA':
             continue
+        parsed = {
+            'record': record['host'],
+            'type': record['type'],
+            'data': record['data'],
+            'ttl': record['ttl'],
+        }
+        if 'mxPriority' in record:
+            parsed['mxPriority'] = record['mxPriority']
+        records.append(parsed)
+
+    zone = parser.zone.rstrip('.') if parser.zone else None
+    bad_lines = ['%s (line %d: %s)' % (error['text'], error['line'],
+                                       error['error'])
+                 for error in parser.errors]
+    return zone, records, bad_lines
 
-        name = record_search.group('domain')
-        # The API requires we send a host, although bind allows a blank
-        # entry. @ is the same thing as blank
-        if name is None:
-            name = "@"
-
-        ttl = record_search.group('ttl')
-        # we don't do anything with the class
-        # domain_class = domainSearch.group('class')
-        record_type = record_search.group('type').upper()
-        data = record_search.group('data')
-
-        # the dns class doesn't support weighted MX records yet, so we chomp
-        # that part out.
-        if record_type == "MX":
-            record_search = re.search(r'(?P<weight>\d+)\s+(?P<data>.*)', data)
-            data = record_search.group('data')
-
-        # This will skip the SOA record bit. And any domain that gets
-        # parsed oddly.
-        if record_type == 'IN':
-            bad_lines.append(line)
-            continue
 
-        records.append({
-            'record': name,
-            'type': record_type,
-            'data': data,
-            'ttl': ttl,
-        })
+def parse_zone_details(zone_contents):
+    """Parses the contents of a zone file into python data-structures."""
+    return parse_zone_file(zone_contents.splitlines())
 
-    return zone, records, bad_lines
+
+def record_templates(records):
+    """Converts parsed records into DNSManager record templates."""
+    templates = []
+    for record in records:
+        template = {'host': record['record'],
+                    'type': record['type'],
+                    'data': record['data'],
+                    'ttl': record['ttl']}
+        if 'mxPriority' in record:
+            template['mxPriority'] = record['mxPriority']
+        templates.append(template)
+    return templates
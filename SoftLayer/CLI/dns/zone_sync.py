@@ -0,0 +1,106 @@
+"""Sync a zone with a BIND zone file."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI.dns import zone_import
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+from SoftLayer.managers import dns
+
+import click
+
+
+@click.command()
+@click.argument('zonefile',
+                type=click.Path(exists=True, readable=True, resolve_path=True))
+@click.option('--dry-run', is_flag=True,
+              help="Only show the changes that would be made")
+@click.option('--batch-size',
+              type=click.IntRange(1, None),
+              default=dns.RECORD_BATCH_SIZE,
+              help="Number of records to change per API call")
+@environment.pass_env
+def cli(env, zonefile, dry_run, batch_size):
+    """Sync a zone with a BIND zone file.
+
+    Records missing from the zone are created, records which differ are
+    edited and records which aren't in the zone file are deleted. SOA records
+    are left alone.
+    """
+
+    manager = SoftLayer.DNSManager(env.client)
+    with open(zonefile) as zone_f:
+        zone, records, bad_lines = zone_import.parse_zone_file(zone_f)
+
+    if zone is None:
+        raise exceptions.CLIAbort("The zone file has no $ORIGIN")
+    if bad_lines:
+        for line in bad_lines:
+            env.err("Unparsed: %s" % line)
+        raise exceptions.CLIAbort("Fix the zone file before syncing it, "
+                                  "records which couldn't be parsed would "
+                                  "be deleted")
+
+    desired = zone_import.record_templates(records)
+
+    try:
+        zone_id = helpers.resolve_id(manager.resolve_ids, zone, name='zone')
+    except exceptions.CLIAbort:
+        zone_id = None
+
+    if zone_id is None:
+        plan = dns.plan_zone_sync([], desired)
+    else:
+        plan = manager.sync_zone(zone_id, desired, dry_run=True)
+
+    env.out(env.fmt(_plan_table(plan)))
+    if dry_run:
+        return
+
+    if plan['delete'] and not (env.skip_confirmations or formatting.confirm(
+            "This will delete %d records. Continue?" % len(plan['delete']))):
+        raise exceptions.CLIAbort('Aborted.')
+
+    if zone_id is None:
+        zone_id = manager.create_zone(zone)['id']
+        env.err(click.style("Created: %s" % zone, fg='green'))
+
+    plan = manager.apply_zone_plan(zone_id, plan, batch_size=batch_size)
+    for failure in plan['failed']:
+        record = failure['record']
+        env.err(click.style("Failed to %s %s %s %s: %s"
+                            % (failure['action'], record['host'],
+                               record['type'].upper(), record['data'],
+                               failure['error']), fg='red'))
+
+    if plan['failed']:
+        raise exceptions.CLIAbort("%d changes failed" % len(plan['failed']))
+
+
+def _plan_table(plan):
+    """Returns a table of the changes in a plan."""
+    table = formatting.Table(['action', 'id', 'record', 'type', 'ttl',
+                              'data'])
+    table.align['record'] = 'r'
+    table.align['data'] = 'l'
+
+    for action in ('create', 'edit', 'delete'):
+        for record in plan[action]:
+            table.add_row([
+                action,
+                _blank_if_none(record.get('id')),
+                record['host'],
+                record['type'].upper(),
+                _blank_if_none(record.get('ttl')),
+                record['data'],
+            ])
+    return table
+
+
+def _blank_if_none(value):
+    """Returns a blank table cell for missing values."""
+    if value is None:
+        return formatting.blank()
+    return value
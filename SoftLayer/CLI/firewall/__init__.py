@@ -2,6 +2,8 @@
 # :license: MIT, see LICENSE for more details.
 
 from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer import firewall_rules
 
 
 def parse_id(input_id):
@@ -16,3 +18,31 @@ def parse_id(input_id):
         raise exceptions.CLIAbort(
             'Invalid ID %s: ID should be of the form xxx:yyy' % input_id)
     return key_value[0], int(key_value[1])
+
+
+def changes_table(rules, result):
+    """Helper to show how synced rules differ from the firewall's rules.
+
+    :param list rules: the rule dictionaries that were synced
+    :param dict result: the result of FirewallManager.sync_rules
+    :returns: a table of the shadowed, removed and added rules
+    """
+    by_order = dict((rule['orderValue'], rule) for rule in rules)
+    table = formatting.Table(['change', 'rule', 'note'])
+    table.align['rule'] = 'l'
+    for shadowed in result['shadowed']:
+        if shadowed['conflict']:
+            note = 'never matches, rule %d with another action comes first'
+        else:
+            note = 'never matches, rule %d comes first'
+        table.add_row(['shadowed',
+                       firewall_rules.format_rule(by_order[shadowed['rule']]),
+                       note % shadowed['shadowed_by']])
+    for change, changed_rules in (('remove', result['removed']),
+                                  ('add', result['added'])):
+        for rule in changed_rules:
+            table.add_row([change, firewall_rules.format_rule(rule),
+                           formatting.blank()])
+    if result['changed'] and not result['added'] and not result['removed']:
+        table.add_row(['reorder', formatting.blank(), formatting.blank()])
+    return table
@@ -10,54 +10,11 @@ from SoftLayer.CLI import environment
 from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import firewall
 from SoftLayer.CLI import formatting
+from SoftLayer import firewall_rules
 
 import click
 
-DELIMITER = "=========================================\n"
-
-
-def parse_rules(content=None):
-    """Helper to parse the input from the user into a list of rules.
-
-    :param string content: the content of the editor
-    :returns: a list of rules
-    """
-    rules = content.split(DELIMITER)
-    parsed_rules = list()
-    order = 1
-    for rule in rules:
-        if rule.strip() == '':
-            continue
-        parsed_rule = {}
-        lines = rule.split("\n")
-        parsed_rule['orderValue'] = order
-        order += 1
-        for line in lines:
-            if line.strip() == '':
-                continue
-            key_value = line.strip().split(':')
-            key = key_value[0].strip()
-            value = key_value[1].strip()
-            if key == 'action':
-                parsed_rule['action'] = value
-            elif key == 'protocol':
-                parsed_rule['protocol'] = value
-            elif key == 'source_ip_address':
-                parsed_rule['sourceIpAddress'] = value
-            elif key == 'source_ip_subnet_mask':
-                parsed_rule['sourceIpSubnetMask'] = value
-            elif key == 'destination_ip_address':
-                parsed_rule['destinationIpAddress'] = value
-            elif key == 'destination_ip_subnet_mask':
-                parsed_rule['destinationIpSubnetMask'] = value
-            elif key == 'destination_port_range_start':
-                parsed_rule['destinationPortRangeStart'] = int(value)
-            elif key == 'destination_port_range_end':
-                parsed_rule['destinationPortRangeEnd'] = int(value)
-            elif key == 'version':
-                parsed_rule['version'] = int(value)
-        parsed_rules.append(parsed_rule)
-    return parsed_rules
+DELIMITER = firewall_rules.DELIMITER
 
 
 def open_editor(rules=None, content=None):
@@ -114,6 +71,8 @@ def get_formatted_rule(rule=None):
     :returns: a formatted string that get be pushed into the editor
     """
     rule = rule or {}
+    # IPv6 rules have no subnet mask
+    default_mask = '255.255.255.255' if rule.get('version', 4) == 4 else ''
     return ('action: %s\n'
             'protocol: %s\n'
             'source_ip_address: %s\n'
@@ -126,9 +85,9 @@ def get_formatted_rule(rule=None):
             % (rule.get('action', 'permit'),
                rule.get('protocol', 'tcp'),
                rule.get('sourceIpAddress', 'any'),
-               rule.get('sourceIpSubnetMask', '255.255.255.255'),
+               rule.get('sourceIpSubnetMask', default_mask),
                rule.get('destinationIpAddress', 'any'),
-               rule.get('destinationIpSubnetMask', '255.255.255.255'),
+               rule.get('destinationIpSubnetMask', default_mask),
                rule.get('destinationPortRangeStart', 1),
                rule.get('destinationPortRangeEnd', 1),
                rule.get('version', 4)))
@@ -143,38 +102,37 @@ def cli(env, identifier):
     mgr = SoftLayer.FirewallManager(env.client)
 
     firewall_type, firewall_id = firewall.parse_id(identifier)
-    if firewall_type == 'vlan':
+    dedicated = firewall_type == 'vlan'
+    if dedicated:
         orig_rules = mgr.get_dedicated_fwl_rules(firewall_id)
     else:
         orig_rules = mgr.get_standard_fwl_rules(firewall_id)
     # open an editor for the user to enter their rules
     edited_rules = open_editor(rules=orig_rules)
-    env.out(edited_rules)
-    if formatting.confirm("Would you like to submit the rules. "
-                          "Continue?"):
-        while True:
-            try:
-                rules = parse_rules(edited_rules)
-                if firewall_type == 'vlan':
-                    rules = mgr.edit_dedicated_fwl_rules(firewall_id,
-                                                         rules)
-                else:
-                    rules = mgr.edit_standard_fwl_rules(firewall_id,
-                                                        rules)
-                break
-            except (SoftLayer.SoftLayerError, ValueError) as error:
-                env.out("Unexpected error({%s})" % (error))
-                if formatting.confirm("Would you like to continue editing "
+    while True:
+        try:
+            # The rules are pushed as edited, without compacting them
+            rules = firewall_rules.parse_rules(edited_rules)
+            result = mgr.sync_rules(firewall_id, rules,
+                                    dedicated=dedicated,
+                                    compact=False,
+                                    dry_run=True)
+            env.out(env.fmt(firewall.changes_table(rules, result)))
+            if not result['changed']:
+                env.out('No changes to the firewall rules')
+                return
+            if not formatting.confirm("Would you like to submit the rules. "
+                                      "Continue?"):
+                raise exceptions.CLIAbort('Aborted.')
+            if dedicated:
+                mgr.edit_dedicated_fwl_rules(firewall_id, result['rules'])
+            else:
+                mgr.edit_standard_fwl_rules(firewall_id, result['rules'])
+            env.out('Firewall updated!')
+            return
+        except (SoftLayer.SoftLayerError, ValueError) as error:
+            env.out("Unexpected error({%s})" % (error))
+            if not formatting.confirm("Would you like to continue editing "
                                       "the rules. Continue?"):
-                    edited_rules = open_editor(content=edited_rules)
-                    env.out(edited_rules)
-                    if formatting.confirm("Would you like to submit the "
-                                          "rules. Continue?"):
-                        continue
-                    else:
-                        raise exceptions.CLIAbort('Aborted.')
-                else:
-                    raise exceptions.CLIAbort('Aborted.')
-                return 'Firewall updated!'
-    else:
-        raise exceptions.CLIAbort('Aborted.')
+                raise exceptions.CLIAbort('Aborted.')
+            edited_rules = open_editor(content=edited_rules)
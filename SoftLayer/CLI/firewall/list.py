@@ -4,82 +4,56 @@
 import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import formatting
-from SoftLayer import utils
 
 import click
 
+TYPE_NAMES = {
+    'vlan': 'VLAN - dedicated',
+    'vs': 'Virtual Server - standard',
+    'server': 'Server - standard',
+}
+
 
 @click.command()
+@click.option('--rules',
+              is_flag=True,
+              help="Also show the number of rules of each firewall")
 @environment.pass_env
-def cli(env):
+def cli(env, rules):
     """List firewalls."""
 
     mgr = SoftLayer.FirewallManager(env.client)
-    table = formatting.Table(['firewall id',
-                              'type',
-                              'features',
-                              'server/vlan id'])
-    fwvlans = mgr.get_firewalls()
-    dedicated_firewalls = [firewall for firewall in fwvlans
-                           if firewall['dedicatedFirewallFlag']]
-
-    for vlan in dedicated_firewalls:
-        features = []
-        if vlan['highAvailabilityFirewallFlag']:
-            features.append('HA')
-
-        if features:
-            feature_list = formatting.listing(features, separator=',')
-        else:
+    columns = ['firewall id', 'type', 'features', 'server/vlan id']
+    if rules:
+        columns.append('rules')
+    table = formatting.Table(columns)
+
+    firewalls = mgr.list_firewalls()
+    rule_sets = [None] * len(firewalls)
+    if rules:
+        rule_sets = mgr.get_rule_sets(firewalls)
+
+    for firewall, rule_set in zip(firewalls, rule_sets):
+        if firewall['features']:
+            feature_list = formatting.listing(firewall['features'],
+                                              separator=',')
+        elif firewall['type'] == 'vlan':
             feature_list = formatting.blank()
+        else:
+            feature_list = '-'
 
-        table.add_row([
-            'vlan:%s' % vlan['networkVlanFirewall']['id'],
-            'VLAN - dedicated',
+        row = [
+            '%s:%s' % (firewall['type'], firewall['id']),
+            TYPE_NAMES[firewall['type']],
             feature_list,
-            vlan['id']
-        ])
-
-    shared_vlan = [firewall for firewall in fwvlans
-                   if not firewall['dedicatedFirewallFlag']]
-    for vlan in shared_vlan:
-        vs_firewalls = [guest
-                        for guest in vlan['firewallGuestNetworkComponents']
-                        if has_firewall_component(guest)]
-
-        for firewall in vs_firewalls:
-            table.add_row([
-                'vs:%s' % firewall['id'],
-                'Virtual Server - standard',
-                '-',
-                firewall['guestNetworkComponent']['guest']['id']
-            ])
-
-        server_firewalls = [server
-                            for server in vlan['firewallNetworkComponents']
-                            if has_firewall_component(server)]
-
-        for firewall in server_firewalls:
-            table.add_row([
-                'server:%s' % firewall['id'],
-                'Server - standard',
-                '-',
-                utils.lookup(firewall,
-                             'networkComponent',
-                             'downlinkComponent',
-                             'hardwareId')
-            ])
+            firewall['vlan_id'] if firewall['type'] == 'vlan'
+            else firewall['server_id'],
+        ]
+        if rule_set is not None:
+            if rule_set['error'] is not None:
+                row.append(str(rule_set['error']))
+            else:
+                row.append(len(rule_set['rules']))
+        table.add_row(row)
 
     return table
-
-
-def has_firewall_component(server):
-    """Helper to determine whether or not a server has a firewall.
-
-    :param dict server: A dictionary representing a server
-    :returns: True if the Server has a firewall.
-    """
-    if server['status'] != 'no_edit':
-        return True
-
-    return False
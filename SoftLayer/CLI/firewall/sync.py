@@ -0,0 +1,65 @@
+"""Sync firewall rules with a rule file."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import firewall
+from SoftLayer.CLI import formatting
+from SoftLayer import firewall_rules
+
+import click
+
+
+@click.command(epilog="""The rule file has one rule per line, e.g.
+
+    permit tcp from 10.0.0.0/24 to any on server port 80-443
+
+The format of 'slcli firewall edit' and a JSON list of rules are also
+accepted. Use '-' to read the rules from stdin.""")
+@click.argument('identifier')
+@click.argument('rule_file', type=click.File('r'))
+@click.option('--dry-run',
+              is_flag=True,
+              help="Show the changes without pushing the rules")
+@click.option('--compact/--no-compact',
+              default=True,
+              help="Drop shadowed rules and merge rules that only differ by "
+                   "ports or subnets")
+@environment.pass_env
+def cli(env, identifier, rule_file, dry_run, compact):
+    """Sync firewall rules with a rule file.
+
+    The rules are only pushed when they differ from the current rules.
+    """
+
+    mgr = SoftLayer.FirewallManager(env.client)
+    firewall_type, firewall_id = firewall.parse_id(identifier)
+    dedicated = firewall_type == 'vlan'
+
+    try:
+        rules = firewall_rules.parse_rules(rule_file.read())
+        result = mgr.sync_rules(firewall_id, rules,
+                                dedicated=dedicated,
+                                compact=compact,
+                                dry_run=True)
+    except ValueError as ex:
+        raise exceptions.CLIAbort('Invalid rules: %s' % ex)
+
+    env.out(env.fmt(firewall.changes_table(rules, result)))
+
+    if not result['changed']:
+        env.err('The firewall rules are up to date (%d rules)'
+                % len(result['rules']))
+        return
+    if dry_run:
+        return
+
+    if not (env.skip_confirmations or formatting.confirm(
+            'Push %d rules to the firewall?' % len(result['rules']))):
+        raise exceptions.CLIAbort('Aborted.')
+
+    if dedicated:
+        mgr.edit_dedicated_fwl_rules(firewall_id, result['rules'])
+    else:
+        mgr.edit_standard_fwl_rules(firewall_id, result['rules'])
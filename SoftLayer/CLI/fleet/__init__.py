@@ -0,0 +1 @@
+"""Operations on many hosts at once."""
@@ -0,0 +1,141 @@
+"""Power on, off, reboot or cycle many hosts at once."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+from SoftLayer.managers import power
+from SoftLayer import utils
+
+import click
+
+HOST_TYPES = {'vs': 'vs', 'server': 'hardware'}
+VERBS = {'on': 'power on', 'off': 'power off',
+         'reboot': 'reboot', 'cycle': 'power cycle'}
+PAST_TENSE = {'on': 'powered on', 'off': 'powered off',
+              'reboot': 'rebooted', 'cycle': 'power cycled'}
+
+
+@click.command(epilog="""Hosts can be given as ids, hostnames or IP
+addresses, read from a file with one per line ('-' for stdin), or found by
+tag and datacenter. A line is printed for each host as soon as its power
+action finishes.
+
+With --batch, hosts are powered a batch at a time, e.g. 10% of them, and
+once a host fails the remaining batches are skipped unless --keep-going is
+given.
+
+\b
+Examples:
+    slcli fleet power reboot --tag web -d dal05 --batch 10% --batch-wait 300
+    slcli fleet power off --type server --file hosts.txt""")
+@click.argument('action', type=click.Choice(sorted(VERBS)))
+@click.argument('identifiers', nargs=-1)
+@click.option('--type', 'host_type',
+              type=click.Choice(['vs', 'server']),
+              default='vs',
+              show_default=True,
+              help="Type of host")
+@click.option('--file', 'host_file',
+              type=click.File('r'),
+              help="File of hosts, one per line")
+@helpers.multi_option('--tag', help="Hosts with this tag")
+@click.option('--datacenter', '-d', help="Hosts in this datacenter")
+@click.option('--hard/--soft',
+              default=None,
+              help="Perform a hard or soft reboot or power off")
+@click.option('--batch',
+              help="Hosts per batch, as a number or a percentage, E.G.: 10%")
+@click.option('--batch-wait',
+              type=click.FLOAT,
+              default=0,
+              help="Seconds to wait between batches")
+@click.option('--keep-going',
+              is_flag=True,
+              help="Run the remaining batches after a host failed")
+@click.option('--workers',
+              type=click.INT,
+              default=utils.DEFAULT_MAX_WORKERS,
+              show_default=True,
+              help="Number of concurrent API calls")
+@click.option('--rate',
+              type=click.FLOAT,
+              default=5,
+              show_default=True,
+              help="Most API calls per second")
+@environment.pass_env
+def cli(env, action, identifiers, host_type, host_file, tag, datacenter, hard,
+        batch, batch_wait, keep_going, workers, rate):
+    """Power on, off, reboot or cycle many hosts at once."""
+
+    mgr = SoftLayer.PowerManager(env.client)
+    kind = HOST_TYPES[host_type]
+    name = 'VS' if kind == 'vs' else 'hardware'
+
+    identifiers = list(identifiers)
+    if host_file is not None:
+        for line in host_file:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                identifiers.append(line)
+    if not (identifiers or tag or datacenter):
+        raise exceptions.ArgumentError(
+            'Give the hosts as arguments, or with --file, --tag or '
+            '--datacenter')
+
+    host_ids = []
+    if identifiers:
+        host_ids = helpers.resolve_ids(
+            lambda identifier: mgr.resolve_ids(kind, identifier),
+            identifiers, name, max_workers=workers)
+    if tag or datacenter:
+        for host_id in mgr.find_hosts(kind, tags=list(tag),
+                                      datacenter=datacenter):
+            if host_id not in host_ids:
+                host_ids.append(host_id)
+    if not host_ids:
+        raise exceptions.CLIAbort('No hosts found')
+
+    try:
+        size = power.parse_batch_size(batch, len(host_ids))
+    except ValueError as ex:
+        raise exceptions.ArgumentError('--batch %s' % ex)
+    method = action
+    if hard is not None:
+        method = '%s-%s' % (action, 'hard' if hard else 'soft')
+    if method not in power.POWER_METHODS[kind]:
+        raise exceptions.ArgumentError(
+            '%s is not supported for %s'
+            % (' --'.join(method.rsplit('-', 1)), host_type))
+
+    batches = -(-len(host_ids) // size)
+    if action != 'on' and not (env.skip_confirmations or formatting.confirm(
+            'This will %s %d %s host(s) in %d batch(es). Continue?'
+            % (VERBS[action], len(host_ids), host_type, batches))):
+        raise exceptions.CLIAbort('Aborted.')
+
+    failed = 0
+    finished = 0
+    for result in mgr.power(kind, host_ids, method,
+                            max_workers=workers,
+                            rate=rate,
+                            batch_size=size,
+                            batch_wait=batch_wait,
+                            stop_on_failure=not keep_going):
+        finished += 1
+        if result['success']:
+            env.out('%s %s %s (batch %d)' % (host_type, result['id'],
+                                             PAST_TENSE[action],
+                                             result['batch']))
+        else:
+            failed += 1
+            env.out('%s %s failed (batch %d): %s' % (host_type, result['id'],
+                                                     result['batch'],
+                                                     result['error']))
+
+    skipped = len(host_ids) - finished
+    if failed or skipped:
+        raise exceptions.CLIAbort('%d of %d hosts failed, %d skipped'
+                                  % (failed, len(host_ids), skipped))
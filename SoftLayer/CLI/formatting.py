@@ -68,6 +68,23 @@ def format_output(data, fmt='table'):  # pylint: disable=R0911,R0912
     return data
 
 
+def format_many(outputs, fmt='table'):
+    """Formats many outputs as a single document.
+
+    Unlike a list given to :func:`format_output`, they're formatted as one
+    JSON array in the json format.
+
+    :param list outputs: outputs :func:`format_output` can format
+    :param string fmt (optional): One of: table, raw, json, python
+    """
+    if fmt == 'json':
+        return json.dumps([format_output(output, fmt='python')
+                           for output in outputs],
+                          indent=4,
+                          cls=CLIJSONEncoder)
+    return format_output(list(outputs), fmt=fmt)
+
+
 def format_prettytable(table):
     """Converts SoftLayer.CLI.formatting.Table instance to a prettytable."""
     for i, row in enumerate(table.rows):
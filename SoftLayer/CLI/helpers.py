@@ -7,6 +7,7 @@
 """
 
 from SoftLayer.CLI import exceptions
+from SoftLayer import utils
 
 import click
 
@@ -48,3 +49,42 @@ def resolve_id(resolver, identifier, name='object'):
             (name, identifier, ', '.join([str(_id) for _id in ids])))
 
     return ids[0]
+
+
+def resolve_ids(resolver, identifiers, name='object',
+                max_workers=utils.DEFAULT_MAX_WORKERS):
+    """Resolves many ids concurrently using a resolver function.
+
+    Every identifier is resolved before any error is raised, so all of the
+    ones which can't be resolved are reported at once.
+
+    :param resolver: function that resolves ids. Should return None or a list
+                     of ids.
+    :param list identifiers: string identifiers used to resolve ids
+    :param string name: the object type, to be used in error messages
+    :param int max_workers: the maximum number of concurrent lookups
+    :returns: the ids in the order of the identifiers, without duplicates
+
+    """
+    identifiers = list(identifiers)
+    results = utils.concurrent_map(resolver, identifiers,
+                                   max_workers=max_workers)
+
+    ids = []
+    messages = []
+    for identifier, (found, error) in zip(identifiers, results):
+        if error is not None:
+            raise error
+        if not found:
+            messages.append("Error: Unable to find %s '%s'"
+                            % (name, identifier))
+        elif len(found) > 1:
+            messages.append("Error: Multiple %s found for '%s': %s" %
+                            (name, identifier,
+                             ', '.join([str(_id) for _id in found])))
+        elif found[0] not in ids:
+            ids.append(found[0])
+
+    if messages:
+        raise exceptions.CLIAbort('\n'.join(messages))
+    return ids
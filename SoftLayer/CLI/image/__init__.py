@@ -1,6 +1,8 @@
 """Compute images."""
 # :license: MIT, see LICENSE for more details.
+from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
 
 
 MASK = ('id,accountId,name,globalIdentifier,parentId,publicFlag,flexImageFlag,'
@@ -9,3 +11,16 @@ DETAIL_MASK = MASK + (',children[id,blockDevicesDiskSpaceTotal,datacenter],'
                       'note,createDate,status')
 PUBLIC_TYPE = formatting.FormattedItem('PUBLIC', 'Public')
 PRIVATE_TYPE = formatting.FormattedItem('PRIVATE', 'Private')
+
+
+def resolve_id(image_mgr, identifier):
+    """Resolves an image id, suggesting similar names if none match."""
+    ids = image_mgr.resolve_ids(identifier)
+    if not ids:
+        names = sorted(set(image['name'] for image
+                           in image_mgr.index.suggest(identifier)))
+        if names:
+            raise exceptions.CLIAbort(
+                "Error: Unable to find image '%s'. Did you mean: %s?"
+                % (identifier, ', '.join(names)))
+    return helpers.resolve_id(lambda _: ids, identifier, 'image')
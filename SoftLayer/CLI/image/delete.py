@@ -3,7 +3,7 @@
 
 import SoftLayer
 from SoftLayer.CLI import environment
-from SoftLayer.CLI import helpers
+from SoftLayer.CLI import image as image_mod
 
 import click
 
@@ -15,6 +15,6 @@ def cli(env, identifier):
     """Delete an image."""
 
     image_mgr = SoftLayer.ImageManager(env.client)
-    image_id = helpers.resolve_id(image_mgr.resolve_ids, identifier, 'image')
+    image_id = image_mod.resolve_id(image_mgr, identifier)
 
     image_mgr.delete_image(image_id)
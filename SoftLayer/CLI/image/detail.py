@@ -4,7 +4,6 @@
 import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import formatting
-from SoftLayer.CLI import helpers
 from SoftLayer.CLI import image as image_mod
 from SoftLayer import utils
 
@@ -18,7 +17,7 @@ def cli(env, identifier):
     """Get details for an image."""
 
     image_mgr = SoftLayer.ImageManager(env.client)
-    image_id = helpers.resolve_id(image_mgr.resolve_ids, identifier, 'image')
+    image_id = image_mod.resolve_id(image_mgr, identifier)
 
     image = image_mgr.get_image(image_id, mask=image_mod.DETAIL_MASK)
     disk_space = 0
@@ -0,0 +1,84 @@
+"""Copy an image to many datacenters."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+from SoftLayer.CLI import image as image_mod
+
+import click
+
+
+@click.command(epilog="""Progress is printed to stderr as the copies are
+made and a table of the final state of each datacenter once they're done.
+
+\b
+Examples:
+    slcli image distribute golden-image -d dal05 -d ams01 -d sng01
+    slcli image distribute golden-image --uri swift://... -d dal05""")
+@click.argument('identifier')
+@helpers.multi_option('--datacenter', '-d',
+                      required=True,
+                      help="Datacenter to copy the image to")
+@click.option('--uri',
+              help="Import a new image named IDENTIFIER from this URI first")
+@click.option('--note', default="",
+              help="The note of the imported image")
+@click.option('--osrefcode', default="",
+              help="The referenceCode of the operating system software"
+                   " description for the imported VHD")
+@click.option('--interval',
+              type=click.FLOAT,
+              default=30,
+              show_default=True,
+              help="Seconds between progress checks")
+@click.option('--timeout',
+              type=click.FLOAT,
+              default=7200,
+              show_default=True,
+              help="Seconds to wait for the copies")
+@environment.pass_env
+def cli(env, identifier, datacenter, uri, note, osrefcode, interval, timeout):
+    """Copy an image to many datacenters."""
+
+    image_mgr = SoftLayer.ImageManager(env.client)
+    if uri:
+        data = {'name': identifier, 'uri': uri}
+        if note:
+            data['note'] = note
+        if osrefcode:
+            data['operatingSystemReferenceCode'] = osrefcode
+        result = image_mgr.import_image_from_uri(data)
+        if not result:
+            raise exceptions.CLIAbort("Failed to import Image")
+        image_id = result['id']
+        env.err('Importing image %s' % image_id)
+    else:
+        image_id = image_mod.resolve_id(image_mgr, identifier)
+
+    states = {}
+    try:
+        for event in image_mgr.distribute_image(image_id, datacenter,
+                                                interval=interval,
+                                                timeout=timeout):
+            env.err('%s: %s %s' % (event['datacenter'] or 'image',
+                                   event['state'], event['detail']))
+            if event['datacenter'] is not None:
+                states[event['datacenter']] = event
+    except SoftLayer.SoftLayerError as ex:
+        raise exceptions.CLIAbort(str(ex))
+
+    table = formatting.Table(['datacenter', 'state', 'detail'])
+    failures = 0
+    for name, event in sorted(states.items()):
+        if event['state'] != 'ready':
+            failures += 1
+        table.add_row([name, event['state'],
+                       event['detail'] or formatting.blank()])
+    env.out(env.fmt(table))
+
+    if failures:
+        raise exceptions.CLIAbort('%d of %d datacenters failed'
+                                  % (failures, len(states)))
@@ -4,7 +4,7 @@
 import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import exceptions
-from SoftLayer.CLI import helpers
+from SoftLayer.CLI import image as image_mod
 
 import click
 
@@ -26,6 +26,6 @@ def cli(env, identifier, name, note, tag):
         data['note'] = note
     if tag:
         data['tag'] = tag
-    image_id = helpers.resolve_id(image_mgr.resolve_ids, identifier, 'image')
+    image_id = image_mod.resolve_id(image_mgr, identifier)
     if not image_mgr.edit(image_id, **data):
         raise exceptions.CLIAbort("Failed to Edit Image")
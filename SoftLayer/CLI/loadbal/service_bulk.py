@@ -0,0 +1,160 @@
+"""Add, edit, toggle and delete many load balancer services."""
+# :license: MIT, see LICENSE for more details.
+
+import csv
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import loadbal
+
+import click
+
+ACTIONS = ['add', 'edit', 'toggle', 'delete']
+INT_FIELDS = {
+    'group': 'group_id',
+    'service': 'service_id',
+    'port': 'port',
+    'weight': 'weight',
+    'healthcheck_type': 'hc_type',
+}
+TRUE_VALUES = ['1', 'true', 'yes', 'enabled']
+FALSE_VALUES = ['0', 'false', 'no', 'disabled']
+
+
+def read_changes(change_file, file_format):
+    """Reads the rows of a CSV or YAML change file."""
+    if file_format == 'yaml':
+        try:
+            import yaml
+        except ImportError:
+            raise exceptions.CLIAbort('PyYAML is required to read YAML files')
+        try:
+            rows = yaml.safe_load(change_file)
+        except yaml.YAMLError as ex:
+            raise exceptions.CLIAbort('Invalid YAML: %s' % ex)
+        if isinstance(rows, dict):
+            rows = rows.get('services')
+        if not isinstance(rows, list) or not all(isinstance(row, dict)
+                                                 for row in rows):
+            raise exceptions.CLIAbort('The YAML file should be a list of '
+                                      'services')
+        return rows
+    return list(csv.DictReader(line for line in change_file
+                               if line.strip() and
+                               not line.lstrip().startswith('#')))
+
+
+def parse_change(row):
+    """Turns a row of the change file into a change for the manager.
+
+    :raises ValueError: if a value is invalid
+    """
+    row = dict((str(key).strip().lower(), value)
+               for key, value in row.items()
+               if key is not None and value not in (None, ''))
+    action = str(row.pop('action', '')).strip().lower()
+    if action not in ACTIONS:
+        raise ValueError('Invalid action %r' % action)
+
+    change = {'action': action}
+    for key, value in row.items():
+        if key in INT_FIELDS:
+            try:
+                change[INT_FIELDS[key]] = int(value)
+            except ValueError:
+                raise ValueError('Invalid %s %r' % (key, value))
+        elif key in ('ip', 'ip_address'):
+            change['ip_address'] = str(value).strip()
+        elif key == 'enabled':
+            change['enabled'] = _boolean(value)
+        else:
+            raise ValueError('Unknown column %s' % key)
+    return change
+
+
+def _boolean(value):
+    """Parses the value of the enabled column."""
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError('Invalid enabled value %r' % value)
+
+
+@click.command(epilog="""The change file is a CSV file with a header, e.g.
+
+\b
+    action,group,service,ip,port,weight,enabled,healthcheck_type
+    add,50718,,10.0.0.5,8080,1,true,21
+    edit,,1234,,,5,,
+    toggle,,1235,,,,,
+    delete,,1236,,,,,
+
+or a YAML list of services with the same keys. Use '-' to read the changes
+from stdin.""")
+@click.argument('identifier')
+@click.argument('change_file', type=click.File('r'))
+@click.option('--format', 'file_format',
+              type=click.Choice(['csv', 'yaml']),
+              help="The format of the change file. Files ending with .yaml "
+                   "or .yml are read as YAML, others as CSV.")
+@click.option('--dry-run',
+              is_flag=True,
+              help="Check the changes without making them")
+@environment.pass_env
+def cli(env, identifier, change_file, file_format, dry_run):
+    """Add, edit, toggle and delete many load balancer services.
+
+    All adds, edits and toggles are made with a single update of the load
+    balancer.
+    """
+
+    mgr = SoftLayer.LoadBalancerManager(env.client)
+    _, loadbal_id = loadbal.parse_id(identifier)
+
+    if file_format is None:
+        name = getattr(change_file, 'name', '') or ''
+        if name.lower().endswith(('.yaml', '.yml')):
+            file_format = 'yaml'
+        else:
+            file_format = 'csv'
+
+    changes = []
+    for number, row in enumerate(read_changes(change_file, file_format), 1):
+        try:
+            changes.append(parse_change(row))
+        except ValueError as ex:
+            raise exceptions.CLIAbort('Invalid change %d: %s' % (number, ex))
+    if not changes:
+        raise exceptions.CLIAbort('No changes found')
+
+    if not (dry_run or env.skip_confirmations or formatting.confirm(
+            'Make %d service changes to load balancer %s?'
+            % (len(changes), identifier))):
+        raise exceptions.CLIAbort('Aborted.')
+
+    results = mgr.apply_service_changes(loadbal_id, changes, dry_run=dry_run)
+
+    table = formatting.Table(['#', 'action', 'id', 'status'])
+    failures = 0
+    for number, result in enumerate(results, 1):
+        change = result['change']
+        object_id = change.get('service_id', change.get('group_id'))
+        if result['success']:
+            status = 'valid' if dry_run else 'done'
+        else:
+            status = result['error']
+            failures += 1
+        table.add_row([number, change['action'],
+                       formatting.blank() if object_id is None else object_id,
+                       status])
+    env.out(env.fmt(table))
+
+    if failures:
+        raise exceptions.CLIAbort('%d of %d service changes failed'
+                                  % (failures, len(results)))
@@ -0,0 +1,49 @@
+"""Watch the services of a load balancer for changes."""
+# :license: MIT, see LICENSE for more details.
+
+import json
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import loadbal
+from SoftLayer import transports
+
+import click
+
+
+@click.command(epilog="""Each change is printed as a line of JSON, e.g.
+
+\b
+    {"event": "changed", "changes": {"status": {"old": "UP", "new": "DOWN"}},
+     "service": {...}, "time": "2015-01-01T00:00:00Z"}
+
+The first poll prints an "initial" event for every service. Polls are made
+more often while services are changing and less often while they aren't.""")
+@click.argument('identifier')
+@click.option('--interval',
+              type=click.FLOAT,
+              default=5,
+              show_default=True,
+              help="Seconds between polls while services are changing")
+@click.option('--max-interval',
+              type=click.FLOAT,
+              default=60,
+              show_default=True,
+              help="Most seconds between polls while nothing changes")
+@click.option('--count',
+              type=click.INT,
+              help="Stop after this many polls")
+@environment.pass_env
+def cli(env, identifier, interval, max_interval, count):
+    """Watch the services of a load balancer for changes."""
+
+    mgr = SoftLayer.LoadBalancerManager(env.client)
+    _, loadbal_id = loadbal.parse_id(identifier)
+
+    with transports.pooled_connections(env.client.transport):
+        for event in mgr.watch_services(loadbal_id,
+                                        interval=interval,
+                                        max_interval=max(interval,
+                                                         max_interval),
+                                        polls=count):
+            env.out(json.dumps(event, sort_keys=True))
@@ -1,7 +1,24 @@
 """Message queue service."""
 # :license: MIT, see LICENSE for more details.
 
+import os
+import os.path
+
 from SoftLayer.CLI import formatting
+from SoftLayer.managers import messaging
+
+# Auth tokens are only kept in memory, unless this environment variable names
+# a file to save them to, e.g. ~/.softlayer_mq_tokens, so that separate runs
+# don't each re-authenticate. The file is only readable by its owner.
+TOKEN_CACHE_ENV = 'SL_MQ_TOKEN_CACHE'
+
+
+def token_cache():
+    """Returns the auth token cache shared by the mq commands."""
+    path = os.environ.get(TOKEN_CACHE_ENV)
+    if path:
+        path = os.path.expanduser(path)
+    return messaging.get_token_cache(path or None)
 
 
 def queue_table(queue):
@@ -33,6 +50,24 @@ def message_table(message):
     return [table, message['body']]
 
 
+def push_stats_table(summary):
+    """Returns a table with the throughput and latency of pushes."""
+    table = formatting.Table(['property', 'value'])
+    table.align['property'] = 'r'
+    table.align['value'] = 'l'
+
+    table.add_row(['sent', summary['sent']])
+    table.add_row(['failed', summary['failed']])
+    table.add_row(['seconds', round(summary['seconds'], 3)])
+    table.add_row(['messages_per_second', round(summary['rate'], 1)])
+    for key in ('min', 'mean', 'p50', 'p95', 'p99', 'max'):
+        latency = summary['latency'].get(key)
+        table.add_row(['latency_%s_ms' % key,
+                       formatting.blank() if latency is None
+                       else round(latency * 1000, 1)])
+    return table
+
+
 def topic_table(topic):
     """Returns a table with details about a topic."""
     table = formatting.Table(['property', 'value'])
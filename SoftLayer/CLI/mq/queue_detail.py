@@ -19,7 +19,8 @@ import click
 def cli(env, account_id, queue_name, datacenter, network):
     """Detail a queue."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
     queue = mq_client.get_queue(queue_name)
@@ -0,0 +1,65 @@
+"""Pops every message from a queue and prints them as JSON lines."""
+# :license: MIT, see LICENSE for more details.
+
+import json
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import mq
+from SoftLayer.managers import messaging
+from SoftLayer import utils
+
+import click
+
+
+@click.command(epilog="""Each message is printed as a line of JSON once it
+has been popped, and is deleted from the queue in the background
+afterwards. Messages which were printed but couldn't be deleted will be
+popped again after their visibility interval.""")
+@click.argument('account-id')
+@click.argument('queue-name')
+@click.option('--batch',
+              default=100,
+              show_default=True,
+              type=click.INT,
+              help="Number of messages to pop at a time")
+@click.option('--workers',
+              default=utils.DEFAULT_MAX_WORKERS,
+              show_default=True,
+              type=click.INT,
+              help="Number of concurrent deletes")
+@click.option('--max-messages',
+              type=click.INT,
+              help="Stop after this many messages")
+@click.option('--datacenter', help="Datacenter, E.G.: dal05")
+@click.option('--network',
+              type=click.Choice(['public', 'private']),
+              help="Network type")
+@environment.pass_env
+def cli(env, account_id, queue_name, batch, workers, max_messages, datacenter,
+        network):
+    """Pops every message from a queue and prints them as JSON lines."""
+
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
+    mq_client = manager.get_connection(account_id,
+                                       datacenter=datacenter, network=network,
+                                       pool_size=workers + 1)
+
+    def write(message):
+        """Prints a message."""
+        env.out(json.dumps(message, sort_keys=True))
+
+    # A single handler keeps the messages in the order they were popped
+    consumer = messaging.QueueConsumer(mq_client, queue_name, write,
+                                       batch_size=batch,
+                                       max_workers=1,
+                                       delete_workers=workers,
+                                       delete_batch_size=batch)
+    stats = consumer.run(max_messages=max_messages)
+
+    env.err('Drained %(handled)d messages, deleted %(deleted)d' % stats)
+    if stats['delete_failed']:
+        raise exceptions.CLIAbort('Unable to delete %d messages'
+                                  % stats['delete_failed'])
@@ -4,6 +4,7 @@
 import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import formatting
+from SoftLayer.CLI import mq
 
 import click
 
@@ -18,7 +19,8 @@ import click
 def cli(env, account_id, datacenter, network):
     """List all queues on an account."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
 
@@ -26,7 +26,8 @@ import click
 def cli(env, account_id, queue_name, count, delete_after, datacenter, network):
     """Pops a message from a queue."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
 
@@ -36,6 +37,11 @@ def cli(env, account_id, queue_name, count, delete_after, datacenter, network):
         formatted_messages.append(mq.message_table(message))
 
     if delete_after:
-        for message in messages['items']:
-            mq_client.delete_message(queue_name, message['id'])
+        results = mq_client.delete_messages(queue_name,
+                                            [message['id'] for message
+                                             in messages['items']])
+        for result in results:
+            if result['error'] is not None:
+                env.err('Unable to delete message %s: %s'
+                        % (result['id'], result['error']))
     return formatted_messages
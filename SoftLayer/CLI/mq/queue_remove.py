@@ -3,6 +3,7 @@
 
 import SoftLayer
 from SoftLayer.CLI import environment
+from SoftLayer.CLI import mq
 
 import click
 
@@ -20,7 +21,8 @@ import click
 def cli(env, account_id, queue_name, message_id, force, datacenter, network):
     """Delete a queue or a queued message."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
 
@@ -32,7 +32,8 @@ def cli(env, account_id, topic_name, datacenter, network,
         visibility_interval, expiration, tag):
     """Create a new topic."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
 
@@ -19,7 +19,8 @@ import click
 def cli(env, account_id, topic_name, datacenter, network):
     """Detail a topic."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
     topic = mq_client.get_topic(topic_name)
@@ -0,0 +1,64 @@
+"""Publish every line of a file to a topic."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import mq
+from SoftLayer.managers import messaging
+from SoftLayer import utils
+
+import click
+
+
+@click.command(epilog="""Each non-empty line of the file is published as a
+message, with up to WORKERS messages being pushed at a time. Failed messages
+are reported as they happen and a summary of the throughput and latency is
+printed once every message has been pushed.""")
+@click.argument('account-id')
+@click.argument('topic-name')
+@click.argument('messages', type=click.File('r'))
+@click.option('--workers',
+              default=utils.DEFAULT_MAX_WORKERS,
+              show_default=True,
+              type=click.INT,
+              help="Number of concurrent pushes")
+@click.option('--window',
+              type=click.INT,
+              help="Most messages in flight [default: twice WORKERS]")
+@click.option('--datacenter', help="Datacenter, E.G.: dal05")
+@click.option('--network',
+              type=click.Choice(['public', 'private']),
+              help="Network type")
+@environment.pass_env
+def cli(env, account_id, topic_name, messages, workers, window, datacenter,
+        network):
+    """Publish every line of a file to a topic."""
+
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
+    mq_client = manager.get_connection(account_id,
+                                       datacenter=datacenter, network=network,
+                                       pool_size=workers)
+
+    def read_messages():
+        """Reads the messages, skipping blank lines."""
+        for line in messages:
+            body = line.rstrip('\r\n')
+            if body:
+                yield body
+
+    stats = messaging.PushStats()
+    for result in stats.track(mq_client.push_topic_messages(
+            topic_name, read_messages(), max_workers=workers,
+            window=window)):
+        if result['error'] is not None:
+            env.err('Failed to publish %r: %s'
+                    % (result['message'], result['error']))
+
+    summary = stats.summary()
+    env.out(env.fmt(mq.push_stats_table(summary)))
+    if summary['failed']:
+        raise exceptions.CLIAbort('Unable to publish %d of %d messages'
+                                  % (summary['failed'],
+                                     summary['failed'] + summary['sent']))
@@ -21,7 +21,8 @@ import click
 def cli(env, account_id, topic_name, message, datacenter, network):
     """Push a message into a topic."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
 
@@ -3,6 +3,7 @@
 
 import SoftLayer
 from SoftLayer.CLI import environment
+from SoftLayer.CLI import mq
 
 import click
 
@@ -19,7 +20,8 @@ import click
 def cli(env, account_id, topic_name, force, datacenter, network):
     """Delete a topic."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
     mq_client.delete_topic(topic_name, force)
@@ -29,7 +29,8 @@ def cli(env, account_id, topic_name, datacenter, network, sub_type, queue_name,
         http_method, http_url, http_body):
     """Create a subscription on a topic."""
 
-    manager = SoftLayer.MessagingManager(env.client)
+    manager = SoftLayer.MessagingManager(env.client,
+                                         token_cache=mq.token_cache())
     mq_client = manager.get_connection(account_id,
                                        datacenter=datacenter, network=network)
     if sub_type == 'queue':
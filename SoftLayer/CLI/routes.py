@@ -50,6 +50,7 @@ ALL_ROUTES = [
     ('dns:record-edit', 'SoftLayer.CLI.dns.record_edit:cli'),
     ('dns:record-list', 'SoftLayer.CLI.dns.record_list:cli'),
     ('dns:record-remove', 'SoftLayer.CLI.dns.record_remove:cli'),
+    ('dns:sync', 'SoftLayer.CLI.dns.zone_sync:cli'),
     ('dns:zone-create', 'SoftLayer.CLI.dns.zone_create:cli'),
     ('dns:zone-delete', 'SoftLayer.CLI.dns.zone_delete:cli'),
     ('dns:zone-list', 'SoftLayer.CLI.dns.zone_list:cli'),
@@ -61,6 +62,10 @@ ALL_ROUTES = [
     ('firewall:detail', 'SoftLayer.CLI.firewall.detail:cli'),
     ('firewall:edit', 'SoftLayer.CLI.firewall.edit:cli'),
     ('firewall:list', 'SoftLayer.CLI.firewall.list:cli'),
+    ('firewall:sync', 'SoftLayer.CLI.firewall.sync:cli'),
+
+    ('fleet', 'SoftLayer.CLI.fleet'),
+    ('fleet:power', 'SoftLayer.CLI.fleet.power:cli'),
 
     ('globalip', 'SoftLayer.CLI.globalip'),
     ('globalip:assign', 'SoftLayer.CLI.globalip.assign:cli'),
@@ -72,6 +77,7 @@ ALL_ROUTES = [
     ('image', 'SoftLayer.CLI.image'),
     ('image:delete', 'SoftLayer.CLI.image.delete:cli'),
     ('image:detail', 'SoftLayer.CLI.image.detail:cli'),
+    ('image:distribute', 'SoftLayer.CLI.image.distribute:cli'),
     ('image:edit', 'SoftLayer.CLI.image.edit:cli'),
     ('image:list', 'SoftLayer.CLI.image.list:cli'),
     ('image:import', 'SoftLayer.CLI.image.import:cli'),
@@ -96,9 +102,11 @@ ALL_ROUTES = [
     ('loadbal:routing-methods', 'SoftLayer.CLI.loadbal.routing_methods:cli'),
     ('loadbal:routing-types', 'SoftLayer.CLI.loadbal.routing_types:cli'),
     ('loadbal:service-add', 'SoftLayer.CLI.loadbal.service_add:cli'),
+    ('loadbal:service-bulk', 'SoftLayer.CLI.loadbal.service_bulk:cli'),
     ('loadbal:service-delete', 'SoftLayer.CLI.loadbal.service_delete:cli'),
     ('loadbal:service-edit', 'SoftLayer.CLI.loadbal.service_edit:cli'),
     ('loadbal:service-toggle', 'SoftLayer.CLI.loadbal.service_toggle:cli'),
+    ('loadbal:watch', 'SoftLayer.CLI.loadbal.watch:cli'),
 
     ('messaging', 'SoftLayer.CLI.mq'),
     ('messaging:accounts-list', 'SoftLayer.CLI.mq.accounts_list:cli'),
@@ -106,6 +114,7 @@ ALL_ROUTES = [
     ('messaging:ping', 'SoftLayer.CLI.mq.ping:cli'),
     ('messaging:queue-add', 'SoftLayer.CLI.mq.queue_add:cli'),
     ('messaging:queue-detail', 'SoftLayer.CLI.mq.queue_detail:cli'),
+    ('messaging:queue-drain', 'SoftLayer.CLI.mq.queue_drain:cli'),
     ('messaging:queue-edit', 'SoftLayer.CLI.mq.queue_edit:cli'),
     ('messaging:queue-list', 'SoftLayer.CLI.mq.queue_list:cli'),
     ('messaging:queue-pop', 'SoftLayer.CLI.mq.queue_pop:cli'),
@@ -114,6 +123,7 @@ ALL_ROUTES = [
     ('messaging:topic-add', 'SoftLayer.CLI.mq.topic_add:cli'),
     ('messaging:topic-detail', 'SoftLayer.CLI.mq.topic_detail:cli'),
     ('messaging:topic-list', 'SoftLayer.CLI.mq.topic_list:cli'),
+    ('messaging:topic-publish', 'SoftLayer.CLI.mq.topic_publish:cli'),
     ('messaging:topic-push', 'SoftLayer.CLI.mq.topic_push:cli'),
     ('messaging:topic-remove', 'SoftLayer.CLI.mq.topic_remove:cli'),
     ('messaging:topic-subscribe', 'SoftLayer.CLI.mq.topic_subscribe:cli'),
@@ -152,6 +162,7 @@ ALL_ROUTES = [
     ('snapshot:create-space', 'SoftLayer.CLI.snapshot.create_space:cli'),
     ('snapshot:list', 'SoftLayer.CLI.snapshot.list:cli'),
     ('snapshot:restore-volume', 'SoftLayer.CLI.snapshot.restore_volume:cli'),
+    ('snapshot:rotate', 'SoftLayer.CLI.snapshot.rotate:cli'),
 
     ('sshkey', 'SoftLayer.CLI.sshkey'),
     ('sshkey:add', 'SoftLayer.CLI.sshkey.add:cli'),
@@ -181,6 +192,7 @@ ALL_ROUTES = [
     ('ticket:update', 'SoftLayer.CLI.ticket.update:cli'),
     ('ticket:subjects', 'SoftLayer.CLI.ticket.subjects:cli'),
     ('ticket:summary', 'SoftLayer.CLI.ticket.summary:cli'),
+    ('ticket:sync', 'SoftLayer.CLI.ticket.sync:cli'),
 
     ('vlan', 'SoftLayer.CLI.vlan'),
     ('vlan:detail', 'SoftLayer.CLI.vlan.detail:cli'),
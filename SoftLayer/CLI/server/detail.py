@@ -1,8 +1,9 @@
-"""Get details for a hardware device."""
+"""Get details for hardware devices."""
 # :license: MIT, see LICENSE for more details.
 
 import SoftLayer
 from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import formatting
 from SoftLayer.CLI import helpers
 from SoftLayer import utils
@@ -10,8 +11,10 @@ from SoftLayer import utils
 import click
 
 
-@click.command()
-@click.argument('identifier')
+@click.command(epilog="""Many servers can be given at once. They are all
+fetched concurrently and printed one after the other, or as a single list
+with --format json.""")
+@click.argument('identifiers', nargs=-1, required=True)
 @click.option('--passwords',
               is_flag=True,
               help='Show passwords (check over your shoulder!)')
@@ -19,19 +22,47 @@ import click
               is_flag=True,
               help='Show associated prices')
 @environment.pass_env
-def cli(env, identifier, passwords, price):
-    """Get details for a hardware device."""
+def cli(env, identifiers, passwords, price):
+    """Get details for hardware devices."""
 
     hardware = SoftLayer.HardwareManager(env.client)
-
+    hardware_ids = helpers.resolve_ids(hardware.resolve_ids,
+                                       identifiers,
+                                       'hardware')
+
+    failed = 0
+    tables = []
+    for detail in hardware.get_hardware_details(hardware_ids):
+        if detail['error'] is not None:
+            failed += 1
+            env.err('Unable to get details for hardware %s: %s'
+                    % (detail['id'], detail['error']))
+            continue
+        table = _detail_table(detail['hardware'], detail['ptr_records'],
+                              passwords=passwords, price=price)
+        if env.format == 'table':
+            env.out(env.fmt(table))
+        else:
+            # Machine formats get a single document
+            tables.append(table)
+
+    if len(hardware_ids) == 1 and tables:
+        env.out(env.fmt(tables[0]))
+    elif tables:
+        env.out(formatting.format_many(tables, fmt=env.format))
+
+    if failed:
+        raise exceptions.CLIAbort(
+            'Unable to get details for %d of %d servers'
+            % (failed, len(hardware_ids)))
+
+
+def _detail_table(result, ptr_records, passwords=False, price=False):
+    """Returns a table with the details of a hardware device."""
     table = formatting.KeyValueTable(['Name', 'Value'])
     table.align['Name'] = 'r'
     table.align['Value'] = 'l'
 
-    hardware_id = helpers.resolve_id(hardware.resolve_ids,
-                                     identifier,
-                                     'hardware')
-    result = hardware.get_hardware(hardware_id)
     result = utils.NestedDict(result)
 
     table.add_row(['id', result['id']])
@@ -102,16 +133,7 @@ def cli(env, identifier, passwords, price):
     if tag_row:
         table.add_row(['tags', formatting.listing(tag_row, separator=',')])
 
-    # Test to see if this actually has a primary (public) ip address
-    try:
-        if not result['privateNetworkOnlyFlag']:
-            ptr_domains = (env.client['Hardware_Server']
-                           .getReverseDomainRecords(id=hardware_id))
-
-            for ptr_domain in ptr_domains:
-                for ptr in ptr_domain['resourceRecords']:
-                    table.add_row(['ptr', ptr['data']])
-    except SoftLayer.SoftLayerAPIError:
-        pass
+    for ptr in ptr_records:
+        table.add_row(['ptr', ptr])
 
     return table
@@ -0,0 +1,126 @@
+"""Create and prune iSCSI snapshots under a retention policy."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import helpers
+from SoftLayer.managers import iscsi
+
+import click
+
+
+@click.command(epilog="""A volume is snapshotted when its newest snapshot is
+at least INTERVAL hours old. A snapshot is kept if it is one of the KEEP
+newest, the newest of one of the last DAILY days or the newest of one of the
+last WEEKLY weeks, and deleted otherwise. A volume's old snapshots are only
+deleted once its new snapshot has been created.
+
+Only the snapshots with the rotation's notes are rotated, so snapshots taken
+by hand are never deleted unless --all-snapshots is given.
+
+\b
+Example, run nightly from cron:
+    slcli --really snapshot rotate --keep 7 --weekly 4""")
+@click.argument('identifiers', nargs=-1)
+@click.option('--interval',
+              type=click.FLOAT,
+              default=23,
+              show_default=True,
+              help="Hours between snapshots. The default lets a nightly run "
+                   "start a little early.")
+@click.option('--keep',
+              type=click.INT,
+              default=7,
+              show_default=True,
+              help="Number of newest snapshots to keep")
+@click.option('--daily',
+              type=click.INT,
+              default=0,
+              help="Number of days to keep a snapshot of")
+@click.option('--weekly',
+              type=click.INT,
+              default=0,
+              help="Number of weeks to keep a snapshot of")
+@click.option('--notes',
+              default=iscsi.ROTATION_NOTES,
+              show_default=True,
+              help="Notes for the new snapshots. Only snapshots with these "
+                   "notes are rotated.")
+@click.option('--all-snapshots',
+              is_flag=True,
+              help="Also prune snapshots the rotation didn't create")
+@click.option('--workers',
+              type=click.INT,
+              default=4,
+              show_default=True,
+              help="Number of concurrent API calls")
+@click.option('--rate',
+              type=click.FLOAT,
+              help="Most API calls per second")
+@click.option('--dry-run',
+              is_flag=True,
+              help="Print the plan without running it")
+@environment.pass_env
+def cli(env, identifiers, interval, keep, daily, weekly, notes, all_snapshots,
+        workers, rate, dry_run):
+    """Create and prune iSCSI snapshots under a retention policy.
+
+    Rotates every iSCSI volume on the account, or only the given ones.
+    """
+
+    iscsi_mgr = SoftLayer.ISCSIManager(env.client)
+    volume_ids = None
+    if identifiers:
+        volume_ids = [helpers.resolve_id(iscsi_mgr.resolve_ids, identifier,
+                                         'iSCSI')
+                      for identifier in identifiers]
+    try:
+        policy = iscsi.SnapshotPolicy(interval=interval, keep=keep,
+                                      daily=daily, weekly=weekly)
+    except ValueError as ex:
+        raise exceptions.CLIAbort(str(ex))
+
+    plan = iscsi_mgr.plan_snapshot_rotation(policy, volume_ids=volume_ids,
+                                            notes=notes,
+                                            all_snapshots=all_snapshots)
+
+    table = formatting.Table(['action', 'volume', 'snapshot', 'created',
+                              'status'])
+    if dry_run or not plan:
+        for operation in plan:
+            table.add_row(_row(operation, operation['reason']))
+        env.out(env.fmt(table))
+        return
+
+    creates = len([operation for operation in plan
+                   if operation['action'] == 'create'])
+    if not (env.skip_confirmations or formatting.confirm(
+            'Create %d and delete %d snapshots?'
+            % (creates, len(plan) - creates))):
+        raise exceptions.CLIAbort('Aborted.')
+
+    failures = 0
+    for result in iscsi_mgr.run_snapshot_plan(plan, notes=notes,
+                                              max_workers=workers, rate=rate):
+        if result['success']:
+            status = 'done'
+        else:
+            status = str(result['error'])
+            failures += 1
+        table.add_row(_row(result, status))
+    env.out(env.fmt(table))
+
+    if failures:
+        raise exceptions.CLIAbort('%d of %d snapshot operations failed'
+                                  % (failures, len(plan)))
+
+
+def _row(operation, status):
+    """Returns a table row for an operation."""
+    return [operation['action'],
+            operation['volume'] or operation['volume_id'],
+            operation['snapshot_id'] or formatting.blank(),
+            operation['create_date'] or formatting.blank(),
+            status]
@@ -19,12 +19,17 @@ import click
                                  'networking',
                                  'hardware',
                                  'vs']))
+@click.option('--counts',
+              is_flag=True,
+              help="Use the API's per-VLAN counts. Much faster on large "
+                   "accounts, but devices on several VLANs are counted once "
+                   "per VLAN")
 @environment.pass_env
-def cli(env, sortby):
+def cli(env, sortby, counts):
     """Account summary."""
 
     mgr = SoftLayer.NetworkManager(env.client)
-    datacenters = mgr.summary_by_datacenter()
+    datacenters = mgr.summary_by_datacenter(use_counts=counts)
 
     table = formatting.Table([
         'datacenter', 'vlans', 'subnets', 'ips', 'networking', 'hardware', 'vs'
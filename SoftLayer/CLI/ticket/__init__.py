@@ -1,22 +1,48 @@
 """Support tickets."""
 
+import os.path
+
+from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import formatting
+from SoftLayer.managers import ticket as ticket_mgr
 
 import click
 
 
 TEMPLATE_MSG = "***** SoftLayer Ticket Content ******"
+# Tickets are synced here by 'slcli ticket sync' for --offline
+TICKET_STORE_FILE = '~/.softlayer_tickets.db'
+
+
+def open_store(offline=False):
+    """Opens the local ticket store.
+
+    :param boolean offline: fail unless the store has been synced
+    """
+    path = os.path.expanduser(TICKET_STORE_FILE)
+    if offline and not os.path.exists(path):
+        raise exceptions.CLIAbort("No tickets have been synced, "
+                                  "run 'slcli ticket sync' first")
+    return ticket_mgr.TicketStore(path)
 
 
-def get_ticket_results(mgr, ticket_id, update_count=1):
+def get_ticket_results(mgr, ticket_id, update_count=1, store=None):
     """Get output about a ticket.
 
     :param integer id: the ticket ID
     :param integer update_count: number of entries to retrieve from ticket
+    :param TicketStore store: read the ticket from this store rather than
+                              the API
     :returns: a KeyValue table containing the details of the ticket
 
     """
-    ticket = mgr.get_ticket(ticket_id)
+    if store is None:
+        ticket = mgr.get_ticket(ticket_id)
+    else:
+        ticket = store.get_ticket(ticket_id)
+        if ticket is None:
+            raise exceptions.CLIAbort("Ticket %s hasn't been synced"
+                                      % ticket_id)
 
     table = formatting.KeyValueTable(['Name', 'Value'])
     table.align['Name'] = 'r'
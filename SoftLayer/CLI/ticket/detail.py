@@ -12,11 +12,22 @@ import click
 @click.command()
 @click.argument('identifier')
 @click.option('--count', type=click.INT, help="Number of updates", default=10)
+@click.option('--offline',
+              is_flag=True,
+              help="Read the ticket synced by 'slcli ticket sync'")
 @environment.pass_env
-def cli(env, identifier, count):
+def cli(env, identifier, count, offline):
     """Get details for a ticket."""
 
     mgr = SoftLayer.TicketManager(env.client)
 
     ticket_id = helpers.resolve_id(mgr.resolve_ids, identifier, 'ticket')
-    return ticket.get_ticket_results(mgr, ticket_id, update_count=count)
+    if not offline:
+        return ticket.get_ticket_results(mgr, ticket_id, update_count=count)
+
+    store = ticket.open_store(offline=True)
+    try:
+        return ticket.get_ticket_results(mgr, ticket_id, update_count=count,
+                                         store=store)
+    finally:
+        store.close()
@@ -4,6 +4,7 @@
 import SoftLayer
 from SoftLayer.CLI import environment
 from SoftLayer.CLI import formatting
+from SoftLayer.CLI import ticket as ticket_mod
 
 
 import click
@@ -13,13 +14,23 @@ import click
 @click.option('--open / --closed', 'is_open',
               help="Display only open or closed tickets",
               default=True)
+@click.option('--offline',
+              is_flag=True,
+              help="List the tickets synced by 'slcli ticket sync'")
 @environment.pass_env
-def cli(env, is_open):
+def cli(env, is_open, offline):
     """List tickets."""
-    ticket_mgr = SoftLayer.TicketManager(env.client)
-
-    tickets = ticket_mgr.list_tickets(open_status=is_open,
-                                      closed_status=not is_open)
+    if offline:
+        store = ticket_mod.open_store(offline=True)
+        try:
+            tickets = store.list_tickets(open_status=is_open,
+                                         closed_status=not is_open)
+        finally:
+            store.close()
+    else:
+        ticket_mgr = SoftLayer.TicketManager(env.client)
+        tickets = ticket_mgr.list_tickets(open_status=is_open,
+                                          closed_status=not is_open)
 
     table = formatting.Table(['id', 'assigned_user', 'title',
                               'last_edited', 'status'])
@@ -0,0 +1,41 @@
+"""Sync tickets to the local store used by --offline."""
+# :license: MIT, see LICENSE for more details.
+
+import SoftLayer
+from SoftLayer.CLI import environment
+from SoftLayer.CLI import formatting
+from SoftLayer.CLI import ticket
+from SoftLayer import utils
+
+import click
+
+
+@click.command(epilog="""Only tickets edited since the last sync are fetched,
+so this is cheap to run often, e.g. every minute from cron. Read the synced
+tickets with 'slcli ticket list --offline' and 'slcli ticket detail
+--offline'.""")
+@click.option('--workers',
+              type=click.INT,
+              default=utils.DEFAULT_MAX_WORKERS,
+              show_default=True,
+              help="Number of tickets to fetch updates for at a time")
+@environment.pass_env
+def cli(env, workers):
+    """Sync tickets to the local store used by --offline."""
+
+    mgr = SoftLayer.TicketManager(env.client)
+    store = ticket.open_store()
+    try:
+        result = mgr.sync_tickets(store, max_workers=workers)
+    finally:
+        store.close()
+
+    table = formatting.KeyValueTable(['Name', 'Value'])
+    table.align['Name'] = 'r'
+    table.align['Value'] = 'l'
+    table.add_row(['changed', result['changed']])
+    table.add_row(['updated', result['updated']])
+    table.add_row(['failed', result['failed']])
+    table.add_row(['synced_until',
+                   result['high_water'] or formatting.blank()])
+    return table
@@ -40,6 +40,11 @@ import click
               type=click.Path(writable=True, resolve_path=True),
               help="Exports options to a template file")
 @click.option('--postinstall', '-i', help="Post-install script to download")
+@click.option('--quantity',
+              type=click.IntRange(1, None),
+              default=1,
+              help="Number of virtual servers to create. The hostname of "
+                   "each server is suffixed with its number")
 @helpers.multi_option('--key', '-k',
                       help="SSH keys to add to the root user")
 @helpers.multi_option('--disk', help="Disk sizes")
@@ -116,6 +121,10 @@ def cli(env, **args):
         billing_rate = 'monthly'
         if args.get('billing') == 'hourly':
             billing_rate = 'hourly'
+        if args['quantity'] > 1:
+            table.add_row(['Cost per server', "%.2f" % total])
+            table.add_row(['Servers', args['quantity']])
+            total *= args['quantity']
         table.add_row(['Total %s cost' % billing_rate, "%.2f" % total])
         output.append(table)
         output.append(formatting.FormattedItem(
@@ -126,7 +135,7 @@ def cli(env, **args):
     if args['export']:
         export_file = args.pop('export')
         template.export_to_template(export_file, args,
-                                    exclude=['wait', 'test'])
+                                    exclude=['wait', 'test', 'quantity'])
         return 'Successfully exported options to a template file.'
 
     if do_create:
@@ -134,6 +143,10 @@ def cli(env, **args):
                 "This action will incur charges on your account. Continue?")):
             raise exceptions.CLIAbort('Aborting virtual server order.')
 
+        if args['quantity'] > 1:
+            output.append(_create_many(vsi, data, args))
+            return output
+
         result = vsi.create_instance(**data)
 
         table = formatting.KeyValueTable(['name', 'value'])
@@ -152,6 +165,53 @@ def cli(env, **args):
     return output
 
 
+def _create_many(vsi, data, args):
+    """Creates args['quantity'] virtual servers with a single order.
+
+    Tags are applied to all of the new servers concurrently and the outcome
+    is reported for each server.
+    """
+    tags = data.pop('tags', None)
+    config_list = []
+    for index in range(1, args['quantity'] + 1):
+        config = dict(data)
+        config['hostname'] = '%s%d' % (data['hostname'], index)
+        config_list.append(config)
+
+    instances = vsi.create_instances(config_list)
+
+    tag_results = {}
+    if tags:
+        tag_results = dict(
+            (result['id'], result) for result in vsi.tag_instances(
+                dict((instance['id'], tags) for instance in instances)))
+
+    columns = ['id', 'hostname', 'created', 'guid', 'tags']
+    if args.get('wait'):
+        columns.append('ready')
+    table = formatting.Table(columns)
+
+    for instance in instances:
+        tag_result = tag_results.get(instance['id'])
+        if tag_result is None:
+            tag_status = formatting.blank()
+        elif tag_result['success']:
+            tag_status = tag_result['tags']
+        else:
+            tag_status = 'FAILED: %s' % tag_result['error']
+
+        row = [instance['id'],
+               instance['hostname'],
+               instance['createDate'],
+               instance['globalIdentifier'],
+               tag_status]
+        if args.get('wait'):
+            row.append(vsi.wait_for_ready(instance['id'], int(args['wait'])))
+        table.add_row(row)
+
+    return table
+
+
 def _validate_args(args):
     """Raises an ArgumentError if the given arguments are not valid."""
 
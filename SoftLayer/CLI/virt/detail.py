@@ -1,8 +1,9 @@
-"""Get details for a virtual server."""
+"""Get details for virtual servers."""
 # :license: MIT, see LICENSE for more details.
 
 import SoftLayer
 from SoftLayer.CLI import environment
+from SoftLayer.CLI import exceptions
 from SoftLayer.CLI import formatting
 from SoftLayer.CLI import helpers
 from SoftLayer import utils
@@ -10,23 +11,53 @@ from SoftLayer import utils
 import click
 
 
-@click.command()
-@click.argument('identifier')
+@click.command(epilog="""Many virtual servers can be given at once. They are
+all fetched concurrently and printed one after the other, or as a single
+list with --format json.""")
+@click.argument('identifiers', nargs=-1, required=True)
 @click.option('--passwords',
               is_flag=True,
               help='Show passwords (check over your shoulder!)')
 @click.option('--price', is_flag=True, help='Show associated prices')
 @environment.pass_env
-def cli(self, identifier, passwords=False, price=False):
-    """Get details for a virtual server."""
-
-    vsi = SoftLayer.VSManager(self.client)
+def cli(env, identifiers, passwords=False, price=False):
+    """Get details for virtual servers."""
+
+    vsi = SoftLayer.VSManager(env.client)
+    vs_ids = helpers.resolve_ids(vsi.resolve_ids, identifiers, 'VS')
+
+    failed = 0
+    tables = []
+    for detail in vsi.get_instance_details(vs_ids):
+        if detail['error'] is not None:
+            failed += 1
+            env.err('Unable to get details for VS %s: %s'
+                    % (detail['id'], detail['error']))
+            continue
+        table = _detail_table(detail['instance'], detail['ptr_records'],
+                              passwords=passwords, price=price)
+        if env.format == 'table':
+            env.out(env.fmt(table))
+        else:
+            # Machine formats get a single document
+            tables.append(table)
+
+    if len(vs_ids) == 1 and tables:
+        env.out(env.fmt(tables[0]))
+    elif tables:
+        env.out(formatting.format_many(tables, fmt=env.format))
+
+    if failed:
+        raise exceptions.CLIAbort('Unable to get details for %d of %d VSs'
+                                  % (failed, len(vs_ids)))
+
+
+def _detail_table(result, ptr_records, passwords=False, price=False):
+    """Returns a table with the details of a virtual server."""
     table = formatting.KeyValueTable(['Name', 'Value'])
     table.align['Name'] = 'r'
     table.align['Value'] = 'l'
 
-    vs_id = helpers.resolve_id(vsi.resolve_ids, identifier, 'VS')
-    result = vsi.get_instance(vs_id)
     result = utils.NestedDict(result)
 
     table.add_row(['id', result['id']])
@@ -99,16 +130,7 @@ def cli(self, identifier, passwords=False, price=False):
     if tag_row:
         table.add_row(['tags', formatting.listing(tag_row, separator=', ')])
 
-    # Test to see if this actually has a primary (public) ip address
-    try:
-        if not result['privateNetworkOnlyFlag']:
-            ptr_domains = (self.client['Virtual_Guest']
-                           .getReverseDomainRecords(id=vs_id))
-
-            for ptr_domain in ptr_domains:
-                for ptr in ptr_domain['resourceRecords']:
-                    table.add_row(['ptr', ptr['data']])
-    except SoftLayer.SoftLayerAPIError:
-        pass
+    for ptr in ptr_records:
+        table.add_row(['ptr', ptr])
 
     return table
@@ -9,12 +9,20 @@ from SoftLayer.CLI import helpers
 
 import click
 
+# Only what the sync needs, so large fleets load quickly
+INSTANCE_MASK = ('id,hostname,domain,fullyQualifiedDomainName,'
+                 'primaryIpAddress')
+
 
 @click.command(epilog="""If you don't specify any
 arguments, it will attempt to update both the A and PTR records. If you don't
 want to update both records, you may use the -a or --ptr arguments to limit
-the records updated.""")
-@click.argument('identifier')
+the records updated.
+
+Without an identifier, every virtual server matching the filter options is
+synced, or every virtual server on the account with --all. Each zone and
+reverse domain is fetched once and the changes are sent in batches.""")
+@click.argument('identifier', required=False)
 @click.option('--a-record', '-a',
               is_flag=True,
               help="Sync the A record for the host")
@@ -23,81 +31,83 @@ the records updated.""")
               default=7200,
               type=click.INT,
               help="Sets the TTL for the A and/or PTR records")
+@click.option('--hostname', '-H', help='Filter servers by hostname')
+@click.option('--domain', '-D', help='Filter servers by domain')
+@click.option('--datacenter', '-d', help='Filter servers by datacenter')
+@click.option('--tag',
+              help='Filter servers by tags (multiple allowed)',
+              multiple=True)
+@click.option('--all', 'all_instances',
+              is_flag=True,
+              help="Sync every virtual server on the account")
+@click.option('--dry-run',
+              is_flag=True,
+              help="Show the changes without making them")
 @environment.pass_env
-def cli(env, identifier, a_record, ptr, ttl):
+def cli(env, identifier, a_record, ptr, ttl, hostname, domain, datacenter,
+        tag, all_instances, dry_run):
     """Sync DNS records."""
 
     dns = SoftLayer.DNSManager(env.client)
     vsi = SoftLayer.VSManager(env.client)
 
-    vs_id = helpers.resolve_id(vsi.resolve_ids, identifier, 'VS')
-    instance = vsi.get_instance(vs_id)
-    zone_id = helpers.resolve_id(dns.resolve_ids,
-                                 instance['domain'],
-                                 name='zone')
-
-    def sync_a_record():
-        """Sync A record."""
-        records = dns.get_records(zone_id, host=instance['hostname'])
-
-        if not records:
-            # don't have a record, lets add one to the base zone
-            dns.create_record(zone['id'],
-                              instance['hostname'],
-                              'a',
-                              instance['primaryIpAddress'],
-                              ttl=ttl)
-        else:
-            recs = [x for x in records if x['type'].lower() == 'a']
-            if len(recs) != 1:
-                raise exceptions.CLIAbort("Aborting A record sync, found "
-                                          "%d A record exists!" % len(recs))
-            rec = recs[0]
-            rec['data'] = instance['primaryIpAddress']
-            rec['ttl'] = ttl
-            dns.edit_record(rec)
-
-    def sync_ptr_record():
-        """Sync PTR record."""
-        host_rec = instance['primaryIpAddress'].split('.')[-1]
-        ptr_domains = (env.client['Virtual_Guest']
-                       .getReverseDomainRecords(id=instance['id'])[0])
-        edit_ptr = None
-        for ptr in ptr_domains['resourceRecords']:
-            if ptr['host'] == host_rec:
-                ptr['ttl'] = ttl
-                edit_ptr = ptr
-                break
-
-        if edit_ptr:
-            edit_ptr['data'] = instance['fullyQualifiedDomainName']
-            dns.edit_record(edit_ptr)
+    if not (identifier or all_instances or hostname or domain or
+            datacenter or tag):
+        raise exceptions.ArgumentError(
+            'Give a virtual server, a filter option or --all')
+
+    if identifier:
+        vs_id = helpers.resolve_id(vsi.resolve_ids, identifier, 'VS')
+        instances = [vsi.get_instance(vs_id, mask=INSTANCE_MASK)]
+        if not instances[0]['primaryIpAddress']:
+            raise exceptions.CLIAbort('No primary IP address associated with '
+                                      'this VS')
+        description = instances[0]['fullyQualifiedDomainName']
+    else:
+        instances = vsi.list_instances(hostname=hostname,
+                                       domain=domain,
+                                       datacenter=datacenter,
+                                       tags=tag,
+                                       mask=INSTANCE_MASK)
+        if not instances:
+            raise exceptions.CLIAbort('No virtual servers found')
+        description = '%d virtual servers' % len(instances)
+
+    both = not ptr and not a_record
+    options = {'a_record': both or a_record,
+               'ptr': both or ptr,
+               'ttl': ttl}
+
+    if not dry_run:
+        go_for_it = env.skip_confirmations or formatting.confirm(
+            "Attempt to update DNS records for %s" % description)
+        if not go_for_it:
+            raise exceptions.CLIAbort("Aborting DNS sync")
+
+    changes = dns.sync_instance_records(instances, dry_run=dry_run,
+                                        **options)
+
+    table = formatting.Table(['instance', 'type', 'action', 'host', 'data',
+                              'status'])
+    table.align['instance'] = 'l'
+    table.align['data'] = 'l'
+    failed = 0
+    for change in changes:
+        record = change['record'] or {}
+        if change['error'] is not None:
+            failed += 1
+            status = str(change['error'])
+        elif dry_run or change['action'] == 'unchanged':
+            status = formatting.blank()
         else:
-            dns.create_record(ptr_domains['id'],
-                              host_rec,
-                              'ptr',
-                              instance['fullyQualifiedDomainName'],
-                              ttl=ttl)
-
-    if not instance['primaryIpAddress']:
-        raise exceptions.CLIAbort('No primary IP address associated with '
-                                  'this VS')
-
-    zone = dns.get_zone(zone_id)
-
-    go_for_it = env.skip_confirmations or formatting.confirm(
-        "Attempt to update DNS records for %s"
-        % instance['fullyQualifiedDomainName'])
-
-    if not go_for_it:
-        raise exceptions.CLIAbort("Aborting DNS sync")
-
-    both = False
-    if not ptr and not a_record:
-        both = True
-
-    if both or a_record:
-        sync_a_record()
-
-    if both or ptr:
-        sync_ptr_record()
+            status = 'done'
+        table.add_row([change['instance']['fullyQualifiedDomainName'],
+                       change['type'],
+                       change['action'],
+                       record.get('host') or formatting.blank(),
+                       record.get('data') or formatting.blank(),
+                       status])
+    env.out(env.fmt(table))
+
+    if failed:
+        raise exceptions.CLIAbort('Unable to sync %d DNS records' % failed)
@@ -0,0 +1,332 @@
+"""
+    SoftLayer.filters
+    ~~~~~~~~~~~~~~~~~
+    Local evaluation of SoftLayer objectFilters
+
+    Filters built with :func:`SoftLayer.utils.query_filter`,
+    :func:`SoftLayer.utils.query_filter_date` and
+    :class:`SoftLayer.utils.NestedDict` are normally run by the API. The
+    functions here compile the same dictionaries into Python predicates so
+    that cached data can be filtered the way the API would filter it.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import datetime
+
+from SoftLayer import utils
+
+# Two character operators come first so '<=' is not mistaken for '<'
+STRING_OPERATIONS = ['!=', '<=', '>=', '!~', '*=', '^=', '$=', '_=',
+                     '<', '>', '~']
+DATE_OPERATIONS = ['betweenDate', 'greaterThanDate', 'lessThanDate']
+# Operations that don't restrict the result set
+IGNORED_OPERATIONS = ['orderBy']
+DATE_FORMATS = ['%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y',
+                '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']
+
+_MISSING = object()
+
+
+def compile_filter(object_filter, root=None):
+    """Compiles an objectFilter into a predicate.
+
+    ::
+
+        >>> is_dal05 = compile_filter(
+        ...     {'virtualGuests': {'datacenter': {'name': {
+        ...         'operation': '_= dal05'}}}},
+        ...     root='virtualGuests')
+        >>> is_dal05({'datacenter': {'name': 'DAL05'}})
+        True
+
+    :param dict object_filter: the objectFilter
+    :param string root: the top-level key naming the collection, e.g.
+                        'virtualGuests'. It is skipped when present.
+    :returns: a function that takes an object and returns a boolean
+    """
+    if root is not None and root in object_filter:
+        object_filter = object_filter[root]
+
+    tests = [test for test in _compile_node(object_filter, ())
+             if test is not None]
+
+    if not tests:
+        return lambda obj: True
+    if len(tests) == 1:
+        return tests[0]
+
+    def predicate(obj):
+        """All of the properties need to match."""
+        for test in tests:
+            if not test(obj):
+                return False
+        return True
+    return predicate
+
+
+def filter_objects(objects, object_filter, root=None):
+    """Returns the objects that match the objectFilter.
+
+    :param objects: an iterable of dictionaries
+    :param dict object_filter: the objectFilter
+    :param string root: see :func:`compile_filter`
+    :returns list:
+    """
+    predicate = compile_filter(object_filter, root=root)
+    return [obj for obj in objects if predicate(obj)]
+
+
+def _compile_node(node, path):
+    """Yields a predicate for every operation in a filter node."""
+    if 'operation' in node:
+        yield _compile_operation(path, node['operation'],
+                                 node.get('options') or [])
+
+    for key, value in node.items():
+        if key in ('operation', 'options'):
+            continue
+        if not isinstance(value, dict):
+            raise ValueError('Invalid objectFilter at %s: %r'
+                             % ('.'.join(path + (key,)), value))
+        for test in _compile_node(value, path + (key,)):
+            yield test
+
+
+def _make_getter(path):
+    """Returns a function which collects the values at path.
+
+    Lists found along the way are expanded, so a filter on
+    tagReferences.tag.name matches if any of the tags match.
+    """
+    def _expand(values, keys):
+        """Slow path for paths that cross a list."""
+        for key in keys:
+            found = []
+            for value in values:
+                if isinstance(value, list):
+                    value = [item.get(key, _MISSING) for item in value
+                             if isinstance(item, dict)]
+                    found.extend(item for item in value
+                                 if item is not _MISSING)
+                elif isinstance(value, dict) and key in value:
+                    found.append(value[key])
+            values = found
+        flat = []
+        for value in values:
+            if isinstance(value, list):
+                flat.extend(value)
+            else:
+                flat.append(value)
+        return flat
+
+    def getter(obj):
+        """Collects the values at path."""
+        value = obj
+        for depth, key in enumerate(path):
+            if isinstance(value, dict):
+                value = value.get(key, _MISSING)
+                if value is _MISSING:
+                    return ()
+            elif isinstance(value, list):
+                return _expand([value], path[depth:])
+            else:
+                return ()
+        if isinstance(value, list):
+            return value
+        return (value,)
+    return getter
+
+
+def _compile_operation(path, operation, options):
+    """Returns a predicate for a single property operation."""
+    getter = _make_getter(path)
+
+    if isinstance(operation, utils.string_types):
+        operation = operation.strip()
+        if operation in IGNORED_OPERATIONS:
+            return None
+        if operation == 'is null':
+            return lambda obj: all(value is None for value in getter(obj))
+        if operation == 'not null':
+            return lambda obj: any(value is not None
+                                   for value in getter(obj))
+
+    test = _compile_test(operation, options)
+
+    def predicate(obj):
+        """Any of the values at path can match."""
+        for value in getter(obj):
+            if value is not None and test(value):
+                return True
+        return False
+    return predicate
+
+
+def _options(options):
+    """Converts an objectFilter options list into a dictionary."""
+    return dict((option['name'], option['value']) for option in options)
+
+
+def _compile_test(operation, options):
+    """Returns a function that tests a single value against an operation."""
+    if not isinstance(operation, utils.string_types):
+        return _equals(operation)
+
+    if operation == 'in':
+        return _in(_options(options).get('data', []))
+
+    if operation in DATE_OPERATIONS:
+        return _compile_date(operation, _options(options))
+
+    for operator in STRING_OPERATIONS:
+        if operation.startswith(operator):
+            return _compile_operator(operator,
+                                     operation[len(operator):].strip())
+
+    return _equals(operation)
+
+
+def _number(value):
+    """Returns value as a float, or None if it isn't a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    """Returns value as text."""
+    if isinstance(value, utils.string_types):
+        return value
+    return str(value)
+
+
+def _equals(operand):
+    """Exact match. Numbers compare numerically."""
+    number = _number(operand)
+    text = _text(operand)
+    if number is None:
+        return lambda value: _text(value) == text
+
+    def test(value):
+        """Exact match."""
+        if value == operand:
+            return True
+        return _number(value) == number
+    return test
+
+
+def _in(data):
+    """Matches any of the given values."""
+    texts = set(_text(item) for item in data)
+    return lambda value: _text(value) in texts
+
+
+def _compare(operator, operand):
+    """<, <=, > and >=. Numbers compare numerically, anything else as text."""
+    number = _number(operand)
+    compare = {
+        '<': lambda left, right: left < right,
+        '<=': lambda left, right: left <= right,
+        '>': lambda left, right: left > right,
+        '>=': lambda left, right: left >= right,
+    }[operator]
+
+    def test(value):
+        """Compares value to the operand."""
+        value_number = _number(value)
+        if number is not None and value_number is not None:
+            return compare(value_number, number)
+        return compare(_text(value), operand)
+    return test
+
+
+def _compile_operator(operator, operand):
+    """Returns a test for a prefixed string operation like '^= web'."""
+    if operator in ('<', '<=', '>', '>='):
+        return _compare(operator, operand)
+
+    if operator == '!=':
+        equals = _equals(operand)
+        return lambda value: not equals(value)
+
+    if operator == '~':
+        return lambda value: operand in _text(value)
+
+    if operator == '!~':
+        return lambda value: operand not in _text(value)
+
+    # The rest are case insensitive
+    lowered = operand.lower()
+    if operator == '_=':
+        return lambda value: _text(value).lower() == lowered
+    if operator == '*=':
+        return lambda value: lowered in _text(value).lower()
+    if operator == '^=':
+        return lambda value: _text(value).lower().startswith(lowered)
+    return lambda value: _text(value).lower().endswith(lowered)
+
+
+def parse_date(value):
+    """Parses API and objectFilter timestamps into a naive datetime.
+
+    Timezone offsets are ignored: the API reports and filters dates in the
+    same timezone. Returns None when the value isn't a date.
+
+    :param value: e.g. '2013-08-01T14:16:47-07:00' or '8/1/2013 0:0:0'
+    """
+    if isinstance(value, datetime.datetime):
+        return value
+
+    value = _text(value).strip()
+    if len(value) >= 19 and value[10] == 'T':
+        try:
+            return datetime.datetime(int(value[0:4]), int(value[5:7]),
+                                     int(value[8:10]), int(value[11:13]),
+                                     int(value[14:16]), int(value[17:19]))
+        except ValueError:
+            return None
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def _compile_date(operation, options):
+    """betweenDate, greaterThanDate and lessThanDate."""
+    def _option(name):
+        """Returns the parsed date option."""
+        values = options.get(name) or [None]
+        date = parse_date(values[0])
+        if date is None:
+            raise ValueError('Invalid %s option for %s: %r'
+                             % (name, operation, values[0]))
+        return date
+
+    if operation == 'betweenDate':
+        start, end = _option('startDate'), _option('endDate')
+
+        def check(date):
+            """Whether the date is within the range."""
+            return start <= date <= end
+    elif operation == 'greaterThanDate':
+        after = _option('date')
+
+        def check(date):
+            """Whether the date is after the option."""
+            return date > after
+    else:
+        before = _option('date')
+
+        def check(date):
+            """Whether the date is before the option."""
+            return date < before
+
+    def test(value):
+        """Compares the value as a date."""
+        date = parse_date(value)
+        return date is not None and check(date)
+    return test
@@ -0,0 +1,827 @@
+"""
+    SoftLayer.firewall_rules
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+    Firewall rule parsing, compaction and diffing
+
+    Rules are compiled into a normalized form where every address is a
+    network (host bits cleared) and every TCP/UDP rule has a port range, so
+    rules spelled differently compare equal. The compiler then drops rules
+    that can never match because an earlier rule covers them, and merges
+    rules with the same action which only differ by a port range or a subnet.
+
+    A firewall uses the first rule that matches a packet. Within a run of
+    consecutive rules with the same action the order of the rules doesn't
+    change the outcome, so rules are only merged within such runs. Dropping
+    a rule covered by a single earlier rule never changes the outcome either.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import collections
+import json
+import re
+
+ACTIONS = ['permit', 'deny']
+# Protocols which match any protocol
+ANY_PROTOCOLS = ['any', 'ip']
+# Protocols with a destination port range
+PORT_PROTOCOLS = ['tcp', 'udp']
+MIN_PORT = 1
+MAX_PORT = 65535
+BITS = {4: 32, 6: 128}
+# The default mask of addresses that aren't IPs, e.g. 'any on server'
+SYMBOLIC_MASKS = {4: '255.255.255.255', 6: 128}
+DELIMITER = "=========================================\n"
+DELIMITER_RE = re.compile(r'^\s*=+\s*$')
+# Keys of the editor format and the rule properties they set
+EDITOR_KEYS = {
+    'action': 'action',
+    'protocol': 'protocol',
+    'source_ip_address': 'sourceIpAddress',
+    'source_ip_subnet_mask': 'sourceIpSubnetMask',
+    'source_ip_cidr': 'sourceIpCidr',
+    'destination_ip_address': 'destinationIpAddress',
+    'destination_ip_subnet_mask': 'destinationIpSubnetMask',
+    'destination_ip_cidr': 'destinationIpCidr',
+    'destination_port_range_start': 'destinationPortRangeStart',
+    'destination_port_range_end': 'destinationPortRangeEnd',
+    'version': 'version',
+}
+LINE_KEYWORDS = ['from', 'to', 'port', 'version']
+# How many times pruning and merging are repeated at most. Each round can
+# join runs of rules split by a rule that was pruned.
+MAX_ROUNDS = 8
+
+# The protocols of the rules that may cover a rule of a protocol
+_PROTOCOLS = dict((protocol, ANY_PROTOCOLS) for protocol in ANY_PROTOCOLS)
+# Netmask integers by version and prefix length
+_MASKS = dict((version, [((1 << bits) - 1) ^ ((1 << (bits - prefix)) - 1)
+                         for prefix in range(bits + 1)])
+              for version, bits in BITS.items())
+
+# A normalized rule. source and destination are (network, prefix) tuples, or
+# (name, None) for addresses which aren't IPs. ports is a (start, end) tuple,
+# or None for protocols without ports. order is the position of the first
+# rule it was compiled from.
+Rule = collections.namedtuple('Rule', ['action', 'protocol', 'version',
+                                       'source', 'destination', 'ports',
+                                       'order'])
+
+
+def parse_rules(text):
+    """Parses a rule file into a list of rule dictionaries.
+
+    Three formats are understood:
+
+    - a JSON list of rules, e.g. saved from ``getRules``
+    - the ``slcli firewall edit`` format: blocks of 'key: value' lines
+      separated by lines of '='
+    - one rule per line::
+
+        # action protocol [from SOURCE] [to DESTINATION] [port START[-END]]
+        permit tcp from 10.0.0.0/24 to any on server port 80-443
+        deny udp from any to 10.1.2.3 port 53 version 4
+        permit icmp from 2001:db8::/32 to any
+
+    :param string text: the contents of the rule file
+    :returns: a list of rule dictionaries with orderValue set
+    :raises ValueError: if a rule can't be parsed
+    """
+    stripped = text.strip()
+    if stripped.startswith('['):
+        try:
+            rules = json.loads(stripped)
+        except ValueError as ex:
+            raise ValueError('Invalid JSON rules: %s' % ex)
+        if not all(isinstance(rule, dict) for rule in rules):
+            raise ValueError('Invalid JSON rules: expected a list of objects')
+    elif any(DELIMITER_RE.match(line) for line in text.splitlines()):
+        rules = _parse_editor(text)
+    else:
+        rules = _parse_lines(text)
+
+    for order, rule in enumerate(rules, 1):
+        rule['orderValue'] = order
+    return rules
+
+
+def _parse_editor(text):
+    """Parses the 'key: value' block format."""
+    rules = []
+    rule = None
+    for number, line in enumerate(text.splitlines(), 1):
+        if DELIMITER_RE.match(line):
+            rule = None
+            continue
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        key, sep, value = line.partition(':')
+        key = key.strip().lower()
+        if not sep:
+            raise ValueError('Line %d: invalid rule property %r'
+                             % (number, line))
+        if key not in EDITOR_KEYS:
+            # Unknown properties are ignored, as they always have been
+            continue
+        if rule is None:
+            rule = {}
+            rules.append(rule)
+        value = value.strip()
+        if key in ('destination_port_range_start',
+                   'destination_port_range_end', 'version',
+                   'source_ip_cidr', 'destination_ip_cidr'):
+            value = _int(value, number, key)
+        rule[EDITOR_KEYS[key]] = value
+    return rules
+
+
+def _parse_lines(text):
+    """Parses the one rule per line format."""
+    rules = []
+    for number, line in enumerate(text.splitlines(), 1):
+        tokens = line.split('#', 1)[0].split()
+        if not tokens:
+            continue
+        if len(tokens) < 2:
+            raise ValueError('Line %d: expected an action and a protocol'
+                             % number)
+
+        rule = {'action': tokens[0], 'protocol': tokens[1]}
+        keyword = None
+        values = {}
+        for token in tokens[2:]:
+            if token.lower() in LINE_KEYWORDS:
+                keyword = token.lower()
+                if keyword in values:
+                    raise ValueError('Line %d: %s is given twice'
+                                     % (number, keyword))
+                values[keyword] = []
+            elif keyword is None:
+                raise ValueError('Line %d: unexpected %r' % (number, token))
+            else:
+                values[keyword].append(token)
+
+        for keyword, words in values.items():
+            if not words:
+                raise ValueError('Line %d: missing value for %s'
+                                 % (number, keyword))
+        if 'from' in values:
+            rule['sourceIpAddress'] = ' '.join(values['from'])
+        if 'to' in values:
+            rule['destinationIpAddress'] = ' '.join(values['to'])
+        if 'port' in values:
+            start, _, end = ''.join(values['port']).partition('-')
+            rule['destinationPortRangeStart'] = _int(start, number, 'port')
+            rule['destinationPortRangeEnd'] = _int(end or start, number,
+                                                   'port')
+        if 'version' in values:
+            rule['version'] = _int(values['version'][0], number, 'version')
+        rules.append(rule)
+    return rules
+
+
+def _int(value, number, name):
+    """Converts a value read from line number to an integer."""
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('Line %d: invalid %s %r' % (number, name, value))
+
+
+def parse_ip(address, version):
+    """Parses an IPv4 or IPv6 address into an integer.
+
+    :raises ValueError: if the address is not valid
+    """
+    if version == 4:
+        parts = address.split('.')
+        if len(parts) != 4 or not all(part.isdigit() for part in parts):
+            raise ValueError('Invalid IPv4 address %r' % address)
+        value = 0
+        for part in parts:
+            if int(part) > 255:
+                raise ValueError('Invalid IPv4 address %r' % address)
+            value = (value << 8) | int(part)
+        return value
+
+    head, sep, tail = address.partition('::')
+    if '::' in tail:
+        raise ValueError('Invalid IPv6 address %r' % address)
+    groups = []
+    for part in (head, tail):
+        hextets = []
+        for hextet in (part.split(':') if part else []):
+            if '.' in hextet:
+                ipv4 = parse_ip(hextet, 4)
+                hextets.extend(['%x' % (ipv4 >> 16), '%x' % (ipv4 & 0xffff)])
+            else:
+                hextets.append(hextet)
+        groups.append(hextets)
+    missing = 8 - len(groups[0]) - len(groups[1])
+    if (sep and missing < 1) or (not sep and missing != 0):
+        raise ValueError('Invalid IPv6 address %r' % address)
+
+    value = 0
+    for hextet in groups[0] + ['0'] * missing + groups[1]:
+        if not 1 <= len(hextet) <= 4:
+            raise ValueError('Invalid IPv6 address %r' % address)
+        try:
+            value = (value << 16) | int(hextet, 16)
+        except ValueError:
+            raise ValueError('Invalid IPv6 address %r' % address)
+    return value
+
+
+def format_ip(value, version):
+    """Formats an integer as an IPv4 or compressed IPv6 address."""
+    if version == 4:
+        return '.'.join(str((value >> shift) & 0xff)
+                        for shift in (24, 16, 8, 0))
+
+    hextets = ['%x' % ((value >> shift) & 0xffff)
+               for shift in range(112, -16, -16)]
+    # Compress the longest run of two or more zero groups
+    best_start, best_length = -1, 1
+    start = None
+    for index, hextet in enumerate(hextets + ['end']):
+        if hextet == '0':
+            if start is None:
+                start = index
+        elif start is not None:
+            if index - start > best_length:
+                best_start, best_length = start, index - start
+            start = None
+    if best_start < 0:
+        return ':'.join(hextets)
+    return '%s::%s' % (':'.join(hextets[:best_start]),
+                       ':'.join(hextets[best_start + best_length:]))
+
+
+def _mask(prefix, version):
+    """Returns the netmask integer of a prefix length."""
+    return _MASKS[version][prefix]
+
+
+def _prefix(mask, version):
+    """Converts a dotted IPv4 netmask or a prefix length to a prefix length.
+
+    A missing mask, including the 'None' an unset mask is shown as in the
+    editor, is a single address.
+    """
+    mask = str(mask).strip()
+    if mask.lower() in ('', 'none'):
+        prefix = BITS[version]
+    elif mask.isdigit():
+        prefix = int(mask)
+    elif version == 4:
+        value = parse_ip(mask, 4)
+        prefix = bin(value).count('1')
+        if value != _mask(prefix, 4):
+            raise ValueError('Invalid subnet mask %r' % mask)
+    else:
+        raise ValueError('Invalid IPv6 prefix length %r' % mask)
+    if not 0 <= prefix <= BITS[version]:
+        raise ValueError('Invalid prefix length %r' % mask)
+    return prefix
+
+
+def parse_address(address, mask, version):
+    """Normalizes an address and its mask into a (network, prefix) tuple.
+
+    'any' and missing addresses are the whole address space. Addresses that
+    aren't IPs, like 'any on server', are kept as a (name, None) tuple.
+
+    :param string address: an IP, a CIDR ('10.0.0.0/8'), 'any' or a name
+    :param mask: a dotted IPv4 netmask or a prefix length. A prefix length
+                 in the address takes precedence.
+    :param int version: 4 or 6
+    """
+    address = (address or 'any').strip().lower()
+    if address == 'any':
+        return (0, 0)
+
+    ip_text, slash, prefix = address.partition('/')
+    try:
+        value = parse_ip(ip_text, version)
+    except ValueError:
+        if slash or re.match(r'^[0-9a-f:.]+$', address):
+            raise
+        return (address, None)
+
+    if slash:
+        prefix = _prefix(prefix, version)
+    else:
+        prefix = _prefix(mask, version)
+    return (value & _mask(prefix, version), prefix)
+
+
+def _version(rule):
+    """Returns the IP version of a rule, inferring it from its addresses."""
+    if rule.get('version'):
+        version = int(rule['version'])
+        if version not in BITS:
+            raise ValueError('Invalid IP version %r' % rule['version'])
+        return version
+    for key in ('sourceIpAddress', 'destinationIpAddress'):
+        if ':' in (rule.get(key) or ''):
+            return 6
+    return 4
+
+
+def normalize_rule(rule, order=0):
+    """Converts a rule dictionary into a normalized :class:`Rule`.
+
+    :param dict rule: a rule as returned by getRules or :func:`parse_rules`
+    :param int order: the position of the rule
+    :raises ValueError: if the rule is not valid
+    """
+    action = (rule.get('action') or '').strip().lower()
+    if action not in ACTIONS:
+        raise ValueError('Rule %d: invalid action %r'
+                         % (order, rule.get('action')))
+    protocol = (rule.get('protocol') or '').strip().lower()
+    if not protocol:
+        raise ValueError('Rule %d: missing protocol' % order)
+
+    try:
+        version = _version(rule)
+        source = parse_address(rule.get('sourceIpAddress'),
+                               _first(rule, 'sourceIpCidr',
+                                      'sourceIpSubnetMask'),
+                               version)
+        destination = parse_address(rule.get('destinationIpAddress'),
+                                    _first(rule, 'destinationIpCidr',
+                                           'destinationIpSubnetMask'),
+                                    version)
+    except ValueError as ex:
+        raise ValueError('Rule %d: %s' % (order, ex))
+
+    ports = None
+    if protocol in PORT_PROTOCOLS:
+        start = rule.get('destinationPortRangeStart')
+        end = rule.get('destinationPortRangeEnd')
+        if start is None and end is None:
+            start, end = MIN_PORT, MAX_PORT
+        elif end is None:
+            end = start
+        elif start is None:
+            start = end
+        start, end = int(start), int(end)
+        if not MIN_PORT <= start <= end <= MAX_PORT:
+            raise ValueError('Rule %d: invalid port range %d-%d'
+                             % (order, start, end))
+        ports = (start, end)
+
+    return Rule(action, protocol, version, source, destination, ports, order)
+
+
+def _first(rule, *keys):
+    """Returns the first value of keys set in rule."""
+    for key in keys:
+        if str(rule.get(key)).strip().lower() not in ('none', ''):
+            return rule[key]
+    return None
+
+
+def render_rule(rule, order):
+    """Converts a :class:`Rule` back into a rule dictionary.
+
+    :param Rule rule: the normalized rule
+    :param int order: the orderValue of the rule
+    """
+    result = {
+        'orderValue': order,
+        'action': rule.action,
+        'protocol': rule.protocol,
+        'version': rule.version,
+    }
+    for name, address in (('source', rule.source),
+                          ('destination', rule.destination)):
+        if address[1] is None:
+            result[name + 'IpAddress'] = address[0]
+            mask = SYMBOLIC_MASKS[rule.version]
+        elif address[1] == 0:
+            # Spelled the way the API and 'slcli firewall edit' spell it
+            result[name + 'IpAddress'] = 'any'
+            mask = SYMBOLIC_MASKS[rule.version]
+        else:
+            result[name + 'IpAddress'] = format_ip(address[0], rule.version)
+            mask = address[1]
+            if rule.version == 4:
+                mask = format_ip(_mask(mask, 4), 4)
+        if rule.version == 4:
+            result[name + 'IpSubnetMask'] = mask
+        else:
+            result[name + 'IpCidr'] = mask
+    if rule.ports is not None:
+        result['destinationPortRangeStart'] = rule.ports[0]
+        result['destinationPortRangeEnd'] = rule.ports[1]
+    return result
+
+
+def format_rule(rule):
+    """Formats a rule dictionary in the one rule per line format.
+
+    ::
+
+        >>> format_rule({'action': 'permit', 'protocol': 'tcp',
+        ...              'sourceIpAddress': '10.0.0.0',
+        ...              'sourceIpSubnetMask': '255.255.255.0',
+        ...              'destinationIpAddress': 'any on server',
+        ...              'destinationPortRangeStart': 80,
+        ...              'destinationPortRangeEnd': 443})
+        'permit tcp from 10.0.0.0/24 to any on server port 80-443'
+
+    """
+    normalized = normalize_rule(rule, rule.get('orderValue') or 0)
+    words = [normalized.action, normalized.protocol]
+    for keyword, address in (('from', normalized.source),
+                             ('to', normalized.destination)):
+        if address[1] is None:
+            text = address[0]
+        elif address[1] == 0:
+            text = 'any'
+        elif address[1] == BITS[normalized.version]:
+            text = format_ip(address[0], normalized.version)
+        else:
+            text = '%s/%d' % (format_ip(address[0], normalized.version),
+                              address[1])
+        words.extend([keyword, text])
+    if normalized.ports not in (None, (MIN_PORT, MAX_PORT)):
+        start, end = normalized.ports
+        words.extend(['port', str(start) if start == end
+                      else '%d-%d' % (start, end)])
+    if normalized.version != 4 and normalized.source[1] in (None, 0) and (
+            normalized.destination[1] in (None, 0)):
+        words.extend(['version', str(normalized.version)])
+    return ' '.join(words)
+
+
+def rule_key(rule):
+    """Returns what a rule matches and does, without its position."""
+    return rule[:6]
+
+
+def _address_covers(outer, inner, version):
+    """Returns True if the address outer includes all of inner."""
+    if outer[1] == 0:
+        return True
+    if outer[1] is None or inner[1] is None:
+        return outer == inner
+    return (outer[1] <= inner[1] and
+            inner[0] & _mask(outer[1], version) == outer[0])
+
+
+def covers(outer, inner):
+    """Returns True if every packet matching inner also matches outer."""
+    if outer.version != inner.version:
+        return False
+    if outer.protocol not in ANY_PROTOCOLS:
+        if outer.protocol != inner.protocol:
+            return False
+        if outer.ports is not None and not (
+                outer.ports[0] <= inner.ports[0] and
+                inner.ports[1] <= outer.ports[1]):
+            return False
+    return (_address_covers(outer.source, inner.source, inner.version) and
+            _address_covers(outer.destination, inner.destination,
+                            inner.version))
+
+
+class _CoverIndex(object):
+    """Finds the rules that may cover a rule without comparing every pair.
+
+    Rules are bucketed by version, protocol, destination and source. For a
+    rule only the buckets of its protocol (or any protocol) and of the
+    networks containing its addresses are looked up, and only for the
+    prefix lengths actually in use.
+    """
+
+    def __init__(self, rules=()):
+        self.buckets = {}
+        self.prefixes = {}
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule):
+        """Adds a rule to the index."""
+        key = (rule.version, rule.protocol, rule.destination, rule.source)
+        self.buckets.setdefault(key, []).append(rule)
+        for field, address in (('destination', rule.destination),
+                               ('source', rule.source)):
+            if address[1] is not None:
+                self.prefixes.setdefault((rule.version, field),
+                                         set()).add(address[1])
+
+    def _networks(self, address, version, field):
+        """Returns the indexed networks which may contain address."""
+        prefixes = self.prefixes.get((version, field), ())
+        if address[1] is None:
+            networks = [address]
+            if 0 in prefixes:
+                networks.append((0, 0))
+            return networks
+        return [(address[0] & _mask(prefix, version), prefix)
+                for prefix in prefixes if prefix <= address[1]]
+
+    def candidates(self, rule):
+        """Yields the indexed rules whose addresses contain the rule's."""
+        version = rule.version
+        destinations = self._networks(rule.destination, version,
+                                      'destination')
+        sources = self._networks(rule.source, version, 'source')
+        buckets = self.buckets
+        for protocol in _PROTOCOLS.get(rule.protocol) or (
+                [rule.protocol] + ANY_PROTOCOLS):
+            for destination in destinations:
+                for source in sources:
+                    bucket = buckets.get((version, protocol, destination,
+                                          source))
+                    if bucket:
+                        for candidate in bucket:
+                            yield candidate
+
+
+def find_shadowed(rules):
+    """Finds rules which can never match because an earlier rule covers them.
+
+    Earlier rules are indexed by protocol and address, so each rule is only
+    compared with the earlier rules whose addresses contain its own.
+
+    :param list rules: normalized :class:`Rule` objects, in order
+    :returns: a list of (rule, shadowing rule) tuples
+    """
+    index = _CoverIndex()
+    shadowed = []
+    for rule in rules:
+        for candidate in index.candidates(rule):
+            if covers(candidate, rule):
+                shadowed.append((rule, candidate))
+                break
+        else:
+            index.add(rule)
+    return shadowed
+
+
+def _group(rules, key_func):
+    """Groups rules by key_func, keeping the order groups are first seen in.
+
+    Rules with a key of None are kept on their own.
+    """
+    groups = []
+    by_key = {}
+    for rule in rules:
+        key = key_func(rule)
+        if key is None:
+            groups.append([rule])
+        elif key in by_key:
+            by_key[key].append(rule)
+        else:
+            by_key[key] = [rule]
+            groups.append(by_key[key])
+    return groups
+
+
+def _merge_ports(rules):
+    """Merges rules that only differ by overlapping or adjacent ports."""
+    groups = _group(rules, lambda rule: (
+        None if rule.ports is None else
+        (rule.protocol, rule.version, rule.source, rule.destination)))
+
+    merged = []
+    for group in groups:
+        if len(group) == 1:
+            merged.extend(group)
+            continue
+        current = None
+        for rule in sorted(group, key=lambda rule: rule.ports):
+            if current is not None and rule.ports[0] <= current.ports[1] + 1:
+                current = current._replace(
+                    ports=(current.ports[0],
+                           max(current.ports[1], rule.ports[1])),
+                    order=min(current.order, rule.order))
+            else:
+                if current is not None:
+                    merged.append(current)
+                current = rule
+        merged.append(current)
+    return merged
+
+
+def aggregate_networks(networks, version):
+    """Collapses (network, prefix) tuples into the fewest covering ones.
+
+    Networks inside another network are dropped and sibling networks are
+    joined, so 10.0.0.0/25 and 10.0.0.128/25 become 10.0.0.0/24.
+    """
+    bits = BITS[version]
+    networks = sorted(set(networks), key=lambda net: (net[0], net[1]))
+    while True:
+        collapsed = []
+        for network in networks:
+            if collapsed:
+                last = collapsed[-1]
+                if (last[1] <= network[1] and
+                        network[0] & _mask(last[1], version) == last[0]):
+                    continue
+                if (last[1] == network[1] and last[1] > 0 and
+                        last[0] & _mask(last[1] - 1, version) == last[0] and
+                        last[0] | (1 << (bits - last[1])) == network[0]):
+                    collapsed[-1] = (last[0], last[1] - 1)
+                    continue
+            collapsed.append(network)
+        if len(collapsed) == len(networks):
+            return collapsed
+        networks = collapsed
+
+
+def _merge_addresses(rules, field, other):
+    """Merges rules that only differ by the networks in field."""
+    groups = _group(rules, lambda rule: (
+        None if getattr(rule, field)[1] is None else
+        (rule.protocol, rule.version, rule.ports, getattr(rule, other))))
+
+    merged = []
+    for group in groups:
+        if len(group) == 1:
+            merged.extend(group)
+            continue
+        version = group[0].version
+        for network in aggregate_networks(
+                [getattr(rule, field) for rule in group], version):
+            orders = [rule.order for rule in group
+                      if _address_covers(network, getattr(rule, field),
+                                         version)]
+            merged.append(group[0]._replace(order=min(orders),
+                                            **{field: network}))
+    return merged
+
+
+def _drop_covered(rules):
+    """Drops the rules of a same action run covered by another rule of it.
+
+    Of two identical rules the first one is kept.
+    """
+    index = _CoverIndex(rules)
+    kept = []
+    for rule in rules:
+        for candidate in index.candidates(rule):
+            if candidate is not rule and covers(candidate, rule) and (
+                    candidate.order < rule.order or
+                    not covers(rule, candidate)):
+                break
+        else:
+            kept.append(rule)
+    return kept
+
+
+def _compact_run(rules):
+    """Merges the rules of a run of rules with the same action."""
+    while True:
+        count = len(rules)
+        rules = _drop_covered(rules)
+        rules = _merge_ports(rules)
+        rules = _merge_addresses(rules, 'destination', 'source')
+        rules = _merge_addresses(rules, 'source', 'destination')
+        if len(rules) == count:
+            return sorted(rules, key=lambda rule: rule.order)
+
+
+def _compact(rules):
+    """Merges rules within each run of rules with the same action."""
+    compacted = []
+    run = []
+    for rule in rules:
+        if run and run[0].action != rule.action:
+            compacted.extend(_compact_run(run))
+            run = []
+        run.append(rule)
+    if run:
+        compacted.extend(_compact_run(run))
+    return compacted
+
+
+def compile_rules(rules, compact=True):
+    """Normalizes, prunes and compacts a list of rules.
+
+    ::
+
+        >>> result = compile_rules(parse_rules('''
+        ... permit tcp from 10.0.0.0/25 to any port 80
+        ... permit tcp from 10.0.0.128/25 to any port 81-90
+        ... permit tcp from 10.0.0.0/24 to any port 80-90
+        ... permit tcp from 10.0.0.7 to any port 85
+        ... '''))
+        >>> len(result['rules'])
+        1
+
+    :param list rules: rule dictionaries, in order
+    :param bool compact: drop shadowed rules and merge rules. When False the
+                         rules are only normalized and checked.
+    :returns: a dictionary with the keys 'rules', the compiled rule
+              dictionaries, and 'shadowed', a list of dictionaries with the
+              keys 'rule', 'shadowed_by' (the orderValue of each rule) and
+              'conflict' (True when the two rules have different actions)
+    :raises ValueError: if a rule is not valid
+    """
+    normalized = [normalize_rule(rule, rule.get('orderValue') or order)
+                  for order, rule in enumerate(rules, 1)]
+    originals = dict((normalized_rule.order, (normalized_rule, rule))
+                     for normalized_rule, rule in zip(normalized, rules))
+    normalized.sort(key=lambda rule: rule.order)
+
+    shadowed = []
+    seen = set()
+    current = normalized
+    for rounds in range(MAX_ROUNDS):
+        found = find_shadowed(current)
+        for rule, shadow in found:
+            if rule.order not in seen:
+                seen.add(rule.order)
+                shadowed.append({'rule': rule.order,
+                                 'shadowed_by': shadow.order,
+                                 'conflict': rule.action != shadow.action})
+        # Once compacted, the rules only change again if more are shadowed
+        if not compact or (rounds and not found):
+            break
+        dropped = set(id(rule) for rule, _ in found)
+        current = _compact([rule for rule in current
+                            if id(rule) not in dropped])
+
+    shadowed.sort(key=lambda item: item['rule'])
+    return {
+        'rules': [_render_spelled(rule, order, originals)
+                  for order, rule in enumerate(current, 1)],
+        'shadowed': shadowed,
+    }
+
+
+def _render_spelled(rule, order, originals):
+    """Renders a compiled rule, keeping how its rule spelled 'any'.
+
+    An address matching everything may be written as 'any' or as 0.0.0.0
+    with a 0.0.0.0 mask. Such an address of the rule a compiled rule starts
+    at is passed on as it was written.
+    """
+    result = render_rule(rule, order)
+    original, rule_dict = originals[rule.order]
+    for name, address, written in (
+            ('source', rule.source, original.source),
+            ('destination', rule.destination, original.destination)):
+        text = rule_dict.get(name + 'IpAddress')
+        if address != (0, 0) or written != (0, 0) or not text or (
+                '/' in text):
+            continue
+        result[name + 'IpAddress'] = text
+        for key in (name + 'IpSubnetMask', name + 'IpCidr'):
+            if key in result and _first(rule_dict, key) is not None:
+                result[key] = rule_dict[key]
+    return result
+
+
+def diff_rules(current, desired):
+    """Compares two rule lists, ignoring how rules are spelled.
+
+    :param list current: rule dictionaries, e.g. from getRules
+    :param list desired: rule dictionaries
+    :returns: a dictionary with the keys 'changed' (False when both lists
+              match the same packets in the same order), 'added' and
+              'removed' (the rule dictionaries only found in desired or
+              current)
+    """
+    current = sorted(current, key=lambda rule: rule.get('orderValue') or 0)
+    desired = sorted(desired, key=lambda rule: rule.get('orderValue') or 0)
+    current_keys = [rule_key(normalize_rule(rule, order))
+                    for order, rule in enumerate(current, 1)]
+    desired_keys = [rule_key(normalize_rule(rule, order))
+                    for order, rule in enumerate(desired, 1)]
+
+    remaining = _count(current_keys)
+    added = []
+    for key, rule in zip(desired_keys, desired):
+        if remaining.get(key):
+            remaining[key] -= 1
+        else:
+            added.append(rule)
+
+    remaining = _count(desired_keys)
+    removed = []
+    for key, rule in zip(current_keys, current):
+        if remaining.get(key):
+            remaining[key] -= 1
+        else:
+            removed.append(rule)
+
+    return {
+        'changed': current_keys != desired_keys,
+        'added': added,
+        'removed': removed,
+    }
+
+
+def _count(keys):
+    """Counts how many times each key appears."""
+    counts = {}
+    for key in keys:
+        counts[key] = counts.get(key, 0) + 1
+    return counts
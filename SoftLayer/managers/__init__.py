@@ -13,14 +13,17 @@ from SoftLayer.managers.dns import DNSManager  # NOQA
 from SoftLayer.managers.firewall import FirewallManager  # NOQA
 from SoftLayer.managers.hardware import HardwareManager  # NOQA
 from SoftLayer.managers.image import ImageManager  # NOQA
+from SoftLayer.managers.inventory import InventorySnapshot  # NOQA
 from SoftLayer.managers.iscsi import ISCSIManager  # NOQA
 from SoftLayer.managers.load_balancer import LoadBalancerManager  # NOQA
 from SoftLayer.managers.messaging import MessagingManager  # NOQA
 from SoftLayer.managers.metadata import MetadataManager  # NOQA
 from SoftLayer.managers.network import NetworkManager  # NOQA
 from SoftLayer.managers.ordering import OrderingManager  # NOQA
+from SoftLayer.managers.power import PowerManager  # NOQA
 from SoftLayer.managers.sshkey import SshKeyManager  # NOQA
 from SoftLayer.managers.ssl import SSLManager  # NOQA
+from SoftLayer.managers.tags import TagManager  # NOQA
 from SoftLayer.managers.ticket import TicketManager  # NOQA
 from SoftLayer.managers.vs import VSManager  # NOQA
 
@@ -30,14 +33,17 @@ __all__ = [
     'FirewallManager',
     'HardwareManager',
     'ImageManager',
+    'InventorySnapshot',
     'ISCSIManager',
     'LoadBalancerManager',
     'MessagingManager',
     'MetadataManager',
     'NetworkManager',
     'OrderingManager',
+    'PowerManager',
     'SshKeyManager',
     'SSLManager',
+    'TagManager',
     'TicketManager',
     'VSManager',
 ]
@@ -5,13 +5,84 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import logging
+import time
+
 from SoftLayer import utils
 
 import six
 
 
+LOGGER = logging.getLogger(__name__)
+
 MAX_URLS_PER_LOAD = 5
 MAX_URLS_PER_PURGE = 5
+# The API methods behind each content action and their chunk sizes
+CONTENT_ACTIONS = {
+    'load': ('loadContent', MAX_URLS_PER_LOAD),
+    'purge': ('purgeContent', MAX_URLS_PER_PURGE),
+}
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def normalize_url(url):
+    """Returns the canonical form of a CDN URL.
+
+    Surrounding whitespace and the fragment are removed, the scheme and host
+    are lower cased and default ports are dropped. The path and query are
+    case sensitive and kept as they are.
+
+    ::
+
+        >>> normalize_url(' HTTP://Example.COM:80/Img/a.png#top ')
+        'http://example.com/Img/a.png'
+
+    """
+    url = url.strip().split('#', 1)[0]
+    parts = six.moves.urllib.parse.urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    host, _, port = netloc.rpartition(':')
+    if host and port == DEFAULT_PORTS.get(scheme):
+        netloc = host
+    return six.moves.urllib.parse.urlunsplit(
+        (scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def unique_urls(urls, normalize=False):
+    """Yields the URLs, skipping exact duplicates.
+
+    URLs are consumed lazily so a file can be streamed through.
+
+    :param urls: an iterable of URLs
+    :param boolean normalize: normalize the URLs with :func:`normalize_url`
+                              first, so URLs only spelled differently are
+                              skipped too
+    """
+    seen = set()
+    for url in urls:
+        if normalize:
+            url = normalize_url(url)
+        if url not in seen:
+            seen.add(url)
+            yield url
+
+
+def _chunks(items, size):
+    """Yields lists of up to size items from an iterable."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 class CDNManager(utils.IdentifierMixin, object):
@@ -94,46 +165,129 @@ class CDNManager(utils.IdentifierMixin, object):
 
         return self.account.deleteOriginPullRule(origin_id, id=account_id)
 
-    def load_content(self, account_id, urls):
+    def load_content(self, account_id, urls, normalize=False):
         """Prefetches one or more URLs to the CDN edge nodes.
 
         :param int account_id: the CDN account ID into which content should be
                                preloaded.
         :param urls: a string or a list of strings representing the CDN URLs
                      that should be pre-loaded.
+        :param boolean normalize: normalize the URLs first, see
+                                  :func:`normalize_url`
         :returns: true if all load requests were successfully submitted;
                   otherwise, returns the first error encountered.
         """
+        return _first_failure(self.submit_content(account_id, urls, 'load',
+                                                  retries=0,
+                                                  normalize=normalize))
 
-        if isinstance(urls, six.string_types):
-            urls = [urls]
-
-        for i in range(0, len(urls), MAX_URLS_PER_LOAD):
-            result = self.account.loadContent(urls[i:i + MAX_URLS_PER_LOAD],
-                                              id=account_id)
-            if not result:
-                return result
-
-        return True
-
-    def purge_content(self, account_id, urls):
+    def purge_content(self, account_id, urls, normalize=False):
         """Purges one or more URLs from the CDN edge nodes.
 
         :param int account_id: the CDN account ID from which content should
                                be purged.
         :param urls: a string or a list of strings representing the CDN URLs
                      that should be purged.
+        :param boolean normalize: normalize the URLs first, see
+                                  :func:`normalize_url`
         :returns: true if all purge requests were successfully submitted;
                   otherwise, returns the first error encountered.
         """
+        return _first_failure(self.submit_content(account_id, urls, 'purge',
+                                                  retries=0,
+                                                  normalize=normalize))
+
+    def submit_content(self, account_id, urls, action,
+                       max_workers=utils.DEFAULT_MAX_WORKERS, rate=None,
+                       retries=DEFAULT_RETRIES,
+                       retry_delay=DEFAULT_RETRY_DELAY, normalize=False):
+        """Purges or prefetches any number of URLs concurrently.
+
+        The URLs are deduplicated, split into chunks of the size the API
+        accepts and submitted by a bounded pool of threads. A
+        chunk that raises an error or isn't accepted is retried with an
+        exponential backoff. URLs are read lazily, a window of chunks at a
+        time, so a large file can be streamed through.
+
+        :param int account_id: the CDN account ID
+        :param urls: a string or an iterable of URLs
+        :param string action: 'purge' or 'load'
+        :param int max_workers: the maximum number of concurrent API calls
+        :param float rate: the maximum number of API calls per second, or
+                           None for no limit
+        :param int retries: the number of times a failed chunk is retried
+        :param float retry_delay: seconds to wait before the first retry. It
+                                  doubles with each retry.
+        :param boolean normalize: submit the URLs normalized with
+                                  :func:`normalize_url`. By default they're
+                                  submitted as given.
+        :returns: A generator of dictionaries, one per chunk in submission
+                  order, with the keys 'urls', 'success', 'attempts',
+                  'result' and 'error'
+
+        ::
+
+           # Purge every URL listed in a file, 10 calls per second at most.
+           import SoftLayer
+           client = SoftLayer.create_client_from_env()
+
+           mgr = SoftLayer.CDNManager(client)
+           with open('urls.txt') as urls:
+               for chunk in mgr.submit_content(1234, urls, 'purge', rate=10):
+                   if not chunk['success']:
+                       print chunk['urls'], chunk['error']
 
+        """
+        method, chunk_size = CONTENT_ACTIONS[action]
         if isinstance(urls, six.string_types):
             urls = [urls]
-
-        for i in range(0, len(urls), MAX_URLS_PER_PURGE):
-            result = self.account.purgeContent(urls[i:i + MAX_URLS_PER_PURGE],
-                                               id=account_id)
-            if not result:
-                return result
-
-        return True
+        limiter = utils.RateLimiter(rate)
+
+        def _submit(chunk):
+            """Submits a chunk, retrying it on failure."""
+            attempts = 0
+            while True:
+                attempts += 1
+                limiter.wait()
+                result = error = None
+                try:
+                    result = getattr(self.account, method)(chunk,
+                                                           id=account_id)
+                except Exception as ex:  # pylint: disable=broad-except
+                    error = ex
+                if (error is None and result) or attempts > retries:
+                    break
+                LOGGER.warning('Unable to %s %d URLs (attempt %d): %s',
+                               action, len(chunk), attempts,
+                               error or result)
+                time.sleep(retry_delay * 2 ** (attempts - 1))
+
+            return {
+                'urls': chunk,
+                'success': error is None and bool(result),
+                'attempts': attempts,
+                'result': result,
+                'error': error,
+            }
+
+        window = max(max_workers, 1) * 4
+        chunks = _chunks(unique_urls(urls, normalize=normalize), chunk_size)
+        for work in _chunks(chunks, window):
+            responses = utils.concurrent_map(_submit, work,
+                                             max_workers=max_workers)
+            for response, _ in responses:
+                yield response
+
+
+def _first_failure(chunks):
+    """Returns True if every chunk succeeded, else the first failed result.
+
+    An error raised by the API is re-raised.
+    """
+    failure = True
+    for chunk in chunks:
+        if not chunk['success'] and failure is True:
+            if chunk['error'] is not None:
+                raise chunk['error']
+            failure = chunk['result']
+    return failure
@@ -5,10 +5,136 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import json
+import logging
+import threading
 import time
 
+from SoftLayer import exceptions
 from SoftLayer import utils
 
+LOGGER = logging.getLogger(__name__)
+
+# Number of records sent in each createObjects call
+RECORD_BATCH_SIZE = 100
+RECORD_MASK = ('id,expire,domainId,host,minimum,refresh,retry,'
+               'mxPriority,ttl,type,data,responsiblePerson')
+# Record types managed by SoftLayer which zone syncs leave alone
+SYNC_IGNORED_TYPES = ['soa']
+
+
+def record_key(record):
+    """Returns the (host, type, data) tuple identifying a resource record.
+
+    The record type is compared case insensitively.
+
+    :param dict record: a resource record or record template
+    """
+    return (record['host'], record['type'].lower(), record['data'])
+
+
+def _int(value):
+    """Returns a TTL or priority as an integer, or None if it isn't set."""
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def plan_zone_sync(current, desired):
+    """Computes the changes needed to turn current records into desired.
+
+    Records are matched on (host, type, data). Matching records whose TTL or
+    MX priority differ are edited. Of the rest, records sharing a host and
+    type are paired up and edited to the new data, then whatever is left is
+    created or deleted. SOA records are never touched.
+
+    :param list current: the zone's resource records, with ids
+    :param list desired: dictionaries with 'host', 'type' and 'data' keys and
+                         optionally 'ttl' and 'mxPriority'. A TTL or priority
+                         of None keeps the current value.
+    :returns: A dictionary with 'create', 'edit', 'delete' and 'unchanged'
+              lists. Edits are full records, with their id, as they should be
+              sent to the API.
+    """
+    plan = {'create': [], 'edit': [], 'delete': [], 'unchanged': []}
+
+    by_key = {}
+    for record in current:
+        if record['type'].lower() in SYNC_IGNORED_TYPES:
+            continue
+        by_key.setdefault(record_key(record), []).append(record)
+
+    def _changes(record, wanted):
+        """Returns the fields of record which need to change."""
+        changes = {}
+        if record['data'] != wanted['data']:
+            changes['data'] = wanted['data']
+        for field in ('ttl', 'mxPriority'):
+            value = _int(wanted.get(field))
+            if value is not None and _int(record.get(field)) != value:
+                changes[field] = value
+        return changes
+
+    def _edit(record, changes):
+        """Records an edit or that the record is unchanged."""
+        if changes:
+            edited = dict(record)
+            edited.update(changes)
+            plan['edit'].append(edited)
+        else:
+            plan['unchanged'].append(record)
+
+    unmatched = []
+    for wanted in desired:
+        matches = by_key.get(record_key(wanted))
+        if matches:
+            record = matches.pop(0)
+            _edit(record, _changes(record, wanted))
+        else:
+            unmatched.append(wanted)
+
+    by_name = {}
+    for records in by_key.values():
+        for record in records:
+            by_name.setdefault((record['host'], record['type'].lower()),
+                               []).append(record)
+
+    for wanted in unmatched:
+        records = by_name.get((wanted['host'], wanted['type'].lower()))
+        if records:
+            record = records.pop(0)
+            _edit(record, _changes(record, wanted))
+        else:
+            plan['create'].append(wanted)
+
+    for records in by_name.values():
+        plan['delete'].extend(records)
+
+    for action in ('edit', 'delete', 'unchanged'):
+        plan[action].sort(key=lambda record: record['id'])
+    return plan
+
+
+def _read_checkpoint(path, zone_id):
+    """Returns the record keys of a zone saved in a checkpoint file.
+
+    Each line of the file holds a zone id followed by a record key. Lines
+    written for other zones are ignored.
+    """
+    keys = set()
+    try:
+        with open(path) as checkpoint:
+            for line in checkpoint:
+                line = line.strip()
+                if not line:
+                    continue
+                saved = json.loads(line)
+                if len(saved) == 4 and str(saved[0]) == str(zone_id):
+                    keys.add(tuple(saved[1:]))
+    except IOError:
+        pass
+    return keys
+
 
 class DNSManager(utils.IdentifierMixin, object):
     """Domain Name System manager.
@@ -99,6 +225,123 @@ class DNSManager(utils.IdentifierMixin, object):
             'type': record_type,
             'data': data})
 
+    def create_records(self, zone_id, records, batch_size=RECORD_BATCH_SIZE,
+                       max_workers=utils.DEFAULT_MAX_WORKERS,
+                       checkpoint=None):
+        """Create many resource records on a domain.
+
+        Records are sent in batches with
+        SoftLayer_Dns_Domain_ResourceRecord::createObjects and batches are
+        sent concurrently. When a batch fails its records are created one at a
+        time so a single bad record doesn't fail the rest of the batch.
+
+        :param integer zone_id: the zone's ID
+        :param list records: dictionaries with 'host', 'type' and 'data' keys
+                             and optionally 'ttl' (default: 60) and
+                             'mxPriority'
+        :param int batch_size: the number of records per API call
+        :param int max_workers: the maximum number of concurrent API calls
+        :param string checkpoint: path of a file recording the records which
+                                  were created. Records found in it for this
+                                  zone are skipped, so an interrupted import
+                                  can be resumed by running it again.
+        :returns: A list of dictionaries, one per record, with the keys
+                  'record', 'id', 'success', 'skipped' and 'error'
+
+        ::
+
+           # Create 1000 A records, 200 per call.
+           records = [{'host': 'web%d' % i, 'type': 'a',
+                       'data': '10.0.0.%d' % (i % 250)}
+                      for i in range(1000)]
+           results = mgr.create_records(12345, records, batch_size=200)
+           failed = [result for result in results if not result['success']]
+
+        """
+        done = _read_checkpoint(checkpoint, zone_id) if checkpoint else set()
+        lock = threading.Lock()
+
+        def _save(created):
+            """Appends created records to the checkpoint file."""
+            if not checkpoint or not created:
+                return
+            with lock:
+                with open(checkpoint, 'a') as checkpoint_file:
+                    for record in created:
+                        checkpoint_file.write(json.dumps(
+                            [zone_id] + list(record_key(record))) + '\n')
+
+        results = []
+        pending = []
+        for record in records:
+            if record_key(record) in done:
+                results.append({'record': record, 'id': None,
+                                'success': True, 'skipped': True,
+                                'error': None})
+                continue
+            template = {
+                'domainId': zone_id,
+                'ttl': record.get('ttl', 60),
+                'host': record['host'],
+                'type': record['type'],
+                'data': record['data'],
+            }
+            if record.get('mxPriority') is not None:
+                template['mxPriority'] = record['mxPriority']
+            result = {'record': record, 'id': None, 'success': False,
+                      'skipped': False, 'error': None}
+            results.append(result)
+            pending.append((template, result))
+
+        batches = [pending[start:start + batch_size]
+                   for start in range(0, len(pending), batch_size)]
+
+        def _create_batch(batch):
+            """Creates a batch, falling back to one record per call.
+
+            A transport error, e.g. a timeout, fails the whole batch: the
+            batch may have been created anyway, so retrying its records
+            could duplicate them.
+            """
+            templates = [template for template, _ in batch]
+            try:
+                created = self.record.createObjects(templates)
+            except exceptions.TransportError:
+                raise
+            except exceptions.SoftLayerAPIError as ex:
+                LOGGER.warning('Batch of %d records failed, retrying them '
+                               'one at a time: %s', len(batch), ex)
+            else:
+                if not isinstance(created, list) or \
+                        len(created) != len(batch):
+                    created = [None] * len(batch)
+                for (_, result), record in zip(batch, created):
+                    result['success'] = True
+                    result['id'] = (record or {}).get('id')
+                _save(templates)
+                return
+
+            for template, result in batch:
+                try:
+                    record = self.record.createObject(template)
+                except exceptions.SoftLayerAPIError as ex:
+                    result['error'] = ex
+                    continue
+                result['success'] = True
+                if isinstance(record, dict):
+                    result['id'] = record.get('id')
+                _save([template])
+
+        responses = utils.concurrent_map(_create_batch, batches,
+                                         max_workers=max_workers)
+        for batch, (_, error) in zip(batches, responses):
+            if error is not None:
+                for _, result in batch:
+                    if not result['success']:
+                        result['error'] = error
+
+        return results
+
     def delete_record(self, record_id):
         """Delete a resource record by its ID.
 
@@ -144,13 +387,308 @@ class DNSManager(utils.IdentifierMixin, object):
 
         results = self.service.getResourceRecords(
             id=zone_id,
-            mask='id,expire,domainId,host,minimum,refresh,retry,'
-            'mxPriority,ttl,type,data,responsiblePerson',
+            mask=RECORD_MASK,
             filter=_filter.to_dict(),
         )
 
         return results
 
+    def sync_zone(self, zone_id, desired_records, dry_run=False,
+                  batch_size=RECORD_BATCH_SIZE,
+                  max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Make a zone's records match a list of desired records.
+
+        The zone's records are fetched once and compared with
+        :func:`plan_zone_sync`, so the number of API calls grows with the
+        number of changes rather than the size of the zone. Creates, edits
+        and deletes are sent in concurrent batches.
+
+        :param integer zone_id: the zone's ID
+        :param list desired_records: dictionaries with 'host', 'type' and
+                                     'data' keys and optionally 'ttl' and
+                                     'mxPriority'
+        :param bool dry_run: only compute the changes
+        :param int batch_size: the number of records per API call
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: The plan from :func:`plan_zone_sync` with a 'failed' list
+                  of dictionaries with the keys 'action', 'record' and
+                  'error'
+
+        ::
+
+           # Remove every record except www.
+           plan = mgr.sync_zone(12345, [{'host': 'www', 'type': 'a',
+                                         'data': '1.2.3.4', 'ttl': 900}])
+           print len(plan['delete']), 'records deleted'
+
+        """
+        current = self.service.getResourceRecords(id=zone_id,
+                                                  mask=RECORD_MASK)
+        plan = plan_zone_sync(current, desired_records)
+        plan['failed'] = []
+        if dry_run:
+            return plan
+
+        return self.apply_zone_plan(zone_id, plan, batch_size=batch_size,
+                                    max_workers=max_workers)
+
+    def apply_zone_plan(self, zone_id, plan, batch_size=RECORD_BATCH_SIZE,
+                        max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Applies a plan from :func:`plan_zone_sync` to a zone.
+
+        :param integer zone_id: the zone's ID
+        :param dict plan: the plan, e.g. from a dry run of :meth:`sync_zone`
+        :param int batch_size: the number of records per API call
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: The plan with a 'failed' list of dictionaries with the keys
+                  'action', 'record' and 'error'
+        """
+        plan['failed'] = []
+        if plan['create']:
+            results = self.create_records(zone_id, plan['create'],
+                                          batch_size=batch_size,
+                                          max_workers=max_workers)
+            plan['failed'].extend(
+                {'action': 'create', 'record': result['record'],
+                 'error': result['error']}
+                for result in results if not result['success'])
+
+        plan['failed'].extend(self._send_batches(
+            [('edit', 'editObjects', plan['edit']),
+             ('delete', 'deleteObjects', plan['delete'])],
+            batch_size, max_workers))
+        return plan
+
+    def _send_batches(self, changes, batch_size, max_workers):
+        """Sends editObjects/deleteObjects calls in concurrent batches.
+
+        :param list changes: (action, method, records) tuples
+        :returns: a list of dictionaries with the keys 'action', 'record' and
+                  'error' for every record in a failed batch
+        """
+        work = []
+        for action, method, records in changes:
+            work.extend((action, method, records[start:start + batch_size])
+                        for start in range(0, len(records), batch_size))
+
+        def _apply(item):
+            """Edits or deletes a batch of records."""
+            _, method, batch = item
+            return getattr(self.record, method)(batch)
+
+        failed = []
+        responses = utils.concurrent_map(_apply, work,
+                                         max_workers=max_workers)
+        for (action, _, batch), (_, error) in zip(work, responses):
+            if error is not None:
+                LOGGER.warning('Unable to %s %d records: %s',
+                               action, len(batch), error)
+                failed.extend(
+                    {'action': action, 'record': record, 'error': error}
+                    for record in batch)
+        return failed
+
+    def sync_instance_records(self, instances, a_record=True, ptr=True,
+                              ttl=7200, dry_run=False,
+                              service='Virtual_Guest',
+                              batch_size=RECORD_BATCH_SIZE,
+                              max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Sync the A and PTR records of many servers at once.
+
+        Each forward zone's A records are fetched once and each reverse
+        domain once (through the first server in it), every change is worked
+        out locally, then creates and edits are sent in batches.
+
+        :param list instances: servers with the 'id', 'hostname', 'domain',
+                               'fullyQualifiedDomainName' and
+                               'primaryIpAddress' properties
+        :param bool a_record: sync A records
+        :param bool ptr: sync PTR records
+        :param int ttl: the TTL for the records
+        :param bool dry_run: only work out the changes
+        :param string service: the service owning the servers, for the
+                               reverse domain lookup. E.G. Virtual_Guest
+        :param int batch_size: the number of records per API call
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: A list of dictionaries, one per record, with the keys
+                  'instance', 'type' ('a' or 'ptr'), 'action' ('create',
+                  'edit', 'unchanged' or 'error'), 'record', 'success' and
+                  'error'
+        """
+        changes = []
+
+        def _change(instance, record_type, action, record=None, error=None):
+            """Adds a change to the result."""
+            changes.append({'instance': instance, 'type': record_type,
+                            'action': action, 'record': record,
+                            'success': action != 'error', 'error': error})
+
+        targets = []
+        for instance in instances:
+            if not instance.get('primaryIpAddress'):
+                for record_type, wanted in (('a', a_record), ('ptr', ptr)):
+                    if wanted:
+                        _change(instance, record_type, 'error',
+                                error='No primary IP address')
+            else:
+                targets.append(instance)
+
+        if a_record:
+            self._plan_a_records(targets, ttl, _change, max_workers)
+        if ptr:
+            self._plan_ptr_records(targets, ttl, service, _change,
+                                   max_workers)
+
+        if dry_run:
+            return changes
+
+        creates = {}
+        for change in changes:
+            if change['action'] == 'create':
+                creates.setdefault(change['record']['domainId'],
+                                   []).append(change)
+        for zone_id, zone_changes in sorted(creates.items()):
+            results = self.create_records(
+                zone_id, [change['record'] for change in zone_changes],
+                batch_size=batch_size, max_workers=max_workers)
+            for change, result in zip(zone_changes, results):
+                change['success'] = result['success']
+                change['error'] = result['error']
+
+        edits = [change for change in changes if change['action'] == 'edit']
+        failed = self._send_batches(
+            [('edit', 'editObjects',
+              [change['record'] for change in edits])],
+            batch_size, max_workers)
+        errors = dict((id(failure['record']), failure['error'])
+                      for failure in failed)
+        for change in edits:
+            if id(change['record']) in errors:
+                change['success'] = False
+                change['error'] = errors[id(change['record'])]
+
+        return changes
+
+    def _plan_a_records(self, instances, ttl, add_change, max_workers):
+        """Works out the A record changes for instances."""
+        zones = dict((zone['name'].lower(), zone['id'])
+                     for zone in self.list_zones(mask='id,name'))
+
+        zone_ids = set()
+        for instance in instances:
+            zone_id = zones.get(instance['domain'].lower())
+            if zone_id is not None:
+                zone_ids.add(zone_id)
+        zone_ids = sorted(zone_ids)
+
+        def _get_a_records(zone_id):
+            """Fetches the A records of a zone."""
+            return self.service.getResourceRecords(
+                id=zone_id, mask=RECORD_MASK,
+                filter={'resourceRecords': {
+                    'type': utils.query_filter('a')}})
+
+        records_by_zone = {}
+        responses = utils.concurrent_map(_get_a_records, zone_ids,
+                                         max_workers=max_workers)
+        for zone_id, (records, error) in zip(zone_ids, responses):
+            records_by_zone[zone_id] = (records or [], error)
+
+        for instance in instances:
+            zone_id = zones.get(instance['domain'].lower())
+            if zone_id is None:
+                add_change(instance, 'a', 'error',
+                           error='No zone found for %s' % instance['domain'])
+                continue
+            records, error = records_by_zone[zone_id]
+            if error is not None:
+                add_change(instance, 'a', 'error', error=error)
+                continue
+
+            matches = [record for record in records
+                       if record['host'].lower() ==
+                       instance['hostname'].lower() and
+                       record['type'].lower() == 'a']
+            if not matches:
+                add_change(instance, 'a', 'create', {
+                    'domainId': zone_id,
+                    'host': instance['hostname'],
+                    'type': 'a',
+                    'data': instance['primaryIpAddress'],
+                    'ttl': ttl,
+                })
+            elif len(matches) > 1:
+                add_change(instance, 'a', 'error',
+                           error='Found %d A records' % len(matches))
+            else:
+                self._plan_edit(instance, 'a', matches[0],
+                                instance['primaryIpAddress'], ttl,
+                                add_change)
+
+    def _plan_ptr_records(self, instances, ttl, service, add_change,
+                          max_workers):
+        """Works out the PTR record changes for instances."""
+        groups = {}
+        for instance in instances:
+            network = instance['primaryIpAddress'].rsplit('.', 1)[0]
+            groups.setdefault(network, []).append(instance)
+        networks = sorted(groups)
+
+        def _get_reverse_domain(network):
+            """Fetches a reverse domain and its PTR records.
+
+            The reverse domain is found through its first instance, which
+            only returns that instance's records, so the records of the
+            whole domain are fetched separately.
+            """
+            domains = self.client.call(service, 'getReverseDomainRecords',
+                                       id=groups[network][0]['id'])
+            if not domains:
+                raise exceptions.SoftLayerError(
+                    'No reverse domain found for %s' % network)
+            records = self.service.getResourceRecords(
+                id=domains[0]['id'], mask=RECORD_MASK,
+                filter={'resourceRecords': {
+                    'type': utils.query_filter('ptr')}})
+            return domains[0], records or []
+
+        responses = utils.concurrent_map(_get_reverse_domain, networks,
+                                         max_workers=max_workers)
+        for network, (response, error) in zip(networks, responses):
+            for instance in groups[network]:
+                if error is not None:
+                    add_change(instance, 'ptr', 'error', error=error)
+                    continue
+
+                domain, records = response
+                host = instance['primaryIpAddress'].split('.')[-1]
+                matches = [record for record in records
+                           if record.get('host') == host and
+                           record.get('type', 'ptr').lower() == 'ptr']
+                if matches:
+                    self._plan_edit(instance, 'ptr', matches[0],
+                                    instance['fullyQualifiedDomainName'],
+                                    ttl, add_change)
+                else:
+                    add_change(instance, 'ptr', 'create', {
+                        'domainId': domain['id'],
+                        'host': host,
+                        'type': 'ptr',
+                        'data': instance['fullyQualifiedDomainName'],
+                        'ttl': ttl,
+                    })
+
+    @staticmethod
+    def _plan_edit(instance, record_type, record, data, ttl, add_change):
+        """Adds an edit, or an unchanged record if nothing differs."""
+        if record.get('data') == data and _int(record.get('ttl')) == ttl:
+            add_change(instance, record_type, 'unchanged', record)
+            return
+        record = dict(record)
+        record['data'] = data
+        record['ttl'] = ttl
+        add_change(instance, record_type, 'edit', record)
+
     def edit_record(self, record):
         """Update an existing record with the options provided.
 
@@ -5,6 +5,8 @@
 
     :license: MIT, see LICENSE for more details.
 """
+from SoftLayer import firewall_rules
+from SoftLayer import masks
 from SoftLayer import utils
 
 RULE_MASK = ('mask[orderValue,action,destinationIpAddress,'
@@ -12,6 +14,25 @@ RULE_MASK = ('mask[orderValue,action,destinationIpAddress,'
              'destinationPortRangeEnd,sourceIpAddress,sourceIpSubnetMask,'
              'version]')
 
+FIREWALL_PAGE_SIZE = 500
+# One getNetworkVlans call per kind of firewall, each filtered server side to
+# the VLANs that have one and masked to just what a listing needs. The API
+# can't OR filters, so the three calls are made concurrently instead.
+FIREWALL_QUERIES = [
+    ('vlan', 'dedicatedFirewallFlag', {'operation': 1},
+     str(masks.ObjectMask('id', 'dedicatedFirewallFlag',
+                          'highAvailabilityFirewallFlag',
+                          'networkVlanFirewall.id'))),
+    ('vs', 'firewallGuestNetworkComponents', {'id': {'operation': 'not null'}},
+     str(masks.ObjectMask('id', 'dedicatedFirewallFlag',
+                          'firewallGuestNetworkComponents[id,status,'
+                          'guestNetworkComponent.guest.id]'))),
+    ('server', 'firewallNetworkComponents', {'id': {'operation': 'not null'}},
+     str(masks.ObjectMask('id', 'dedicatedFirewallFlag',
+                          'firewallNetworkComponents[id,status,'
+                          'networkComponent.downlinkComponent.hardwareId]'))),
+]
+
 
 def has_firewall(vlan):
     """Helper to determine whether or not a VLAN has a firewall.
@@ -28,6 +49,39 @@ def has_firewall(vlan):
     )
 
 
+def _vlan_firewalls(kind, vlan):
+    """Yields the firewalls of one kind found on a VLAN."""
+    if kind == 'vlan':
+        if vlan.get('dedicatedFirewallFlag'):
+            features = []
+            if vlan.get('highAvailabilityFirewallFlag'):
+                features.append('HA')
+            yield {'type': 'vlan',
+                   'id': vlan['networkVlanFirewall']['id'],
+                   'vlan_id': vlan['id'],
+                   'server_id': None,
+                   'features': features}
+        return
+
+    # Standard firewalls on a dedicated VLAN are managed by that firewall
+    if vlan.get('dedicatedFirewallFlag'):
+        return
+    if kind == 'vs':
+        components = vlan.get('firewallGuestNetworkComponents') or []
+        path = ('guestNetworkComponent', 'guest', 'id')
+    else:
+        components = vlan.get('firewallNetworkComponents') or []
+        path = ('networkComponent', 'downlinkComponent', 'hardwareId')
+    for component in components:
+        if component.get('status') == 'no_edit':
+            continue
+        yield {'type': kind,
+               'id': component['id'],
+               'vlan_id': vlan['id'],
+               'server_id': utils.lookup(component, *path),
+               'features': []}
+
+
 class FirewallManager(utils.IdentifierMixin, object):
     """Manages firewalls.
 
@@ -207,18 +261,81 @@ class FirewallManager(utils.IdentifierMixin, object):
         :returns: A list of firewalls on the current account.
         """
 
-        mask = ('firewallNetworkComponents,'
-                'networkVlanFirewall,'
-                'dedicatedFirewallFlag,'
-                'firewallGuestNetworkComponents,'
-                'firewallInterfaces,'
-                'firewallRules,'
-                'highAvailabilityFirewallFlag')
+        mask = str(masks.ObjectMask('firewallNetworkComponents',
+                                    'networkVlanFirewall',
+                                    'dedicatedFirewallFlag',
+                                    'firewallGuestNetworkComponents',
+                                    'firewallInterfaces',
+                                    'firewallRules',
+                                    'highAvailabilityFirewallFlag'))
 
         return [firewall
                 for firewall in self.account.getNetworkVlans(mask=mask)
                 if has_firewall(firewall)]
 
+    def list_firewalls(self, max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Lists the firewalls on the account without their rules.
+
+        Dedicated VLAN firewalls, virtual server firewalls and server
+        firewalls are each fetched with a filtered, paged call using a
+        minimal mask, concurrently. Use :meth:`get_rule_sets` to load the
+        rules of the firewalls that need them.
+
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: A list of dictionaries with the keys 'type' ('vlan', 'vs'
+                  or 'server'), 'id' (the firewall id), 'vlan_id',
+                  'server_id' (None for VLAN firewalls) and 'features'
+        """
+
+        def _fetch(query):
+            """Fetches the VLANs with one kind of firewall."""
+            _, key, operation, mask = query
+            return list(self.account.getNetworkVlans(
+                mask=mask, filter={'networkVlans': {key: operation}},
+                iter=True, chunk=FIREWALL_PAGE_SIZE))
+
+        firewalls = []
+        responses = utils.concurrent_map(_fetch, FIREWALL_QUERIES,
+                                         max_workers=max_workers)
+        for (kind, _, _, _), (vlans, error) in zip(FIREWALL_QUERIES,
+                                                   responses):
+            if error is not None:
+                raise error
+            for vlan in sorted(vlans, key=lambda vlan: vlan['id']):
+                firewalls.extend(_vlan_firewalls(kind, vlan))
+        return firewalls
+
+    def get_rules(self, firewall_type, firewall_id):
+        """Get the rules of a firewall of any type.
+
+        :param string firewall_type: 'vlan' for a dedicated firewall, 'vs' or
+                                     'server' for a standard firewall
+        :param integer firewall_id: the instance ID of the firewall
+        :returns: A list of the rules.
+        """
+        if firewall_type == 'vlan':
+            return self.get_dedicated_fwl_rules(firewall_id)
+        return self.get_standard_fwl_rules(firewall_id)
+
+    def get_rule_sets(self, firewalls, max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Fetches the rules of many firewalls concurrently.
+
+        A failure to fetch the rules of one firewall does not stop the
+        others.
+
+        :param list firewalls: dictionaries with the keys 'type' and 'id',
+                               e.g. from :meth:`list_firewalls`
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: A list of dictionaries, one per firewall in the same order,
+                  with the keys 'firewall', 'rules' and 'error'
+        """
+        firewalls = list(firewalls)
+        responses = utils.concurrent_map(
+            lambda firewall: self.get_rules(firewall['type'], firewall['id']),
+            firewalls, max_workers=max_workers)
+        return [{'firewall': firewall, 'rules': rules, 'error': error}
+                for firewall, (rules, error) in zip(firewalls, responses)]
+
     def get_standard_fwl_rules(self, firewall_id):
         """Get the rules of a standard firewall.
 
@@ -277,3 +394,54 @@ class FirewallManager(utils.IdentifierMixin, object):
         template = {'networkComponentFirewallId': firewall_id, 'rules': rules}
 
         return rule_svc.createObject(template)
+
+    def sync_rules(self, firewall_id, rules, dedicated=False, compact=True,
+                   dry_run=False):
+        """Compiles rules and pushes them if they differ from the current ones.
+
+        :param integer firewall_id: the instance ID of the firewall
+        :param list rules: rule dictionaries, e.g. from
+                           :func:`SoftLayer.firewall_rules.parse_rules`
+        :param bool dedicated: True for a dedicated (VLAN) firewall, False
+                               for a standard firewall
+        :param bool compact: drop shadowed rules and merge rules that only
+                             differ by ports or subnets
+        :param bool dry_run: only compile and compare the rules
+        :returns: a dictionary with the keys 'rules' (the compiled rules),
+                  'shadowed', 'changed', 'added', 'removed' and 'request'
+                  (the update request, or None when nothing was pushed). See
+                  :func:`SoftLayer.firewall_rules.compile_rules` and
+                  :func:`SoftLayer.firewall_rules.diff_rules`.
+        :raises ValueError: if a rule is not valid
+
+        ::
+
+           # Push the rules in a file to a dedicated firewall.
+           import SoftLayer
+           from SoftLayer import firewall_rules
+           client = SoftLayer.create_client_from_env()
+
+           mgr = SoftLayer.FirewallManager(client)
+           with open('rules.txt') as rule_file:
+               rules = firewall_rules.parse_rules(rule_file.read())
+           result = mgr.sync_rules(1234, rules, dedicated=True)
+           print '%d rules, changed: %s' % (len(result['rules']),
+                                            result['changed'])
+
+        """
+        result = firewall_rules.compile_rules(rules, compact=compact)
+        if dedicated:
+            current = self.get_dedicated_fwl_rules(firewall_id)
+        else:
+            current = self.get_standard_fwl_rules(firewall_id)
+        result.update(firewall_rules.diff_rules(current, result['rules']))
+        result['request'] = None
+
+        if result['changed'] and not dry_run:
+            if dedicated:
+                result['request'] = self.edit_dedicated_fwl_rules(
+                    firewall_id, result['rules'])
+            else:
+                result['request'] = self.edit_standard_fwl_rules(
+                    firewall_id, result['rules'])
+        return result
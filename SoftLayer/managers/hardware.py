@@ -8,6 +8,7 @@
 import socket
 
 import SoftLayer
+from SoftLayer.managers import locations
 from SoftLayer.managers import ordering
 from SoftLayer import utils
 # Invalid names are ignored due to long method names and short argument names
@@ -36,6 +37,7 @@ class HardwareManager(utils.IdentifierMixin, object):
             self.ordering_manager = ordering.OrderingManager(client)
         else:
             self.ordering_manager = ordering_manager
+        self.locations = locations.get_location_registry(client)
 
     def cancel_hardware(self, hardware_id, reason='unneeded', comment='',
                         immediate=False):
@@ -195,6 +197,54 @@ class HardwareManager(utils.IdentifierMixin, object):
 
         return self.hardware.getObject(id=hardware_id, **kwargs)
 
+    def get_hardware_details(self, hardware_ids,
+                             max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Get details about many hardware devices concurrently.
+
+        Every call needed is planned up front, so the servers and their PTR
+        records are all fetched at the same time rather than one after the
+        other. A failure to fetch one server does not stop the others.
+
+        :param list hardware_ids: the hardware IDs
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: A list of dictionaries, one per server in the same order,
+                  with the keys 'id', 'hardware' (see :meth:`get_hardware`),
+                  'ptr_records' and 'error'
+        """
+        hardware_ids = list(hardware_ids)
+        calls = [(hardware_id, call) for hardware_id in hardware_ids
+                 for call in ('hardware', 'ptr')]
+
+        def _call(call):
+            """Makes one of the planned calls."""
+            hardware_id, kind = call
+            if kind == 'hardware':
+                return self.get_hardware(hardware_id)
+            return self.hardware.getReverseDomainRecords(id=hardware_id)
+
+        responses = dict(zip(calls, utils.concurrent_map(
+            _call, calls, max_workers=max_workers)))
+        details = []
+        for hardware_id in hardware_ids:
+            hardware, error = responses[(hardware_id, 'hardware')]
+            ptr_domains, ptr_error = responses[(hardware_id, 'ptr')]
+            ptr_records = []
+            # The PTR records of private only hosts are dropped. An API
+            # error fetching them means there are none, but any other
+            # failure is reported.
+            if error is None and not hardware.get('privateNetworkOnlyFlag'):
+                if ptr_error is None:
+                    ptr_records = [ptr['data'] for ptr_domain in ptr_domains
+                                   for ptr in ptr_domain['resourceRecords']]
+                elif not isinstance(ptr_error,
+                                    SoftLayer.SoftLayerAPIError):
+                    error = ptr_error
+            details.append({'id': hardware_id,
+                            'hardware': hardware,
+                            'ptr_records': ptr_records,
+                            'error': error})
+        return details
+
     def reload(self, hardware_id, post_uri=None, ssh_keys=None):
         """Perform an OS reload of a server with its current configuration.
 
@@ -347,6 +397,14 @@ class HardwareManager(utils.IdentifierMixin, object):
             'extras': extras,
         }
 
+    def _get_location_key(self, package, location):
+        """Get the region keyname of the package for a location."""
+        keyname = self.locations.get_region_keyname(package, location)
+        if keyname is None:
+            raise SoftLayer.SoftLayerError(
+                "Could not find valid location for: '%s'" % location)
+        return keyname
+
     def _get_package(self):
         """Get the package related to simple hardware ordering."""
         mask = '''
@@ -424,7 +482,7 @@ regions[location[location]]
 
         order = {
             'hardware': [hardware],
-            'location': _get_location_key(package, location),
+            'location': self._get_location_key(package, location),
             'prices': [{'id': price} for price in prices],
             'packageId': package['id'],
             'presetId': _get_preset_id(package, size),
@@ -627,16 +685,6 @@ def _is_private_port_speed_item(item):
     return False
 
 
-def _get_location_key(package, location):
-    """Get the longer key with a short location name."""
-    for region in package['regions']:
-        if region['location']['location']['name'] == location:
-            return region['keyname']
-
-    raise SoftLayer.SoftLayerError("Could not find valid location for: '%s'"
-                                   % location)
-
-
 def _get_preset_id(package, size):
     """Get the preset id given the keyName of the preset."""
     for preset in package['activePresets']:
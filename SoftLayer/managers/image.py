@@ -5,11 +5,367 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import weakref
 
+from SoftLayer import exceptions
+from SoftLayer.managers import locations
 from SoftLayer import utils
 
+LOGGER = logging.getLogger(__name__)
+
 IMAGE_MASK = ('id,accountId,name,globalIdentifier,blockDevices,parentId,'
               'createDate')
+# Only what's needed to look images up by name
+IMAGE_INDEX_MASK = 'id,name,globalIdentifier'
+# Public images rarely change, private ones may be captured at any time
+PUBLIC_IMAGE_TTL = 86400
+PRIVATE_IMAGE_TTL = 300
+# Only what's needed to follow an image being copied to datacenters
+DISTRIBUTION_MASK = ('id,transaction[id,transactionStatus[name]],'
+                     'children[id,datacenter[id,name],status[keyName],'
+                     'transaction[id,transactionStatus[name]]]')
+# Suggestions must share at least this fraction of their trigrams
+SUGGEST_THRESHOLD = 0.3
+
+_INDEXES = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def _trigrams(text):
+    """Returns the set of trigrams of a lowercased, padded name."""
+    text = '  %s ' % text
+    return set(text[start:start + 3] for start in range(len(text) - 2))
+
+
+class _ImageTable(object):
+    """Images of one visibility, indexed by name."""
+
+    def __init__(self, images):
+        self.images = images
+        self.by_name = {}
+        self.trigrams = {}
+        for position, image in enumerate(images):
+            name = (image.get('name') or '').strip().lower()
+            self.by_name.setdefault(name, []).append(position)
+            for trigram in _trigrams(name):
+                self.trigrams.setdefault(trigram, set()).add(position)
+        self.names = sorted(self.by_name)
+
+    def find(self, query):
+        """Returns the images matching a name query.
+
+        Like :func:`SoftLayer.utils.query_filter`, 'name*', '*name' and
+        '*name*' match prefixes, suffixes and substrings. Any other name must
+        match exactly. Names are case insensitive.
+        """
+        query = query.strip().lower()
+        prefix = query.endswith('*') and len(query) > 1
+        suffix = query.startswith('*') and len(query) > 1
+        needle = query.strip('*')
+
+        if not (prefix or suffix):
+            positions = self.by_name.get(query, [])
+        elif prefix and not suffix:
+            positions = []
+            start = bisect.bisect_left(self.names, needle)
+            for name in self.names[start:]:
+                if not name.startswith(needle):
+                    break
+                positions.extend(self.by_name[name])
+        else:
+            positions = self._candidates(needle)
+            if prefix:
+                positions = [position for position in positions
+                             if needle in self._name(position)]
+            else:
+                positions = [position for position in positions
+                             if self._name(position).endswith(needle)]
+        return [self.images[position] for position in sorted(positions)]
+
+    def suggest(self, query, limit):
+        """Returns (score, image) tuples for names similar to the query."""
+        wanted = _trigrams(query.strip().lower())
+        hits = {}
+        for trigram in wanted:
+            for position in self.trigrams.get(trigram, ()):
+                hits[position] = hits.get(position, 0) + 1
+        scored = []
+        for position, count in hits.items():
+            total = len(wanted) + len(_trigrams(self._name(position)))
+            score = float(count) / (total - count)
+            if score >= SUGGEST_THRESHOLD:
+                scored.append((score, self.images[position]))
+        scored.sort(key=lambda item: (-item[0], item[1]['id']))
+        return scored[:limit]
+
+    def _candidates(self, needle):
+        """Returns the positions of names which may contain needle."""
+        # The padding of the index trigrams only helps prefix matches
+        trigrams = [needle[start:start + 3]
+                    for start in range(len(needle) - 2)]
+        if not trigrams:
+            return range(len(self.images))
+        candidates = None
+        for trigram in trigrams:
+            positions = self.trigrams.get(trigram, set())
+            if candidates is None:
+                candidates = set(positions)
+            else:
+                candidates &= positions
+            if not candidates:
+                break
+        return candidates
+
+    def _name(self, position):
+        """Returns the lowercased name of an image."""
+        return (self.images[position].get('name') or '').strip().lower()
+
+
+class ImageIndex(object):
+    """A cached index of public and private images for name lookups.
+
+    Each visibility is fetched with a minimal mask the first time it's
+    needed and kept for its TTL. When a path is given, the images are also
+    saved there so other processes don't need to fetch them again. Use
+    :func:`get_image_index` to share an index between the managers of a
+    client.
+
+    ::
+
+        >>> index = ImageIndex(client)
+        >>> index.find('centos*', visibility='public')
+        [{'id': 1234, 'name': 'CentOS 6', ...}, ...]
+        >>> index.find_many(['web', 'db'])
+        {'web': [...], 'db': [...]}
+
+    :param SoftLayer.API.Client client: an API client instance
+    :param string path: file to cache the images in
+    :param int public_ttl: seconds before public images are fetched again
+    :param int private_ttl: seconds before private images are fetched again
+    """
+
+    def __init__(self, client, path=None, public_ttl=PUBLIC_IMAGE_TTL,
+                 private_ttl=PRIVATE_IMAGE_TTL):
+        self.client = client
+        self.path = path
+        self.ttls = {'public': public_ttl, 'private': private_ttl}
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._expires = {}
+
+    def images(self, visibility='public'):
+        """Returns every image of a visibility, 'public' or 'private'."""
+        return list(self._table(visibility).images)
+
+    def find(self, name, visibility=None, refresh=False):
+        """Returns the images matching a name.
+
+        :param string name: an image name, or 'name*', '*name' or '*name*'
+                            to match a prefix, suffix or substring. Names
+                            are case insensitive.
+        :param string visibility: 'public', 'private' or None for both
+        :param bool refresh: see :func:`find_many`
+        """
+        return self.find_many([name], visibility, refresh)[name]
+
+    def find_many(self, names, visibility=None, refresh=False):
+        """Looks up many names with at most one fetch per visibility.
+
+        :param list names: image names or name patterns, see :func:`find`
+        :param string visibility: 'public', 'private' or None for both
+        :param bool refresh: when a name matches none of the cached images
+                             of a visibility, fetch them again once, so
+                             images created since they were cached are
+                             found
+        :returns: a dictionary of the images matching each name
+        """
+        found = dict((name, []) for name in names)
+        for name in self._visibilities(visibility):
+            table, fetched = self._load(name)
+            matches = [(query, table.find(query)) for query in found]
+            if refresh and not fetched and not all(
+                    images for _, images in matches):
+                table, _ = self._load(name, force=True)
+                matches = [(query, table.find(query)) for query in found]
+            for query, images in matches:
+                found[query].extend(images)
+        return found
+
+    def suggest(self, name, limit=5, visibility=None):
+        """Returns the images with the names most similar to a name.
+
+        Names are compared by the trigrams they share, so misspellings and
+        missing words still match.
+
+        :param string name: a name which may not match exactly
+        :param int limit: the maximum number of images to return
+        :param string visibility: 'public', 'private' or None for both
+        """
+        scored = []
+        for table in self._tables_for(visibility):
+            scored.extend(table.suggest(name, limit))
+        scored.sort(key=lambda item: (-item[0], item[1]['id']))
+        return [image for _, image in scored[:limit]]
+
+    def invalidate(self, visibility=None):
+        """Forgets images, so they're fetched on the next lookup.
+
+        :param string visibility: 'public', 'private' or None for both
+        """
+        with self._lock:
+            keys = []
+            for name in self._visibilities(visibility):
+                self._expires.pop(name, None)
+                key = self._cache_key(name)
+                if key:
+                    keys.append(key)
+
+            # Other processes and lookups mustn't reload the stale images
+            saved = self._read() if keys else {}
+            if any(key in saved for key in keys):
+                for key in keys:
+                    saved.pop(key, None)
+                self._write(saved)
+
+    def _tables_for(self, visibility):
+        """Returns the tables for a visibility or both."""
+        return [self._table(name) for name in self._visibilities(visibility)]
+
+    @staticmethod
+    def _visibilities(visibility):
+        """Returns the visibilities a lookup covers."""
+        if visibility is None:
+            return ['public', 'private']
+        if visibility not in ('public', 'private'):
+            raise ValueError("visibility must be 'public' or 'private'")
+        return [visibility]
+
+    def _table(self, visibility):
+        """Returns the table of a visibility, fetching it if needed."""
+        return self._load(visibility)[0]
+
+    def _load(self, visibility, force=False):
+        """Returns the table of a visibility and whether it was fetched.
+
+        :param bool force: fetch the images even if they're cached
+        """
+        with self._lock:
+            if not force and time.time() < self._expires.get(visibility, 0):
+                return self._tables[visibility], False
+
+            key = self._cache_key(visibility)
+            saved = self._read().get(key) if key and not force else None
+            if saved and saved['time'] + self.ttls[visibility] > time.time():
+                saved_at, images = saved['time'], saved['images']
+                fetched = False
+            else:
+                images = self._fetch(visibility)
+                saved_at = time.time()
+                fetched = True
+                if key:
+                    self._save(key, saved_at, images)
+
+            self._tables[visibility] = _ImageTable(images)
+            self._expires[visibility] = saved_at + self.ttls[visibility]
+            return self._tables[visibility], fetched
+
+    def _fetch(self, visibility):
+        """Fetches the images of a visibility."""
+        if visibility == 'public':
+            service = self.client['Virtual_Guest_Block_Device_Template_Group']
+            return service.getPublicImages(mask=IMAGE_INDEX_MASK)
+        return self.client['Account'].getPrivateBlockDeviceTemplateGroups(
+            mask=IMAGE_INDEX_MASK)
+
+    def _cache_key(self, visibility):
+        """Returns the key of a visibility in the file or None."""
+        if not self.path:
+            return None
+        if visibility == 'public':
+            return 'public'
+        # Private images are only saved for the user they belong to
+        username = getattr(self.client.auth, 'username', None)
+        if not username:
+            return None
+        return 'private:%s' % username
+
+    def _read(self):
+        """Returns the saved images, keyed by visibility."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            LOGGER.warning('Ignoring unreadable image cache %s', self.path)
+            return {}
+
+    def _save(self, key, saved_at, images):
+        """Adds images to the file."""
+        saved = self._read()
+        saved[key] = {'time': saved_at, 'images': images}
+        self._write(saved)
+
+    def _write(self, saved):
+        """Writes the saved images to the file, atomically."""
+        temp_path = '%s.%s.tmp' % (self.path, os.getpid())
+        try:
+            descriptor = os.open(temp_path,
+                                 os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, 'w') as cache_file:
+                json.dump(saved, cache_file)
+            if os.name == 'nt' and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError):
+            LOGGER.warning('Unable to save image cache %s', self.path,
+                           exc_info=True)
+
+
+def _copies_by_datacenter(image):
+    """Returns the copies of an image keyed by datacenter id."""
+    copies = {}
+    for child in image.get('children') or []:
+        datacenter_id = utils.lookup(child, 'datacenter', 'id')
+        if datacenter_id is not None:
+            copies[datacenter_id] = child
+    return copies
+
+
+def _distribution_event(datacenter, state, detail):
+    """Returns a progress event of an image distribution.
+
+    :param detail: a message or a transaction, which is described by its
+                   status
+    """
+    if isinstance(detail, dict):
+        detail = (utils.lookup(detail, 'transactionStatus', 'name') or
+                  'transaction %s' % detail.get('id'))
+    return {'datacenter': datacenter, 'state': state, 'detail': detail}
+
+
+def get_image_index(client, path=None):
+    """Returns the image index shared by a client's managers.
+
+    The index is created on the first call for a client, so only the path
+    given then is used.
+
+    :param SoftLayer.API.Client client: an API client instance
+    :param string path: file to cache the images in
+    """
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(client)
+        if index is None:
+            # The index mustn't keep the client alive
+            index = ImageIndex(weakref.proxy(client), path=path)
+            _INDEXES[client] = index
+        return index
 
 
 class ImageManager(utils.IdentifierMixin, object):
@@ -21,6 +377,8 @@ class ImageManager(utils.IdentifierMixin, object):
     def __init__(self, client):
         self.client = client
         self.vgbdtg = self.client['Virtual_Guest_Block_Device_Template_Group']
+        self.index = get_image_index(client)
+        self.locations = locations.get_location_registry(client)
         self.resolvers = [self._get_ids_from_name_public,
                           self._get_ids_from_name_private]
 
@@ -41,6 +399,7 @@ class ImageManager(utils.IdentifierMixin, object):
         :param int image_id: The ID of the image.
         """
         self.vgbdtg.deleteObject(id=image_id)
+        self.index.invalidate('private')
 
     def list_private_images(self, guid=None, name=None, **kwargs):
         """List all private images.
@@ -89,13 +448,16 @@ class ImageManager(utils.IdentifierMixin, object):
 
     def _get_ids_from_name_public(self, name):
         """Get public images which match the given name."""
-        results = self.list_public_images(name=name)
-        return [result['id'] for result in results]
+        return [image['id'] for image in self.index.find(name, 'public')]
 
     def _get_ids_from_name_private(self, name):
-        """Get private images which match the given name."""
-        results = self.list_private_images(name=name)
-        return [result['id'] for result in results]
+        """Get private images which match the given name.
+
+        The private images are fetched again when none of the cached ones
+        match, since the image may have been created since.
+        """
+        return [image['id']
+                for image in self.index.find(name, 'private', refresh=True)]
 
     def edit(self, image_id, name=None, note=None, tag=None):
         """Edit image related details.
@@ -112,6 +474,7 @@ class ImageManager(utils.IdentifierMixin, object):
             obj['note'] = note
         if obj:
             self.vgbdtg.editObject(obj, id=image_id)
+            self.index.invalidate('private')
         if tag:
             self.vgbdtg.setTags(str(tag), id=image_id)
         if name or note or tag:
@@ -119,7 +482,112 @@ class ImageManager(utils.IdentifierMixin, object):
         else:
             return False
 
+    def distribute_image(self, image_id, datacenters,
+                         max_workers=utils.DEFAULT_MAX_WORKERS, interval=10,
+                         timeout=None):
+        """Copies an image to many datacenters and follows the copies.
+
+        Waits for any transaction on the image, such as an import, to
+        finish. Then the datacenters are added concurrently and the copies
+        are polled with a single call per interval until every one is ready
+        or the timeout runs out.
+
+        :param int image_id: The ID of the image
+        :param list datacenters: names, long names or ids of the datacenters
+        :param int max_workers: the maximum number of concurrent API calls
+        :param float interval: seconds between polls
+        :param float timeout: seconds to wait for the copies, or None to
+                              wait until they're done
+        :returns: A generator of progress events, dictionaries with the keys
+                  'datacenter' (None for the image itself), 'state' and
+                  'detail'. The states are 'importing', 'copying', 'ready',
+                  'failed' and 'timeout'. Every datacenter ends 'ready',
+                  'failed' or 'timeout'.
+        """
+        targets = []
+        for datacenter in datacenters:
+            location = self.locations.get(datacenter)
+            if location is None:
+                raise exceptions.SoftLayerError(
+                    "Unable to find datacenter '%s'" % datacenter)
+            if location not in targets:
+                targets.append(location)
+
+        deadline = time.time() + timeout if timeout is not None else None
+        image = self._poll_distribution(image_id)
+        status = None
+        while image.get('transaction'):
+            event = _distribution_event(None, 'importing',
+                                        image['transaction'])
+            if event['detail'] != status:
+                status = event['detail']
+                yield event
+            if deadline is not None and time.time() >= deadline:
+                for location in targets:
+                    yield _distribution_event(location['name'], 'timeout',
+                                              'the image is still busy')
+                return
+            time.sleep(interval)
+            image = self._poll_distribution(image_id)
+
+        copies = _copies_by_datacenter(image)
+        to_add = [location for location in targets
+                  if location['id'] not in copies]
+
+        def _add(location):
+            """Starts copying the image to a datacenter."""
+            return self.vgbdtg.addLocations([{'id': location['id']}],
+                                            id=image_id)
+
+        pending = dict((location['id'], location) for location in targets)
+        # Right after addLocations a new copy can show up before its copy
+        # transaction does, so it's only ready once it has had one or the
+        # API reports it active
+        copied = set(location['id'] for location in targets
+                     if location not in to_add)
+        for location, (result, error) in zip(
+                to_add, utils.concurrent_map(_add, to_add,
+                                             max_workers=max_workers)):
+            if error is not None or not result:
+                del pending[location['id']]
+                yield _distribution_event(location['name'], 'failed',
+                                          str(error or 'not accepted'))
+
+        states = {}
+        while pending:
+            for location_id, location in sorted(pending.items()):
+                copy = copies.get(location_id)
+                if copy is not None and copy.get('transaction'):
+                    copied.add(location_id)
+                elif copy is not None and (
+                        location_id in copied or
+                        utils.lookup(copy, 'status', 'keyName') == 'ACTIVE'):
+                    del pending[location_id]
+                    yield _distribution_event(location['name'], 'ready', '')
+                    continue
+                event = _distribution_event(
+                    location['name'], 'copying',
+                    copy and copy.get('transaction') or 'waiting to start')
+                if states.get(location_id) != event['detail']:
+                    states[location_id] = event['detail']
+                    yield event
+
+            if not pending:
+                break
+            if deadline is not None and time.time() >= deadline:
+                for _, location in sorted(pending.items()):
+                    yield _distribution_event(location['name'], 'timeout',
+                                              states.get(location['id'], ''))
+                return
+            time.sleep(interval)
+            copies = _copies_by_datacenter(self._poll_distribution(image_id))
+
+    def _poll_distribution(self, image_id):
+        """Returns an image with the transactions of its copies."""
+        return self.vgbdtg.getObject(id=image_id, mask=DISTRIBUTION_MASK)
+
     def import_image_from_uri(self, data):
         """Import images which match the given uri."""
         result = self.vgbdtg.createFromExternalSource(data)
+        self.index.invalidate('private')
         return result
@@ -0,0 +1,349 @@
+"""
+    SoftLayer.inventory
+    ~~~~~~~~~~~~~~~~~~~
+    Account-wide inventory snapshot
+
+    :license: MIT, see LICENSE for more details.
+"""
+from SoftLayer import filters
+from SoftLayer.managers import firewall
+from SoftLayer import utils
+
+INVENTORY_PAGE_SIZE = 500
+
+# Each table is loaded with a single paged Account call using a mask that
+# only asks for what list and filter queries need. Tables with a
+# 'modify_field' are refreshed incrementally; the others are small enough to
+# be re-fetched.
+TABLES = {
+    'guests': {
+        'method': 'getVirtualGuests',
+        'filter_key': 'virtualGuests',
+        'mask': ['id',
+                 'globalIdentifier',
+                 'hostname',
+                 'domain',
+                 'fullyQualifiedDomainName',
+                 'primaryIpAddress',
+                 'primaryBackendIpAddress',
+                 'maxCpu',
+                 'maxMemory',
+                 'hourlyBillingFlag',
+                 'modifyDate',
+                 'datacenter.name',
+                 'powerState.keyName',
+                 'status.keyName',
+                 'tagReferences.tag.name'],
+        'indexes': ['hostname',
+                    'fullyQualifiedDomainName',
+                    'primaryIpAddress',
+                    'primaryBackendIpAddress',
+                    'datacenter.name'],
+        'modify_field': 'modifyDate',
+    },
+    'hardware': {
+        'method': 'getHardware',
+        'filter_key': 'hardware',
+        'mask': ['id',
+                 'globalIdentifier',
+                 'hostname',
+                 'domain',
+                 'fullyQualifiedDomainName',
+                 'primaryIpAddress',
+                 'primaryBackendIpAddress',
+                 'processorPhysicalCoreAmount',
+                 'memoryCapacity',
+                 'hardwareStatusId',
+                 'datacenter.name',
+                 'tagReferences.tag.name'],
+        'indexes': ['hostname',
+                    'fullyQualifiedDomainName',
+                    'primaryIpAddress',
+                    'primaryBackendIpAddress',
+                    'datacenter.name'],
+    },
+    'vlans': {
+        'method': 'getNetworkVlans',
+        'filter_key': 'networkVlans',
+        'mask': ['id',
+                 'name',
+                 'vlanNumber',
+                 'networkSpace',
+                 'totalPrimaryIpAddressCount',
+                 'hardwareCount',
+                 'virtualGuestCount',
+                 'subnetCount',
+                 'primaryRouter[id,hostname,datacenter.name]',
+                 'dedicatedFirewallFlag',
+                 'highAvailabilityFirewallFlag',
+                 'networkVlanFirewall.id',
+                 'firewallInterfaces.id',
+                 'firewallNetworkComponents[id,status,'
+                 'networkComponent.downlinkComponent.hardwareId]',
+                 'firewallGuestNetworkComponents[id,status,'
+                 'guestNetworkComponent.guest.id]'],
+        'indexes': ['vlanNumber',
+                    'name',
+                    'primaryRouter.datacenter.name'],
+    },
+    'subnets': {
+        'method': 'getSubnets',
+        'filter_key': 'subnets',
+        'mask': ['id',
+                 'networkIdentifier',
+                 'cidr',
+                 'subnetType',
+                 'version',
+                 'networkVlanId',
+                 'ipAddressCount',
+                 'datacenter.name'],
+        'indexes': ['networkIdentifier',
+                    'subnetType',
+                    'datacenter.name'],
+    },
+    'global_ips': {
+        'method': 'getGlobalIpRecords',
+        'filter_key': 'globalIpRecords',
+        'mask': ['id',
+                 'ipAddress[ipAddress,subnet.version]',
+                 'destinationIpAddress.ipAddress'],
+        'indexes': ['ipAddress.ipAddress',
+                    'destinationIpAddress.ipAddress'],
+    },
+}
+
+# Firewalls are derived from the VLAN table rather than fetched again.
+FIREWALL_INDEXES = ['networkVlanFirewall.id',
+                    'primaryRouter.datacenter.name']
+
+
+class InventoryTable(object):
+    """An in-memory table of API objects, keyed by id and indexed by field.
+
+    Rows are the dictionaries returned by the API. Index fields are dotted
+    paths into a row, e.g. 'datacenter.name'.
+
+    :param string name: the table name
+    :param list indexes: dotted field paths to maintain an index for
+    :param string filter_key: the top-level objectFilter key for these
+                              objects, e.g. 'virtualGuests'
+    """
+
+    def __init__(self, name, indexes=None, filter_key=None):
+        self.name = name
+        self.filter_key = filter_key
+        self.rows = {}
+        self.indexes = dict((field, {}) for field in indexes or [])
+        self._paths = dict((field, field.split('.'))
+                           for field in self.indexes)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows.values())
+
+    def __contains__(self, row_id):
+        return row_id in self.rows
+
+    def _value(self, row, field):
+        """Returns the value of a dotted field path for a row."""
+        path = self._paths.get(field) or field.split('.')
+        return utils.lookup(row, *path)
+
+    def load(self, rows):
+        """Replaces the contents of the table.
+
+        :param rows: an iterable of row dictionaries
+        """
+        self.rows = {}
+        for index in self.indexes.values():
+            index.clear()
+        for row in rows:
+            self.upsert(row)
+
+    def upsert(self, row):
+        """Inserts a row or replaces the row with the same id."""
+        self.remove(row['id'])
+        self.rows[row['id']] = row
+        for field, index in self.indexes.items():
+            index.setdefault(self._value(row, field), set()).add(row['id'])
+
+    def remove(self, row_id):
+        """Removes a row, if present."""
+        row = self.rows.pop(row_id, None)
+        if row is None:
+            return
+        for field, index in self.indexes.items():
+            value = self._value(row, field)
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del index[value]
+
+    def retain(self, row_ids):
+        """Removes every row whose id is not in row_ids."""
+        row_ids = set(row_ids)
+        for row_id in [row_id for row_id in self.rows
+                       if row_id not in row_ids]:
+            self.remove(row_id)
+
+    def get(self, row_id):
+        """Returns the row with the given id or None."""
+        return self.rows.get(row_id)
+
+    def find(self, field, value):
+        """Returns the rows where the dotted field path equals value.
+
+        Indexed fields are a dictionary lookup, others are a table scan.
+        """
+        index = self.indexes.get(field)
+        if index is not None:
+            return [self.rows[row_id] for row_id in index.get(value, ())]
+        return [row for row in self.rows.values()
+                if self._value(row, field) == value]
+
+    def select(self, predicate=None):
+        """Returns the rows for which predicate(row) is true.
+
+        :param predicate: a function that takes a row. All rows are returned
+                          when it is None.
+        """
+        if predicate is None:
+            return list(self.rows.values())
+        return [row for row in self.rows.values() if predicate(row)]
+
+    def query(self, object_filter):
+        """Returns the rows matching an objectFilter.
+
+        The filter is evaluated locally with :mod:`SoftLayer.filters`, so the
+        same filter a manager would send to the API can be used, e.g.
+        ``{'virtualGuests': {'hostname': utils.query_filter('web*')}}``.
+
+        :param dict object_filter: the objectFilter
+        """
+        return self.select(filters.compile_filter(object_filter,
+                                                  root=self.filter_key))
+
+
+class InventorySnapshot(object):
+    """A local snapshot of the account's inventory.
+
+    Virtual servers, hardware, VLANs, subnets, global IPs and firewalls are
+    fetched once with lightweight masks and kept in :class:`InventoryTable`
+    objects so list and lookup queries can be answered without API calls.
+
+    :param SoftLayer.API.Client client: an API client instance
+    :param list tables: names of the tables to keep. Defaults to all of them.
+    :param int chunk: number of objects to fetch per API call
+
+    ::
+
+       # Find every virtual server in dal05 without another API call.
+       import SoftLayer
+       client = SoftLayer.create_client_from_env()
+
+       snapshot = SoftLayer.InventorySnapshot(client)
+       snapshot.load()
+       for guest in snapshot['guests'].find('datacenter.name', 'dal05'):
+           print guest['fullyQualifiedDomainName']
+
+       # Later on, only fetch what changed
+       snapshot.refresh()
+
+    """
+
+    def __init__(self, client, tables=None, chunk=INVENTORY_PAGE_SIZE):
+        self.client = client
+        self.account = client['Account']
+        self.chunk = chunk
+        self.table_names = list(tables or sorted(TABLES))
+        self.tables = dict(
+            (name, InventoryTable(name,
+                                  TABLES[name]['indexes'],
+                                  filter_key=TABLES[name]['filter_key']))
+            for name in self.table_names)
+        self.tables['firewalls'] = InventoryTable('firewalls',
+                                                  FIREWALL_INDEXES,
+                                                  filter_key='networkVlans')
+        self.high_water = {}
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    def _fetch(self, name, mask=None, _filter=None):
+        """Pages through the Account method backing a table."""
+        spec = TABLES[name]
+        kwargs = {
+            'mask': "mask[%s]" % (mask or ','.join(spec['mask'])),
+            'iter': True,
+            'chunk': self.chunk,
+        }
+        if _filter:
+            kwargs['filter'] = _filter
+        return list(getattr(self.account, spec['method'])(**kwargs))
+
+    def _update_high_water(self, name, rows):
+        """Remembers the newest modification date seen for a table."""
+        field = TABLES[name].get('modify_field')
+        if not field:
+            return
+        dates = [row[field] for row in rows if row.get(field)]
+        if dates:
+            self.high_water[name] = max(dates + [self.high_water.get(name,
+                                                                     '')])
+
+    def _load_table(self, name):
+        """Fetches a whole table."""
+        rows = self._fetch(name)
+        self.tables[name].load(rows)
+        self.high_water.pop(name, None)
+        self._update_high_water(name, rows)
+
+    def _refresh_table(self, name):
+        """Fetches the rows changed since the last load or refresh.
+
+        A cheap id-only listing is used to drop rows which no longer exist.
+        """
+        spec = TABLES[name]
+        field = spec.get('modify_field')
+        if not field or name not in self.high_water:
+            return self._load_table(name)
+
+        _filter = utils.NestedDict()
+        _filter[spec['filter_key']][field] = utils.query_filter_after(
+            self.high_water[name])
+
+        ids = [row['id'] for row in self._fetch(name, mask='id')]
+        changed = self._fetch(name, _filter=_filter.to_dict())
+
+        table = self.tables[name]
+        table.retain(ids)
+        for row in changed:
+            table.upsert(row)
+        self._update_high_water(name, changed)
+
+    def _run(self, func):
+        """Runs func for every table concurrently."""
+        results = utils.concurrent_map(func, self.table_names)
+        for _, error in results:
+            if error is not None:
+                raise error
+
+        if 'vlans' in self.tables:
+            self.tables['firewalls'].load(
+                vlan for vlan in self.tables['vlans']
+                if firewall.has_firewall(vlan))
+
+    def load(self):
+        """Fetches every table from the API."""
+        self._run(self._load_table)
+
+    def refresh(self):
+        """Brings every table up to date.
+
+        Tables that track a modification date only fetch the rows that
+        changed since the last load. The others are fetched again.
+        """
+        self._run(self._refresh_table)
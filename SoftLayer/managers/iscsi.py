@@ -5,8 +5,111 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import datetime
+
+from SoftLayer import filters
+from SoftLayer.managers import locations
 from SoftLayer import utils
 
+# The notes of the snapshots created by a rotation. Only snapshots with
+# the rotation's notes are pruned by it.
+ROTATION_NOTES = 'Rotated snapshot'
+# Only what's needed to plan a snapshot rotation
+SNAPSHOT_ROTATION_MASK = ('id,username,nasType,'
+                          'serviceResource[datacenter.name],'
+                          'snapshots[id,createDate,notes]')
+
+
+def _utc(value):
+    """Parses an API timestamp into a naive UTC datetime or None.
+
+    :param value: e.g. '2014-03-21T01:00:00-05:00'
+    """
+    date = filters.parse_date(value)
+    if date is None:
+        return None
+    offset = value[19:] if len(value) > 19 and value[10] == 'T' else ''
+    if len(offset) == 6 and offset[0] in '+-' and offset[3] == ':':
+        delta = datetime.timedelta(hours=int(offset[1:3]),
+                                   minutes=int(offset[4:6]))
+        date = date - delta if offset[0] == '+' else date + delta
+    return date
+
+
+class SnapshotPolicy(object):
+    """When to snapshot a volume and which of its snapshots to keep.
+
+    A snapshot is kept if any rule keeps it and deleted otherwise. A
+    snapshot that is about to be created counts as the newest one, and
+    snapshots with a creation date that can't be read are always kept.
+
+    ::
+
+        # Snapshot nightly, keep a week of nightlies and a month of weeklies
+        policy = SnapshotPolicy(interval=23, keep=7, weekly=4)
+
+    :param float interval: hours after the newest snapshot before a new one
+                           is created. None never creates snapshots.
+    :param int keep: the number of newest snapshots to keep
+    :param int daily: the number of days to keep the newest snapshot of
+    :param int weekly: the number of weeks to keep the newest snapshot of
+    """
+
+    def __init__(self, interval=None, keep=0, daily=0, weekly=0):
+        if not (keep or daily or weekly):
+            raise ValueError('A retention policy must keep some snapshots')
+        self.interval = interval
+        self.keep = keep
+        self.daily = daily
+        self.weekly = weekly
+
+    def plan(self, snapshots, now=None):
+        """Works out what to do with a volume's snapshots.
+
+        :param list snapshots: the volume's snapshots, with their
+                               'createDate'
+        :param datetime now: the current UTC time
+        :returns: a tuple of whether to create a snapshot and a list of
+                  (snapshot, reason) tuples for the snapshots to delete
+        """
+        now = now or datetime.datetime.utcnow()
+        dated = []
+        for snapshot in snapshots:
+            created = _utc(snapshot.get('createDate') or '')
+            if created is not None:
+                dated.append((created, snapshot))
+        dated.sort(key=lambda item: item[0], reverse=True)
+
+        create = self.interval is not None and (
+            not dated or
+            now - dated[0][0] >= datetime.timedelta(hours=self.interval))
+
+        # The snapshot about to be created is the newest
+        history = [(now, None)] if create else []
+        history.extend(dated)
+
+        kept = set()
+        for rule, count in ((None, self.keep),
+                            (lambda date: date.date(), self.daily),
+                            (lambda date: date.isocalendar()[:2],
+                             self.weekly)):
+            periods = set()
+            for position, (created, _) in enumerate(history):
+                if rule is None:
+                    if position < count:
+                        kept.add(position)
+                    continue
+                period = rule(created)
+                if period not in periods and len(periods) < count:
+                    periods.add(period)
+                    kept.add(position)
+
+        deletes = []
+        for position, (_, snapshot) in enumerate(history):
+            if snapshot is not None and position not in kept:
+                deletes.append((snapshot, 'not kept by the retention policy'))
+        return create, deletes
+
 
 class ISCSIManager(utils.IdentifierMixin, object):
     """Manages iSCSI storages."""
@@ -16,6 +119,7 @@ class ISCSIManager(utils.IdentifierMixin, object):
         self.client = client
         self.iscsi_svc = self.client['Network_Storage_Iscsi']
         self.product_order = self.client['Product_Order']
+        self.locations = locations.get_location_registry(client)
 
     def _find_item_prices(self, size, categorycode=''):
         """Retrieves the Item Price IDs."""
@@ -47,13 +151,10 @@ class ISCSIManager(utils.IdentifierMixin, object):
 
     def _get_location_id(self, location):
         """Returns location id of datacenter for ProductOrder::placeOrder()."""
-        loc_svc = self.client['Location_Datacenter']
-        datacenters = loc_svc.getDatacenters(mask='mask[longName,id,name]')
-        for datacenter in datacenters:
-            if datacenter['name'] == location:
-                location = datacenter['id']
-                return location
-        raise ValueError('Invalid datacenter name specified.')
+        location_id = self.locations.get_id(location)
+        if location_id is None:
+            raise ValueError('Invalid datacenter name specified.')
+        return location_id
 
     def create_iscsi(self, size=None, location=None):
         """Places an order for iSCSI volume.
@@ -152,6 +253,118 @@ Network_Storage_Iscsi_SnapshotSpace',
 
         self.iscsi_svc.deleteObject(id=snapshot_id)
 
+    def list_volume_snapshots(self, volume_ids=None):
+        """Lists iSCSI volumes with their snapshots in a single call.
+
+        :param list volume_ids: only return these volumes
+        :returns: A list of volumes, each with its 'snapshots'
+        """
+        volumes = self.client['Account'].getIscsiNetworkStorage(
+            mask='mask[%s]' % SNAPSHOT_ROTATION_MASK)
+        if volume_ids is not None:
+            volume_ids = set(int(volume_id) for volume_id in volume_ids)
+        return [volume for volume in volumes
+                if volume.get('nasType') != 'ISCSI_SNAPSHOT' and
+                (volume_ids is None or volume['id'] in volume_ids)]
+
+    def plan_snapshot_rotation(self, policy, volume_ids=None, now=None,
+                               notes=ROTATION_NOTES, all_snapshots=False):
+        """Works out which snapshots to create and delete.
+
+        Only the snapshots created by the rotation, i.e. with its notes, are
+        rotated. Other snapshots, such as ones taken by hand, are left alone
+        unless all_snapshots is set.
+
+        :param SnapshotPolicy policy: the retention policy
+        :param list volume_ids: only rotate these volumes. Defaults to all.
+        :param datetime now: the current UTC time
+        :param string notes: the notes of the rotation's snapshots
+        :param boolean all_snapshots: rotate every snapshot of the volumes
+        :returns: A list of operations, each a dictionary with the keys
+                  'action' ('create' or 'delete'), 'volume_id', 'volume'
+                  (the volume's name), 'snapshot_id', 'create_date' and
+                  'reason'. Creates come first.
+        """
+        now = now or datetime.datetime.utcnow()
+        creates = []
+        deletes = []
+        for volume in self.list_volume_snapshots(volume_ids):
+            snapshots = [snapshot for snapshot
+                         in volume.get('snapshots') or []
+                         if all_snapshots or snapshot.get('notes') == notes]
+            create, prune = policy.plan(snapshots, now)
+            if create:
+                creates.append({
+                    'action': 'create',
+                    'volume_id': volume['id'],
+                    'volume': volume.get('username'),
+                    'snapshot_id': None,
+                    'create_date': None,
+                    'reason': 'newest snapshot is %s hours old or more'
+                              % policy.interval,
+                })
+            for snapshot, reason in prune:
+                deletes.append({
+                    'action': 'delete',
+                    'volume_id': volume['id'],
+                    'volume': volume.get('username'),
+                    'snapshot_id': snapshot['id'],
+                    'create_date': snapshot.get('createDate'),
+                    'reason': reason,
+                })
+        return creates + deletes
+
+    def run_snapshot_plan(self, plan, notes=ROTATION_NOTES,
+                          max_workers=utils.DEFAULT_MAX_WORKERS, rate=None):
+        """Runs the operations of a snapshot rotation plan concurrently.
+
+        Snapshots are created first. A volume's old snapshots are only
+        deleted once its new snapshot was created.
+
+        :param list plan: operations from :func:`plan_snapshot_rotation`
+        :param string notes: notes for the created snapshots
+        :param int max_workers: the maximum number of concurrent API calls
+        :param float rate: the maximum number of API calls per second, or
+                           None for no limit
+        :returns: A generator of the operations in the order they finish,
+                  each with the keys 'success' and 'error' added
+        """
+        limiter = utils.RateLimiter(rate)
+
+        def _run(operation):
+            """Runs a single operation."""
+            limiter.wait()
+            if operation['action'] == 'create':
+                self.iscsi_svc.createSnapshot(notes,
+                                              id=operation['volume_id'])
+            else:
+                self.iscsi_svc.deleteObject(id=operation['snapshot_id'])
+
+        def _results(operations):
+            """Runs operations, yielding their results."""
+            for operation, _, error in utils.concurrent_imap(
+                    _run, operations, max_workers=max_workers):
+                yield dict(operation, success=error is None, error=error)
+
+        failed = set()
+        for result in _results([operation for operation in plan
+                                if operation['action'] == 'create']):
+            if not result['success']:
+                failed.add(result['volume_id'])
+            yield result
+
+        deletes = []
+        for operation in plan:
+            if operation['action'] != 'delete':
+                continue
+            if operation['volume_id'] in failed:
+                yield dict(operation, success=False,
+                           error='skipped, the new snapshot failed')
+            else:
+                deletes.append(operation)
+        for result in _results(deletes):
+            yield result
+
     def restore_from_snapshot(self, volume_id, snapshot_id):
         """Restore the volume to snapshot's contents.
 
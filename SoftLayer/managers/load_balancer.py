@@ -5,8 +5,19 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import time
+
+from SoftLayer import exceptions
+from SoftLayer.managers import locations
+from SoftLayer import masks
 from SoftLayer import utils
 
+# Only what's needed to tell when a service changes
+SERVICE_STATE_MASK = ('virtualServers[id,serviceGroups[id,services[id,'
+                      'enabled,status,port,ipAddress[ipAddress],'
+                      'groupReferences[weight],healthChecks[type[keyname]]'
+                      ']]]')
+
 
 class LoadBalancerManager(utils.IdentifierMixin, object):
     """Manages load balancers.
@@ -20,6 +31,7 @@ class LoadBalancerManager(utils.IdentifierMixin, object):
         self.prod_pkg = self.client['Product_Package']
         self.lb_svc = self.client['Network_Application_Delivery_Controller_'
                                   'LoadBalancer_VirtualIpAddress']
+        self.locations = locations.get_location_registry(client)
 
     def get_lb_pkgs(self):
         """Retrieves the local load balancer packages.
@@ -75,11 +87,10 @@ class LoadBalancerManager(utils.IdentifierMixin, object):
         :returns: the location id of the given datacenter
         """
 
-        dcenters = self.client['Location'].getDataCenters()
-        for dcenter in dcenters:
-            if dcenter['name'] == datacenter:
-                return dcenter['id']
-        return 'FIRST_AVAILABLE'
+        location_id = self.locations.get_id(datacenter)
+        if location_id is None:
+            return 'FIRST_AVAILABLE'
+        return location_id
 
     def cancel_lb(self, loadbal_id):
         """Cancels the specified load balancer.
@@ -127,14 +138,94 @@ class LoadBalancerManager(utils.IdentifierMixin, object):
         """
 
         if 'mask' not in kwargs:
-            kwargs['mask'] = ('loadBalancerHardware[datacenter], '
-                              'ipAddress, virtualServers[serviceGroups'
-                              '[routingMethod,routingType,services'
-                              '[healthChecks[type], groupReferences,'
-                              ' ipAddress]]]')
+            kwargs['mask'] = str(masks.ObjectMask(
+                'loadBalancerHardware[datacenter]',
+                'ipAddress',
+                'virtualServers[serviceGroups[routingMethod,routingType]]',
+                'virtualServers[serviceGroups[services[groupReferences,'
+                'ipAddress]]]',
+                'virtualServers[serviceGroups[services[healthChecks[type]]]]'
+            ))
 
         return self.lb_svc.getObject(id=loadbal_id, **kwargs)
 
+    def get_service_states(self, loadbal_id):
+        """Returns the state of every service of a load balancer.
+
+        :param int loadbal_id: The id of the load balancer
+        :returns: A dictionary of service id to a dictionary with the keys
+                  'service_id', 'group_id', 'ip_address', 'port', 'enabled',
+                  'status', 'weight' and 'health_check'
+        """
+        load_balancer = self.lb_svc.getObject(id=loadbal_id,
+                                              mask=SERVICE_STATE_MASK)
+        states = {}
+        for virtual_server in load_balancer.get('virtualServers', []):
+            for service_group in virtual_server.get('serviceGroups', []):
+                for service in service_group.get('services', []):
+                    states[service['id']] = {
+                        'service_id': service['id'],
+                        'group_id': virtual_server['id'],
+                        'ip_address': utils.lookup(service, 'ipAddress',
+                                                   'ipAddress'),
+                        'port': service.get('port'),
+                        'enabled': bool(service.get('enabled')),
+                        'status': service.get('status'),
+                        'weight': utils.lookup(
+                            (service.get('groupReferences') or [{}])[0],
+                            'weight'),
+                        'health_check': utils.lookup(
+                            (service.get('healthChecks') or [{}])[0],
+                            'type', 'keyname'),
+                    }
+        return states
+
+    def watch_services(self, loadbal_id, interval=5, max_interval=60,
+                       polls=None):
+        """Polls the services of a load balancer and yields their changes.
+
+        The first poll yields an 'initial' event per service. Later polls
+        only yield the services that were 'added', 'removed' or 'changed',
+        the last with a 'changes' dictionary of field to its old and new
+        value. A poll that fails yields an 'error' event and the watch
+        carries on. Every event has the keys 'time' and 'event', and all but
+        'error' events have the service state as 'service'.
+
+        The polls are interval seconds apart while services change. Polls
+        without changes, or that fail, space the next one out further, up to
+        max_interval seconds.
+
+        :param int loadbal_id: The id of the load balancer
+        :param float interval: the shortest time between polls, in seconds
+        :param float max_interval: the longest time between polls
+        :param int polls: stop after this many polls, or never if None
+        """
+        previous = None
+        delay = interval
+        count = 0
+        while True:
+            count += 1
+            now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            try:
+                current = self.get_service_states(loadbal_id)
+            except exceptions.SoftLayerAPIError as ex:
+                yield {'time': now, 'event': 'error', 'error': ex.faultString}
+                delay = min(delay * 2, max_interval)
+            else:
+                events = _diff_service_states(previous, current)
+                previous = current
+                if events:
+                    delay = interval
+                else:
+                    delay = min(delay * 1.5, max_interval)
+                for event in events:
+                    event['time'] = now
+                    yield event
+
+            if polls is not None and count >= polls:
+                return
+            time.sleep(delay)
+
     def delete_service(self, service_id):
         """Deletes a service from the loadbal_id.
 
@@ -229,26 +320,123 @@ class LoadBalancerManager(utils.IdentifierMixin, object):
         virtual_servers = load_balancer['virtualServers']
         for virtual_server in virtual_servers:
             if virtual_server['id'] == service_group_id:
-                service_template = {
-                    'enabled': int(enabled),
-                    'port': port,
-                    'ipAddressId': ip_address_id,
-                    'healthChecks': [
-                        {
-                            'healthCheckTypeId': hc_type
-                        }
-                    ],
-                    'groupReferences': [
-                        {
-                            'weight': weight
-                        }
-                    ]
-                }
                 services = virtual_server['serviceGroups'][0]['services']
-                services.append(service_template)
+                services.append(_service_template(ip_address_id, port,
+                                                  enabled, hc_type, weight))
 
         return self.lb_svc.editObject(load_balancer, id=loadbal_id)
 
+    def apply_service_changes(self, loadbal_id, changes, dry_run=False,
+                              max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Adds, edits, toggles and deletes many services at once.
+
+        The load balancer is fetched once, every add, edit and toggle is
+        applied to it in memory and the result is submitted with a single
+        editObject call. Services which are removed from the load balancer
+        aren't deleted by editObject, so deletes are made concurrently
+        afterwards. Each change is a dictionary with the keys:
+
+        - action: 'add', 'edit', 'toggle' or 'delete'
+        - group_id: the service group to add the service to (add only)
+        - service_id: the service to change (edit, toggle and delete)
+        - ip_address_id or ip_address: the IP of the service. IP addresses
+          are resolved concurrently.
+        - port, enabled, hc_type and weight: as in :func:`add_service`.
+          Services are added with the defaults of :func:`add_service`.
+
+        A change that can't be applied, e.g. because the service doesn't
+        exist, doesn't stop the others.
+
+        :param int loadbal_id: The id of the load balancer
+        :param list changes: the changes to make, in order
+        :param bool dry_run: only check the changes, don't submit them
+        :param int max_workers: the maximum number of concurrent calls
+        :returns: a list with a dictionary per change with the keys
+                  'change', 'success' and 'error'
+        """
+        results = [{'change': change, 'success': False, 'error': None}
+                   for change in changes]
+        self._resolve_ip_addresses(results, max_workers)
+
+        mask = ('virtualServers[serviceGroups[services[groupReferences,'
+                'healthChecks]]]')
+        load_balancer = self.lb_svc.getObject(id=loadbal_id, mask=mask)
+        groups = {}
+        services = {}
+        for virtual_server in load_balancer.get('virtualServers', []):
+            for service_group in virtual_server.get('serviceGroups', []):
+                groups.setdefault(virtual_server['id'], service_group)
+                for service in service_group.get('services', []):
+                    if 'id' in service:
+                        services[service['id']] = service
+
+        edits = []
+        deletes = []
+        for result in results:
+            if result['error'] is not None:
+                continue
+            try:
+                if result['change'].get('action') == 'delete':
+                    _lookup(services, 'service', result['change'])
+                    deletes.append(result)
+                else:
+                    _apply_service_change(groups, services, result['change'])
+                    edits.append(result)
+            except ValueError as ex:
+                result['error'] = str(ex)
+
+        if dry_run:
+            for result in edits + deletes:
+                result['success'] = True
+            return results
+
+        if edits:
+            try:
+                self.lb_svc.editObject(load_balancer, id=loadbal_id)
+            except exceptions.SoftLayerAPIError as ex:
+                for result in edits:
+                    result['error'] = ex.faultString
+            else:
+                for result in edits:
+                    result['success'] = True
+
+        svc = self.client['Network_Application_Delivery_Controller_'
+                          'LoadBalancer_Service']
+        deleted = utils.concurrent_map(
+            lambda result: svc.deleteObject(
+                id=result['change']['service_id']),
+            deletes, max_workers=max_workers)
+        for result, (_, error) in zip(deletes, deleted):
+            result['success'] = error is None
+            if error is not None:
+                result['error'] = getattr(error, 'faultString', str(error))
+        return results
+
+    def _resolve_ip_addresses(self, results, max_workers):
+        """Sets the ip_address_id of changes which give an ip_address.
+
+        Each address is looked up once, concurrently.
+        """
+        addresses = sorted(set(result['change']['ip_address']
+                               for result in results
+                               if result['change'].get('ip_address')))
+        if not addresses:
+            return
+
+        ip_service = self.client['Network_Subnet_IpAddress']
+        found = dict(zip(addresses, utils.concurrent_map(
+            ip_service.getByIpAddress, addresses, max_workers=max_workers)))
+        for result in results:
+            address = result['change'].get('ip_address')
+            if not address:
+                continue
+            record, error = found[address]
+            if error is not None or not record:
+                result['error'] = 'Unknown IP address %s' % address
+            else:
+                result['change'] = dict(result['change'],
+                                        ip_address_id=record['id'])
+
     def add_service_group(self, lb_id, allocation=100, port=80,
                           routing_type=2, routing_method=10):
         """Adds a new service group to the load balancer.
@@ -325,3 +513,90 @@ class LoadBalancerManager(utils.IdentifierMixin, object):
         svc = self.client['Network_Application_Delivery_Controller'
                           '_LoadBalancer_Service_Group']
         return svc.kickAllConnections(id=actual_id)
+
+
+def _service_template(ip_address_id, port=80, enabled=True, hc_type=21,
+                      weight=1):
+    """Returns the template of a new service."""
+    return {
+        'enabled': int(enabled),
+        'port': port,
+        'ipAddressId': ip_address_id,
+        'healthChecks': [
+            {
+                'healthCheckTypeId': hc_type
+            }
+        ],
+        'groupReferences': [
+            {
+                'weight': weight
+            }
+        ]
+    }
+
+
+def _lookup(objects, kind, change):
+    """Returns the service or service group a change refers to."""
+    object_id = change.get('%s_id' % kind)
+    if object_id is None:
+        raise ValueError('A %s id is required to %s a service'
+                         % (kind, change.get('action')))
+    if object_id not in objects:
+        raise ValueError('Unknown %s %s' % (kind, object_id))
+    return objects[object_id]
+
+
+def _apply_service_change(groups, services, change):
+    """Applies an add, edit or toggle to the load balancer tree."""
+    action = change.get('action')
+    if action == 'add':
+        if change.get('ip_address_id') is None:
+            raise ValueError('An IP address is required to add a service')
+        group = _lookup(groups, 'group', change)
+        options = dict((key, change[key])
+                       for key in ('port', 'enabled', 'hc_type', 'weight')
+                       if change.get(key) is not None)
+        group.setdefault('services', []).append(
+            _service_template(change['ip_address_id'], **options))
+    elif action == 'edit':
+        service = _lookup(services, 'service', change)
+        if change.get('enabled') is not None:
+            service['enabled'] = int(change['enabled'])
+        if change.get('port') is not None:
+            service['port'] = change['port']
+        if change.get('weight') is not None:
+            service['groupReferences'][0]['weight'] = change['weight']
+        if change.get('hc_type') is not None:
+            service['healthChecks'][0]['healthCheckTypeId'] = change['hc_type']
+        if change.get('ip_address_id') is not None:
+            service['ipAddressId'] = change['ip_address_id']
+    elif action == 'toggle':
+        service = _lookup(services, 'service', change)
+        service['enabled'] = int(not service.get('enabled'))
+    else:
+        raise ValueError('Unknown action %s' % action)
+
+
+def _diff_service_states(previous, current):
+    """Returns the events between two polls of the service states."""
+    if previous is None:
+        return [{'event': 'initial', 'service': current[service_id]}
+                for service_id in sorted(current)]
+
+    events = []
+    for service_id in sorted(set(previous) | set(current)):
+        if service_id not in previous:
+            events.append({'event': 'added', 'service': current[service_id]})
+        elif service_id not in current:
+            events.append({'event': 'removed',
+                           'service': previous[service_id]})
+        elif previous[service_id] != current[service_id]:
+            old, new = previous[service_id], current[service_id]
+            events.append({
+                'event': 'changed',
+                'service': new,
+                'changes': dict((key, {'old': old.get(key),
+                                       'new': new[key]})
+                                for key in new if old.get(key) != new[key]),
+            })
+    return events
@@ -0,0 +1,204 @@
+"""
+    SoftLayer.locations
+    ~~~~~~~~~~~~~~~~~~~
+    Datacenter lookups shared by the ordering managers
+
+    :license: MIT, see LICENSE for more details.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+LOGGER = logging.getLogger(__name__)
+
+DATACENTER_MASK = 'mask[id,name,longName]'
+# Datacenters are rarely added, so they're only fetched once a day
+LOCATION_CACHE_TTL = 86400
+
+_REGISTRIES = weakref.WeakKeyDictionary()
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def _keys(location):
+    """Returns the keys a location is indexed by."""
+    keys = [location.get('id')]
+    for field in ('name', 'longName'):
+        if location.get(field):
+            keys.append(location[field].lower())
+    return [key for key in keys if key is not None]
+
+
+def _key(location):
+    """Returns the index key for a location name or id."""
+    if isinstance(location, int):
+        return location
+    location = str(location).strip()
+    if location.isdigit():
+        return int(location)
+    return location.lower()
+
+
+class LocationRegistry(object):
+    """Datacenters indexed by short name, long name and id.
+
+    The datacenters are fetched once and kept for ttl seconds. When a path
+    is given they are also saved there, so other processes don't need to
+    fetch them again. Use :func:`get_location_registry` to share a registry
+    between the managers of a client.
+
+    ::
+
+        >>> registry = LocationRegistry(client)
+        >>> registry.get('dal05') == registry.get('Dallas 5')
+        True
+        >>> registry.get_id('DAL05')
+        138124
+
+    :param SoftLayer.API.Client client: an API client instance
+    :param string path: file to cache the datacenters in
+    :param int ttl: seconds before the datacenters are fetched again
+    """
+
+    def __init__(self, client, path=None, ttl=LOCATION_CACHE_TTL):
+        self.client = client
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._datacenters = None
+        self._index = {}
+        self._expires = 0
+        self._regions = {}
+
+    def datacenters(self):
+        """Returns every datacenter."""
+        self._load()
+        return list(self._datacenters)
+
+    def get(self, location):
+        """Returns a datacenter or None.
+
+        :param location: the short name (dal05), long name (Dallas 5) or id
+                         of a datacenter. Names are case insensitive.
+        """
+        self._load()
+        return self._index.get(_key(location))
+
+    def get_id(self, location):
+        """Returns the id of a datacenter or None.
+
+        :param location: the short name, long name or id of a datacenter
+        """
+        datacenter = self.get(location)
+        if datacenter is None:
+            return None
+        return datacenter['id']
+
+    def get_region_keyname(self, package, location):
+        """Returns the keyname of a package's region for a datacenter or None.
+
+        The regions are indexed once per package until the datacenters are
+        fetched again. Each region's location
+        must have been fetched, E.G.: with the mask
+        'regions[keyname,location[location]]'.
+
+        :param dict package: a product package with its regions
+        :param location: the short name, long name or id of a datacenter
+        """
+        with self._lock:
+            regions = self._regions.get(package.get('id'))
+            if regions is None:
+                regions = {}
+                for region in package.get('regions') or []:
+                    datacenter = region['location']['location']
+                    for key in _keys(datacenter):
+                        regions.setdefault(key, region['keyname'])
+                if package.get('id') is not None:
+                    self._regions[package['id']] = regions
+        keyname = regions.get(_key(location))
+        if keyname is None and not isinstance(_key(location), int):
+            # The region may only have been fetched with the short name
+            datacenter = self.get(location)
+            if datacenter is not None:
+                keyname = regions.get(_key(datacenter['name']))
+        return keyname
+
+    def invalidate(self):
+        """Forgets the datacenters, so they're fetched on the next lookup."""
+        with self._lock:
+            self._expires = 0
+            self._regions = {}
+
+    def _load(self):
+        """Fetches the datacenters if they haven't been or have expired."""
+        with self._lock:
+            if time.time() < self._expires:
+                return
+            saved_at, datacenters = self._read()
+            if datacenters is None:
+                datacenters = self.client['Location_Datacenter'].\
+                    getDatacenters(mask=DATACENTER_MASK)
+                saved_at = time.time()
+                self._save(saved_at, datacenters)
+
+            index = {}
+            for datacenter in datacenters:
+                for key in _keys(datacenter):
+                    index.setdefault(key, datacenter)
+            self._datacenters = datacenters
+            self._index = index
+            self._regions = {}
+            self._expires = saved_at + self.ttl
+
+    def _read(self):
+        """Returns the time the datacenters were saved and the datacenters.
+
+        Both are None if the file is missing, unreadable or expired.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return None, None
+        try:
+            with open(self.path) as cache_file:
+                saved = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            LOGGER.warning('Ignoring unreadable location cache %s', self.path)
+            return None, None
+        if saved.get('time', 0) + self.ttl <= time.time():
+            return None, None
+        return saved['time'], saved['datacenters']
+
+    def _save(self, saved_at, datacenters):
+        """Writes the datacenters to the file, atomically."""
+        if not self.path:
+            return
+        temp_path = '%s.%s.tmp' % (self.path, os.getpid())
+        try:
+            with open(temp_path, 'w') as cache_file:
+                json.dump({'time': saved_at, 'datacenters': datacenters},
+                          cache_file)
+            if os.name == 'nt' and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError):
+            LOGGER.warning('Unable to save location cache %s', self.path,
+                           exc_info=True)
+
+
+def get_location_registry(client, path=None):
+    """Returns the location registry shared by a client's managers.
+
+    The registry is created on the first call for a client, so only the
+    path given then is used.
+
+    :param SoftLayer.API.Client client: an API client instance
+    :param string path: file to cache the datacenters in
+    """
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(client)
+        if registry is None:
+            # The registry mustn't keep the client alive
+            registry = LocationRegistry(weakref.proxy(client), path=path)
+            _REGISTRIES[client] = registry
+        return registry
@@ -6,13 +6,30 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import logging
+import os
+import random
+import threading
+import time
 
+import requests.adapters
 import requests.auth
+import six
 
 from SoftLayer import consts
 from SoftLayer import exceptions
+from SoftLayer import utils
 # pylint: disable=no-self-use
 
+LOGGER = logging.getLogger(__name__)
+STAT_KEYS = ['popped', 'handled', 'failed', 'deleted', 'delete_failed']
+DEFAULT_TOKEN_TTL = 3600
+DEFAULT_TOKEN_RENEWAL = 300
+AUTH_RETRIES = 3
+AUTH_RETRY_DELAY = 0.5
+_TOKEN_CACHES = {}
+_TOKEN_CACHES_LOCK = threading.Lock()
+
 
 ENDPOINTS = {
     "dal05": {
@@ -22,6 +39,260 @@ ENDPOINTS = {
 }
 
 
+def pooled_session(pool_size=utils.DEFAULT_MAX_WORKERS):
+    """Returns a requests.Session which keeps connections open for reuse.
+
+    The session can be shared by threads. Up to pool_size connections per
+    host are kept alive, so size it to the number of threads using it.
+
+    :param int pool_size: the number of connections to keep per host
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1,
+                                            pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class TokenCache(object):
+    """Caches auth tokens for any number of threads, and optionally on disk.
+
+    Tokens are cached by a key such as (auth endpoint, username). When a
+    token is missing or expired only one thread fetches a new one; the
+    others wait for it instead of authenticating too. A token which is
+    about to expire is renewed in the background while it is still handed
+    out.
+
+    With a path, tokens are also saved to that file, readable only by the
+    user, so that other processes can reuse them until they expire.
+
+    :param string path: (optional) file to persist the tokens to
+    :param int ttl: seconds a token is used for after it is fetched
+    :param int renew_before: renew tokens this many seconds before they
+                             expire
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TOKEN_TTL,
+                 renew_before=DEFAULT_TOKEN_RENEWAL):
+        self.path = path
+        self.ttl = ttl
+        self.renew_before = renew_before
+        self._tokens = None
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._renewing = set()
+
+    def get(self, key, fetch):
+        """Returns a valid token for the key, fetching one if needed.
+
+        :param tuple key: what the token is for
+        :param fetch: function which returns a new token
+        """
+        token, expires = self._lookup(key)
+        now = time.time()
+        if token is not None and now < expires:
+            if now >= expires - self.renew_before:
+                self._renew(key, fetch, token)
+            return token
+        return self.refresh(key, fetch, stale=token)
+
+    def refresh(self, key, fetch, stale=None):
+        """Returns a new token for the key, unless stale was already replaced.
+
+        Only one thread fetches at a time for a key. Threads which were
+        waiting use the token it fetched.
+
+        :param tuple key: what the token is for
+        :param fetch: function which returns a new token
+        :param string stale: the token which is known to be bad or old
+        """
+        with self._key_lock(key):
+            self._load(reload_file=True)
+            token, expires = self._lookup(key)
+            if token is not None and token != stale and time.time() < expires:
+                return token
+            token = fetch()
+            self.set(key, token)
+            return token
+
+    def set(self, key, token):
+        """Caches a token for the key for ttl seconds."""
+        self._load()
+        with self._lock:
+            self._tokens[key] = (token, time.time() + self.ttl)
+            self._save()
+
+    def invalidate(self, key):
+        """Forgets the token for the key."""
+        self._load()
+        with self._lock:
+            if self._tokens.pop(key, None) is not None:
+                self._save()
+
+    def _lookup(self, key):
+        """Returns the (token, expiry time) for the key."""
+        self._load()
+        with self._lock:
+            return self._tokens.get(key, (None, 0))
+
+    def _key_lock(self, key):
+        """Returns the lock which makes refreshes of a key single-flight."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _renew(self, key, fetch, token):
+        """Refreshes a token which is about to expire in the background."""
+        with self._lock:
+            if key in self._renewing:
+                return
+            self._renewing.add(key)
+
+        def renew():
+            """Refreshes the token, keeping the current one on failure."""
+            try:
+                self.refresh(key, fetch, stale=token)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.warning('Unable to renew the auth token for %s', key,
+                               exc_info=True)
+            finally:
+                with self._lock:
+                    self._renewing.discard(key)
+
+        thread = threading.Thread(target=renew)
+        thread.daemon = True
+        thread.start()
+
+    def _load(self, reload_file=False):
+        """Reads the tokens saved by this and other processes.
+
+        Tokens read from the file replace the cached ones if they expire
+        later.
+        """
+        with self._lock:
+            if self._tokens is not None and not reload_file:
+                return
+            if self._tokens is None:
+                self._tokens = {}
+            for key, (token, expires) in self._read().items():
+                if expires > self._tokens.get(key, (None, 0))[1]:
+                    self._tokens[key] = (token, expires)
+
+    def _read(self):
+        """Returns the unexpired tokens in the file."""
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as token_file:
+                entries = json.load(token_file)
+        except (IOError, OSError, ValueError):
+            LOGGER.warning('Ignoring unreadable token cache %s', self.path)
+            return {}
+        now = time.time()
+        return dict((tuple(entry['key']), (entry['token'], entry['expires']))
+                    for entry in entries if entry['expires'] > now)
+
+    def _save(self):
+        """Writes the unexpired tokens to the file, atomically."""
+        if not self.path:
+            return
+        now = time.time()
+        entries = [{'key': list(key), 'token': token, 'expires': expires}
+                   for key, (token, expires) in self._tokens.items()
+                   if expires > now]
+        temp_path = '%s.%s.tmp' % (self.path, os.getpid())
+        try:
+            descriptor = os.open(temp_path,
+                                 os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, 'w') as token_file:
+                json.dump(entries, token_file)
+            if os.name == 'nt' and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError):
+            LOGGER.warning('Unable to save token cache %s', self.path,
+                           exc_info=True)
+
+
+class PushStats(object):
+    """Measures the throughput and latency of concurrent pushes.
+
+    ::
+
+        >>> stats = PushStats()
+        >>> for result in stats.track(conn.push_topic_messages(...)):
+        ...     if result['error']:
+        ...         print result['message'], result['error']
+        >>> stats.summary()
+        {'sent': 1000, 'failed': 0, 'seconds': 2.1, 'rate': 476.2, ...}
+    """
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+        self.failed = 0
+        self.latencies = []
+
+    def track(self, results):
+        """Adds every result of a push while passing it on."""
+        self.start = self.start or time.time()
+        for result in results:
+            self.add(result)
+            yield result
+        self.end = time.time()
+
+    def add(self, result):
+        """Adds the result of a push."""
+        if self.start is None:
+            self.start = time.time()
+        if result['error'] is not None:
+            self.failed += 1
+        else:
+            self.latencies.append(result['latency'])
+
+    def summary(self):
+        """Returns the stats so far.
+
+        :returns: a dictionary with the number of messages 'sent' and
+                  'failed', the elapsed 'seconds', the 'rate' of messages
+                  sent per second and 'latency', a dictionary of the 'min',
+                  'mean', 'p50', 'p95', 'p99' and 'max' seconds a successful
+                  push took
+        """
+        end = self.end or time.time()
+        seconds = end - self.start if self.start is not None else 0
+        latencies = sorted(self.latencies)
+        latency = {}
+        if latencies:
+            latency = {
+                'min': latencies[0],
+                'mean': sum(latencies) / len(latencies),
+                'max': latencies[-1],
+            }
+            for percentile in (50, 95, 99):
+                index = int(round(percentile / 100.0 * (len(latencies) - 1)))
+                latency['p%d' % percentile] = latencies[index]
+        return {
+            'sent': len(latencies),
+            'failed': self.failed,
+            'seconds': seconds,
+            'rate': len(latencies) / seconds if seconds else 0,
+            'latency': latency,
+        }
+
+
+def get_token_cache(path=None):
+    """Returns the token cache shared by everything using the same path.
+
+    :param string path: (optional) file to persist the tokens to. Tokens are
+                        only kept in memory by default.
+    """
+    with _TOKEN_CACHES_LOCK:
+        if path not in _TOKEN_CACHES:
+            _TOKEN_CACHES[path] = TokenCache(path)
+        return _TOKEN_CACHES[path]
+
+
 class QueueAuth(requests.auth.AuthBase):
     """Message Queue authentication for requests.
 
@@ -29,42 +300,86 @@ class QueueAuth(requests.auth.AuthBase):
     :param username: SoftLayer username
     :param api_key: SoftLayer API Key
     :param auth_token: (optional) Starting auth token
+    :param cache: (optional) :class:`TokenCache` to share tokens through.
+                  Without one, every instance authenticates on its own.
     """
-    def __init__(self, endpoint, username, api_key, auth_token=None):
+    def __init__(self, endpoint, username, api_key, auth_token=None,
+                 cache=None):
         self.endpoint = endpoint
         self.username = username
         self.api_key = api_key
         self.auth_token = auth_token
+        self.cache = cache
+        if cache is not None and auth_token:
+            cache.set(self.cache_key, auth_token)
+
+    @property
+    def cache_key(self):
+        """The key of this endpoint and user's token in the cache."""
+        return (self.endpoint, self.username)
 
     def auth(self):
-        """Authenticate."""
+        """Authenticate.
+
+        With a cache, a token another thread or process fetched in the
+        meantime is used instead of authenticating again.
+        """
+        if self.cache is None:
+            self.auth_token = self._request_token()
+        else:
+            self.auth_token = self.cache.refresh(self.cache_key,
+                                                 self._request_token,
+                                                 stale=self.auth_token)
+
+    def _request_token(self):
+        """Returns a new auth token."""
         headers = {
             'X-Auth-User': self.username,
             'X-Auth-Key': self.api_key
         }
         resp = requests.post(self.endpoint, headers=headers)
         if resp.ok:
-            self.auth_token = resp.headers['X-Auth-Token']
+            return resp.headers['X-Auth-Token']
         else:
             raise exceptions.Unauthenticated("Error while authenticating: %s"
                                              % resp.status_code)
 
-    def handle_error(self, resp, **_):
-        """Handle errors."""
+    def handle_error(self, resp, **kwargs):
+        """Handle errors.
+
+        Requests which fail with 503 are retried with an exponential
+        backoff, with up to half of each delay added at random so that
+        concurrent clients don't retry in step. Requests which fail with 401 are retried once with a new
+        token; concurrent failures with the same token share one refresh
+        when there is a cache.
+        """
         resp.request.deregister_hook('response', self.handle_error)
-        if resp.status_code == 503:
-            resp.connection.send(resp.request)
-        elif resp.status_code == 401:
-            self.auth()
-            resp.request.headers['X-Auth-Token'] = self.auth_token
-            resp.connection.send(resp.request)
+        for attempt in range(AUTH_RETRIES):
+            if resp.status_code == 503:
+                delay = AUTH_RETRY_DELAY * 2 ** attempt
+                time.sleep(delay + random.uniform(0, delay / 2))
+            elif resp.status_code == 401 and not attempt:
+                if self.cache is None:
+                    self.auth()
+                else:
+                    self.auth_token = self.cache.refresh(
+                        self.cache_key, self._request_token,
+                        stale=resp.request.headers.get('X-Auth-Token'))
+                resp.request.headers['X-Auth-Token'] = self.auth_token
+            else:
+                break
+            resp = resp.connection.send(resp.request, **kwargs)
+        return resp
 
     def __call__(self, resp):
         """Attach auth token to the request.
 
         Do authentication if an auth token isn't available
         """
-        if not self.auth_token:
+        if self.cache is not None:
+            self.auth_token = self.cache.get(self.cache_key,
+                                             self._request_token)
+        elif not self.auth_token:
             self.auth()
         resp.register_hook('response', self.handle_error)
         resp.headers['X-Auth-Token'] = self.auth_token
@@ -72,9 +387,16 @@ class QueueAuth(requests.auth.AuthBase):
 
 
 class MessagingManager(object):
-    """Manage SoftLayer Message Queue."""
-    def __init__(self, client):
+    """Manage SoftLayer Message Queue.
+
+    :param SoftLayer.API.Client client: the API client instance
+    :param token_cache: (optional) :class:`TokenCache` for the connections
+                        to share auth tokens through. Defaults to the cache
+                        shared in memory by the whole process.
+    """
+    def __init__(self, client, token_cache=None):
         self.client = client
+        self.token_cache = token_cache or get_token_cache()
 
     def list_accounts(self, **kwargs):
         """List message queue accounts.
@@ -113,12 +435,17 @@ class MessagingManager(object):
         """Get all known message queue endpoints."""
         return ENDPOINTS
 
-    def get_connection(self, account_id, datacenter=None, network=None):
+    def get_connection(self, account_id, datacenter=None, network=None,
+                       pool_size=None):
         """Get connection to Message Queue Service.
 
         :param account_id: Message Queue Account id
         :param datacenter: Datacenter code
         :param network: network ('public' or 'private')
+        :param int pool_size: (optional) reuse up to this many connections,
+                              e.g. the number of threads using the
+                              connection. Each request uses a new connection
+                              by default.
         """
         if any([not self.client.auth,
                 not getattr(self.client.auth, 'username', None),
@@ -128,8 +455,11 @@ class MessagingManager(object):
 
         client = MessagingConnection(
             account_id, endpoint=self.get_endpoint(datacenter, network))
+        if pool_size:
+            client.session = pooled_session(pool_size)
         client.authenticate(self.client.auth.username,
-                            self.client.auth.api_key)
+                            self.client.auth.api_key,
+                            cache=self.token_cache)
         return client
 
     def ping(self, datacenter=None, network=None):
@@ -145,10 +475,13 @@ class MessagingConnection(object):
 
     :param account_id: Message Queue Account id
     :param endpoint: Endpoint URL
+    :param session: (optional) requests.Session to make requests with, e.g.
+                    from :func:`pooled_session`
     """
-    def __init__(self, account_id, endpoint=None):
+    def __init__(self, account_id, endpoint=None, session=None):
         self.account_id = account_id
         self.endpoint = endpoint
+        self.session = session
         self.auth = None
 
     def _make_request(self, method, path, **kwargs):
@@ -167,21 +500,25 @@ class MessagingConnection(object):
         kwargs['auth'] = self.auth
 
         url = '/'.join((self.endpoint, 'v1', self.account_id, path))
-        resp = requests.request(method, url, **kwargs)
+        if self.session is None:
+            resp = requests.request(method, url, **kwargs)
+        else:
+            resp = self.session.request(method, url, **kwargs)
         resp.raise_for_status()
         return resp
 
-    def authenticate(self, username, api_key, auth_token=None):
+    def authenticate(self, username, api_key, auth_token=None, cache=None):
         """Authenticate this connection using the given credentials.
 
         :param username: SoftLayer username
         :param api_key: SoftLayer API Key
         :param auth_token: (optional) Starting auth token
+        :param cache: (optional) :class:`TokenCache` to reuse tokens from
         """
         auth_endpoint = '/'.join((self.endpoint, 'v1',
                                   self.account_id, 'auth'))
         auth = QueueAuth(auth_endpoint, username, api_key,
-                         auth_token=auth_token)
+                         auth_token=auth_token, cache=cache)
         auth.auth()
         self.auth = auth
 
@@ -260,6 +597,28 @@ class MessagingConnection(object):
                                   data=json.dumps(message))
         return resp.json()
 
+    def push_queue_messages(self, queue_name, messages,
+                            max_workers=utils.DEFAULT_MAX_WORKERS,
+                            window=None):
+        """Pushes many messages to a queue concurrently.
+
+        Messages are read lazily and pushed by max_workers threads with at
+        most window messages in flight, so a stream of any length can be
+        pushed. Use a connection with a pooled session so the pushes reuse
+        connections. A failed push doesn't stop the others.
+
+        :param queue_name: Queue Name
+        :param messages: an iterable of message bodies, or of dictionaries
+                         with a 'body' and other message options
+        :param int max_workers: the maximum number of concurrent pushes
+        :param int window: the maximum number of messages in flight
+        :returns: a generator of dictionaries with the keys 'message', 'id',
+                  'error' and 'latency', the seconds the push took, in the
+                  order the pushes complete
+        """
+        return self._push_messages(self.push_queue_message, queue_name,
+                                   messages, max_workers, window)
+
     def pop_messages(self, queue_name, count=1):
         """Pop messages from a queue.
 
@@ -293,6 +652,24 @@ class MessagingConnection(object):
                            % (queue_name, message_id))
         return True
 
+    def delete_messages(self, queue_name, message_ids,
+                        max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Delete many messages concurrently.
+
+        A failed delete doesn't stop the others.
+
+        :param queue_name: Queue Name
+        :param list message_ids: Message ids
+        :param int max_workers: the maximum number of concurrent deletes
+        :returns: a list of dictionaries with the keys 'id' and 'error', in
+                  the order of message_ids
+        """
+        results = utils.concurrent_map(
+            lambda message_id: self.delete_message(queue_name, message_id),
+            message_ids, max_workers=max_workers)
+        return [{'id': message_id, 'error': error}
+                for message_id, (_, error) in zip(message_ids, results)]
+
     # TOPIC METHODS
 
     def get_topics(self, tags=None):
@@ -358,6 +735,45 @@ class MessagingConnection(object):
                                   data=json.dumps(message))
         return resp.json()
 
+    def push_topic_messages(self, topic_name, messages,
+                            max_workers=utils.DEFAULT_MAX_WORKERS,
+                            window=None):
+        """Pushes many messages to a topic concurrently.
+
+        See :func:`push_queue_messages`. Pass the results through a
+        :class:`PushStats` to measure throughput and latency.
+
+        :param topic_name: Topic Name
+        :param messages: an iterable of message bodies, or of dictionaries
+                         with a 'body' and other message options
+        :param int max_workers: the maximum number of concurrent pushes
+        :param int window: the maximum number of messages in flight
+        """
+        return self._push_messages(self.push_topic_message, topic_name,
+                                   messages, max_workers, window)
+
+    def _push_messages(self, push_message, name, messages, max_workers,
+                       window):
+        """Pushes messages concurrently with push_message."""
+        def push(message):
+            """Pushes one message and times it."""
+            start = time.time()
+            if isinstance(message, dict):
+                options = dict(message)
+                result = push_message(name, options.pop('body', None),
+                                      **options)
+            else:
+                result = push_message(name, message)
+            return result, time.time() - start
+
+        for message, result, error in utils.concurrent_imap(
+                push, messages, max_workers=max_workers, window=window):
+            pushed, latency = result or (None, None)
+            yield {'message': message,
+                   'id': pushed['id'] if pushed else None,
+                   'error': error,
+                   'latency': latency}
+
     def get_subscriptions(self, topic_name):
         """Listing of subscriptions on a topic.
 
@@ -389,3 +805,172 @@ class MessagingConnection(object):
         self._make_request('delete', 'topics/%s/subscriptions/%s' %
                            (topic_name, subscription_id))
         return True
+
+
+class QueueConsumer(object):
+    """Consumes the messages of a queue with a pool of handler threads.
+
+    Messages are popped in batches and queued for the handlers, so the next
+    batch is fetched while the previous one is being handled. Messages
+    whose handler returns anything but False are acknowledged: they are
+    deleted from the queue in batches by a background thread. Messages
+    whose handler raises an exception or returns False are left on the
+    queue to become visible again after their visibility interval.
+
+    ::
+
+        >>> def handler(message):
+        ...     print message['body']
+        >>> consumer = QueueConsumer(connection, 'queue', handler)
+        >>> stats = consumer.run()
+
+    :param connection: a :class:`MessagingConnection`, ideally with a pooled
+                       session
+    :param queue_name: Queue Name
+    :param handler: function called with each message
+    :param int batch_size: the number of messages to pop at a time
+    :param int max_workers: the number of handler threads
+    :param int prefetch: the number of batches to hold ahead of the
+                         handlers
+    :param int delete_workers: the number of concurrent deletes. Defaults
+                               to max_workers.
+    :param int delete_batch_size: acknowledged messages are deleted when this
+                                  many are waiting...
+    :param float flush_interval: ...or when the oldest has waited this many
+                                 seconds
+    :param float poll_interval: seconds to wait before popping again when
+                                the queue is empty, when not stopping once
+                                it is empty
+    """
+
+    def __init__(self, connection, queue_name, handler, batch_size=100,
+                 max_workers=utils.DEFAULT_MAX_WORKERS, prefetch=2,
+                 delete_workers=None, delete_batch_size=100,
+                 flush_interval=1.0, poll_interval=1.0):
+        self.connection = connection
+        self.queue_name = queue_name
+        self.handler = handler
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.prefetch = prefetch
+        self.delete_workers = delete_workers or max_workers
+        self.delete_batch_size = delete_batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.stats = {}
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Stops popping messages. Popped messages are still handled."""
+        self._stopped.set()
+
+    def run(self, max_messages=None, until_empty=True):
+        """Consumes messages until stopped.
+
+        :param int max_messages: stop after popping this many messages
+        :param bool until_empty: stop when the queue is empty, otherwise
+                                 keep polling until :meth:`stop` is called
+        :returns: a dictionary of counts with the keys 'popped', 'handled',
+                  'failed', 'deleted' and 'delete_failed'
+        """
+        self._stopped.clear()
+        self.stats = dict((key, 0) for key in STAT_KEYS)
+        stop = object()
+        work = six.moves.queue.Queue(self.batch_size * max(self.prefetch, 1))
+        acks = six.moves.queue.Queue()
+
+        handlers = [threading.Thread(target=self._handle,
+                                     args=(work, acks, stop))
+                    for _ in range(max(self.max_workers, 1))]
+        deleter = threading.Thread(target=self._delete, args=(acks, stop))
+        for thread in handlers + [deleter]:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            self._fetch(work, max_messages, until_empty)
+        finally:
+            for _ in handlers:
+                work.put(stop)
+            for thread in handlers:
+                thread.join()
+            acks.put(stop)
+            deleter.join()
+        return self.stats
+
+    def _count(self, key, amount=1):
+        """Adds to one of the stats."""
+        with self._lock:
+            self.stats[key] += amount
+
+    def _fetch(self, work, max_messages, until_empty):
+        """Pops batches of messages and queues them for the handlers."""
+        popped = 0
+        while not self._stopped.is_set():
+            count = self.batch_size
+            if max_messages is not None:
+                count = min(count, max_messages - popped)
+                if count <= 0:
+                    return
+            messages = self.connection.pop_messages(self.queue_name,
+                                                    count=count)['items']
+            if not messages:
+                if until_empty:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+
+            popped += len(messages)
+            self._count('popped', len(messages))
+            for message in messages:
+                work.put(message)
+
+    def _handle(self, work, acks, stop):
+        """Hands queued messages to the handler."""
+        while True:
+            message = work.get()
+            if message is stop:
+                return
+            try:
+                acknowledged = self.handler(message) is not False
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception('Error handling message %s', message['id'])
+                self._count('failed')
+                continue
+            self._count('handled')
+            if acknowledged:
+                acks.put(message['id'])
+
+    def _delete(self, acks, stop):
+        """Deletes acknowledged messages in batches."""
+        batch = []
+        deadline = None
+        while True:
+            timeout = None
+            if batch:
+                timeout = max(deadline - time.time(), 0)
+            try:
+                message_id = acks.get(timeout=timeout)
+            except six.moves.queue.Empty:
+                message_id = None
+
+            if message_id is not None and message_id is not stop:
+                if not batch:
+                    deadline = time.time() + self.flush_interval
+                batch.append(message_id)
+            if batch and (message_id is None or message_id is stop or
+                          len(batch) >= self.delete_batch_size):
+                self._delete_batch(batch)
+                batch = []
+            if message_id is stop:
+                return
+
+    def _delete_batch(self, message_ids):
+        """Deletes a batch of messages concurrently."""
+        results = self.connection.delete_messages(
+            self.queue_name, message_ids, max_workers=self.delete_workers)
+        failed = len([result for result in results
+                      if result['error'] is not None])
+        self._count('deleted', len(message_ids) - failed)
+        self._count('delete_failed', failed)
@@ -21,6 +21,86 @@ DEFAULT_VLAN_MASK = ','.join(['firewallInterfaces',
                               'subnets',
                               'totalPrimaryIpAddressCount',
                               'virtualGuests'])
+SUMMARY_VLAN_MASK = ','.join(['id',
+                              'primaryRouter.datacenter.name',
+                              'hardware.id',
+                              'networkComponents.id',
+                              'subnets.id',
+                              'totalPrimaryIpAddressCount',
+                              'virtualGuests.id'])
+SUMMARY_COUNT_MASK = ','.join(['id',
+                               'primaryRouter.datacenter.name',
+                               'hardwareCount',
+                               'networkComponentCount',
+                               'subnetCount',
+                               'totalPrimaryIpAddressCount',
+                               'virtualGuestCount'])
+SUMMARY_PAGE_SIZE = 100
+
+
+def summarize_vlans(vlans, use_counts=False):
+    """Aggregates VLANs into per-datacenter counts in a single pass.
+
+    Hardware, network components and virtual guests attached to more than
+    one VLAN are only counted once, in the datacenter of the first VLAN they
+    are seen on.
+
+    :param vlans: an iterable of VLAN dictionaries
+    :param bool use_counts: read the hardwareCount, networkComponentCount,
+                            subnetCount and virtualGuestCount relational
+                            counts instead of the nested objects. Devices
+                            attached to several VLANs are then counted once
+                            per VLAN.
+    :returns: A dictionary keyed by data center with a dictionary of counts
+    """
+    datacenters = {}
+    seen_hardware = set()
+    seen_network = set()
+    seen_guests = set()
+
+    def _count_unique(items, seen):
+        """Counts the items whose id has not been seen yet."""
+        count = 0
+        for item in items:
+            if item['id'] not in seen:
+                seen.add(item['id'])
+                count += 1
+        return count
+
+    for vlan in vlans:
+        name = utils.lookup(vlan, 'primaryRouter', 'datacenter', 'name')
+        summary = datacenters.get(name)
+        if summary is None:
+            summary = datacenters[name] = {
+                'hardwareCount': 0,
+                'networkingCount': 0,
+                'primaryIpCount': 0,
+                'subnetCount': 0,
+                'virtualGuestCount': 0,
+                'vlanCount': 0,
+            }
+
+        summary['vlanCount'] += 1
+        summary['primaryIpCount'] += vlan.get('totalPrimaryIpAddressCount',
+                                              0)
+
+        if use_counts:
+            summary['hardwareCount'] += int(vlan.get('hardwareCount', 0))
+            summary['networkingCount'] += int(
+                vlan.get('networkComponentCount', 0))
+            summary['virtualGuestCount'] += int(
+                vlan.get('virtualGuestCount', 0))
+            summary['subnetCount'] += int(vlan.get('subnetCount', 0))
+        else:
+            summary['hardwareCount'] += _count_unique(
+                vlan.get('hardware', []), seen_hardware)
+            summary['networkingCount'] += _count_unique(
+                vlan.get('networkComponents', []), seen_network)
+            summary['virtualGuestCount'] += _count_unique(
+                vlan.get('virtualGuests', []), seen_guests)
+            summary['subnetCount'] += len(vlan.get('subnets', []))
+
+    return datacenters
 
 
 class NetworkManager(object):
@@ -321,57 +401,35 @@ class NetworkManager(object):
         """Resolve VLAN ids."""
         return utils.resolve_ids(identifier, [self._list_vlans_by_name])
 
-    def summary_by_datacenter(self):
+    def summary_by_datacenter(self, use_counts=False,
+                              chunk=SUMMARY_PAGE_SIZE):
         """Summary of the networks on the account, grouped by data center.
 
         The resultant dictionary is primarily useful for statistical purposes.
         It contains count information rather than raw data. If you want raw
         information, see the :func:`list_vlans` method instead.
 
+        VLANs are fetched page by page with a mask that only asks for ids,
+        and aggregated as they arrive. See :func:`summarize_vlans`.
+
+        :param bool use_counts: ask the API for relational counts instead of
+                                the attached objects. This is much cheaper on
+                                large accounts but counts devices attached to
+                                several VLANs more than once.
+        :param int chunk: number of VLANs to fetch per API call
         :returns: A dictionary keyed by data center with the data containing a
                   set of counts for subnets, hardware, virtual servers, and
                   other objects residing within that data center.
 
         """
-        datacenters = {}
-        unique_vms = []
-        unique_servers = []
-        unique_network = []
-
-        for vlan in self.list_vlans():
-            name = utils.lookup(vlan, 'primaryRouter', 'datacenter', 'name')
-            if name not in datacenters:
-                datacenters[name] = {
-                    'hardwareCount': 0,
-                    'networkingCount': 0,
-                    'primaryIpCount': 0,
-                    'subnetCount': 0,
-                    'virtualGuestCount': 0,
-                    'vlanCount': 0,
-                }
-
-            datacenters[name]['vlanCount'] += 1
-
-            for hardware in vlan['hardware']:
-                if hardware['id'] not in unique_servers:
-                    datacenters[name]['hardwareCount'] += 1
-                    unique_servers.append(hardware['id'])
-
-            for net in vlan['networkComponents']:
-                if net['id'] not in unique_network:
-                    datacenters[name]['networkingCount'] += 1
-                    unique_network.append(net['id'])
-
-            for virtual_guest in vlan['virtualGuests']:
-                if virtual_guest['id'] not in unique_vms:
-                    datacenters[name]['virtualGuestCount'] += 1
-                    unique_vms.append(virtual_guest['id'])
-
-            datacenters[name]['primaryIpCount'] += (
-                vlan['totalPrimaryIpAddressCount'])
-            datacenters[name]['subnetCount'] += len(vlan['subnets'])
-
-        return datacenters
+        mask = SUMMARY_VLAN_MASK
+        if use_counts:
+            mask = SUMMARY_COUNT_MASK
+
+        vlans = self.account.getNetworkVlans(mask="mask[%s]" % mask,
+                                             iter=True,
+                                             chunk=chunk)
+        return summarize_vlans(vlans, use_counts=use_counts)
 
     def unassign_global_ip(self, global_ip_id):
         """Unassigns a global IP address from a target.
@@ -0,0 +1,174 @@
+"""
+    SoftLayer.power
+    ~~~~~~~~~~~~~~~
+    Power actions for many virtual servers or hardware servers at once
+
+    :license: MIT, see LICENSE for more details.
+"""
+import time
+
+from SoftLayer.managers import hardware
+from SoftLayer.managers import vs
+from SoftLayer import utils
+
+# The API method behind each power action, per host type. Hardware can
+# only be powered off hard, so it has no 'off-soft'.
+POWER_METHODS = {
+    'vs': {
+        'on': 'powerOn',
+        'off': 'powerOffSoft',
+        'off-soft': 'powerOffSoft',
+        'off-hard': 'powerOff',
+        'reboot': 'rebootDefault',
+        'reboot-soft': 'rebootSoft',
+        'reboot-hard': 'rebootHard',
+    },
+    'hardware': {
+        'on': 'powerOn',
+        'off': 'powerOff',
+        'off-hard': 'powerOff',
+        'cycle': 'powerCycle',
+        'reboot': 'rebootDefault',
+        'reboot-soft': 'rebootSoft',
+        'reboot-hard': 'rebootHard',
+    },
+}
+SERVICES = {'vs': 'Virtual_Guest', 'hardware': 'Hardware_Server'}
+
+
+def parse_batch_size(value, total):
+    """Returns the number of hosts per batch.
+
+    ::
+
+        >>> parse_batch_size('10%', 300)
+        30
+        >>> parse_batch_size('25', 300)
+        25
+
+    :param string value: a number of hosts, or a percentage of the total.
+                         Empty means every host at once.
+    :param int total: the number of hosts
+    """
+    if not value:
+        return max(total, 1)
+    value = str(value).strip()
+    if value.endswith('%'):
+        percent = float(value[:-1])
+        if not 0 < percent <= 100:
+            raise ValueError('batch percentage must be between 0 and 100')
+        # Round up, so there's always at least one host per batch
+        return max(int(-(-total * percent // 100)), 1)
+    size = int(value)
+    if size < 1:
+        raise ValueError('batch size must be at least 1')
+    return size
+
+
+class PowerManager(object):
+    """Runs power actions on many virtual servers or hardware servers.
+
+    Hosts are powered concurrently and under a rate limit, optionally in
+    batches so that a rolling restart only takes part of a fleet down at a
+    time.
+
+    ::
+
+        >>> mgr = PowerManager(client)
+        >>> ids = mgr.find_hosts('vs', tags=['web'], datacenter='dal05')
+        >>> for result in mgr.power('vs', ids, 'reboot', batch_size=10):
+        ...     print(result['id'], result['success'])
+
+    :param SoftLayer.API.Client client: an API client instance
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.managers = {
+            'vs': vs.VSManager(client),
+            'hardware': hardware.HardwareManager(client),
+        }
+
+    def resolve_ids(self, host_type, identifier):
+        """Returns the ids of the hosts of a type matching an identifier.
+
+        :param string host_type: 'vs' or 'hardware'
+        :param string identifier: an id, hostname or IP address
+        """
+        return self.managers[host_type].resolve_ids(identifier)
+
+    def find_hosts(self, host_type, tags=None, datacenter=None):
+        """Returns the ids of the hosts of a type with tags or a datacenter.
+
+        :param string host_type: 'vs' or 'hardware'
+        :param list tags: only hosts with one of these tags
+        :param string datacenter: only hosts in this datacenter, e.g. dal05
+        """
+        if host_type == 'vs':
+            hosts = self.managers['vs'].list_instances(
+                tags=tags, datacenter=datacenter, mask='mask[id]')
+        else:
+            hosts = self.managers['hardware'].list_hardware(
+                tags=tags, datacenter=datacenter, mask='mask[id]')
+        return sorted(host['id'] for host in hosts)
+
+    def power(self, host_type, host_ids, action,
+              max_workers=utils.DEFAULT_MAX_WORKERS, rate=None,
+              batch_size=None, batch_wait=0, stop_on_failure=True):
+        """Runs a power action on many hosts.
+
+        The hosts of each batch are powered concurrently, and the next batch
+        starts batch_wait seconds after the last host of a batch finished.
+
+        :param string host_type: 'vs' or 'hardware'
+        :param list host_ids: the ids of the hosts
+        :param string action: one of the actions of :data:`POWER_METHODS`
+                              for the host type, e.g. 'reboot'
+        :param int max_workers: the maximum number of concurrent API calls
+        :param float rate: the maximum number of API calls per second, or
+                           None for no limit
+        :param int batch_size: the number of hosts per batch, or None for
+                               every host at once
+        :param float batch_wait: seconds to wait between batches
+        :param boolean stop_on_failure: skip the remaining batches once a
+                                        host failed
+        :returns: A generator of dictionaries in the order the hosts finish,
+                  with the keys 'id', 'batch' (counting from 1), 'success'
+                  and 'error'. Hosts of skipped batches aren't included.
+        """
+        methods = POWER_METHODS.get(host_type)
+        if methods is None:
+            raise ValueError('unknown host type %r' % host_type)
+        if action not in methods:
+            raise ValueError('%s is not a power action for %s, use one of: %s'
+                             % (action, host_type,
+                                ', '.join(sorted(methods))))
+
+        service = self.client[SERVICES[host_type]]
+        method = methods[action]
+        limiter = utils.RateLimiter(rate)
+
+        def _power(host_id):
+            """Runs the power action on a single host."""
+            limiter.wait()
+            return service.call(method, id=host_id)
+
+        host_ids = list(host_ids)
+        size = batch_size or max(len(host_ids), 1)
+        batches = [host_ids[start:start + size]
+                   for start in range(0, len(host_ids), size)]
+        for number, batch in enumerate(batches, 1):
+            if number > 1 and batch_wait:
+                time.sleep(batch_wait)
+
+            failed = False
+            for host_id, _, error in utils.concurrent_imap(
+                    _power, batch, max_workers=max_workers):
+                failed = failed or error is not None
+                yield {'id': host_id,
+                       'batch': number,
+                       'success': error is None,
+                       'error': error}
+
+            if failed and stop_on_failure:
+                return
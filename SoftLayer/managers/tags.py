@@ -0,0 +1,111 @@
+"""
+    SoftLayer.tags
+    ~~~~~~~~~~~~~~
+    Tag Manager/helpers
+
+    :license: MIT, see LICENSE for more details.
+"""
+import logging
+
+from SoftLayer import utils
+
+LOGGER = logging.getLogger(__name__)
+
+
+def normalize_tags(tags):
+    """Returns a canonical comma separated tag string.
+
+    Whitespace around each tag is stripped, empty tags are dropped and
+    duplicate tags are removed while keeping their original order.
+
+    :param string tags: tags as a comma separated list
+    """
+    seen = set()
+    names = []
+    for name in tags.split(','):
+        name = name.strip()
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+    return ','.join(names)
+
+
+def group_by_tags(tags_by_id):
+    """Groups resource ids which share the same tag string.
+
+    :param dict tags_by_id: mapping of resource id to a tag string. Resources
+                            with a tag string of None are skipped.
+    :returns: A dictionary of normalized tag string to a list of ids
+    """
+    groups = {}
+    for resource_id, tags in tags_by_id.items():
+        if tags is None:
+            continue
+        groups.setdefault(normalize_tags(tags), []).append(resource_id)
+    return groups
+
+
+class TagManager(object):
+    """Manages tags on SoftLayer resources.
+
+    :param SoftLayer.API.Client client: an API client instance
+    :param int max_workers: the maximum number of concurrent setTags calls
+    """
+
+    def __init__(self, client, max_workers=utils.DEFAULT_MAX_WORKERS):
+        self.client = client
+        self.max_workers = max_workers
+
+    def set_tags(self, service, tags_by_id):
+        """Sets tags on many resources of the same service concurrently.
+
+        The API only tags one resource per call so the calls are spread over
+        a bounded pool of threads. A failure to tag one resource does not
+        stop the others from being tagged.
+
+        :param string service: the service owning the resources.
+                               E.G. Virtual_Guest
+        :param dict tags_by_id: mapping of resource id to a comma separated
+                                tag string. Use the empty string to remove
+                                all tags from a resource.
+        :returns: A list of dictionaries, one per resource, with the keys
+                  'id', 'tags', 'success' and 'error'
+
+        ::
+
+           # Tag two virtual servers as 'web' and a third one as 'db'.
+           import SoftLayer
+           client = SoftLayer.create_client_from_env()
+
+           mgr = SoftLayer.TagManager(client)
+           results = mgr.set_tags('Virtual_Guest',
+                                  {12345: 'web', 12346: 'web', 12347: 'db'})
+           for result in results:
+               if not result['success']:
+                   print result['id'], result['error']
+
+        """
+        work = []
+        for tags, resource_ids in sorted(group_by_tags(tags_by_id).items()):
+            work.extend((resource_id, tags) for resource_id in resource_ids)
+
+        def _set_tags(item):
+            """Tags a single resource."""
+            resource_id, tags = item
+            return self.client.call(service, 'setTags', tags, id=resource_id)
+
+        results = []
+        responses = utils.concurrent_map(_set_tags, work,
+                                         max_workers=self.max_workers)
+        for (resource_id, tags), (_, error) in zip(work, responses):
+            if error is not None:
+                LOGGER.warning('Unable to tag %s %s with "%s": %s',
+                               service, resource_id, tags, error)
+            results.append({
+                'id': resource_id,
+                'tags': tags,
+                'success': error is None,
+                'error': error,
+            })
+
+        return results
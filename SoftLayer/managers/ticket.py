@@ -5,9 +5,101 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import json
+import sqlite3
 
 from SoftLayer import utils
 
+# Only what's needed to list tickets and tell when their updates changed
+SYNC_MASK = ('id,title,assignedUser[firstName,lastName],createDate,'
+             'lastEditDate,accountId,status,updateCount')
+UPDATE_MASK = 'entry,editor,createDate'
+
+
+class TicketStore(object):
+    """A local SQLite copy of the account's tickets.
+
+    Filled by :func:`TicketManager.sync_tickets` and read without any API
+    calls, e.g. by dashboards.
+
+    ::
+
+        >>> store = TicketStore('tickets.db')
+        >>> TicketManager(client).sync_tickets(store)
+        {'changed': 12, 'updated': 3, 'failed': 0, ...}
+        >>> store.list_tickets(closed_status=False)
+        [{'id': 1234, 'title': ..., 'status': {'name': 'Open'}, ...}, ...]
+
+    :param string path: the database file, or ':memory:'
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS tickets ('
+                              'id INTEGER PRIMARY KEY, '
+                              'closed INTEGER NOT NULL, '
+                              'ticket TEXT NOT NULL)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS sync ('
+                              'key TEXT PRIMARY KEY, '
+                              'value TEXT)')
+
+    def close(self):
+        """Closes the database."""
+        self.conn.close()
+
+    @property
+    def high_water(self):
+        """The newest 'lastEditDate' synced, or None."""
+        row = self.conn.execute("SELECT value FROM sync "
+                                "WHERE key = 'high_water'").fetchone()
+        return row[0] if row else None
+
+    def get_ticket(self, ticket_id):
+        """Returns a ticket with its updates, or None."""
+        row = self.conn.execute('SELECT ticket FROM tickets WHERE id = ?',
+                                (int(ticket_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_tickets(self, open_status=True, closed_status=True):
+        """Returns tickets without their updates, ordered by id.
+
+        :param boolean open_status: include open tickets
+        :param boolean closed_status: include closed tickets
+        """
+        query = 'SELECT ticket FROM tickets'
+        if not all([open_status, closed_status]):
+            query += ' WHERE closed = %d' % (0 if open_status else 1)
+        tickets = []
+        for row in self.conn.execute(query + ' ORDER BY id'):
+            ticket = json.loads(row[0])
+            ticket.pop('updates', None)
+            tickets.append(ticket)
+        return tickets
+
+    def save(self, tickets, high_water=None):
+        """Saves tickets and moves the high-water mark in one transaction.
+
+        :param list tickets: tickets, each with its 'updates'
+        :param string high_water: the newest 'lastEditDate' which is now
+                                  fully synced
+        """
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO tickets (id, closed, ticket) '
+                'VALUES (?, ?, ?)',
+                [(ticket['id'], int(_is_closed(ticket)), json.dumps(ticket))
+                 for ticket in tickets])
+            if high_water is not None:
+                self.conn.execute('INSERT OR REPLACE INTO sync (key, value) '
+                                  "VALUES ('high_water', ?)", (high_water,))
+
+
+def _is_closed(ticket):
+    """Returns whether a ticket is closed."""
+    return utils.lookup(ticket, 'status', 'name') == 'Closed'
+
 
 class TicketManager(utils.IdentifierMixin, object):
     """Manages support Tickets.
@@ -38,6 +130,74 @@ class TicketManager(utils.IdentifierMixin, object):
 
         return self.client.call('Account', call, mask=mask)
 
+    def sync_tickets(self, store, max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Brings a ticket store up to date.
+
+        Only tickets edited since the store's high-water mark are fetched,
+        with a minimal mask; the tickets edited in the same second as the
+        mark are fetched again, in case one was edited after the last sync.
+        The updates of the tickets with new updates are then fetched
+        concurrently. If fetching any updates fails, the high-water mark
+        stays put so that the next sync tries again.
+
+        :param TicketStore store: the store to update
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: A dictionary with the number of tickets 'changed' since the
+                  last sync, the number whose updates were fetched
+                  ('updated') or couldn't be ('failed'), and the new
+                  'high_water' mark
+        """
+        kwargs = {'mask': 'mask[%s]' % SYNC_MASK}
+        if store.high_water:
+            kwargs['filter'] = {'tickets': {
+                'lastEditDate': utils.query_filter_after(store.high_water)}}
+        changed = self.account.getTickets(**kwargs)
+
+        saved_tickets = []
+        stale = []
+        unchanged = 0
+        for ticket in changed:
+            ticket = dict(ticket)
+            saved = store.get_ticket(ticket['id']) or {}
+            if 'updates' in saved and all(saved.get(key) == value
+                                          for key, value in ticket.items()):
+                unchanged += 1
+                continue
+            if (saved.get('updateCount') == ticket.get('updateCount') and
+                    'updates' in saved):
+                ticket['updates'] = saved['updates']
+                saved_tickets.append(ticket)
+            else:
+                stale.append(ticket)
+
+        def _get_updates(ticket):
+            """Fetches the updates of a ticket."""
+            return self.ticket.getUpdates(id=ticket['id'],
+                                          mask='mask[%s]' % UPDATE_MASK)
+
+        failed = 0
+        results = utils.concurrent_map(_get_updates, stale,
+                                       max_workers=max_workers)
+        for ticket, (updates, error) in zip(stale, results):
+            if error is not None:
+                failed += 1
+                continue
+            ticket['updates'] = updates
+            saved_tickets.append(ticket)
+
+        high_water = store.high_water
+        if not failed:
+            high_water = max([ticket['lastEditDate'] for ticket in changed
+                              if ticket.get('lastEditDate')] +
+                             [high_water or ''])
+        store.save(saved_tickets, high_water=high_water or None)
+        return {
+            'changed': len(changed) - unchanged,
+            'updated': len(stale) - failed,
+            'failed': failed,
+            'high_water': high_water or None,
+        }
+
     def list_subjects(self):
         """List all tickets."""
         return self.client['Ticket_Subject'].getAllObjects()
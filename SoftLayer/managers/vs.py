@@ -10,7 +10,11 @@ import itertools
 import socket
 import time
 
+from SoftLayer import exceptions
+from SoftLayer.managers import image
+from SoftLayer import masks
 from SoftLayer.managers import ordering
+from SoftLayer.managers import tags as tagging
 from SoftLayer import utils
 # pylint: disable=no-self-use
 
@@ -34,6 +38,7 @@ class VSManager(utils.IdentifierMixin, object):
             self.ordering_manager = ordering.OrderingManager(client)
         else:
             self.ordering_manager = ordering_manager
+        self.tag_manager = tagging.TagManager(client)
 
     def list_instances(self, hourly=True, monthly=True, tags=None, cpus=None,
                        memory=None, hostname=None, domain=None,
@@ -88,7 +93,7 @@ class VSManager(utils.IdentifierMixin, object):
                 'activeTransaction.transactionStatus[friendlyName,name]',
                 'status',
             ]
-            kwargs['mask'] = "mask[%s]" % ','.join(items)
+            kwargs['mask'] = str(masks.ObjectMask(*items))
 
         call = 'getVirtualGuests'
         if not all([hourly, monthly]):
@@ -206,6 +211,54 @@ class VSManager(utils.IdentifierMixin, object):
 
         return self.guest.getObject(id=instance_id, **kwargs)
 
+    def get_instance_details(self, instance_ids,
+                             max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Get details about many virtual server instances concurrently.
+
+        Every call needed is planned up front, so the instances and their
+        PTR records are all fetched at the same time rather than one after
+        the other. A failure to fetch one instance does not stop the others.
+
+        :param list instance_ids: the instance IDs
+        :param int max_workers: the maximum number of concurrent API calls
+        :returns: A list of dictionaries, one per instance in the same order,
+                  with the keys 'id', 'instance' (see :meth:`get_instance`),
+                  'ptr_records' and 'error'
+        """
+        instance_ids = list(instance_ids)
+        calls = [(instance_id, call) for instance_id in instance_ids
+                 for call in ('instance', 'ptr')]
+
+        def _call(call):
+            """Makes one of the planned calls."""
+            instance_id, kind = call
+            if kind == 'instance':
+                return self.get_instance(instance_id)
+            return self.guest.getReverseDomainRecords(id=instance_id)
+
+        responses = dict(zip(calls, utils.concurrent_map(
+            _call, calls, max_workers=max_workers)))
+        details = []
+        for instance_id in instance_ids:
+            instance, error = responses[(instance_id, 'instance')]
+            ptr_domains, ptr_error = responses[(instance_id, 'ptr')]
+            ptr_records = []
+            # The PTR records of private only hosts are dropped. An API
+            # error fetching them means there are none, but any other
+            # failure is reported.
+            if error is None and not instance.get('privateNetworkOnlyFlag'):
+                if ptr_error is None:
+                    ptr_records = [ptr['data'] for ptr_domain in ptr_domains
+                                   for ptr in ptr_domain['resourceRecords']]
+                elif not isinstance(ptr_error,
+                                    exceptions.SoftLayerAPIError):
+                    error = ptr_error
+            details.append({'id': instance_id,
+                            'instance': instance,
+                            'ptr_records': ptr_records,
+                            'error': error})
+        return details
+
     def get_create_options(self):
         """Retrieves the available options for creating a VS.
 
@@ -470,19 +523,39 @@ class VSManager(utils.IdentifierMixin, object):
         """Creates multiple virtual server instances.
 
         This takes a list of dictionaries using the same arguments as
-        create_instance().
+        create_instance(). Tags are applied concurrently once the instances
+        have been created. A failure to tag an instance doesn't stop the
+        others from being tagged, but once all of them have been tried a
+        SoftLayerAPIError naming each instance which failed is raised.
         """
         tags = [conf.pop('tags', None) for conf in config_list]
 
         resp = self.guest.createObjects([self._generate_create_dict(**kwargs)
                                          for kwargs in config_list])
 
-        for instance, tag in zip(resp, tags):
-            if tag is not None:
-                self.guest.setTags(tag, id=instance['id'])
+        results = self.tag_instances(dict((instance['id'], tag)
+                                          for instance, tag in zip(resp, tags)
+                                          if tag is not None))
+        failures = [result for result in results if not result['success']]
+        if failures:
+            raise exceptions.SoftLayerAPIError(
+                getattr(failures[0]['error'], 'faultCode', None),
+                'Unable to tag instances: %s' % ', '.join(
+                    '%s (%s)' % (result['id'], result['error'])
+                    for result in failures))
 
         return resp
 
+    def tag_instances(self, tags_by_id):
+        """Sets tags on many virtual servers concurrently.
+
+        :param dict tags_by_id: mapping of instance id to a comma separated
+                                tag string
+        :returns: A list of dictionaries, one per instance, with the keys
+                  'id', 'tags', 'success' and 'error'
+        """
+        return self.tag_manager.set_tags('Virtual_Guest', tags_by_id)
+
     def change_port_speed(self, instance_id, public, speed):
         """Allows you to change the port speed of a virtual server's NICs.
 
@@ -588,8 +661,10 @@ class VSManager(utils.IdentifierMixin, object):
         disks = [block_device for block_device in vsi['blockDevices']
                  if disk_filter(block_device)]
 
-        return self.guest.createArchiveTransaction(
+        result = self.guest.createArchiveTransaction(
             name, disks, notes, id=instance_id)
+        image.get_image_index(self.client).invalidate('private')
+        return result
 
     def upgrade(self, instance_id, cpus=None, memory=None,
                 nic_speed=None, public=True):
@@ -0,0 +1,384 @@
+"""
+    SoftLayer.masks
+    ~~~~~~~~~~~~~~~
+    Object mask parsing, merging and rendering
+
+    Object masks are usually written by hand, so the same mask can be spelled
+    many ways: properties can be repeated or listed in any order.
+    :class:`ObjectMask` parses a mask into a tree of properties so masks can
+    be merged and compared, and renders it back in one canonical spelling.
+
+    A relational property named without sub-properties ('datacenter') selects
+    all of its local properties, and so does a property walked through with a
+    dot ('datacenter.regions'), since what follows the dot may be a relational
+    property. Sub-properties listed in brackets ('datacenter[name]') select
+    only those. Merging never narrows a property: merging 'datacenter[name]'
+    with 'datacenter.regions' keeps all of datacenter's local properties, and
+    gives 'datacenter.name,datacenter.regions'.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import re
+
+from SoftLayer import utils
+
+PROPERTY_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+TYPE_RE = re.compile(r'SoftLayer_[A-Za-z0-9_]+')
+# Marks a property that was also selected as a whole
+_ALL = '*'
+
+
+class ObjectMask(object):
+    """A parsed object mask.
+
+    Any number of mask strings or :class:`ObjectMask` objects can be given.
+    They are merged into one mask.
+
+    ::
+
+        >>> mask = ObjectMask('id,datacenter[name]', 'datacenter[id],id')
+        >>> str(mask)
+        'mask[datacenter[id,name],id]'
+        >>> mask == parse('mask[id,datacenter[name,id]]')
+        True
+
+    :param masks: mask strings, with or without the 'mask[...]' wrapper, or
+                  ObjectMask instances
+    """
+
+    def __init__(self, *masks):
+        self.properties = {}
+        self.types = {}
+        for mask in masks:
+            self.merge(mask)
+
+    def add(self, path):
+        """Adds a dotted property path, e.g. 'datacenter.name'.
+
+        :returns: the ObjectMask, so calls can be chained
+        """
+        tree = properties = {}
+        for name in path.split('.'):
+            found = PROPERTY_RE.match(name)
+            if not found or found.end() != len(name):
+                raise ValueError('Invalid property %r in %r' % (name, path))
+            if properties is not tree:
+                properties[_ALL] = {}
+            properties = properties.setdefault(name, {})
+        _merge_properties(self.properties, tree)
+        return self
+
+    def merge(self, other):
+        """Merges another mask into this one.
+
+        :param other: a mask string or ObjectMask
+        :returns: the ObjectMask, so calls can be chained
+        """
+        if not isinstance(other, ObjectMask):
+            other = parse(other)
+        _merge_properties(self.properties, other.properties)
+        for type_name, properties in other.types.items():
+            _merge_properties(self.types.setdefault(type_name, {}),
+                              properties)
+        return self
+
+    def paths(self, type_name=None):
+        """Returns the sorted dotted paths of every leaf property.
+
+        :param string type_name: return the paths for a type cast, e.g.
+                                 'SoftLayer_Hardware_Server', instead of the
+                                 untyped properties
+        """
+        if type_name is None:
+            properties = self.properties
+        else:
+            properties = self.types.get(type_name, {})
+        return sorted(_paths(properties, ()))
+
+    def issuperset(self, other):
+        """Returns True when this mask selects everything other selects.
+
+        A request using this mask can then answer a request using the other
+        one.
+
+        :param other: a mask string or ObjectMask
+        """
+        if not isinstance(other, ObjectMask):
+            other = parse(other)
+        if not _covers(self.properties, other.properties):
+            return False
+        for type_name, properties in other.types.items():
+            if not _covers(self.types.get(type_name, {}), properties):
+                return False
+        return True
+
+    def render(self):
+        """Returns the canonical mask string.
+
+        Properties are sorted and duplicates removed. A property keeping all
+        of its local properties is written with a dot for each of its
+        sub-properties, and one selecting only some with brackets.
+        """
+        if not self.types:
+            return 'mask[%s]' % _render(self.properties)
+
+        masks = []
+        if self.properties:
+            masks.append('mask[%s]' % _render(self.properties))
+        for type_name in sorted(self.types):
+            masks.append('mask(%s)[%s]' % (type_name,
+                                           _render(self.types[type_name])))
+        return '[%s]' % ','.join(masks)
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return '<ObjectMask %s>' % self.render()
+
+    def __eq__(self, other):
+        if isinstance(other, utils.string_types):
+            other = parse(other)
+        if not isinstance(other, ObjectMask):
+            return NotImplemented
+        return self.render() == other.render()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(self.render())
+
+
+def parse(mask):
+    """Parses a mask string into an :class:`ObjectMask`.
+
+    Accepts a list of properties ('id,datacenter.name'), a mask
+    ('mask[id,datacenter[name]]'), a type cast mask
+    ('mask(SoftLayer_Hardware_Server)[id]') and a list of masks
+    ('[mask[id],mask(SoftLayer_Hardware_Server)[bareMetalInstanceFlag]]').
+
+    Old style masks ('mask.datacenter.name') are not supported.
+
+    :param mask: the mask string. ObjectMask instances are copied.
+    :raises ValueError: if the mask is not valid
+    """
+    if isinstance(mask, ObjectMask):
+        return ObjectMask().merge(mask)
+    return _Parser(mask).parse()
+
+
+def merge(*masks):
+    """Returns a new :class:`ObjectMask` combining every mask given.
+
+    ::
+
+        >>> str(merge('id,hostname', 'mask[id,datacenter[name]]'))
+        'mask[datacenter[name],hostname,id]'
+        >>> str(merge('datacenter[name]', 'datacenter.regions'))
+        'mask[datacenter.name,datacenter.regions]'
+
+    """
+    return ObjectMask(*masks)
+
+
+def canonical(mask):
+    """Returns the canonical spelling of a mask string.
+
+    Two masks selecting the same properties always give the same string,
+    which makes it a stable key for caching responses.
+    """
+    return parse(mask).render()
+
+
+def _is_whole(node):
+    """Returns True if a property node selects all local properties."""
+    return not node or _ALL in node
+
+
+def _nested(node):
+    """Returns the children of a node which have children of their own."""
+    return dict((name, children) for name, children in node.items()
+                if children and name != _ALL)
+
+
+def _merge_properties(target, source):
+    """Recursively merges the property tree source into target."""
+    for name, children in source.items():
+        if name not in target:
+            target[name] = {}
+            _merge_properties(target[name], children)
+            continue
+
+        node = target[name]
+        whole = _is_whole(node) or _is_whole(children)
+        _merge_properties(node, children)
+        if whole and node:
+            node[_ALL] = {}
+
+
+def _paths(properties, prefix):
+    """Yields the dotted paths of the leaves of a property tree."""
+    for name, children in properties.items():
+        if name == _ALL:
+            continue
+        path = prefix + (name,)
+        if _is_whole(children):
+            yield '.'.join(path)
+        for child_path in _paths(children, path):
+            yield child_path
+
+
+def _covers(properties, other):
+    """Returns True when the property tree other is contained in properties.
+    """
+    for name, children in other.items():
+        if name == _ALL:
+            continue
+        if name not in properties:
+            return False
+        node = properties[name]
+        if _is_whole(node):
+            children = _nested(children)
+        elif _is_whole(children):
+            return False
+        if not _covers(node, children):
+            return False
+    return True
+
+
+def _render(properties):
+    """Renders a property tree without the mask[...] wrapper."""
+    return ','.join(_render_items(properties))
+
+
+def _render_items(properties):
+    """Returns the rendered properties of a property tree."""
+    items = []
+    for name in sorted(properties):
+        if name == _ALL:
+            continue
+        children = properties[name]
+        if not [child for child in children if child != _ALL]:
+            items.append(name)
+        elif _ALL in children:
+            # Brackets would drop the local properties, dots keep them
+            items.extend('%s.%s' % (name, item)
+                         for item in _render_items(children))
+        else:
+            items.append('%s[%s]' % (name, _render(children)))
+    return items
+
+
+class _Parser(object):
+    """A recursive descent parser for object masks."""
+
+    def __init__(self, text):
+        if not isinstance(text, utils.string_types):
+            raise ValueError('Invalid object mask: %r' % (text,))
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        """Returns a ValueError pointing at the current position."""
+        return ValueError('%s at position %d in object mask %r'
+                          % (message, self.pos, self.text))
+
+    def skip_space(self):
+        """Moves past whitespace."""
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def peek(self):
+        """Returns the next non-whitespace character or '' at the end."""
+        self.skip_space()
+        return self.text[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """Consumes char or raises a ValueError."""
+        if self.peek() != char:
+            raise self.error('Expected %r' % char)
+        self.pos += 1
+
+    def match(self, pattern, what):
+        """Consumes and returns text matching pattern."""
+        self.skip_space()
+        found = pattern.match(self.text, self.pos)
+        if not found:
+            raise self.error('Expected %s' % what)
+        self.pos = found.end()
+        return found.group()
+
+    def at_mask(self):
+        """Returns True if the next token starts a mask[...] or mask(...)."""
+        self.skip_space()
+        if not self.text.startswith('mask', self.pos):
+            return False
+        rest = self.text[self.pos + 4:].lstrip()
+        if rest.startswith('.'):
+            raise self.error('Old style object masks are not supported')
+        return rest[:1] in ('[', '(')
+
+    def parse(self):
+        """Parses the whole mask."""
+        mask = ObjectMask()
+        if self.peek() == '[':
+            self.pos += 1
+            self.parse_mask(mask)
+            while self.peek() == ',':
+                self.pos += 1
+                self.parse_mask(mask)
+            self.expect(']')
+        elif self.at_mask():
+            self.parse_mask(mask)
+            while self.peek() == ',':
+                self.pos += 1
+                self.parse_mask(mask)
+        else:
+            self.parse_properties(mask.properties)
+
+        if self.peek():
+            raise self.error('Unexpected %r' % self.peek())
+        return mask
+
+    def parse_mask(self, mask):
+        """Parses mask[...] or mask(Type)[...] into mask."""
+        if not self.at_mask():
+            raise self.error('Expected mask[')
+        self.pos += 4
+        properties = mask.properties
+        if self.peek() == '(':
+            self.pos += 1
+            type_name = self.match(TYPE_RE, 'a SoftLayer type')
+            self.expect(')')
+            properties = mask.types.setdefault(type_name, {})
+        self.expect('[')
+        self.parse_properties(properties)
+        self.expect(']')
+
+    def parse_properties(self, properties):
+        """Parses a comma separated list of properties."""
+        if self.peek() in ('', ']'):
+            return
+        self.parse_property(properties)
+        while self.peek() == ',':
+            self.pos += 1
+            self.parse_property(properties)
+
+    def parse_property(self, properties):
+        """Parses a dotted property path with an optional [...] suffix."""
+        tree = node = {}
+        node = node.setdefault(self.match(PROPERTY_RE, 'a property'), {})
+        while self.peek() == '.':
+            self.pos += 1
+            # A property walked through keeps all of its local properties
+            node[_ALL] = {}
+            node = node.setdefault(self.match(PROPERTY_RE, 'a property'), {})
+        if self.peek() == '[':
+            self.pos += 1
+            self.parse_properties(node)
+            self.expect(']')
+        _merge_properties(properties, tree)
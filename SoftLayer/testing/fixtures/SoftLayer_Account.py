@@ -492,3 +492,36 @@ getLatestBillDate = '2014-05-01T14:03:04-07:00'
 getBalance = 40
 
 getNextInvoiceTotalAmount = 2
+
+getIscsiNetworkStorage = [{
+    'id': 100,
+    'username': 'username',
+    'nasType': 'ISCSI',
+    'serviceResource': {'datacenter': {'name': 'dal05'}},
+    'snapshots': [
+        {'id': 101, 'createDate': '2014-03-21T01:00:00-05:00',
+         'notes': 'Rotated snapshot'},
+        {'id': 102, 'createDate': '2014-03-20T01:00:00-05:00',
+         'notes': 'Rotated snapshot'},
+        {'id': 103, 'createDate': '2014-03-19T01:00:00-05:00',
+         'notes': 'Rotated snapshot'},
+        {'id': 104, 'createDate': '2014-03-12T01:00:00-05:00',
+         'notes': 'Rotated snapshot'},
+        {'id': 105, 'createDate': '2014-03-01T01:00:00-05:00',
+         'notes': 'Rotated snapshot'},
+        {'id': 106, 'createDate': '2014-02-01T01:00:00-05:00',
+         'notes': 'before upgrade'},
+    ],
+}, {
+    'id': 200,
+    'username': 'username2',
+    'nasType': 'ISCSI',
+    'serviceResource': {'datacenter': {'name': 'sjc01'}},
+    'snapshots': [],
+}, {
+    'id': 101,
+    'username': 'username_snap1',
+    'nasType': 'ISCSI_SNAPSHOT',
+    'serviceResource': {'datacenter': {'name': 'dal05'}},
+    'snapshots': [],
+}]
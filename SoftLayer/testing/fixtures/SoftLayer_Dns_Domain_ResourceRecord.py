@@ -1,3 +1,6 @@
 createObject = {'name': 'example.com'}
 deleteObject = True
 editObject = True
+createObjects = [{'id': 1001, 'host': 'a'}, {'id': 1002, 'host': 'b'}]
+editObjects = True
+deleteObjects = True
@@ -1,4 +1,13 @@
 getDatacenters = [{
     'id': 0,
-    'name': 'dal05'
+    'name': 'dal05',
+    'longName': 'Dallas 5',
+}, {
+    'id': 358694,
+    'name': 'lon02',
+    'longName': 'London 2',
+}, {
+    'id': 168642,
+    'name': 'sjc01',
+    'longName': 'San Jose 1',
 }]
@@ -33,3 +33,4 @@ createStandardTicket = {
 }
 edit = True
 addUpdate = {}
+getUpdates = getObject['updates']
@@ -236,3 +236,9 @@ reloadOperatingSystem = 'OK'
 setTags = True
 createArchiveTransaction = {}
 executeRescueLayer = True
+powerOn = True
+powerOff = True
+powerOffSoft = True
+rebootDefault = True
+rebootSoft = True
+rebootHard = True
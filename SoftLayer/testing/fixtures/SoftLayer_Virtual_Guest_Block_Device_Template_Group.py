@@ -21,9 +21,10 @@ getPublicImages = IMAGES
 deleteObject = {}
 editObject = True
 setTags = True
-createFromExternalSource = [{
+createFromExternalSource = {
     'createDate': '2013-12-05T21:53:03-06:00',
     'globalIdentifier': '0B5DEAF4-643D-46CA-A695-CECBE8832C9D',
     'id': 100,
     'name': 'test_image',
-}]
+}
+addLocations = True
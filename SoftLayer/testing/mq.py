@@ -0,0 +1,237 @@
+"""
+    SoftLayer.testing.mq
+    ~~~~~~~~~~~~~~~~~~~~
+    A local, in-memory Message Queue HTTP server for tests and benchmarks
+
+    :license: MIT, see LICENSE for more details.
+"""
+import collections
+import itertools
+import json
+import re
+import threading
+import time
+import uuid
+
+import six
+
+PATH_RE = re.compile(r'^/v1/(?P<account>[^/]+)/(?P<kind>queues|topics)/'
+                     r'(?P<name>[^/]+)(?:/(?P<rest>messages|subscriptions)'
+                     r'(?:/(?P<id>[^/]+))?)?$')
+
+
+class FakeMessageQueueServer(object):
+    """Serves the parts of the Message Queue API used by MessagingConnection.
+
+    Queues and topics are created on first use. Popped messages stay hidden
+    until they are deleted, as if their visibility interval never ran out.
+    Every request is recorded in :attr:`requests` as a (method, path) tuple.
+
+    ::
+
+        with FakeMessageQueueServer() as server:
+            conn = MessagingConnection('test', endpoint=server.endpoint)
+            conn.authenticate('username', 'api_key')
+
+    :param string account_id: the message queue account id
+    :param float latency: seconds to wait before answering each request
+    :param string api_key: the API key which authenticates
+    """
+
+    def __init__(self, account_id='test', latency=0, api_key='api_key'):
+        self.account_id = account_id
+        self.latency = latency
+        self.api_key = api_key
+        self.tokens = set()
+        self.queues = {}
+        self.topics = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.endpoint = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def start(self):
+        """Starts serving on a free local port."""
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.fake = self
+        self.endpoint = 'http://127.0.0.1:%d' % self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops serving."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def add_messages(self, queue_name, bodies):
+        """Adds messages to a queue and returns their ids."""
+        with self.lock:
+            return [self._push(self.queues, queue_name, body)['id']
+                    for body in bodies]
+
+    def messages(self, queue_name):
+        """Returns the messages of a queue which haven't been deleted."""
+        with self.lock:
+            if queue_name not in self.queues:
+                return []
+            return [_public(message) for message
+                    in self.queues[queue_name].in_order()]
+
+    def count(self, method, pattern=''):
+        """Returns how many requests were made with a method and path."""
+        with self.lock:
+            return len([path for request_method, path in self.requests
+                        if request_method == method and pattern in path])
+
+    def handle(self, method, path, headers, body):
+        """Returns the status, headers and content of a response."""
+        if self.latency:
+            time.sleep(self.latency)
+        path, _, query = path.partition('?')
+        params = dict(six.moves.urllib.parse.parse_qsl(query))
+        with self.lock:
+            self.requests.append((method, path))
+
+            if path == '/v1/ping':
+                return 200, {}, {}
+            if path == '/v1/%s/auth' % self.account_id and method == 'POST':
+                if headers.get('X-Auth-Key') != self.api_key:
+                    return 401, {}, {'message': 'Unauthorized'}
+                token = uuid.uuid4().hex
+                self.tokens.add(token)
+                return 200, {'X-Auth-Token': token}, {}
+            if headers.get('X-Auth-Token') not in self.tokens:
+                return 401, {}, {'message': 'Unauthorized'}
+
+            match = PATH_RE.match(path)
+            if not match or match.group('account') != self.account_id:
+                return 404, {}, {'message': 'Not found'}
+            return self._route(method, match.groupdict(), params, body)
+
+    def _route(self, method, parts, params, body):
+        """Handles an authenticated queue or topic request."""
+        objects = self.queues if parts['kind'] == 'queues' else self.topics
+        name = parts['name']
+
+        if parts['rest'] is None:
+            if method == 'PUT':
+                objects.setdefault(name, _Queue())
+            if method in ('GET', 'PUT'):
+                queue = objects.get(name, _Queue())
+                return 200, {}, {
+                    'name': name,
+                    'message_count': len(queue.messages),
+                    'visible_message_count': len(queue.visible),
+                    'tags': [],
+                    'expiration': 604800,
+                    'visibility_interval': 30,
+                }
+            if method == 'DELETE':
+                objects.pop(name, None)
+                return 200, {}, {'message': 'Object queued for deletion'}
+        elif parts['rest'] == 'messages' and parts['id'] is None:
+            if method == 'POST':
+                message = json.loads(body)
+                return 201, {}, dict(self._push(objects, name, message),
+                                     message='Object created')
+            if method == 'GET':
+                queue = objects.get(name, _Queue())
+                batch = int(params.get('batch', 1))
+                items = []
+                while queue.visible and len(items) < batch:
+                    items.append(_public(
+                        queue.messages[queue.visible.popleft()]))
+                return 200, {}, {'item_count': len(items), 'items': items}
+        elif parts['rest'] == 'messages' and method == 'DELETE':
+            queue = objects.get(name, _Queue())
+            if queue.messages.pop(parts['id'], None) is None:
+                return 404, {}, {'message': 'Not found'}
+            if parts['id'] in queue.visible:
+                queue.visible.remove(parts['id'])
+            return 202, {}, {'message': 'Object queued for deletion'}
+        return 405, {}, {'message': 'Method not allowed'}
+
+    @staticmethod
+    def _push(objects, name, message):
+        """Adds a message to a queue or topic."""
+        if not isinstance(message, dict):
+            message = {'body': message}
+        message = {
+            'id': uuid.uuid4().hex,
+            'body': message.get('body'),
+            'fields': message.get('fields', {}),
+            'initial_entry_time': time.time(),
+            'visibility_delay': message.get('visibility_delay', 0),
+            'visibility_interval': message.get('visibility_interval', 30),
+        }
+        queue = objects.setdefault(name, _Queue())
+        queue.messages[message['id']] = dict(message,
+                                             _order=next(queue.counter))
+        queue.visible.append(message['id'])
+        return message
+
+
+class _Queue(object):
+    """The messages of a queue or topic."""
+
+    def __init__(self):
+        self.messages = {}
+        # Ids of the messages which haven't been popped, oldest first
+        self.visible = collections.deque()
+        self.counter = itertools.count()
+
+    def in_order(self):
+        """Returns the messages, oldest first."""
+        return sorted(self.messages.values(),
+                      key=lambda message: message['_order'])
+
+
+def _public(message):
+    """Returns a message without the server's bookkeeping."""
+    return dict((key, value) for key, value in message.items()
+                if key != '_order')
+
+
+class _ThreadingHTTPServer(six.moves.socketserver.ThreadingMixIn,
+                           six.moves.BaseHTTPServer.HTTPServer):
+    """HTTP server with a thread per connection."""
+    daemon_threads = True
+
+
+class _Handler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
+    """Hands requests to the FakeMessageQueueServer."""
+    # Keep connections alive so pooled sessions can reuse them, and don't
+    # hold back the body of a response until its headers are acknowledged
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        """Reads the request and writes the response."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        status, headers, content = self.server.fake.handle(
+            self.command, self.path, self.headers, body)
+        data = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_PUT = do_POST = do_DELETE = _respond
+
+    def log_message(self, *_):
+        """Keeps the test output quiet."""
@@ -255,6 +255,21 @@ class ResolveIdTests(testing.TestCase):
         self.assertRaises(
             exceptions.CLIAbort, helpers.resolve_id, resolver, 'test')
 
+    def test_resolve_ids(self):
+        ids = {'a': [1], 'b': [2], 'c': [1]}
+        resolver = lambda r: ids[r]
+        self.assertEqual(helpers.resolve_ids(resolver, ['b', 'a', 'c']),
+                         [2, 1])
+
+    def test_resolve_ids_reports_all_errors(self):
+        ids = {'a': [1], 'b': [], 'c': [1, 2]}
+        resolver = lambda r: ids[r]
+        e = self.assertRaises(exceptions.CLIAbort, helpers.resolve_ids,
+                              resolver, ['a', 'b', 'c'], 'VS')
+        self.assertEqual(e.message,
+                         "Error: Unable to find VS 'b'\n"
+                         "Error: Multiple VS found for 'c': 1, 2")
+
 
 class TestFormatOutput(testing.TestCase):
 
@@ -310,6 +325,21 @@ class TestFormatOutput(testing.TestCase):
         ret = formatting.format_output(item, 'table')
         self.assertEqual(os.linesep.join(item), ret)
 
+    def test_format_many_json(self):
+        tables = []
+        for name in ['a', 'b']:
+            table = formatting.KeyValueTable(['key', 'value'])
+            table.add_row(['name', name])
+            tables.append(table)
+
+        ret = formatting.format_many(tables, 'json')
+        self.assertEqual(json.loads(ret), [{'name': 'a'}, {'name': 'b'}])
+
+    def test_format_many_table(self):
+        item = ['this', 'is', 'a', 'list']
+        ret = formatting.format_many(item, 'table')
+        self.assertEqual(os.linesep.join(item), ret)
+
     def test_format_output_table(self):
         t = formatting.Table(['nothing'])
         t.align['nothing'] = 'c'
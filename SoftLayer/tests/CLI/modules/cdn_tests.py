@@ -4,6 +4,11 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import os
+import tempfile
+
+import SoftLayer
+from SoftLayer.CLI import exceptions
 from SoftLayer import testing
 
 import json
@@ -53,6 +58,50 @@ class CdnTests(testing.TestCase):
         self.assertEqual(result.exit_code, 0)
         self.assertEqual(result.output, "")
 
+    def test_purge_content_file(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as url_file:
+            url_file.write('http://example.com/a\n\n# comment\n'
+                           'http://example.com/b\nhttp://example.com/a\n'
+                           'http://EXAMPLE.com/a\n')
+        self.addCleanup(os.remove, url_file.name)
+
+        result = self.run_command(['cdn', 'purge', '1234',
+                                   'http://example.com/c',
+                                   '--file', url_file.name])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with('SoftLayer_Network_ContentDelivery_Account',
+                                'purgeContent',
+                                args=(['http://example.com/c',
+                                       'http://example.com/a',
+                                       'http://example.com/b',
+                                       'http://EXAMPLE.com/a'],),
+                                identifier='1234')
+
+    def test_purge_content_normalize(self):
+        result = self.run_command(['cdn', 'purge', '1234', '--normalize',
+                                   'http://example.com/a',
+                                   'HTTP://EXAMPLE.com:80/a'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with('SoftLayer_Network_ContentDelivery_Account',
+                                'purgeContent',
+                                args=(['http://example.com/a'],),
+                                identifier='1234')
+
+    def test_purge_content_failure(self):
+        purge_content = self.set_mock(
+            'SoftLayer_Network_ContentDelivery_Account', 'purgeContent')
+        purge_content.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'busy')
+
+        result = self.run_command(['cdn', 'purge', '1234',
+                                   'http://example.com', '--retries=0'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertEqual(json.loads(result.output)[0]['attempts'], 1)
+
     def test_list_origins(self):
         result = self.run_command(['cdn', 'origin-list', '1234'])
 
@@ -6,9 +6,11 @@
 """
 import json
 import os.path
+import tempfile
 
 import mock
 
+import SoftLayer
 from SoftLayer.CLI.dns import zone_import
 from SoftLayer.CLI import exceptions
 from SoftLayer import testing
@@ -105,54 +107,71 @@ $TTL 86400
                        43200)            ; Minimum
 
 @                      86400    IN NS    ns1.softlayer.com.
-@                      86400    IN NS    ns2.softlayer.com.
+@                      3600     IN NS    ns2.softlayer.com.
 
                         IN MX 10 test.realtest.com.
 testing                86400    IN A     127.0.0.1
-testing1               86400    IN A     12.12.0.1
+testing1.realtest.com. 1h       IN A     12.12.0.1
 server2      IN   A  1.0.3.4
 ftp                             IN  CNAME server2
 dev.realtest.com    IN  TXT "This is just a test of the txt record"
     IN  AAAA  2001:db8:10::1
-spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
+spf  IN TXT ( "v=spf1 ip4:192.0.2.0/24"  ; part one
+              " ip4:198.51.100.123 a" )  ; part two
+bad  IN
+other.example.com. IN A 1.1.1.1
 
 """
         expected = [{'data': 'ns1.softlayer.com.',
                      'record': '@',
                      'type': 'NS',
-                     'ttl': '86400'},
+                     'ttl': 86400},
                     {'data': 'ns2.softlayer.com.',
                      'record': '@',
                      'type': 'NS',
-                     'ttl': '86400'},
+                     'ttl': 3600},
+                    {'data': 'test.realtest.com.',
+                     'record': '@',
+                     'type': 'MX',
+                     'ttl': 86400,
+                     'mxPriority': 10},
                     {'data': '127.0.0.1',
                      'record': 'testing',
                      'type': 'A',
-                     'ttl': '86400'},
+                     'ttl': 86400},
                     {'data': '12.12.0.1',
                      'record': 'testing1',
                      'type': 'A',
-                     'ttl': '86400'},
+                     'ttl': 3600},
                     {'data': '1.0.3.4',
                      'record': 'server2',
                      'type': 'A',
-                     'ttl': None},
+                     'ttl': 86400},
                     {'data': 'server2',
                      'record': 'ftp',
                      'type': 'CNAME',
-                     'ttl': None},
+                     'ttl': 86400},
                     {'data': '"This is just a test of the txt record"',
                      'record': 'dev.realtest.com',
                      'type': 'TXT',
-                     'ttl': None},
-                    {'data': '"v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"',
+                     'ttl': 86400},
+                    {'data': '2001:db8:10::1',
+                     'record': 'dev.realtest.com',
+                     'type': 'AAAA',
+                     'ttl': 86400},
+                    {'data': '"v=spf1 ip4:192.0.2.0/24" '
+                             '" ip4:198.51.100.123 a"',
                      'record': 'spf',
                      'type': 'TXT',
-                     'ttl': None}]
+                     'ttl': 86400}]
         zone, records, bad_lines = zone_import.parse_zone_details(zone_file)
         self.assertEqual(zone, 'realtest.com')
         self.assertEqual(records, expected)
-        self.assertEqual(len(bad_lines), 13)
+        self.assertEqual(bad_lines, [
+            'bad  IN (line 22: Missing record type)',
+            'other.example.com. IN A 1.1.1.1 (line 23: other.example.com. '
+            'is outside of the zone realtest.com.)',
+        ])
 
     def test_import_zone_dry_run(self):
         path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
@@ -162,7 +181,10 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
         self.assertIn(
             "Parsed: type=NS, record=@, data=ns1.softlayer.com., ttl=86400",
             result.output)
-        self.assertIn("Unparsed: $TTL 86400", result.output)
+        self.assertIn(
+            "Parsed: type=MX, record=@, data=test.realtest.com., ttl=86400",
+            result.output)
+        self.assertNotIn("Unparsed", result.output)
 
     def test_import_zone(self):
         path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
@@ -172,52 +194,184 @@ spf  IN TXT "v=spf1 ip4:192.0.2.0/24 ip4:198.51.100.123 a"
                          [])
 
         calls = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
-                           'createObject')
-        expected_calls = [{'data': 'ns1.softlayer.com.',
-                           'host': '@',
-                           'domainId': 12345,
-                           'type': 'NS',
-                           'ttl': '86400'},
-                          {'data': 'ns2.softlayer.com.',
-                           'host': '@',
-                           'domainId': 12345,
-                           'type': 'NS',
-                           'ttl': '86400'},
-                          {'data': '127.0.0.1',
-                           'host': 'testing',
-                           'domainId': 12345,
-                           'type': 'A',
-                           'ttl': '86400'},
-                          {'data': '12.12.0.1',
-                           'host': 'testing1',
-                           'domainId': 12345,
-                           'type': 'A',
-                           'ttl': '86400'},
-                          {'data': '1.0.3.4',
-                           'host': 'server2',
-                           'domainId': 12345,
-                           'type': 'A',
-                           'ttl': None},
-                          {'data': 'server2',
-                           'host': 'ftp',
-                           'domainId': 12345,
-                           'type': 'CNAME',
-                           'ttl': None},
-                          {'data':
-                           '"This is just a test of the txt record"',
-                           'host': 'dev.realtest.com',
-                           'domainId': 12345,
-                           'type': 'TXT',
-                           'ttl': None},
-                          {'data': '"v=spf1 ip4:192.0.2.0/24 '
-                                   'ip4:198.51.100.123 a -all"',
-                           'host': 'spf',
-                           'domainId': 12345,
-                           'type': 'TXT',
-                           'ttl': None}]
-
-        self.assertEqual(len(calls), len(expected_calls))
-        for call, expected_call in zip(calls, expected_calls):
-            self.assertEqual(call.args[0], expected_call)
+                           'createObjects')
+        self.assertEqual(len(calls), 1)
+        expected_records = [{'data': 'ns1.softlayer.com.',
+                             'host': '@',
+                             'domainId': 12345,
+                             'type': 'NS',
+                             'ttl': 86400},
+                            {'data': 'ns2.softlayer.com.',
+                             'host': '@',
+                             'domainId': 12345,
+                             'type': 'NS',
+                             'ttl': 86400},
+                            {'data': 'test.realtest.com.',
+                             'host': '@',
+                             'domainId': 12345,
+                             'type': 'MX',
+                             'ttl': 86400,
+                             'mxPriority': 10},
+                            {'data': '127.0.0.1',
+                             'host': 'testing',
+                             'domainId': 12345,
+                             'type': 'A',
+                             'ttl': 86400},
+                            {'data': '12.12.0.1',
+                             'host': 'testing1',
+                             'domainId': 12345,
+                             'type': 'A',
+                             'ttl': 86400},
+                            {'data': '1.0.3.4',
+                             'host': 'server2',
+                             'domainId': 12345,
+                             'type': 'A',
+                             'ttl': 86400},
+                            {'data': 'server2',
+                             'host': 'ftp',
+                             'domainId': 12345,
+                             'type': 'CNAME',
+                             'ttl': 86400},
+                            {'data':
+                             '"This is just a test of the txt record"',
+                             'host': 'dev.realtest.com',
+                             'domainId': 12345,
+                             'type': 'TXT',
+                             'ttl': 86400},
+                            {'data': '2001:db8:10::1',
+                             'host': 'dev.realtest.com',
+                             'domainId': 12345,
+                             'type': 'AAAA',
+                             'ttl': 86400},
+                            {'data': '"v=spf1 ip4:192.0.2.0/24 '
+                                     'ip4:198.51.100.123 a -all"',
+                             'host': 'spf',
+                             'domainId': 12345,
+                             'type': 'TXT',
+                             'ttl': 86400}]
+
+        self.assertEqual(calls[0].args[0], expected_records)
 
         self.assertIn("Finished", result.output)
+
+    def test_import_zone_batches(self):
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        result = self.run_command(['dns', 'import', path,
+                                   '--batch-size', '3'])
+
+        self.assertEqual(result.exit_code, 0)
+        calls = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                           'createObjects')
+        self.assertEqual([len(call.args[0]) for call in calls], [3, 3, 3, 1])
+        self.assertIn("Created: type=A, record=server2, data=1.0.3.4, "
+                      "ttl=86400", result.output)
+
+    def test_import_zone_failures(self):
+        create_objects = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                       'createObjects')
+        create_objects.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'bad record')
+        create_object = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                      'createObject')
+        create_object.side_effect = [
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'bad NS'),
+        ] + [{'id': 1}] * 9
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+
+        result = self.run_command(['dns', 'import', path])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Failed: type=NS, record=@, data=ns1.softlayer.com., "
+                      "ttl=86400", result.output)
+        self.assertIn("bad NS", result.output)
+        self.assertIn("Created: type=NS, record=@, data=ns2.softlayer.com., "
+                      "ttl=86400", result.output)
+
+    def test_import_zone_checkpoint(self):
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        with tempfile.NamedTemporaryFile(mode='w') as checkpoint:
+            checkpoint.write(json.dumps([12345, '@', 'ns',
+                                         'ns1.softlayer.com.']))
+            checkpoint.write('\n')
+            checkpoint.write(json.dumps([54321, '@', 'ns',
+                                         'ns2.softlayer.com.']))
+            checkpoint.write('\n')
+            checkpoint.flush()
+
+            result = self.run_command(['dns', 'import', path,
+                                       '--checkpoint', checkpoint.name])
+
+            with open(checkpoint.name) as saved:
+                self.assertEqual(len(saved.readlines()), 11)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Skipped: type=NS, record=@, data=ns1.softlayer.com., "
+                      "ttl=86400", result.output)
+        calls = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                           'createObjects')
+        self.assertEqual(len(calls[0].args[0]), 9)
+
+    def test_sync_dry_run(self):
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        result = self.run_command(['dns', 'sync', path, '--dry-run'])
+
+        self.assertEqual(result.exit_code, 0)
+        rows = json.loads(result.output)
+        self.assertEqual([row['action'] for row in rows],
+                         ['create'] * 10 + ['delete'] * 6)
+        self.assertEqual(rows[0], {'action': 'create',
+                                   'id': None,
+                                   'record': '@',
+                                   'type': 'NS',
+                                   'ttl': 86400,
+                                   'data': 'ns1.softlayer.com.'})
+        self.assertEqual(rows[10], {'action': 'delete',
+                                    'id': 1,
+                                    'record': 'a',
+                                    'type': 'CNAME',
+                                    'ttl': 7200,
+                                    'data': 'd'})
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'createObjects'),
+            [])
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'deleteObjects'),
+            [])
+
+    def test_sync_bad_zone_file(self):
+        with tempfile.NamedTemporaryFile(mode='w') as zone_file:
+            zone_file.write('$ORIGIN realtest.com.\nwww IN A\n')
+            zone_file.flush()
+
+            result = self.run_command(['dns', 'sync', zone_file.name])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('Unparsed: www IN A (line 2: Missing A record data)',
+                      result.output)
+        self.assertEqual(self.calls('SoftLayer_Dns_Domain',
+                                    'getResourceRecords'), [])
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    def test_sync(self, confirm_mock):
+        confirm_mock.return_value = True
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        result = self.run_command(['dns', 'sync', path])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'createObjects')), 1)
+        self.assertEqual(len(self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'editObjects')), 0)
+        self.assertEqual(len(self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'deleteObjects')), 1)
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    def test_sync_abort(self, confirm_mock):
+        confirm_mock.return_value = False
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        result = self.run_command(['dns', 'sync', path])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'deleteObjects'),
+            [])
@@ -5,8 +5,15 @@
     :license: MIT, see LICENSE for more details.
 """
 import json
+import os
+import tempfile
 
+import mock
+
+from SoftLayer.CLI import exceptions
+from SoftLayer.CLI.firewall import edit
 from SoftLayer import testing
+from SoftLayer.testing.fixtures import SoftLayer_Network_Vlan_Firewall
 
 
 class FirewallTests(testing.TestCase):
@@ -28,3 +35,120 @@ class FirewallTests(testing.TestCase):
                            'firewall id': 'server:1234',
                            'server/vlan id': 1,
                            'type': 'Server - standard'}])
+
+    def test_list_firewalls_rules(self):
+        result = self.run_command(['firewall', 'list', '--rules'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([(row['firewall id'], row['rules'])
+                          for row in json.loads(result.output)],
+                         [('vlan:1234', 3), ('vs:1234', 3),
+                          ('server:1234', 3)])
+
+    def _rule_file(self, text):
+        """Writes a rule file and returns its name."""
+        with tempfile.NamedTemporaryFile('w', delete=False) as rule_file:
+            rule_file.write(text)
+        self.addCleanup(os.remove, rule_file.name)
+        return rule_file.name
+
+    def test_sync_dry_run(self):
+        rule_file = self._rule_file(
+            'permit tcp from any to any on server port 80-800\n'
+            'permit tcp from 193.212.1.10 to any on server\n'
+            'permit tcp from 193.212.1.10 to any on server port 22\n')
+
+        result = self.run_command(['firewall', 'sync', 'vlan:1234', rule_file,
+                                   '--dry-run'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output), [
+            {'change': 'shadowed',
+             'rule': 'permit tcp from 193.212.1.10 to any on server port 22',
+             'note': 'never matches, rule 2 comes first'},
+            {'change': 'remove',
+             'rule': 'permit tcp from any to any on server port 80',
+             'note': None},
+        ])
+        self.assertEqual(
+            self.calls('SoftLayer_Network_Firewall_Update_Request',
+                       'createObject'), [])
+
+    def test_sync(self):
+        rule_file = self._rule_file('deny icmp from any to any\n')
+
+        result = self.run_command(['--really', 'firewall', 'sync', 'vs:1234',
+                                   rule_file])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([row['change'] for row in json.loads(result.output)],
+                         ['remove', 'remove', 'remove', 'add'])
+        self.assert_called_with('SoftLayer_Network_Firewall_Update_Request',
+                                'createObject',
+                                args=({'networkComponentFirewallId': 1234,
+                                       'rules': [{
+                                           'orderValue': 1,
+                                           'action': 'deny',
+                                           'protocol': 'icmp',
+                                           'version': 4,
+                                           'sourceIpAddress': 'any',
+                                           'sourceIpSubnetMask':
+                                               '255.255.255.255',
+                                           'destinationIpAddress': 'any',
+                                           'destinationIpSubnetMask':
+                                               '255.255.255.255'}]},))
+
+    def test_sync_invalid_rules(self):
+        rule_file = self._rule_file('allow tcp from any to any\n')
+
+        result = self.run_command(['firewall', 'sync', 'vs:1234', rule_file])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+
+    def _edited(self, rules):
+        """Returns the editor contents for rules."""
+        return (edit.DELIMITER +
+                edit.DELIMITER.join(edit.get_formatted_rule(rule)
+                                    for rule in rules) +
+                edit.DELIMITER)
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    @mock.patch('SoftLayer.CLI.firewall.edit.open_editor')
+    def test_edit(self, open_editor, confirm):
+        rules = list(SoftLayer_Network_Vlan_Firewall.getRules)
+        rules.append({'action': 'permit', 'protocol': 'tcp',
+                      'sourceIpAddress': '193.212.1.10',
+                      'destinationIpAddress': 'any on server',
+                      'destinationPortRangeStart': 22,
+                      'destinationPortRangeEnd': 22})
+        open_editor.return_value = self._edited(rules)
+        confirm.return_value = True
+
+        result = self.run_command(['firewall', 'edit', 'vlan:1234'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('never matches, rule 2 comes first', result.output)
+        self.assertIn('Firewall updated!', result.output)
+        request = self.calls('SoftLayer_Network_Firewall_Update_Request',
+                             'createObject')[0]
+        pushed = request.args[0]['rules']
+        self.assertEqual(len(pushed), 4)
+        self.assertEqual((pushed[0]['sourceIpAddress'],
+                          pushed[3]['destinationPortRangeStart']),
+                         ('0.0.0.0', 22))
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    @mock.patch('SoftLayer.CLI.firewall.edit.open_editor')
+    def test_edit_unchanged(self, open_editor, confirm):
+        open_editor.return_value = self._edited(
+            SoftLayer_Network_Vlan_Firewall.getRules)
+
+        result = self.run_command(['firewall', 'edit', 'vlan:1234'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('No changes to the firewall rules', result.output)
+        self.assertFalse(confirm.called)
+        self.assertEqual(
+            self.calls('SoftLayer_Network_Firewall_Update_Request',
+                       'createObject'), [])
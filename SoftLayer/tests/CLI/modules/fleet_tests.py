@@ -0,0 +1,114 @@
+"""
+    SoftLayer.tests.CLI.modules.fleet_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import os
+import tempfile
+
+import mock
+
+import SoftLayer
+from SoftLayer import testing
+
+
+class FleetPowerTests(testing.TestCase):
+
+    def test_power_reboot(self):
+        result = self.run_command(['--really', 'fleet', 'power', 'reboot',
+                                   '100', '104', '--hard'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('vs 100 rebooted (batch 1)', result.output)
+        self.assertIn('vs 104 rebooted (batch 1)', result.output)
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'rebootHard')), 2)
+
+    def test_power_file_and_tag(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as hosts:
+            hosts.write('1000  # web\n\n1003\n')
+        self.addCleanup(os.remove, hosts.name)
+
+        result = self.run_command(['--really', 'fleet', 'power', 'cycle',
+                                   '--type', 'server', '--file', hosts.name,
+                                   '--tag', 'web'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(
+            sorted(call.identifier for call
+                   in self.calls('SoftLayer_Hardware_Server', 'powerCycle')),
+            [1000, 1001, 1002, 1003])
+
+    @mock.patch('time.sleep')
+    def test_power_batches_stop_on_failure(self, sleep):
+        power_off = self.set_mock('SoftLayer_Hardware_Server', 'powerOff')
+        power_off.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'Busy')
+
+        result = self.run_command(['--really', 'fleet', 'power', 'off',
+                                   '--type', 'server', '--datacenter',
+                                   'dal05', '--batch', '33%', '--workers',
+                                   '1'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('server 1000 failed (batch 1): SoftLayerAPIError',
+                      result.output)
+        self.assertEqual(result.exception.message,
+                         '1 of 3 hosts failed, 2 skipped')
+        self.assertEqual(len(self.calls('SoftLayer_Hardware_Server',
+                                        'powerOff')), 1)
+        self.assertFalse(sleep.called)
+
+    def test_power_unsupported(self):
+        result = self.run_command(['--really', 'fleet', 'power', 'cycle',
+                                   '100'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         'Argument Error: cycle is not supported for vs')
+
+    def test_power_off_soft_hardware(self):
+        result = self.run_command(['--really', 'fleet', 'power', 'off',
+                                   '1000', '--type', 'server', '--soft'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         'Argument Error: off --soft is not supported for '
+                         'server')
+        self.assertEqual(self.calls('SoftLayer_Hardware_Server', 'powerOff'),
+                         [])
+
+    def test_power_on_hard(self):
+        result = self.run_command(['--really', 'fleet', 'power', 'on',
+                                   '100', '--hard'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(self.calls('SoftLayer_Virtual_Guest', 'powerOn'), [])
+
+    def test_power_off_soft_vs(self):
+        result = self.run_command(['--really', 'fleet', 'power', 'off',
+                                   '100', '--soft'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'powerOffSoft',
+                                identifier=100)
+
+    def test_power_no_hosts(self):
+        result = self.run_command(['fleet', 'power', 'on'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIsInstance(result.exception,
+                              SoftLayer.CLI.exceptions.ArgumentError)
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    def test_power_aborted(self, confirm):
+        confirm.return_value = False
+
+        result = self.run_command(['fleet', 'power', 'off', '100'])
+
+        self.assertEqual(result.exit_code, 2)
+        confirm.assert_called_with(
+            'This will power off 1 vs host(s) in 1 batch(es). Continue?')
+        self.assertEqual(self.calls('SoftLayer_Virtual_Guest',
+                                    'powerOffSoft'), [])
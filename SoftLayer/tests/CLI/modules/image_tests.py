@@ -0,0 +1,78 @@
+"""
+    SoftLayer.tests.CLI.modules.image_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import json
+
+import mock
+
+from SoftLayer import testing
+
+IMAGE_SERVICE = 'SoftLayer_Virtual_Guest_Block_Device_Template_Group'
+
+
+class ImageTests(testing.TestCase):
+
+    def test_delete_by_name(self):
+        result = self.run_command(['image', 'delete', 'test_image2'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with(
+            'SoftLayer_Virtual_Guest_Block_Device_Template_Group',
+            'deleteObject', identifier=101)
+
+    def test_delete_suggests_names(self):
+        result = self.run_command(['image', 'delete', 'test-imag'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         "Error: Unable to find image 'test-imag'. "
+                         "Did you mean: test_image, test_image2?")
+
+    @mock.patch('time.sleep')
+    def test_distribute_import(self, _):
+        get_object = self.set_mock(IMAGE_SERVICE, 'getObject')
+        get_object.side_effect = [
+            {'id': 100, 'transaction': {'id': 1}, 'children': []},
+            {'id': 100, 'children': []},
+            {'id': 100, 'children': [
+                {'id': 2, 'datacenter': {'id': 0, 'name': 'dal05'},
+                 'status': {'keyName': 'ACTIVE'}},
+                {'id': 3, 'datacenter': {'id': 168642, 'name': 'sjc01'},
+                 'status': {'keyName': 'ACTIVE'}},
+            ]},
+        ]
+
+        result = self.run_command(['image', 'distribute', 'golden',
+                                   '--uri', 'swift://bucket/golden.vhd',
+                                   '-d', 'dal05', '-d', 'sjc01'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with(IMAGE_SERVICE, 'createFromExternalSource',
+                                args=({'name': 'golden',
+                                       'uri': 'swift://bucket/golden.vhd'},))
+        self.assertIn('image: importing transaction 1', result.output)
+        table = json.loads(result.output[result.output.index('['):])
+        self.assertEqual([(row['datacenter'], row['state']) for row in table],
+                         [('dal05', 'ready'), ('sjc01', 'ready')])
+
+    def test_distribute_failures(self):
+        self.set_mock(IMAGE_SERVICE, 'getObject').return_value = {'id': 100}
+        self.set_mock(IMAGE_SERVICE, 'addLocations').return_value = False
+
+        result = self.run_command(['image', 'distribute', '100',
+                                   '-d', 'dal05'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         '1 of 1 datacenters failed')
+
+    def test_distribute_unknown_datacenter(self):
+        result = self.run_command(['image', 'distribute', '100',
+                                   '-d', 'foo01'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         "Unable to find datacenter 'foo01'")
@@ -0,0 +1,108 @@
+"""
+    SoftLayer.tests.CLI.modules.loadbal_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import copy
+import json
+import os
+import tempfile
+
+from SoftLayer.CLI import exceptions
+from SoftLayer import testing
+from SoftLayer.testing.fixtures import \
+    SoftLayer_Network_Application_Delivery_Controller_LoadBalancer_VirtualIpAddress as VIRT_IP_FIXTURE  # noqa
+
+VIRT_IP_SERVICE = ('SoftLayer_Network_Application_Delivery_Controller_'
+                   'LoadBalancer_VirtualIpAddress')
+SERVICE = ('SoftLayer_Network_Application_Delivery_Controller_'
+           'LoadBalancer_Service')
+LOAD_BALANCER = copy.deepcopy(VIRT_IP_FIXTURE.getObject)
+
+
+class LoadBalancerTests(testing.TestCase):
+
+    def set_up(self):
+        mock = self.set_mock(VIRT_IP_SERVICE, 'getObject')
+        mock.return_value = copy.deepcopy(LOAD_BALANCER)
+
+    def _change_file(self, text, suffix='.csv'):
+        """Writes a change file and returns its name."""
+        with tempfile.NamedTemporaryFile('w', suffix=suffix,
+                                         delete=False) as change_file:
+            change_file.write(text)
+        self.addCleanup(os.remove, change_file.name)
+        return change_file.name
+
+    def test_service_bulk_csv(self):
+        change_file = self._change_file(
+            'action,group,service,ip,port,weight,enabled,healthcheck_type\n'
+            '# a new backend\n'
+            'add,50718,,10.0.1.37,8080,1,true,21\n'
+            'edit,,1234,,,5,no,\n'
+            'delete,,1234,,,,,\n')
+
+        result = self.run_command(['--really', 'loadbal', 'service-bulk',
+                                   'local:12345', change_file])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output), [
+            {'#': 1, 'action': 'add', 'id': 50718, 'status': 'done'},
+            {'#': 2, 'action': 'edit', 'id': 1234, 'status': 'done'},
+            {'#': 3, 'action': 'delete', 'id': 1234, 'status': 'done'},
+        ])
+        self.assertEqual(len(self.calls(VIRT_IP_SERVICE, 'editObject')), 1)
+        arg = self.calls(VIRT_IP_SERVICE, 'editObject')[0].args[0]
+        services = arg['virtualServers'][0]['serviceGroups'][0]['services']
+        self.assertEqual(services[0]['enabled'], 0)
+        self.assertEqual(services[1]['ipAddressId'], 12345)
+        self.assert_called_with(SERVICE, 'deleteObject', identifier=1234)
+
+    def test_service_bulk_yaml_dry_run(self):
+        change_file = self._change_file(
+            'services:\n'
+            '- {action: toggle, service: 1234}\n'
+            '- {action: edit, service: 1234, enabled: false, port: 81}\n',
+            suffix='.yaml')
+
+        result = self.run_command(['loadbal', 'service-bulk', '--dry-run',
+                                   'local:12345', change_file])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([row['status'] for row in json.loads(result.output)],
+                         ['valid', 'valid'])
+        self.assertEqual(self.calls(VIRT_IP_SERVICE, 'editObject'), [])
+
+    def test_service_bulk_failures(self):
+        change_file = self._change_file('action,service\n'
+                                        'toggle,1\n')
+
+        result = self.run_command(['--really', 'loadbal', 'service-bulk',
+                                   'local:12345', change_file])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIsInstance(result.exception, exceptions.CLIAbort)
+        self.assertEqual(self.calls(VIRT_IP_SERVICE, 'editObject'), [])
+
+    def test_service_bulk_invalid_row(self):
+        change_file = self._change_file('action,service,port\n'
+                                        'edit,1234,http\n')
+
+        result = self.run_command(['--really', 'loadbal', 'service-bulk',
+                                   'local:12345', change_file])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         "Invalid change 1: Invalid port 'http'")
+        self.assertEqual(self.calls(VIRT_IP_SERVICE, 'getObject'), [])
+
+    def test_watch(self):
+        result = self.run_command(['loadbal', 'watch', 'local:12345',
+                                   '--count', '1'])
+
+        self.assertEqual(result.exit_code, 0)
+        events = [json.loads(line) for line in result.output.splitlines()]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event'], 'initial')
+        self.assertEqual(events[0]['service']['status'], 'DOWN')
@@ -0,0 +1,132 @@
+"""
+    SoftLayer.tests.CLI.modules.mq_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+
+import SoftLayer
+from SoftLayer.managers import messaging
+from SoftLayer import testing
+from SoftLayer.testing import mq
+
+
+class MessagingTests(testing.TestCase):
+
+    def set_up(self):
+        self.server = mq.FakeMessageQueueServer(account_id='12345')
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client.auth = SoftLayer.BasicAuthentication('username',
+                                                         'api_key')
+
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.token_file = os.path.join(tempdir, 'tokens')
+        for patcher in [
+                mock.patch('SoftLayer.managers.messaging._TOKEN_CACHES', {}),
+                mock.patch.dict(os.environ),
+                mock.patch('SoftLayer.MessagingManager.get_endpoint',
+                           return_value=self.server.endpoint)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_queue_pop_delete_after(self):
+        self.server.add_messages('example_queue', ['one', 'two', 'three'])
+
+        result = self.run_command(['messaging', 'queue-pop', '12345',
+                                   'example_queue', '--count', '2',
+                                   '--delete-after'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([message['body'] for message
+                          in self.server.messages('example_queue')],
+                         ['three'])
+
+    def test_queue_drain(self):
+        bodies = ['message %d' % index for index in range(250)]
+        self.server.add_messages('example_queue', bodies)
+
+        result = self.run_command(['messaging', 'queue-drain', '12345',
+                                   'example_queue', '--batch', '40'])
+
+        self.assertEqual(result.exit_code, 0)
+        lines = result.output.splitlines()
+        self.assertEqual(lines[-1], 'Drained 250 messages, deleted 250')
+        self.assertEqual([json.loads(line)['body'] for line in lines[:-1]],
+                         bodies)
+        self.assertEqual(self.server.messages('example_queue'), [])
+
+    def test_queue_drain_max_messages(self):
+        self.server.add_messages('example_queue',
+                                 [str(index) for index in range(10)])
+
+        result = self.run_command(['messaging', 'queue-drain', '12345',
+                                   'example_queue', '--max-messages', '4'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(self.server.messages('example_queue')), 6)
+
+    def test_topic_publish(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as messages:
+            messages.write('one\ntwo\n\nthree\n')
+        self.addCleanup(os.remove, messages.name)
+
+        result = self.run_command(['messaging', 'topic-publish', '12345',
+                                   'example_topic', messages.name])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(self.server.count('POST', '/topics/example_topic'),
+                         3)
+        table = dict((row['property'], row['value'])
+                     for row in json.loads(result.output))
+        self.assertEqual(table['sent'], 3)
+        self.assertEqual(table['failed'], 0)
+
+    def test_topic_publish_failures(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as messages:
+            messages.write('one\nbad\n')
+        self.addCleanup(os.remove, messages.name)
+        push = messaging.MessagingConnection.push_topic_message
+
+        def push_topic_message(conn, topic_name, body, **kwargs):
+            if body == 'bad':
+                raise ValueError('rejected')
+            return push(conn, topic_name, body, **kwargs)
+
+        with mock.patch.object(messaging.MessagingConnection,
+                               'push_topic_message', push_topic_message):
+            result = self.run_command(['messaging', 'topic-publish', '12345',
+                                       'example_topic', messages.name])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         'Unable to publish 1 of 2 messages')
+        self.assertIn("Failed to publish 'bad': rejected", result.output)
+        self.assertEqual(self.server.count('POST', '/topics/example_topic'),
+                         1)
+
+    def test_token_cache_shared_between_commands(self):
+        self.run_command(['messaging', 'queue-detail', '12345',
+                          'example_queue'])
+        self.run_command(['messaging', 'queue-detail', '12345',
+                          'example_queue'])
+
+        self.assertEqual(self.server.count('POST', '/auth'), 1)
+        self.assertFalse(os.path.exists(self.token_file))
+
+    def test_token_cache_persisted(self):
+        os.environ['SL_MQ_TOKEN_CACHE'] = self.token_file
+
+        self.run_command(['messaging', 'queue-detail', '12345',
+                          'example_queue'])
+
+        self.assertEqual(os.stat(self.token_file).st_mode & 0o777, 0o600)
+        with open(self.token_file) as token_file:
+            self.assertEqual(len(json.load(token_file)), 1)
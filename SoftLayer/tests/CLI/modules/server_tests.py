@@ -57,6 +57,26 @@ class ServerCLITests(testing.TestCase):
         self.assertEqual(result.exit_code, 0)
         self.assertEqual(json.loads(result.output), expected)
 
+    def test_server_details_many(self):
+        result = self.run_command(['server', 'detail', '1000', '1001'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([detail['id'] for detail
+                          in json.loads(result.output)], [1000, 1000])
+        self.assertEqual(len(self.calls('SoftLayer_Hardware_Server',
+                                        'getReverseDomainRecords')), 2)
+
+    def test_server_details_unknown(self):
+        self.set_mock('SoftLayer_Account', 'getHardware').return_value = []
+
+        result = self.run_command(['server', 'detail', '1000', 'nope'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         "Error: Unable to find hardware 'nope'")
+        self.assertEqual(self.calls('SoftLayer_Hardware_Server', 'getObject'),
+                         [])
+
     def test_list_servers(self):
         result = self.run_command(['server', 'list', '--tag=openstack'])
 
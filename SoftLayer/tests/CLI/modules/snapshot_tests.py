@@ -0,0 +1,83 @@
+"""
+    SoftLayer.tests.CLI.modules.snapshot_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import json
+
+import SoftLayer
+from SoftLayer import testing
+
+
+class SnapshotTests(testing.TestCase):
+
+    def test_rotate_dry_run(self):
+        result = self.run_command(['snapshot', 'rotate', '--dry-run',
+                                   '--keep', '3', '100'])
+
+        self.assertEqual(result.exit_code, 0)
+        rows = json.loads(result.output)
+        self.assertEqual([row['action'] for row in rows],
+                         ['create', 'delete', 'delete', 'delete'])
+        self.assertEqual([row['snapshot'] for row in rows[1:]],
+                         [103, 104, 105])
+        self.assertEqual(self.calls('SoftLayer_Network_Storage_Iscsi',
+                                    'createSnapshot'), [])
+        self.assertEqual(self.calls('SoftLayer_Network_Storage_Iscsi',
+                                    'deleteObject'), [])
+
+    def test_rotate_all_snapshots(self):
+        result = self.run_command(['snapshot', 'rotate', '--dry-run',
+                                   '--keep', '3', '--all-snapshots', '100'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([row['snapshot']
+                          for row in json.loads(result.output)[1:]],
+                         [103, 104, 105, 106])
+
+    def test_rotate(self):
+        result = self.run_command(['--really', 'snapshot', 'rotate',
+                                   '--keep', '3'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([row['status'] for row in json.loads(result.output)],
+                         ['done'] * 5)
+        self.assert_called_with('SoftLayer_Network_Storage_Iscsi',
+                                'createSnapshot', args=('Rotated snapshot',))
+        self.assertEqual(
+            sorted(call.identifier for call in self.calls(
+                'SoftLayer_Network_Storage_Iscsi', 'deleteObject')),
+            [103, 104, 105])
+
+    def test_rotate_notes(self):
+        result = self.run_command(['--really', 'snapshot', 'rotate',
+                                   '--keep', '3', '--notes', 'nightly'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual([row['action'] for row in json.loads(result.output)],
+                         ['create', 'create'])
+        self.assert_called_with('SoftLayer_Network_Storage_Iscsi',
+                                'createSnapshot', args=('nightly',))
+        self.assertEqual(self.calls('SoftLayer_Network_Storage_Iscsi',
+                                    'deleteObject'), [])
+
+    def test_rotate_failures(self):
+        mock = self.set_mock('SoftLayer_Network_Storage_Iscsi',
+                             'deleteObject')
+        mock.side_effect = SoftLayer.SoftLayerAPIError('SoftLayer_Exception',
+                                                       'Busy')
+
+        result = self.run_command(['--really', 'snapshot', 'rotate',
+                                   '--keep', '3', '100'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         '3 of 4 snapshot operations failed')
+
+    def test_rotate_invalid_policy(self):
+        result = self.run_command(['snapshot', 'rotate', '--keep', '0'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         'A retention policy must keep some snapshots')
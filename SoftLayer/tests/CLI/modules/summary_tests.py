@@ -28,3 +28,26 @@ class SummaryTests(testing.TestCase):
 
         self.assertEqual(result.exit_code, 0)
         self.assertEqual(json.loads(result.output), expected)
+
+    def test_summary_counts(self):
+        mock = self.set_mock('SoftLayer_Account', 'getNetworkVlans')
+        mock.return_value = [{'id': 1,
+                              'primaryRouter': {
+                                  'datacenter': {'name': 'dal00'}},
+                              'hardwareCount': 2,
+                              'networkComponentCount': 1,
+                              'subnetCount': 3,
+                              'totalPrimaryIpAddressCount': 4,
+                              'virtualGuestCount': 5}]
+
+        result = self.run_command(['summary', '--counts'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output),
+                         [{'datacenter': 'dal00',
+                           'networking': 1,
+                           'subnets': 3,
+                           'hardware': 2,
+                           'ips': 4,
+                           'vs': 5,
+                           'vlans': 1}])
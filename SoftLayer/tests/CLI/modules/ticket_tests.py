@@ -4,9 +4,14 @@
 
     :license: MIT, see LICENSE for more details.
 """
-from SoftLayer import testing
-
 import json
+import os
+import shutil
+import tempfile
+
+import mock
+
+from SoftLayer import testing
 
 
 class TicketTests(testing.TestCase):
@@ -38,3 +43,61 @@ class TicketTests(testing.TestCase):
         }
         self.assertEqual(result.exit_code, 0)
         self.assertEqual(json.loads(result.output), expected)
+
+
+class TicketOfflineTests(testing.TestCase):
+
+    def set_up(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        patcher = mock.patch('SoftLayer.CLI.ticket.TICKET_STORE_FILE',
+                             os.path.join(tempdir, 'tickets.db'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sync(self):
+        result = self.run_command(['ticket', 'sync'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output), {
+            'changed': 3,
+            'updated': 3,
+            'failed': 0,
+            'synced_until': '2013-08-01T14:16:47-07:00',
+        })
+
+    def test_list_offline(self):
+        self.run_command(['ticket', 'sync'])
+        account_calls = len(self.calls('SoftLayer_Account'))
+
+        result = self.run_command(['ticket', 'list', '--offline'])
+
+        self.assertEqual(result.exit_code, 0)
+        tickets = json.loads(result.output)
+        self.assertEqual([ticket['id'] for ticket in tickets], [102])
+        self.assertEqual(len(self.calls('SoftLayer_Account')), account_calls)
+
+    def test_detail_offline(self):
+        self.run_command(['ticket', 'sync'])
+
+        result = self.run_command(['ticket', 'detail', '100', '--offline'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output)['update 3'],
+                         'By emp1 (Employee)\nemployee says something')
+        self.assertEqual(self.calls('SoftLayer_Ticket', 'getObject'), [])
+
+    def test_detail_offline_not_synced(self):
+        self.run_command(['ticket', 'sync'])
+
+        result = self.run_command(['ticket', 'detail', '200', '--offline'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         "Ticket 200 hasn't been synced")
+
+    def test_list_offline_never_synced(self):
+        result = self.run_command(['ticket', 'list', '--offline'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('ticket sync', result.exception.message)
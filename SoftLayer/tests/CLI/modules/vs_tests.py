@@ -6,6 +6,7 @@
 """
 import mock
 
+import SoftLayer
 from SoftLayer import testing
 
 import json
@@ -31,6 +32,60 @@ class DnsTests(testing.TestCase):
                            'guid': '05a8ac-6abf0',
                            'backend_ip': '10.45.19.35'}])
 
+    def test_dns_sync(self):
+        result = self.run_command(['--really', 'vs', 'dns-sync', '100',
+                                   '--ptr'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with('SoftLayer_Virtual_Guest',
+                                'getReverseDomainRecords',
+                                identifier=100)
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'createObjects',
+                                args=([{'domainId': 123456, 'host': '2',
+                                        'type': 'ptr',
+                                        'data': 'vs-test1.test.sftlyr.ws',
+                                        'ttl': 7200}],))
+        self.assertEqual(json.loads(result.output),
+                         [{'instance': 'vs-test1.test.sftlyr.ws',
+                           'type': 'ptr',
+                           'action': 'create',
+                           'host': '2',
+                           'data': 'vs-test1.test.sftlyr.ws',
+                           'status': 'done'}])
+
+    def test_dns_sync_fleet_dry_run(self):
+        result = self.run_command(['vs', 'dns-sync', '--ptr', '--dry-run',
+                                   '--datacenter=TEST00'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assert_called_with('SoftLayer_Account', 'getVirtualGuests')
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'getReverseDomainRecords')), 1)
+        self.assertEqual([row['host'] for row in json.loads(result.output)],
+                         ['2', '7'])
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'createObjects'),
+            [])
+
+    def test_dns_sync_fleet_no_filter(self):
+        result = self.run_command(['--really', 'vs', 'dns-sync'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message, 'Argument Error: Give a '
+                         'virtual server, a filter option or --all')
+        self.assertEqual(self.calls('SoftLayer_Account', 'getVirtualGuests'),
+                         [])
+
+    def test_dns_sync_fleet_no_zone(self):
+        result = self.run_command(['--really', 'vs', 'dns-sync', '-a',
+                                   '--all'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'createObjects'),
+            [])
+
     def test_detail_vs(self):
         result = self.run_command(['vs', 'detail', '100',
                                    '--passwords', '--price'])
@@ -66,6 +121,28 @@ class DnsTests(testing.TestCase):
                                      'id': 1}],
                           'owner': 'chechu'})
 
+    def test_detail_vs_many(self):
+        result = self.run_command(['vs', 'detail', '100', '104', '100'])
+
+        self.assertEqual(result.exit_code, 0)
+        details = json.loads(result.output)
+        self.assertEqual([detail['hostname'] for detail in details],
+                         ['vs-test1', 'vs-test1'])
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'getObject')), 2)
+
+    def test_detail_vs_failure(self):
+        guest = self.set_mock('SoftLayer_Virtual_Guest', 'getObject')
+        guest.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception_NotFound', 'Unable to find object')
+
+        result = self.run_command(['vs', 'detail', '100'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(result.exception.message,
+                         'Unable to get details for 1 of 1 VSs')
+        self.assertIn('Unable to get details for VS 100', result.output)
+
     def test_create_options(self):
         result = self.run_command(['vs', 'create-options'])
 
@@ -111,3 +188,72 @@ class DnsTests(testing.TestCase):
                  'networkComponents': [{'maxSpeed': '100'}]},)
         self.assert_called_with('SoftLayer_Virtual_Guest', 'createObject',
                                 args=args)
+
+    def test_create_test_quantity(self):
+        order_mock = self.set_mock('SoftLayer_Virtual_Guest',
+                                   'generateOrderTemplate')
+        order_mock.return_value = {'prices': [
+            {'recurringFee': '10.00', 'hourlyRecurringFee': '0.10',
+             'item': {'description': '2 x 2.0 GHz Cores'}},
+            {'recurringFee': '5.00', 'hourlyRecurringFee': '0.05',
+             'item': {'description': '1 GB'}},
+        ]}
+
+        result = self.run_command(['vs', 'create',
+                                   '--cpu=2',
+                                   '--domain=example.com',
+                                   '--hostname=host',
+                                   '--os=UBUNTU_LATEST',
+                                   '--memory=1',
+                                   '--billing=monthly',
+                                   '--quantity=3',
+                                   '--test'])
+
+        self.assertEqual(result.exit_code, 0)
+        table, _ = json.JSONDecoder().raw_decode(result.output)
+        self.assertEqual(table[-3:],
+                         [{'Item': 'Cost per server', 'cost': '15.00'},
+                          {'Item': 'Servers', 'cost': 3},
+                          {'Item': 'Total monthly cost', 'cost': '45.00'}])
+        self.assertEqual(self.calls('SoftLayer_Virtual_Guest',
+                                    'createObjects'), [])
+
+    @mock.patch('SoftLayer.CLI.formatting.confirm')
+    def test_create_quantity(self, confirm_mock):
+        confirm_mock.return_value = True
+        create_mock = self.set_mock('SoftLayer_Virtual_Guest', 'createObjects')
+        create_mock.return_value = [
+            {'id': 100, 'hostname': 'host1', 'createDate': '2013-08-01',
+             'globalIdentifier': 'guid-1'},
+            {'id': 101, 'hostname': 'host2', 'createDate': '2013-08-01',
+             'globalIdentifier': 'guid-2'},
+        ]
+        result = self.run_command(['vs', 'create',
+                                   '--cpu=2',
+                                   '--domain=example.com',
+                                   '--hostname=host',
+                                   '--os=UBUNTU_LATEST',
+                                   '--memory=1',
+                                   '--quantity=2',
+                                   '--tag=dev',
+                                   '--tag=green'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output),
+                         [{'id': 100,
+                           'hostname': 'host1',
+                           'created': '2013-08-01',
+                           'guid': 'guid-1',
+                           'tags': 'dev,green'},
+                          {'id': 101,
+                           'hostname': 'host2',
+                           'created': '2013-08-01',
+                           'guid': 'guid-2',
+                           'tags': 'dev,green'}])
+
+        hostnames = [config['hostname'] for config in
+                     self.calls('SoftLayer_Virtual_Guest',
+                                'createObjects')[0].args[0]]
+        self.assertEqual(hostnames, ['host1', 'host2'])
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'setTags')), 2)
@@ -5,6 +5,10 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import threading
+
+import mock
+
 import SoftLayer
 from SoftLayer import testing
 
@@ -59,6 +63,18 @@ class TestUtils(testing.TestCase):
         result = SoftLayer.utils.query_filter(10)
         self.assertEqual({'operation': 10}, result)
 
+    def test_query_filter_after(self):
+        result = SoftLayer.utils.query_filter_after(
+            '2014-03-01T00:00:00.123-05:00')
+        self.assertEqual({'operation': 'greaterThanDate',
+                          'options': [{'name': 'date',
+                                       'value': ['02/28/2014 23:59:59']}]},
+                         result)
+
+        result = SoftLayer.utils.query_filter_after('03/21/2014 14:07:07')
+        self.assertEqual(['03/21/2014 14:07:07'],
+                         result['options'][0]['value'])
+
 
 class TestNestedDict(testing.TestCase):
 
@@ -117,6 +133,88 @@ class TestLookup(testing.TestCase):
         self.assertEqual(val, None)
 
 
+class TestConcurrentMap(testing.TestCase):
+
+    def test_results_keep_order(self):
+        results = SoftLayer.utils.concurrent_map(lambda x: x * 2,
+                                                 range(20),
+                                                 max_workers=4)
+        self.assertEqual(results, [(x * 2, None) for x in range(20)])
+
+    def test_failures_do_not_abort(self):
+        results = SoftLayer.utils.concurrent_map(int, ['1', 'x', '3'])
+
+        self.assertEqual(results[0], (1, None))
+        self.assertEqual(results[1][0], None)
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertEqual(results[2], (3, None))
+
+    def test_empty(self):
+        self.assertEqual(SoftLayer.utils.concurrent_map(int, []), [])
+
+
+class TestConcurrentImap(testing.TestCase):
+
+    def test_results(self):
+        results = SoftLayer.utils.concurrent_imap(int, ['1', 'x', '3'],
+                                                  max_workers=2)
+
+        results = sorted(results, key=lambda entry: entry[0])
+        self.assertEqual(results[0], ('1', 1, None))
+        self.assertEqual(results[1], ('3', 3, None))
+        self.assertEqual(results[2][:2], ('x', None))
+        self.assertIsInstance(results[2][2], ValueError)
+
+    def test_window(self):
+        in_flight = []
+        lock = threading.Lock()
+        state = {'count': 0}
+
+        def func(item):
+            with lock:
+                state['count'] += 1
+                in_flight.append(state['count'])
+            return item
+
+        def items():
+            for item in range(50):
+                yield item
+
+        for _, result, _ in SoftLayer.utils.concurrent_imap(
+                func, items(), max_workers=2, window=3):
+            with lock:
+                state['count'] -= 1
+
+        self.assertEqual(len(in_flight), 50)
+        self.assertLessEqual(max(in_flight), 3)
+
+    def test_lazy(self):
+        consumed = []
+
+        def items():
+            for item in range(1000):
+                consumed.append(item)
+                yield item
+
+        results = SoftLayer.utils.concurrent_imap(str, items(), window=4)
+        next(results)
+        results.close()
+
+        self.assertLess(len(consumed), 10)
+
+    def test_items_error(self):
+        def items():
+            yield 1
+            raise ValueError('bad item')
+
+        results = SoftLayer.utils.concurrent_imap(str, items())
+
+        self.assertRaises(ValueError, list, results)
+
+    def test_empty(self):
+        self.assertEqual(list(SoftLayer.utils.concurrent_imap(int, [])), [])
+
+
 def is_a(string):
     if string == 'a':
         return ['this', 'is', 'a']
@@ -127,6 +225,31 @@ def is_b(string):
         return ['this', 'is', 'b']
 
 
+class TestRateLimiter(testing.TestCase):
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def test_wait(self, time_mock, sleep_mock):
+        time_mock.return_value = 100.0
+        limiter = SoftLayer.utils.RateLimiter(4)
+
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+
+        self.assertEqual([call[0][0] for call in sleep_mock.call_args_list],
+                         [0.25, 0.5])
+
+    @mock.patch('time.sleep')
+    def test_no_limit(self, sleep_mock):
+        limiter = SoftLayer.utils.RateLimiter()
+
+        limiter.wait()
+        limiter.wait()
+
+        self.assertFalse(sleep_mock.called)
+
+
 class IdentifierFixture(SoftLayer.utils.IdentifierMixin):
     resolvers = [is_a, is_b]
 
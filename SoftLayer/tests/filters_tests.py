@@ -0,0 +1,223 @@
+"""
+    SoftLayer.tests.filters_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The conformance tests capture the objectFilter a manager sends to the API
+    and check that evaluating it locally against the full fixture gives the
+    records the API would have returned.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import SoftLayer
+from SoftLayer import filters
+from SoftLayer import testing
+from SoftLayer.testing import fixtures
+from SoftLayer import utils
+
+
+def _ids(objects):
+    return sorted(obj['id'] for obj in objects)
+
+
+class FilterConformanceTests(testing.TestCase):
+
+    def set_up(self):
+        self.vs = SoftLayer.VSManager(self.client)
+        self.hardware = SoftLayer.HardwareManager(self.client)
+        self.network = SoftLayer.NetworkManager(self.client)
+
+    def local_results(self, service, method, objects, root):
+        _filter = self.calls(service, method)[-1].filter
+        return _ids(filters.filter_objects(objects, _filter, root=root))
+
+    def assert_vs_list(self, expected, **kwargs):
+        self.vs.list_instances(**kwargs)
+        self.assertEqual(
+            self.local_results('SoftLayer_Account', 'getVirtualGuests',
+                               fixtures.SoftLayer_Account.getVirtualGuests,
+                               'virtualGuests'),
+            expected)
+
+    def test_vs_hostname(self):
+        self.assert_vs_list([100], hostname='vs-test1')
+        self.assert_vs_list([100], hostname='VS-TEST1')
+        self.assert_vs_list([100, 104], hostname='vs-test*')
+        self.assert_vs_list([104], hostname='*2')
+        self.assert_vs_list([100, 104], hostname='*test*')
+        self.assert_vs_list([], hostname='vs-test')
+
+    def test_vs_numbers(self):
+        self.assert_vs_list([100], cpus=2)
+        self.assert_vs_list([104], memory=4096)
+        self.assert_vs_list([104], memory='> 1024')
+        self.assert_vs_list([100, 104], memory='>= 1024')
+        self.assert_vs_list([], memory='< 1024')
+
+    def test_vs_nested(self):
+        self.assert_vs_list([100, 104], datacenter='test00')
+        self.assert_vs_list([], datacenter='dal05')
+        self.assert_vs_list([104], public_ip='172.16.240.7')
+        self.assert_vs_list([100], private_ip='10.45.19.37')
+        self.assert_vs_list([100, 104], domain='test.sftlyr.ws')
+
+    def test_vs_combined(self):
+        self.assert_vs_list([104], datacenter='TEST00', cpus=4)
+        self.assert_vs_list([], hostname='vs-test1', cpus=4)
+
+    def test_hourly_monthly(self):
+        guests = fixtures.SoftLayer_Account.getVirtualGuests
+        hourly = {'virtualGuests': {
+            'hourlyBillingFlag': utils.query_filter(True)}}
+        monthly = {'virtualGuests': {
+            'hourlyBillingFlag': utils.query_filter(False)}}
+
+        self.assertEqual(
+            _ids(filters.filter_objects(guests, hourly, 'virtualGuests')),
+            _ids(fixtures.SoftLayer_Account.getHourlyVirtualGuests))
+        self.assertEqual(
+            _ids(filters.filter_objects(guests, monthly, 'virtualGuests')),
+            _ids(fixtures.SoftLayer_Account.getMonthlyVirtualGuests))
+
+    def test_open_closed_tickets(self):
+        tickets = fixtures.SoftLayer_Account.getTickets
+        open_filter = {'tickets': {'status': {'name': {
+            'operation': '_= open'}}}}
+        closed_filter = {'tickets': {'statusId': utils.query_filter(1002)}}
+
+        self.assertEqual(
+            _ids(filters.filter_objects(tickets, open_filter, 'tickets')),
+            _ids(fixtures.SoftLayer_Account.getOpenTickets))
+        self.assertEqual(
+            _ids(filters.filter_objects(tickets, closed_filter, 'tickets')),
+            _ids(fixtures.SoftLayer_Account.getClosedTickets))
+
+    def test_hardware_tags(self):
+        self.hardware.list_hardware(tags=['a tag'])
+        self.assertEqual(
+            self.local_results('SoftLayer_Account', 'getHardware',
+                               fixtures.SoftLayer_Account.getHardware,
+                               'hardware'),
+            [])
+
+        tag = fixtures.SoftLayer_Account.getHardware[0][
+            'tagReferences'][0]['tag']['name']
+        self.hardware.list_hardware(tags=[tag, 'other'])
+        self.assertEqual(
+            self.local_results('SoftLayer_Account', 'getHardware',
+                               fixtures.SoftLayer_Account.getHardware,
+                               'hardware'),
+            [1000])
+
+    def test_subnets_exclude_global(self):
+        subnets = fixtures.SoftLayer_Account.getSubnets + [
+            {'id': '101', 'subnetType': 'GLOBAL_IP', 'version': 4}]
+
+        self.network.list_subnets()
+        self.assertEqual(
+            self.local_results('SoftLayer_Account', 'getSubnets', subnets,
+                               'subnets'),
+            ['100'])
+
+        self.network.list_subnets(version=6)
+        self.assertEqual(
+            self.local_results('SoftLayer_Account', 'getSubnets', subnets,
+                               'subnets'),
+            [])
+
+    def test_between_date(self):
+        tickets = fixtures.SoftLayer_Account.getTickets
+        _filter = {'createDate': utils.query_filter_date('2014-01-01',
+                                                         '2014-12-31')}
+
+        self.assertEqual(_ids(filters.filter_objects(tickets, _filter)),
+                         [102])
+
+
+class FilterTests(testing.TestCase):
+
+    def test_operators(self):
+        cases = [
+            ('~ Web', 'my-Web-1', True),
+            ('~ web', 'my-Web-1', False),
+            ('!~ web', 'my-Web-1', True),
+            ('*= WEB', 'my-web-1', True),
+            ('^= my', 'MY-web', True),
+            ('$= web', 'my-web', True),
+            ('_= my-web', 'MY-WEB', True),
+            ('!= GLOBAL_IP', 'PRIMARY', True),
+            ('!= GLOBAL_IP', 'GLOBAL_IP', False),
+            ('<= 10', 10, True),
+            ('< 10', '9', True),
+            ('> abc', 'abd', True),
+            ('exact', 'exact', True),
+            ('exact', 'Exact', False),
+            (5, '5', True),
+            (1, True, True),
+        ]
+        for operation, value, expected in cases:
+            predicate = filters.compile_filter(
+                {'field': {'operation': operation}})
+            self.assertEqual(predicate({'field': value}), expected,
+                             '%r vs %r' % (operation, value))
+
+    def test_in(self):
+        predicate = filters.compile_filter({'tagReferences': {'tag': {
+            'name': {'operation': 'in',
+                     'options': [{'name': 'data',
+                                  'value': ['web', 'db']}]}}}})
+
+        web = {'tag': {'name': 'x'}}
+        db = {'tag': {'name': 'db'}}
+        self.assertTrue(predicate({'tagReferences': [web, db]}))
+        self.assertFalse(predicate({'tagReferences': [web]}))
+        self.assertFalse(predicate({'tagReferences': []}))
+        self.assertFalse(predicate({}))
+
+    def test_null(self):
+        is_null = filters.compile_filter({'notes': {'operation': 'is null'}})
+        not_null = filters.compile_filter({'notes': {'operation': 'not null'}})
+
+        self.assertTrue(is_null({}))
+        self.assertTrue(is_null({'notes': None}))
+        self.assertFalse(is_null({'notes': 'x'}))
+        self.assertTrue(not_null({'notes': 'x'}))
+        self.assertFalse(not_null({}))
+
+    def test_dates(self):
+        after = filters.compile_filter({'modifyDate': {
+            'operation': 'greaterThanDate',
+            'options': [{'name': 'date', 'value': ['03/21/2014 14:07:07']}]}})
+        before = filters.compile_filter({'modifyDate': {
+            'operation': 'lessThanDate',
+            'options': [{'name': 'date', 'value': ['2014-03-21']}]}})
+
+        self.assertTrue(after({'modifyDate': '2014-03-21T14:07:08-05:00'}))
+        self.assertFalse(after({'modifyDate': '2014-03-21T14:07:07-05:00'}))
+        self.assertTrue(before({'modifyDate': '2014-03-20T23:59:59-05:00'}))
+        self.assertFalse(before({'modifyDate': 'not a date'}))
+
+    def test_order_by_is_ignored(self):
+        predicate = filters.compile_filter({'id': {
+            'operation': 'orderBy',
+            'options': [{'name': 'sort', 'value': ['ASC']}]}})
+        self.assertTrue(predicate({'id': 1}))
+
+    def test_empty_filter(self):
+        self.assertTrue(filters.compile_filter({})({'id': 1}))
+
+    def test_invalid_filter(self):
+        self.assertRaises(ValueError, filters.compile_filter, {'id': 5})
+        self.assertRaises(ValueError, filters.compile_filter,
+                          {'modifyDate': {'operation': 'betweenDate',
+                                          'options': []}})
+
+    def test_nested_dict(self):
+        _filter = utils.NestedDict()
+        _filter['virtualGuests']['datacenter']['name'] = (
+            utils.query_filter('dal*'))
+        predicate = filters.compile_filter(_filter.to_dict(),
+                                           root='virtualGuests')
+
+        self.assertTrue(predicate({'datacenter': {'name': 'dal05'}}))
+        self.assertFalse(predicate({'datacenter': {'name': 'sjc01'}}))
+        self.assertFalse(predicate({'datacenter': None}))
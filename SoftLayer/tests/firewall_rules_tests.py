@@ -0,0 +1,364 @@
+"""
+    SoftLayer.tests.firewall_rules_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import json
+import random
+
+from SoftLayer import firewall_rules
+from SoftLayer import testing
+from SoftLayer.testing.fixtures import SoftLayer_Network_Vlan_Firewall
+
+
+def _compile(text, **kwargs):
+    """Compiles a rule file and returns the rules as lines."""
+    result = firewall_rules.compile_rules(firewall_rules.parse_rules(text),
+                                          **kwargs)
+    return ([firewall_rules.format_rule(rule) for rule in result['rules']],
+            result['shadowed'])
+
+
+def _first_match(rules, protocol, source, destination, port):
+    """Returns the action of the first normalized rule matching a packet."""
+    for rule in rules:
+        if (rule.protocol not in firewall_rules.ANY_PROTOCOLS and
+                rule.protocol != protocol):
+            continue
+        if rule.ports is not None and not (
+                rule.ports[0] <= port <= rule.ports[1]):
+            continue
+        packet = rule._replace(protocol=protocol, ports=(port, port),
+                               source=(source, 32),
+                               destination=(destination, 32))
+        if firewall_rules.covers(rule, packet):
+            return rule.action
+    return None
+
+
+class ParseRulesTests(testing.TestCase):
+
+    def test_lines(self):
+        rules = firewall_rules.parse_rules(
+            '# web servers\n'
+            'permit tcp from 10.0.0.0/24 to any on server port 80-443\n'
+            '\n'
+            'deny udp to 10.1.2.3 port 53  # dns\n'
+            'permit icmp from 2001:db8::/32 to any\n'
+            'deny tcp from any to any version 6\n')
+
+        self.assertEqual(rules, [
+            {'orderValue': 1, 'action': 'permit', 'protocol': 'tcp',
+             'sourceIpAddress': '10.0.0.0/24',
+             'destinationIpAddress': 'any on server',
+             'destinationPortRangeStart': 80,
+             'destinationPortRangeEnd': 443},
+            {'orderValue': 2, 'action': 'deny', 'protocol': 'udp',
+             'destinationIpAddress': '10.1.2.3',
+             'destinationPortRangeStart': 53,
+             'destinationPortRangeEnd': 53},
+            {'orderValue': 3, 'action': 'permit', 'protocol': 'icmp',
+             'sourceIpAddress': '2001:db8::/32',
+             'destinationIpAddress': 'any'},
+            {'orderValue': 4, 'action': 'deny', 'protocol': 'tcp',
+             'sourceIpAddress': 'any', 'destinationIpAddress': 'any',
+             'version': 6},
+        ])
+
+    def test_invalid_lines(self):
+        for text, error in [('permit\n', 'Line 1: expected an action'),
+                            ('permit tcp 10.0.0.1', "Line 1: unexpected"),
+                            ('\npermit tcp from', 'Line 2: missing value'),
+                            ('permit tcp port x', "Line 1: invalid port"),
+                            ('permit tcp to a to b', 'Line 1: to is given')]:
+            try:
+                firewall_rules.parse_rules(text)
+            except ValueError as ex:
+                self.assertIn(error, str(ex))
+            else:
+                self.fail('%r was parsed' % text)
+
+    def test_editor_format(self):
+        text = (firewall_rules.DELIMITER +
+                'action: permit\n'
+                'protocol: tcp\n'
+                'source_ip_address: 10.0.0.0\n'
+                'source_ip_subnet_mask: 255.255.255.0\n'
+                'destination_ip_address: any on server\n'
+                'destination_port_range_start: 80\n'
+                'destination_port_range_end: 81\n'
+                'version: 4\n' +
+                firewall_rules.DELIMITER +
+                'action: deny\n'
+                'protocol: icmp\n' +
+                firewall_rules.DELIMITER)
+
+        rules = firewall_rules.parse_rules(text)
+
+        self.assertEqual(rules, [
+            {'orderValue': 1, 'action': 'permit', 'protocol': 'tcp',
+             'sourceIpAddress': '10.0.0.0',
+             'sourceIpSubnetMask': '255.255.255.0',
+             'destinationIpAddress': 'any on server',
+             'destinationPortRangeStart': 80,
+             'destinationPortRangeEnd': 81,
+             'version': 4},
+            {'orderValue': 2, 'action': 'deny', 'protocol': 'icmp'},
+        ])
+        self.assertEqual(firewall_rules.parse_rules(
+            firewall_rules.DELIMITER + 'action: deny\n'
+            'protocol: icmp\ncolour: blue\n'),
+            [{'orderValue': 1, 'action': 'deny', 'protocol': 'icmp'}])
+        self.assertRaises(ValueError, firewall_rules.parse_rules,
+                          firewall_rules.DELIMITER + 'colour blue\n')
+
+    def test_json(self):
+        rules = SoftLayer_Network_Vlan_Firewall.getRules
+
+        self.assertEqual(firewall_rules.parse_rules(json.dumps(rules)),
+                         rules)
+        self.assertRaises(ValueError, firewall_rules.parse_rules, '[1, 2]')
+        self.assertRaises(ValueError, firewall_rules.parse_rules, '[{')
+
+
+class AddressTests(testing.TestCase):
+
+    def test_ipv6(self):
+        for address, expected in [('::', '::'),
+                                  ('::1', '::1'),
+                                  ('2001:DB8::', '2001:db8::'),
+                                  ('2001:db8:0:1:0:0:0:1', '2001:db8:0:1::1'),
+                                  ('1:2:3:4:5:6:7:8', '1:2:3:4:5:6:7:8'),
+                                  ('::ffff:10.0.0.1', '::ffff:a00:1')]:
+            value = firewall_rules.parse_ip(address, 6)
+            self.assertEqual(firewall_rules.format_ip(value, 6), expected)
+
+        for address in ['1::2::3', '1:2:3', '12345::', 'g::',
+                        '1:2:3:4:5:6:7:8:9']:
+            self.assertRaises(ValueError, firewall_rules.parse_ip, address, 6)
+
+    def test_parse_address(self):
+        parse = firewall_rules.parse_address
+        self.assertEqual(parse('10.0.0.5/24', None, 4), (0x0a000000, 24))
+        self.assertEqual(parse('10.0.0.5', '255.255.0.0', 4),
+                         (0x0a000000, 16))
+        self.assertEqual(parse('10.0.0.5', None, 4), (0x0a000005, 32))
+        self.assertEqual(parse('any', '255.255.255.255', 4), (0, 0))
+        self.assertEqual(parse(None, None, 6), (0, 0))
+        self.assertEqual(parse('Any On Server', '255.255.255.255', 4),
+                         ('any on server', None))
+        self.assertEqual(parse('2001:db8::1', 32, 6),
+                         (0x20010db8 << 96, 32))
+        self.assertEqual(parse('2001:db8::1', None, 6),
+                         ((0x20010db8 << 96) | 1, 128))
+        self.assertEqual(parse('2001:db8::1', 'None', 6),
+                         ((0x20010db8 << 96) | 1, 128))
+        self.assertEqual(parse('10.0.0.5', 'None', 4), (0x0a000005, 32))
+        self.assertRaises(ValueError, parse, '10.0.0.5', '255.0.255.0', 4)
+        self.assertRaises(ValueError, parse, '10.0.0.5/33', None, 4)
+        self.assertRaises(ValueError, parse, '10.0.0.256', None, 4)
+
+
+class CompileRulesTests(testing.TestCase):
+
+    def test_merge_ports(self):
+        rules, shadowed = _compile('permit tcp from any to any port 80\n'
+                                   'permit tcp from any to any port 81-90\n'
+                                   'permit tcp from any to any port 85-100\n'
+                                   'permit tcp from any to any port 102\n'
+                                   'permit udp from any to any port 101\n')
+
+        self.assertEqual(rules, ['permit tcp from any to any port 80-100',
+                                 'permit tcp from any to any port 102',
+                                 'permit udp from any to any port 101'])
+        self.assertEqual(shadowed, [])
+
+    def test_merge_subnets(self):
+        rules, _ = _compile('deny tcp from 10.0.0.0/25 to any\n'
+                            'deny tcp from 10.0.0.128/26 to any\n'
+                            'deny tcp from 10.0.0.192/26 to any\n'
+                            'deny tcp from 10.0.1.7 to 10.2.0.0\n'
+                            'deny tcp from 10.0.1.7 to 10.2.0.1\n')
+
+        self.assertEqual(rules, ['deny tcp from 10.0.0.0/24 to any',
+                                 'deny tcp from 10.0.1.7 to 10.2.0.0/31'])
+
+    def test_shadowed(self):
+        rules, shadowed = _compile(
+            'permit tcp from 10.0.0.0/8 to any on server port 1-1024\n'
+            'deny tcp from 10.1.0.0/16 to any on server port 22\n'
+            'permit udp from any to any\n'
+            'permit udp from 10.0.0.1 to 10.0.0.2 port 53\n'
+            'permit any from 10.0.0.3 to any\n'
+            'deny icmp from 10.0.0.3 to any\n')
+
+        self.assertEqual(rules, [
+            'permit tcp from 10.0.0.0/8 to any on server port 1-1024',
+            'permit udp from any to any',
+            'permit any from 10.0.0.3 to any',
+        ])
+        self.assertEqual(shadowed, [
+            {'rule': 2, 'shadowed_by': 1, 'conflict': True},
+            {'rule': 4, 'shadowed_by': 3, 'conflict': False},
+            {'rule': 6, 'shadowed_by': 5, 'conflict': True},
+        ])
+
+    def test_does_not_merge_across_actions(self):
+        rules, _ = _compile('permit tcp from any to any port 80\n'
+                            'deny tcp from 10.0.0.1 to any port 81\n'
+                            'permit tcp from any to any port 81\n')
+
+        self.assertEqual(rules, ['permit tcp from any to any port 80',
+                                 'deny tcp from 10.0.0.1 to any port 81',
+                                 'permit tcp from any to any port 81'])
+
+    def test_no_compact(self):
+        rules, shadowed = _compile('permit tcp from any to any port 80\n'
+                                   'permit tcp from any to any port 80\n',
+                                   compact=False)
+
+        self.assertEqual(len(rules), 2)
+        self.assertEqual(shadowed, [{'rule': 2, 'shadowed_by': 1,
+                                     'conflict': False}])
+
+    def test_render(self):
+        result = firewall_rules.compile_rules(firewall_rules.parse_rules(
+            'permit tcp from 10.0.0.9/24 to any on server port 80\n'
+            'permit icmp from 2001:db8::/32 to any\n'))
+
+        self.assertEqual(result['rules'], [
+            {'orderValue': 1, 'action': 'permit', 'protocol': 'tcp',
+             'version': 4,
+             'sourceIpAddress': '10.0.0.0',
+             'sourceIpSubnetMask': '255.255.255.0',
+             'destinationIpAddress': 'any on server',
+             'destinationIpSubnetMask': '255.255.255.255',
+             'destinationPortRangeStart': 80,
+             'destinationPortRangeEnd': 80},
+            {'orderValue': 2, 'action': 'permit', 'protocol': 'icmp',
+             'version': 6,
+             'sourceIpAddress': '2001:db8::',
+             'sourceIpCidr': 32,
+             'destinationIpAddress': 'any',
+             'destinationIpCidr': 128},
+        ])
+
+    def test_render_any(self):
+        rules = firewall_rules.parse_rules(
+            firewall_rules.DELIMITER +
+            'action: deny\n'
+            'protocol: udp\n'
+            'source_ip_address: any\n'
+            'source_ip_subnet_mask: 255.255.255.255\n'
+            'destination_ip_address: any\n'
+            'destination_ip_subnet_mask: 255.255.255.255\n' +
+            firewall_rules.DELIMITER)
+
+        for compact in (True, False):
+            rule = firewall_rules.compile_rules(rules,
+                                                compact=compact)['rules'][0]
+            self.assertEqual((rule['sourceIpAddress'],
+                              rule['sourceIpSubnetMask'],
+                              rule['destinationIpAddress'],
+                              rule['destinationIpSubnetMask']),
+                             ('any', '255.255.255.255',
+                              'any', '255.255.255.255'))
+
+        rule = firewall_rules.compile_rules(
+            SoftLayer_Network_Vlan_Firewall.getRules)['rules'][-1]
+        self.assertEqual(rule['destinationPortRangeEnd'], 800)
+        self.assertEqual((rule['sourceIpAddress'],
+                          rule['sourceIpSubnetMask']),
+                         ('0.0.0.0', '0.0.0.0'))
+
+    def test_invalid_rule(self):
+        for rule in [{'action': 'allow', 'protocol': 'tcp'},
+                     {'action': 'permit'},
+                     {'action': 'permit', 'protocol': 'tcp',
+                      'destinationPortRangeStart': 90,
+                      'destinationPortRangeEnd': 80},
+                     {'action': 'permit', 'protocol': 'tcp', 'version': 5}]:
+            self.assertRaises(ValueError, firewall_rules.compile_rules,
+                              [rule])
+
+    def test_same_behaviour(self):
+        rand = random.Random(7)
+
+        def address():
+            """Returns a random source or destination."""
+            if rand.random() < 0.15:
+                return 'any'
+            return '10.0.0.%d/%d' % (rand.randrange(256),
+                                     rand.choice([24, 25, 26, 30, 32]))
+
+        for _ in range(200):
+            lines = []
+            for _ in range(rand.randrange(1, 10)):
+                protocol = rand.choice(['tcp', 'tcp', 'udp', 'icmp', 'any'])
+                line = '%s %s from %s to %s' % (
+                    rand.choice(['permit', 'permit', 'deny']), protocol,
+                    address(), address())
+                if protocol in firewall_rules.PORT_PROTOCOLS:
+                    start = rand.randrange(1, 20)
+                    line += ' port %d-%d' % (start,
+                                             start + rand.randrange(6))
+                lines.append(line)
+
+            rules = firewall_rules.parse_rules('\n'.join(lines))
+            compiled = firewall_rules.compile_rules(rules)['rules']
+            before = [firewall_rules.normalize_rule(rule) for rule in rules]
+            after = [firewall_rules.normalize_rule(rule) for rule in compiled]
+            for _ in range(100):
+                packet = (rand.choice(['tcp', 'udp', 'icmp', 'gre']),
+                          0x0a000000 | rand.randrange(256),
+                          0x0a000000 | rand.randrange(256),
+                          rand.randrange(1, 30))
+                self.assertEqual(_first_match(before, *packet),
+                                 _first_match(after, *packet),
+                                 (lines, packet))
+
+
+class DiffRulesTests(testing.TestCase):
+
+    def test_unchanged(self):
+        current = SoftLayer_Network_Vlan_Firewall.getRules
+        desired = firewall_rules.compile_rules(current,
+                                               compact=False)['rules']
+
+        diff = firewall_rules.diff_rules(current, desired)
+
+        self.assertEqual(diff, {'changed': False, 'added': [],
+                                'removed': []})
+
+    def test_changed(self):
+        current = firewall_rules.parse_rules(
+            'permit tcp from any to any port 80\n'
+            'permit tcp from any to any port 443\n')
+
+        diff = firewall_rules.diff_rules(current, firewall_rules.parse_rules(
+            'permit tcp from any to any port 443\n'
+            'permit tcp from any to any port 22\n'))
+
+        self.assertTrue(diff['changed'])
+        self.assertEqual([rule['destinationPortRangeStart']
+                          for rule in diff['added']], [22])
+        self.assertEqual([rule['destinationPortRangeStart']
+                          for rule in diff['removed']], [80])
+
+    def test_reordered(self):
+        current = firewall_rules.parse_rules(
+            'permit tcp from any to any port 80\n'
+            'deny tcp from any to any\n')
+        desired = firewall_rules.parse_rules(
+            'deny tcp from any to any\n'
+            'permit tcp from any to any port 80\n')
+
+        self.assertEqual(firewall_rules.diff_rules(current, desired),
+                         {'changed': True, 'added': [], 'removed': []})
+
+    def test_format_rule(self):
+        rule = SoftLayer_Network_Vlan_Firewall.getRules[1]
+
+        self.assertEqual(firewall_rules.format_rule(rule),
+                         'permit tcp from 193.212.1.10 to any on server')
@@ -6,6 +6,9 @@
 """
 import math
 
+import mock
+
+import SoftLayer
 from SoftLayer.managers import cdn
 from SoftLayer import testing
 from SoftLayer.testing import fixtures
@@ -132,3 +135,95 @@ class CDNTests(testing.TestCase):
                                 'purgeContent',
                                 args=([url],),
                                 identifier=12345)
+
+    def test_purge_content_as_given(self):
+        url = 'HTTP://Example.com:80/A.png#x'
+
+        self.cdn_client.purge_content(12345, [url, url])
+        self.assert_called_with('SoftLayer_Network_ContentDelivery_Account',
+                                'purgeContent',
+                                args=([url],),
+                                identifier=12345)
+
+    def test_purge_content_normalize(self):
+        self.cdn_client.purge_content(12345, ['HTTP://Example.com:80/A.png',
+                                              'http://example.com/A.png'],
+                                      normalize=True)
+        self.assert_called_with('SoftLayer_Network_ContentDelivery_Account',
+                                'purgeContent',
+                                args=(['http://example.com/A.png'],),
+                                identifier=12345)
+
+    def test_normalize_url(self):
+        self.assertEqual(cdn.normalize_url(' HTTP://Example.COM:80/A.png#x '),
+                         'http://example.com/A.png')
+        self.assertEqual(cdn.normalize_url('https://a.com:443?q=B'),
+                         'https://a.com/?q=B')
+        self.assertEqual(cdn.normalize_url('http://a.com:8080/b'),
+                         'http://a.com:8080/b')
+        self.assertEqual(cdn.normalize_url('not a url'), 'not a url')
+
+    def test_unique_urls(self):
+        urls = ['http://a.com/1', 'HTTP://A.COM/1', 'http://a.com/2',
+                'http://a.com/1']
+
+        self.assertEqual(list(cdn.unique_urls(urls)),
+                         ['http://a.com/1', 'HTTP://A.COM/1',
+                          'http://a.com/2'])
+
+    def test_unique_urls_normalize(self):
+        urls = ['http://a.com/1', 'HTTP://A.COM/1', 'http://a.com/2']
+
+        self.assertEqual(list(cdn.unique_urls(urls, normalize=True)),
+                         ['http://a.com/1', 'http://a.com/2'])
+
+    def test_submit_content(self):
+        urls = ['http://a.com/%d' % i for i in range(12)]
+        urls.append('http://a.com/0')
+
+        chunks = list(self.cdn_client.submit_content(12345, iter(urls),
+                                                     'purge'))
+
+        calls = self.calls('SoftLayer_Network_ContentDelivery_Account',
+                           'purgeContent')
+        self.assertEqual(sorted(len(call.args[0]) for call in calls),
+                         [2, 5, 5])
+        self.assertEqual([chunk['urls'] for chunk in chunks],
+                         [urls[0:5], urls[5:10], urls[10:12]])
+        self.assertEqual([(chunk['success'], chunk['attempts'])
+                          for chunk in chunks],
+                         [(True, 1), (True, 1), (True, 1)])
+
+    @mock.patch('time.sleep')
+    def test_submit_content_retry(self, sleep_mock):
+        error = SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'busy')
+        load_content = self.set_mock(
+            'SoftLayer_Network_ContentDelivery_Account', 'loadContent')
+        load_content.side_effect = [error, False, True]
+
+        chunks = list(self.cdn_client.submit_content(
+            12345, ['http://a.com/1'], 'load', retry_delay=0.5))
+
+        self.assertEqual(chunks, [{'urls': ['http://a.com/1'],
+                                   'success': True,
+                                   'attempts': 3,
+                                   'result': True,
+                                   'error': None}])
+        self.assertEqual([call[0][0] for call in sleep_mock.call_args_list],
+                         [0.5, 1.0])
+
+    @mock.patch('time.sleep')
+    def test_submit_content_failure(self, sleep_mock):
+        error = SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'busy')
+        purge_content = self.set_mock(
+            'SoftLayer_Network_ContentDelivery_Account', 'purgeContent')
+        purge_content.side_effect = error
+
+        chunks = list(self.cdn_client.submit_content(
+            12345, 'http://a.com/1', 'purge', retries=1))
+
+        self.assertEqual(len(chunks), 1)
+        self.assertFalse(chunks[0]['success'])
+        self.assertEqual(chunks[0]['attempts'], 2)
+        self.assertEqual(chunks[0]['error'], error)
+        self.assertEqual(sleep_mock.call_count, 1)
@@ -4,8 +4,12 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import json
+import os
+import tempfile
 
 import SoftLayer
+from SoftLayer.managers import dns
 from SoftLayer import testing
 from SoftLayer.testing import fixtures
 
@@ -89,6 +93,345 @@ class DNSTests(testing.TestCase):
                                     'data': 'testing'
                                 },))
 
+    def test_create_records(self):
+        records = [{'host': 'a', 'type': 'A', 'data': '1.1.1.1'},
+                   {'host': 'b', 'type': 'MX', 'data': 'mail.example.com',
+                    'ttl': 900, 'mxPriority': 10}]
+
+        results = self.dns_client.create_records(1, records)
+
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'createObjects',
+                                args=([{'domainId': 1,
+                                        'ttl': 60,
+                                        'host': 'a',
+                                        'type': 'A',
+                                        'data': '1.1.1.1'},
+                                       {'domainId': 1,
+                                        'ttl': 900,
+                                        'host': 'b',
+                                        'type': 'MX',
+                                        'data': 'mail.example.com',
+                                        'mxPriority': 10}],))
+        self.assertEqual([result['id'] for result in results], [1001, 1002])
+        self.assertTrue(all(result['success'] for result in results))
+
+    def test_create_records_batches(self):
+        records = [{'host': 'host%d' % i, 'type': 'a', 'data': '10.0.0.%d' % i}
+                   for i in range(5)]
+
+        results = self.dns_client.create_records(1, records, batch_size=2,
+                                                 max_workers=2)
+
+        calls = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                           'createObjects')
+        self.assertEqual(sorted(len(call.args[0]) for call in calls),
+                         [1, 2, 2])
+        self.assertEqual([result['record'] for result in results], records)
+        self.assertTrue(all(result['success'] for result in results))
+        # The fixture returns two records, so ids are only known for the
+        # full batches.
+        self.assertEqual([result['id'] for result in results],
+                         [1001, 1002, 1001, 1002, None])
+
+    def test_create_records_partial_failure(self):
+        create_objects = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                       'createObjects')
+        create_objects.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception_Dns', 'Invalid data')
+        create_object = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                      'createObject')
+        error = SoftLayer.SoftLayerAPIError('SoftLayer_Exception_Dns',
+                                            'Invalid data')
+        create_object.side_effect = [{'id': 10}, error, {'id': 12}]
+        records = [{'host': 'a', 'type': 'a', 'data': '1.1.1.1'},
+                   {'host': 'b', 'type': 'a', 'data': 'nope'},
+                   {'host': 'c', 'type': 'a', 'data': '1.1.1.3'}]
+
+        results = self.dns_client.create_records(1, records)
+
+        self.assertEqual([result['success'] for result in results],
+                         [True, False, True])
+        self.assertEqual([result['id'] for result in results],
+                         [10, None, 12])
+        self.assertEqual(results[1]['error'], error)
+
+    def test_create_records_transport_error(self):
+        create_objects = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                       'createObjects')
+        error = SoftLayer.TransportError(0, 'Read timed out')
+        create_objects.side_effect = error
+        records = [{'host': 'a', 'type': 'a', 'data': '1.1.1.1'},
+                   {'host': 'b', 'type': 'a', 'data': '1.1.1.2'}]
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            results = self.dns_client.create_records(1, records,
+                                                     checkpoint=path)
+            with open(path) as checkpoint:
+                saved = checkpoint.read()
+        finally:
+            os.remove(path)
+
+        self.assertEqual([result['success'] for result in results],
+                         [False, False])
+        self.assertEqual([result['error'] for result in results],
+                         [error, error])
+        self.assertEqual(self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                    'createObject'), [])
+        self.assertEqual(saved, '')
+
+    def test_create_records_checkpoint(self):
+        records = [{'host': 'a', 'type': 'A', 'data': '1.1.1.1'},
+                   {'host': 'b', 'type': 'A', 'data': '1.1.1.2'}]
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            with open(path, 'w') as checkpoint:
+                checkpoint.write(json.dumps([1, 'a', 'a', '1.1.1.1']) + '\n')
+                checkpoint.write(json.dumps([2, 'b', 'a', '1.1.1.2']) + '\n')
+
+            results = self.dns_client.create_records(1, records,
+                                                     checkpoint=path)
+
+            with open(path) as checkpoint:
+                saved = [json.loads(line) for line in checkpoint]
+        finally:
+            os.remove(path)
+
+        self.assertEqual([result['skipped'] for result in results],
+                         [True, False])
+        call = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                          'createObjects')[0]
+        self.assertEqual([record['host'] for record in call.args[0]], ['b'])
+        self.assertEqual(saved, [[1, 'a', 'a', '1.1.1.1'],
+                                 [2, 'b', 'a', '1.1.1.2'],
+                                 [1, 'b', 'a', '1.1.1.2']])
+
+    def test_record_key(self):
+        self.assertEqual(dns.record_key({'host': 'www', 'type': 'CNAME',
+                                         'data': 'example.com.'}),
+                         ('www', 'cname', 'example.com.'))
+
+    def test_plan_zone_sync(self):
+        current = [
+            {'id': 1, 'host': '@', 'type': 'soa', 'data': 'ns1.',
+             'ttl': 86400},
+            {'id': 2, 'host': 'www', 'type': 'a', 'data': '1.1.1.1',
+             'ttl': 900},
+            {'id': 3, 'host': 'api', 'type': 'a', 'data': '1.1.1.2',
+             'ttl': 900},
+            {'id': 4, 'host': 'old', 'type': 'cname', 'data': 'www',
+             'ttl': 900},
+            {'id': 5, 'host': 'www', 'type': 'a', 'data': '1.1.1.1',
+             'ttl': 900},
+            {'id': 6, 'host': '@', 'type': 'mx', 'data': 'mail',
+             'ttl': 900, 'mxPriority': 10},
+        ]
+        desired = [
+            {'host': 'www', 'type': 'A', 'data': '1.1.1.1', 'ttl': '900'},
+            {'host': 'api', 'type': 'A', 'data': '1.1.1.3', 'ttl': None},
+            {'host': 'new', 'type': 'A', 'data': '1.1.1.4', 'ttl': 60},
+            {'host': '@', 'type': 'MX', 'data': 'mail', 'mxPriority': 20},
+        ]
+
+        plan = dns.plan_zone_sync(current, desired)
+
+        self.assertEqual([record['id'] for record in plan['unchanged']], [2])
+        self.assertEqual(plan['edit'], [
+            {'id': 3, 'host': 'api', 'type': 'a', 'data': '1.1.1.3',
+             'ttl': 900},
+            {'id': 6, 'host': '@', 'type': 'mx', 'data': 'mail',
+             'ttl': 900, 'mxPriority': 20},
+        ])
+        self.assertEqual(plan['create'], [desired[2]])
+        # The SOA record is never deleted, the duplicate www record is.
+        self.assertEqual([record['id'] for record in plan['delete']], [4, 5])
+
+    def test_plan_zone_sync_no_changes(self):
+        current = fixtures.SoftLayer_Dns_Domain.getResourceRecords
+        desired = [dict(record) for record in current]
+
+        plan = dns.plan_zone_sync(current, desired)
+
+        self.assertEqual(len(plan['unchanged']), len(current))
+        self.assertEqual((plan['create'], plan['edit'], plan['delete']),
+                         ([], [], []))
+
+    def test_sync_zone(self):
+        desired = [
+            {'host': 'a', 'type': 'cname', 'data': 'd', 'ttl': 7200},
+            {'host': 'b', 'type': 'a', 'data': '2', 'ttl': 900},
+            {'host': 'g', 'type': 'a', 'data': '3', 'ttl': 900},
+        ]
+
+        plan = self.dns_client.sync_zone(12345, desired)
+
+        self.assert_called_with('SoftLayer_Dns_Domain', 'getResourceRecords',
+                                identifier=12345,
+                                mask=dns.RECORD_MASK)
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'createObjects',
+                                args=([{'domainId': 12345, 'host': 'g',
+                                        'type': 'a', 'data': '3',
+                                        'ttl': 900}],))
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'editObjects',
+                                args=([{'id': 2, 'host': 'b', 'type': 'a',
+                                        'data': '2', 'ttl': 900}],))
+        call = self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                          'deleteObjects')[0]
+        self.assertEqual([record['id'] for record in call.args[0]],
+                         [3, 4, 5, 6])
+        self.assertEqual(plan['failed'], [])
+
+    def test_sync_zone_dry_run(self):
+        plan = self.dns_client.sync_zone(12345, [], dry_run=True)
+
+        self.assertEqual(len(plan['delete']), 6)
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'deleteObjects'),
+            [])
+
+    def test_sync_zone_failure(self):
+        error = SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'no')
+        delete_objects = self.set_mock('SoftLayer_Dns_Domain_ResourceRecord',
+                                       'deleteObjects')
+        delete_objects.side_effect = error
+
+        plan = self.dns_client.sync_zone(12345, [], batch_size=4)
+
+        self.assertEqual(len(self.calls('SoftLayer_Dns_Domain_ResourceRecord',
+                                        'deleteObjects')), 2)
+        self.assertEqual(len(plan['failed']), 6)
+        self.assertEqual(plan['failed'][0]['action'], 'delete')
+        self.assertEqual(plan['failed'][0]['error'], error)
+
+    def test_sync_instance_records(self):
+        instances = [
+            {'id': 1, 'hostname': 'web1', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web1.example.com',
+             'primaryIpAddress': '10.0.0.5'},
+            {'id': 2, 'hostname': 'b', 'domain': 'Example.com',
+             'fullyQualifiedDomainName': 'b.example.com',
+             'primaryIpAddress': '10.0.0.6'},
+        ]
+
+        changes = self.dns_client.sync_instance_records(instances)
+
+        self.assertEqual(len(self.calls('SoftLayer_Account', 'getDomains')),
+                         1)
+        self.assertEqual(len(self.calls('SoftLayer_Dns_Domain',
+                                        'getResourceRecords')), 2)
+        self.assert_called_with('SoftLayer_Dns_Domain', 'getResourceRecords',
+                                identifier=123456)
+        self.assert_called_with('SoftLayer_Virtual_Guest',
+                                'getReverseDomainRecords',
+                                identifier=1)
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'getReverseDomainRecords')), 1)
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'createObjects',
+                                args=([{'domainId': 12345, 'host': 'web1',
+                                        'type': 'a', 'data': '10.0.0.5',
+                                        'ttl': 7200}],))
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'createObjects',
+                                args=([{'domainId': 123456, 'host': '5',
+                                        'type': 'ptr',
+                                        'data': 'web1.example.com',
+                                        'ttl': 7200},
+                                       {'domainId': 123456, 'host': '6',
+                                        'type': 'ptr',
+                                        'data': 'b.example.com',
+                                        'ttl': 7200}],))
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'editObjects',
+                                args=([{'id': 2, 'host': 'b', 'type': 'a',
+                                        'data': '10.0.0.6', 'ttl': 7200}],))
+        self.assertEqual(
+            [(change['instance']['id'], change['type'], change['action'],
+              change['success']) for change in changes],
+            [(1, 'a', 'create', True),
+             (2, 'a', 'edit', True),
+             (1, 'ptr', 'create', True),
+             (2, 'ptr', 'create', True)])
+
+    def test_sync_instance_records_ptr_whole_domain(self):
+        mock = self.set_mock('SoftLayer_Dns_Domain', 'getResourceRecords')
+        mock.return_value = [{'id': 9, 'host': '6', 'type': 'ptr',
+                              'data': 'old.example.com', 'ttl': 7200}]
+        instances = [
+            {'id': 1, 'hostname': 'web1', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web1.example.com',
+             'primaryIpAddress': '10.0.0.5'},
+            {'id': 2, 'hostname': 'b', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'b.example.com',
+             'primaryIpAddress': '10.0.0.6'},
+        ]
+
+        changes = self.dns_client.sync_instance_records(instances,
+                                                        a_record=False)
+
+        self.assertEqual([(change['instance']['id'], change['action'])
+                          for change in changes],
+                         [(1, 'create'), (2, 'edit')])
+        self.assert_called_with('SoftLayer_Dns_Domain_ResourceRecord',
+                                'editObjects',
+                                args=([{'id': 9, 'host': '6', 'type': 'ptr',
+                                        'data': 'b.example.com',
+                                        'ttl': 7200}],))
+
+    def test_sync_instance_records_errors(self):
+        instances = [
+            {'id': 1, 'hostname': 'web1', 'domain': 'unknown.com',
+             'fullyQualifiedDomainName': 'web1.unknown.com',
+             'primaryIpAddress': '10.0.0.5'},
+            {'id': 2, 'hostname': 'web2', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web2.example.com',
+             'primaryIpAddress': None},
+        ]
+
+        changes = self.dns_client.sync_instance_records(instances, ptr=False)
+
+        self.assertEqual([(change['instance']['id'], change['action'],
+                           change['success']) for change in changes],
+                         [(2, 'error', False), (1, 'error', False)])
+        self.assertEqual(changes[1]['error'], 'No zone found for unknown.com')
+        self.assertEqual(self.calls('SoftLayer_Dns_Domain',
+                                    'getResourceRecords'), [])
+
+    def test_sync_instance_records_unchanged(self):
+        instances = [
+            {'id': 2, 'hostname': 'b', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'b.example.com',
+             'primaryIpAddress': '1'},
+        ]
+
+        changes = self.dns_client.sync_instance_records(instances, ttl=900,
+                                                        ptr=False)
+
+        self.assertEqual(changes[0]['action'], 'unchanged')
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'editObjects'),
+            [])
+
+    def test_sync_instance_records_dry_run(self):
+        instances = [
+            {'id': 1, 'hostname': 'web1', 'domain': 'example.com',
+             'fullyQualifiedDomainName': 'web1.example.com',
+             'primaryIpAddress': '10.0.0.5'},
+        ]
+
+        changes = self.dns_client.sync_instance_records(instances,
+                                                        dry_run=True)
+
+        self.assertEqual([change['action'] for change in changes],
+                         ['create', 'create'])
+        self.assertEqual(
+            self.calls('SoftLayer_Dns_Domain_ResourceRecord', 'createObjects'),
+            [])
+
     def test_delete_record(self):
         self.dns_client.delete_record(1)
 
@@ -288,3 +288,100 @@ class FirewallTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Network_Firewall_Update_Request',
                                 'createObject',
                                 args=args)
+
+    def test_sync_rules_unchanged(self):
+        rules = fixtures.SoftLayer_Network_Vlan_Firewall.getRules
+
+        result = self.firewall.sync_rules(1234, rules, dedicated=True,
+                                          compact=False)
+
+        self.assertFalse(result['changed'])
+        self.assertIsNone(result['request'])
+        self.assert_called_with('SoftLayer_Network_Vlan_Firewall', 'getRules',
+                                identifier=1234)
+        self.assertEqual(
+            self.calls('SoftLayer_Network_Firewall_Update_Request',
+                       'createObject'), [])
+
+    def test_sync_rules(self):
+        rules = fixtures.SoftLayer_Network_Component_Firewall.getRules
+
+        result = self.firewall.sync_rules(1234, rules)
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(len(result['rules']), 2)
+        self.assertEqual([rule['orderValue'] for rule in result['removed']],
+                         [1])
+        self.assert_called_with('SoftLayer_Network_Firewall_Update_Request',
+                                'createObject',
+                                args=({'networkComponentFirewallId': 1234,
+                                       'rules': result['rules']},))
+
+    def test_sync_rules_dry_run(self):
+        rules = fixtures.SoftLayer_Network_Component_Firewall.getRules
+
+        result = self.firewall.sync_rules(1234, rules, dry_run=True)
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(
+            self.calls('SoftLayer_Network_Firewall_Update_Request',
+                       'createObject'), [])
+
+    def test_list_firewalls(self):
+        firewalls = self.firewall.list_firewalls()
+
+        self.assertEqual(firewalls, [
+            {'type': 'vlan', 'id': 1234, 'vlan_id': 1, 'server_id': None,
+             'features': ['HA']},
+            {'type': 'vs', 'id': 1234, 'vlan_id': 2, 'server_id': 1,
+             'features': []},
+            {'type': 'server', 'id': 1234, 'vlan_id': 2, 'server_id': 1,
+             'features': []},
+        ])
+        calls = self.calls('SoftLayer_Account', 'getNetworkVlans')
+        filters = [call.filter for call in calls]
+        self.assertEqual(len(filters), 3)
+        for expected in [
+            {'networkVlans': {'dedicatedFirewallFlag': {'operation': 1}}},
+            {'networkVlans': {'firewallGuestNetworkComponents': {
+                'id': {'operation': 'not null'}}}},
+            {'networkVlans': {'firewallNetworkComponents': {
+                'id': {'operation': 'not null'}}}}]:
+            self.assertIn(expected, filters)
+        for call in calls:
+            self.assertNotIn('firewallRules', call.mask)
+
+    def test_list_firewalls_skips_no_edit(self):
+        mock = self.set_mock('SoftLayer_Account', 'getNetworkVlans')
+        mock.return_value = [{
+            'id': 2,
+            'dedicatedFirewallFlag': False,
+            'firewallGuestNetworkComponents': [
+                {'id': 1, 'status': 'no_edit',
+                 'guestNetworkComponent': {'guest': {'id': 10}}},
+                {'id': 2, 'status': 'ok',
+                 'guestNetworkComponent': {'guest': {'id': 11}}}],
+        }]
+
+        firewalls = self.firewall.list_firewalls()
+
+        self.assertEqual([(firewall['type'], firewall['id'])
+                          for firewall in firewalls], [('vs', 2)])
+
+    def test_get_rule_sets(self):
+        error = SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'no')
+        mock = self.set_mock('SoftLayer_Network_Component_Firewall',
+                             'getRules')
+        mock.side_effect = error
+
+        rule_sets = self.firewall.get_rule_sets([{'type': 'vlan', 'id': 1},
+                                                 {'type': 'vs', 'id': 2}])
+
+        self.assertEqual(rule_sets[0]['rules'],
+                         fixtures.SoftLayer_Network_Vlan_Firewall.getRules)
+        self.assertIsNone(rule_sets[0]['error'])
+        self.assertEqual(rule_sets[1]['error'], error)
+        self.assert_called_with('SoftLayer_Network_Vlan_Firewall', 'getRules',
+                                identifier=1)
+        self.assert_called_with('SoftLayer_Network_Component_Firewall',
+                                'getRules', identifier=2)
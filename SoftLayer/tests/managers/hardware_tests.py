@@ -102,6 +102,34 @@ class HardwareTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Hardware_Server', 'getObject',
                                 identifier=1000)
 
+    def test_get_hardware_details(self):
+        results = self.hardware.get_hardware_details([1000, 1001])
+
+        self.assertEqual([result['id'] for result in results], [1000, 1001])
+        self.assertEqual(results[0]['hardware'],
+                         fixtures.SoftLayer_Hardware_Server.getObject)
+        self.assertEqual(results[0]['ptr_records'], ['2.0.1.10.in-addr.arpa'])
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(len(self.calls('SoftLayer_Hardware_Server',
+                                        'getObject')), 2)
+        self.assertEqual(len(self.calls('SoftLayer_Hardware_Server',
+                                        'getReverseDomainRecords')), 2)
+
+    def test_get_hardware_details_ptr_errors(self):
+        ptr = self.set_mock('SoftLayer_Hardware_Server',
+                            'getReverseDomainRecords')
+        ptr.side_effect = [
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'No PTRs'),
+            IOError('Connection reset'),
+        ]
+
+        results = self.hardware.get_hardware_details([1000, 1001],
+                                                     max_workers=1)
+
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(results[0]['ptr_records'], [])
+        self.assertIsInstance(results[1]['error'], IOError)
+
     def test_reload(self):
         post_uri = 'http://test.sftlyr.ws/test.sh'
         result = self.hardware.reload(1, post_uri=post_uri, ssh_keys=[1701])
@@ -4,8 +4,14 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import os
+import shutil
+import tempfile
+
+import mock
 
 import SoftLayer
+from SoftLayer.managers import image
 from SoftLayer import testing
 
 IMAGE_SERVICE = 'SoftLayer_Virtual_Guest_Block_Device_Template_Group'
@@ -79,7 +85,7 @@ class ImageTests(testing.TestCase):
 
     def test_resolve_ids_name_public(self):
         public_mock = self.set_mock(IMAGE_SERVICE, 'getPublicImages')
-        public_mock.return_value = [{'id': 100}]
+        public_mock.return_value = [{'id': 100, 'name': 'image_name'}]
         private_mock = self.set_mock('SoftLayer_Account',
                                      'getPrivateBlockDeviceTemplateGroups')
         private_mock.return_value = []
@@ -88,13 +94,16 @@ class ImageTests(testing.TestCase):
 
         result = self.image.resolve_ids('image_name')
         self.assertEqual([100], result)
+        # Found in the public images, so private ones aren't fetched
+        self.assertEqual(private_mock.call_count, 0)
 
     def test_resolve_ids_name_private(self):
         public_mock = self.set_mock(IMAGE_SERVICE, 'getPublicImages')
         public_mock.return_value = []
         private_mock = self.set_mock('SoftLayer_Account',
                                      'getPrivateBlockDeviceTemplateGroups')
-        private_mock.return_value = [{'id': 100}]
+        private_mock.return_value = [{'id': 100,
+                                      'name': 'private_image_name'}]
 
         result = self.image.resolve_ids('private_image_name')
         self.assertEqual([100], result)
@@ -141,3 +150,260 @@ class ImageTests(testing.TestCase):
                                 args=({'name': 'test_image',
                                        'note': 'testimage',
                                        'uri': 'invaliduri'},))
+
+    def test_resolve_ids_cached(self):
+        self.image.resolve_ids('test_image2')
+        SoftLayer.ImageManager(self.client).resolve_ids('test_image')
+
+        self.assert_called_with(IMAGE_SERVICE, 'getPublicImages',
+                                mask=image.IMAGE_INDEX_MASK)
+        self.assertEqual(len(self.calls(IMAGE_SERVICE, 'getPublicImages')), 1)
+
+    def test_resolve_ids_new_private_image(self):
+        private_mock = self.set_mock('SoftLayer_Account',
+                                     'getPrivateBlockDeviceTemplateGroups')
+        private_mock.return_value = [{'id': 100, 'name': 'private_image'}]
+        self.assertEqual(self.image.resolve_ids('private_image'), [100])
+
+        private_mock.return_value = [{'id': 100, 'name': 'private_image'},
+                                     {'id': 101, 'name': 'captured_image'}]
+
+        self.assertEqual(self.image.resolve_ids('captured_image'), [101])
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+
+    def test_delete_image_invalidates_private(self):
+        self.image.resolve_ids('private_image')
+        self.image.delete_image(100)
+        self.image.resolve_ids('private_image')
+
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+
+    @mock.patch('time.sleep')
+    def test_distribute_image(self, sleep):
+        lon02 = {'id': 3, 'datacenter': {'id': 358694, 'name': 'lon02'}}
+        dal05 = {'id': 4, 'datacenter': {'id': 0, 'name': 'dal05'}}
+        sjc01 = {'id': 5, 'datacenter': {'id': 168642, 'name': 'sjc01'},
+                 'status': {'keyName': 'ACTIVE'}}
+        cloning = {'id': 7, 'transactionStatus': {'name': 'CLONING'}}
+        get_object = self.set_mock(IMAGE_SERVICE, 'getObject')
+        get_object.side_effect = [
+            {'id': 100, 'transaction': {'id': 6}, 'children': [lon02]},
+            {'id': 100, 'children': [lon02]},
+            {'id': 100, 'children': [lon02, dict(dal05, transaction=cloning)]},
+            {'id': 100, 'children': [lon02, dal05, sjc01]},
+        ]
+
+        events = list(self.image.distribute_image(
+            100, ['dal05', 'San Jose 1', 'lon02', 'DAL05'], interval=5))
+
+        self.assertEqual([(event['datacenter'], event['state'],
+                           event['detail']) for event in events], [
+            (None, 'importing', 'transaction 6'),
+            ('dal05', 'copying', 'waiting to start'),
+            ('sjc01', 'copying', 'waiting to start'),
+            ('lon02', 'ready', ''),
+            ('dal05', 'copying', 'CLONING'),
+            ('dal05', 'ready', ''),
+            ('sjc01', 'ready', ''),
+        ])
+        self.assertEqual(
+            sorted(call.args[0][0]['id'] for call
+                   in self.calls(IMAGE_SERVICE, 'addLocations')),
+            [0, 168642])
+        self.assert_called_with(IMAGE_SERVICE, 'getObject', identifier=100,
+                                mask=image.DISTRIBUTION_MASK)
+        sleep.assert_called_with(5)
+
+    @mock.patch('time.sleep')
+    def test_distribute_image_copy_not_started(self, _):
+        dal05 = {'id': 4, 'datacenter': {'id': 0, 'name': 'dal05'}}
+        cloning = {'id': 7, 'transactionStatus': {'name': 'CLONING'}}
+        get_object = self.set_mock(IMAGE_SERVICE, 'getObject')
+        get_object.side_effect = [
+            {'id': 100, 'children': []},
+            # The copy shows up before its transaction is attached
+            {'id': 100, 'children': [dal05]},
+            {'id': 100, 'children': [dict(dal05, transaction=cloning)]},
+            {'id': 100, 'children': [dal05]},
+        ]
+
+        events = list(self.image.distribute_image(100, ['dal05']))
+
+        self.assertEqual([(event['state'], event['detail'])
+                          for event in events],
+                         [('copying', 'waiting to start'),
+                          ('copying', 'CLONING'),
+                          ('ready', '')])
+
+    @mock.patch('time.sleep')
+    def test_distribute_image_failures(self, _):
+        get_object = self.set_mock(IMAGE_SERVICE, 'getObject')
+        get_object.return_value = {'id': 100, 'children': []}
+        add_locations = self.set_mock(IMAGE_SERVICE, 'addLocations')
+        add_locations.side_effect = [
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'No space'),
+            True,
+        ]
+
+        events = list(self.image.distribute_image(100, ['dal05', 'sjc01'],
+                                                  max_workers=1,
+                                                  timeout=0))
+
+        self.assertEqual([(event['datacenter'], event['state'])
+                          for event in events],
+                         [('dal05', 'failed'),
+                          ('sjc01', 'copying'),
+                          ('sjc01', 'timeout')])
+        self.assertIn('No space', events[0]['detail'])
+
+    def test_distribute_image_unknown_datacenter(self):
+        self.assertRaises(SoftLayer.SoftLayerError, list,
+                          self.image.distribute_image(100, ['foo01']))
+        self.assertEqual(self.calls(IMAGE_SERVICE, 'addLocations'), [])
+
+
+class ImageIndexTests(testing.TestCase):
+
+    def set_up(self):
+        self.public = [
+            {'id': 1, 'name': 'CentOS 6 64 bit'},
+            {'id': 2, 'name': 'CentOS 7 64 bit'},
+            {'id': 3, 'name': 'Ubuntu 14.04 64 bit'},
+            {'id': 4, 'name': 'Windows 2012 Standard'},
+            {'id': 5, 'name': 'centos 6 64 BIT '},
+        ]
+        self.private = [
+            {'id': 10, 'name': 'web-server'},
+            {'id': 11, 'name': 'db-server'},
+        ]
+        self.set_mock(IMAGE_SERVICE,
+                      'getPublicImages').return_value = self.public
+        self.set_mock('SoftLayer_Account',
+                      'getPrivateBlockDeviceTemplateGroups'
+                      ).return_value = self.private
+        self.index = image.ImageIndex(self.client)
+
+    def _ids(self, images):
+        return [found['id'] for found in images]
+
+    def test_find_exact(self):
+        self.assertEqual(self._ids(self.index.find('centos 6 64 bit')),
+                         [1, 5])
+        self.assertEqual(self.index.find('CentOS 6'), [])
+
+    def test_find_prefix(self):
+        self.assertEqual(self._ids(self.index.find('centos*')), [1, 2, 5])
+
+    def test_find_suffix(self):
+        self.assertEqual(self._ids(self.index.find('*-server')), [10, 11])
+        self.assertEqual(self._ids(self.index.find('*64 bit')), [1, 2, 3, 5])
+
+    def test_find_substring(self):
+        self.assertEqual(self._ids(self.index.find('*7 6*')), [2])
+        self.assertEqual(self._ids(self.index.find('*b*')),
+                         [1, 2, 3, 5, 10, 11])
+
+    def test_find_visibility(self):
+        self.assertEqual(self.index.find('web-server', visibility='public'),
+                         [])
+        self.assertEqual(self.calls('SoftLayer_Account',
+                                    'getPrivateBlockDeviceTemplateGroups'),
+                         [])
+        self.assertRaises(ValueError,
+                          self.index.find, 'web-server', visibility='shared')
+
+    def test_find_many(self):
+        found = self.index.find_many(['web-server', 'db*', 'missing'])
+
+        self.assertEqual(self._ids(found['web-server']), [10])
+        self.assertEqual(self._ids(found['db*']), [11])
+        self.assertEqual(found['missing'], [])
+        self.assertEqual(len(self.calls(IMAGE_SERVICE, 'getPublicImages')), 1)
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 1)
+
+    def test_suggest(self):
+        # The closest match comes first
+        self.assertEqual(self._ids(self.index.suggest('webserver')),
+                         [10, 11])
+        self.assertEqual(self._ids(self.index.suggest('ubunto 14.04',
+                                                      limit=1)), [3])
+        self.assertEqual(self.index.suggest('zzzz'), [])
+
+    def test_find_refresh(self):
+        self.assertEqual(self._ids(self.index.find('web-server')), [10])
+        self.private.append({'id': 12, 'name': 'new-server'})
+
+        self.assertEqual(self.index.find('new-server'), [])
+        self.assertEqual(self._ids(self.index.find('web-server',
+                                                   refresh=True)), [10])
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 1)
+
+        self.assertEqual(self._ids(self.index.find('new-server',
+                                                   refresh=True)), [12])
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+
+    def test_find_refresh_fetched(self):
+        self.assertEqual(self.index.find('missing', refresh=True), [])
+        self.assertEqual(len(self.calls(IMAGE_SERVICE, 'getPublicImages')), 1)
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 1)
+
+    @mock.patch('time.time')
+    def test_ttls(self, now):
+        now.return_value = 1000
+        self.index.find('centos*')
+
+        now.return_value = 1000 + image.PRIVATE_IMAGE_TTL
+        self.index.find('centos*')
+
+        self.assertEqual(len(self.calls(IMAGE_SERVICE, 'getPublicImages')), 1)
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+
+    def test_disk_cache(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, 'images')
+        self.client.auth = SoftLayer.BasicAuthentication('user', 'api_key')
+
+        image.ImageIndex(self.client, path=path).find('centos*')
+        index = image.ImageIndex(self.client, path=path)
+
+        self.assertEqual(self._ids(index.find('web*')), [10])
+        self.assertEqual(len(self.calls(IMAGE_SERVICE, 'getPublicImages')), 1)
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 1)
+
+        # Private images aren't shared with other users
+        self.client.auth = SoftLayer.BasicAuthentication('other', 'api_key')
+        image.ImageIndex(self.client, path=path).find('web*')
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+
+    def test_invalidate_disk_cache(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, 'images')
+        self.client.auth = SoftLayer.BasicAuthentication('user', 'api_key')
+        index = image.ImageIndex(self.client, path=path)
+        self.assertEqual(self._ids(index.find('web-server')), [10])
+
+        self.private[0] = {'id': 10, 'name': 'new-server'}
+        index.invalidate('private')
+
+        self.assertEqual(self._ids(index.find('new-server')), [10])
+        self.assertEqual(index.find('web-server'), [])
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+        # Public images are still saved
+        self.assertEqual(len(self.calls(IMAGE_SERVICE, 'getPublicImages')), 1)
+        # And so is the private image's new name, for other processes
+        other = image.ImageIndex(self.client, path=path)
+        self.assertEqual(self._ids(other.find('new-server')), [10])
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
@@ -0,0 +1,133 @@
+"""
+    SoftLayer.tests.managers.inventory_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import SoftLayer
+from SoftLayer.managers import inventory
+from SoftLayer import testing
+
+
+class InventoryTableTests(testing.TestCase):
+
+    def set_up(self):
+        self.table = inventory.InventoryTable('guests',
+                                              ['hostname', 'datacenter.name'])
+        self.table.load([
+            {'id': 1, 'hostname': 'web1', 'datacenter': {'name': 'dal05'}},
+            {'id': 2, 'hostname': 'web2', 'datacenter': {'name': 'dal05'}},
+            {'id': 3, 'hostname': 'db1', 'datacenter': {'name': 'sjc01'}},
+        ])
+
+    def test_find_indexed(self):
+        rows = self.table.find('datacenter.name', 'dal05')
+        self.assertEqual(sorted(row['id'] for row in rows), [1, 2])
+        self.assertEqual(self.table.find('hostname', 'nope'), [])
+
+    def test_find_not_indexed(self):
+        rows = self.table.find('id', 3)
+        self.assertEqual([row['hostname'] for row in rows], ['db1'])
+
+    def test_upsert_updates_indexes(self):
+        self.table.upsert({'id': 2, 'hostname': 'web2',
+                           'datacenter': {'name': 'sjc01'}})
+
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual([row['id'] for row in
+                          self.table.find('datacenter.name', 'dal05')], [1])
+        self.assertEqual(sorted(row['id'] for row in
+                                self.table.find('datacenter.name', 'sjc01')),
+                         [2, 3])
+
+    def test_retain(self):
+        self.table.retain([1, 3])
+
+        self.assertNotIn(2, self.table)
+        self.assertEqual(self.table.find('hostname', 'web2'), [])
+        self.assertEqual(len(self.table), 2)
+
+    def test_select(self):
+        rows = self.table.select(lambda row: row['hostname'].startswith('w'))
+        self.assertEqual(sorted(row['id'] for row in rows), [1, 2])
+        self.assertEqual(len(self.table.select()), 3)
+
+
+class InventorySnapshotTests(testing.TestCase):
+
+    def set_up(self):
+        self.snapshot = SoftLayer.InventorySnapshot(self.client)
+
+    def test_load(self):
+        self.snapshot.load()
+
+        self.assertEqual(len(self.snapshot['guests']), 2)
+        self.assertEqual(
+            [row['id'] for row in
+             self.snapshot['guests'].find('hostname', 'vs-test1')], [100])
+        self.assertEqual(len(self.snapshot['vlans']), 3)
+        self.assertEqual(sorted(row['id'] for row in
+                                self.snapshot['firewalls']), [1, 2])
+        self.assertEqual(len(self.calls('SoftLayer_Account',
+                                        'getVirtualGuests')), 1)
+        self.assertEqual(len(self.calls('SoftLayer_Account',
+                                        'getNetworkVlans')), 1)
+
+    def test_query(self):
+        self.snapshot.load()
+
+        rows = self.snapshot['guests'].query(
+            {'virtualGuests': {'hostname': {'operation': '$= test2'}}})
+
+        self.assertEqual([row['id'] for row in rows], [104])
+
+    def test_refresh_incremental(self):
+        guests = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        guests.return_value = [
+            {'id': 100, 'hostname': 'a', 'modifyDate': '2014-03-21T14:07:07'},
+            {'id': 104, 'hostname': 'b', 'modifyDate': '2014-03-20T10:00:00'},
+        ]
+        self.snapshot.load()
+
+        def _changed(call):
+            if call.mask == 'mask[id]':
+                return [{'id': 100}, {'id': 105}]
+            return [{'id': 105, 'hostname': 'c',
+                     'modifyDate': '2014-03-22T09:00:00'}]
+
+        guests.side_effect = _changed
+        self.snapshot.refresh()
+
+        table = self.snapshot['guests']
+        self.assertEqual(sorted(row['id'] for row in table), [100, 105])
+        self.assertEqual(table.find('hostname', 'c')[0]['id'], 105)
+        self.assertEqual(self.snapshot.high_water['guests'],
+                         '2014-03-22T09:00:00')
+        self.assert_called_with(
+            'SoftLayer_Account', 'getVirtualGuests',
+            filter={'virtualGuests': {'modifyDate': {
+                'operation': 'greaterThanDate',
+                'options': [{'name': 'date',
+                             'value': ['03/21/2014 14:07:06']}]}}})
+
+    def test_refresh_without_load(self):
+        self.snapshot.refresh()
+
+        self.assertEqual(len(self.snapshot['guests']), 2)
+        self.assertEqual(self.calls('SoftLayer_Account', 'getVirtualGuests',
+                                    )[0].filter, None)
+
+    def test_load_selected_tables(self):
+        snapshot = SoftLayer.InventorySnapshot(self.client,
+                                               tables=['subnets'])
+        snapshot.load()
+
+        self.assertEqual(self.calls('SoftLayer_Account', 'getVirtualGuests'),
+                         [])
+        self.assertEqual(len(snapshot['firewalls']), 0)
+
+    def test_load_error(self):
+        self.set_mock('SoftLayer_Account', 'getHardware').side_effect = (
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'error'))
+
+        self.assertRaises(SoftLayer.SoftLayerAPIError, self.snapshot.load)
@@ -4,8 +4,10 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import datetime
 
 import SoftLayer
+from SoftLayer.managers import iscsi
 from SoftLayer import testing
 from SoftLayer.testing import fixtures
 
@@ -120,3 +122,151 @@ class ISCSITests(testing.TestCase):
                                 'restoreFromSnapshot',
                                 args=(101,),
                                 identifier=100)
+
+    def test_list_volume_snapshots(self):
+        result = self.iscsi.list_volume_snapshots()
+
+        self.assertEqual([volume['id'] for volume in result], [100, 200])
+        self.assert_called_with(
+            'SoftLayer_Account', 'getIscsiNetworkStorage',
+            mask='mask[%s]' % iscsi.SNAPSHOT_ROTATION_MASK)
+
+    def test_plan_snapshot_rotation(self):
+        policy = iscsi.SnapshotPolicy(interval=23, keep=2)
+
+        plan = self.iscsi.plan_snapshot_rotation(
+            policy, volume_ids=['100'],
+            now=datetime.datetime(2014, 3, 21, 12))
+
+        self.assertEqual([(operation['action'], operation['snapshot_id'])
+                          for operation in plan],
+                         [('delete', 103), ('delete', 104), ('delete', 105)])
+
+    def test_plan_snapshot_rotation_other_notes(self):
+        policy = iscsi.SnapshotPolicy(interval=23, keep=2)
+
+        plan = self.iscsi.plan_snapshot_rotation(
+            policy, volume_ids=['100'], notes='nightly',
+            now=datetime.datetime(2014, 3, 21, 12))
+
+        self.assertEqual([(operation['action'], operation['snapshot_id'])
+                          for operation in plan],
+                         [('create', None)])
+
+    def test_plan_snapshot_rotation_all_snapshots(self):
+        policy = iscsi.SnapshotPolicy(interval=23, keep=2)
+
+        plan = self.iscsi.plan_snapshot_rotation(
+            policy, volume_ids=['100'], all_snapshots=True,
+            now=datetime.datetime(2014, 3, 21, 12))
+
+        self.assertEqual([(operation['action'], operation['snapshot_id'])
+                          for operation in plan],
+                         [('delete', 103), ('delete', 104), ('delete', 105),
+                          ('delete', 106)])
+
+    def test_plan_snapshot_rotation_create(self):
+        policy = iscsi.SnapshotPolicy(interval=23, keep=2)
+
+        plan = self.iscsi.plan_snapshot_rotation(
+            policy, now=datetime.datetime(2014, 3, 22, 12))
+
+        self.assertEqual([(operation['action'], operation['volume_id'],
+                           operation['snapshot_id']) for operation in plan],
+                         [('create', 100, None),
+                          ('create', 200, None),
+                          ('delete', 100, 102),
+                          ('delete', 100, 103),
+                          ('delete', 100, 104),
+                          ('delete', 100, 105)])
+
+    def test_run_snapshot_plan(self):
+        policy = iscsi.SnapshotPolicy(interval=23, keep=2)
+        plan = self.iscsi.plan_snapshot_rotation(
+            policy, now=datetime.datetime(2014, 3, 22, 12))
+
+        results = list(self.iscsi.run_snapshot_plan(plan, max_workers=2))
+
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(
+            sorted(call.identifier for call in self.calls(
+                'SoftLayer_Network_Storage_Iscsi', 'createSnapshot')),
+            [100, 200])
+        self.assert_called_with('SoftLayer_Network_Storage_Iscsi',
+                                'createSnapshot',
+                                args=(iscsi.ROTATION_NOTES,))
+        self.assertEqual(
+            sorted(call.identifier for call in self.calls(
+                'SoftLayer_Network_Storage_Iscsi', 'deleteObject')),
+            [102, 103, 104, 105])
+
+    def test_run_snapshot_plan_failed_create(self):
+        mock = self.set_mock('SoftLayer_Network_Storage_Iscsi',
+                             'createSnapshot')
+        mock.side_effect = SoftLayer.SoftLayerAPIError('SoftLayer_Exception',
+                                                       'No snapshot space')
+        plan = self.iscsi.plan_snapshot_rotation(
+            iscsi.SnapshotPolicy(interval=23, keep=2), volume_ids=[100],
+            now=datetime.datetime(2014, 3, 22, 12))
+
+        results = list(self.iscsi.run_snapshot_plan(plan))
+
+        self.assertFalse(any(result['success'] for result in results))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.calls('SoftLayer_Network_Storage_Iscsi',
+                                    'deleteObject'), [])
+
+
+class SnapshotPolicyTests(testing.TestCase):
+
+    def set_up(self):
+        volumes = fixtures.SoftLayer_Account.getIscsiNetworkStorage
+        self.snapshots = [snapshot for snapshot in volumes[0]['snapshots']
+                          if snapshot['notes'] == iscsi.ROTATION_NOTES]
+        self.now = datetime.datetime(2014, 3, 21, 12)
+
+    def _deleted(self, policy, now=None):
+        create, deletes = policy.plan(self.snapshots, now or self.now)
+        return create, [snapshot['id'] for snapshot, _ in deletes]
+
+    def test_keep(self):
+        self.assertEqual(self._deleted(iscsi.SnapshotPolicy(keep=3)),
+                         (False, [104, 105]))
+
+    def test_daily(self):
+        self.assertEqual(self._deleted(iscsi.SnapshotPolicy(keep=1,
+                                                            daily=3)),
+                         (False, [104, 105]))
+
+    def test_weekly(self):
+        self.assertEqual(self._deleted(iscsi.SnapshotPolicy(keep=1,
+                                                            weekly=2)),
+                         (False, [102, 103, 105]))
+
+    def test_new_snapshot_counts_as_newest(self):
+        policy = iscsi.SnapshotPolicy(interval=24, keep=3)
+
+        self.assertEqual(
+            self._deleted(policy, now=datetime.datetime(2014, 3, 22, 12)),
+            (True, [103, 104, 105]))
+
+    def test_interval_uses_utc(self):
+        # The newest snapshot was created at 06:00 UTC
+        policy = iscsi.SnapshotPolicy(interval=6, keep=10)
+
+        self.assertEqual(
+            self._deleted(policy, now=datetime.datetime(2014, 3, 21, 11)),
+            (False, []))
+        self.assertEqual(
+            self._deleted(policy, now=datetime.datetime(2014, 3, 21, 12)),
+            (True, []))
+
+    def test_undated_snapshots_kept(self):
+        self.snapshots = [{'id': 1, 'createDate': ''},
+                          {'id': 2, 'createDate': '2014-03-21T01:00:00Z'}]
+
+        self.assertEqual(self._deleted(iscsi.SnapshotPolicy(keep=1)),
+                         (False, []))
+
+    def test_keeps_nothing(self):
+        self.assertRaises(ValueError, iscsi.SnapshotPolicy, interval=24)
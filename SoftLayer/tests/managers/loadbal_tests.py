@@ -4,11 +4,21 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import copy
+
+import mock
+
 import SoftLayer
 from SoftLayer import testing
+from SoftLayer.testing.fixtures import \
+    SoftLayer_Network_Application_Delivery_Controller_LoadBalancer_VirtualIpAddress as VIRT_IP_FIXTURE  # noqa
 
 VIRT_IP_SERVICE = ('SoftLayer_Network_Application_Delivery_Controller_'
                    'LoadBalancer_VirtualIpAddress')
+SERVICE = ('SoftLayer_Network_Application_Delivery_Controller_'
+           'LoadBalancer_Service')
+# add_service appends to the fixture, so keep a copy of the original
+LOAD_BALANCER = copy.deepcopy(VIRT_IP_FIXTURE.getObject)
 
 
 class LoadBalancerTests(testing.TestCase):
@@ -51,7 +61,7 @@ class LoadBalancerTests(testing.TestCase):
         id1 = self.lb_mgr._get_location('sjc01')
         self.assertEqual(id1, 168642)
 
-        id2 = self.lb_mgr._get_location('dal05')
+        id2 = self.lb_mgr._get_location('foo01')
         self.assertEqual(id2, 'FIRST_AVAILABLE')
 
     def test_get_routing_types(self):
@@ -95,11 +105,9 @@ class LoadBalancerTests(testing.TestCase):
         result = self.lb_mgr.get_local_lb(22348)
 
         self.assertEqual(result['id'], 22348)
-        mask = ('loadBalancerHardware[datacenter], '
-                'ipAddress, virtualServers[serviceGroups'
-                '[routingMethod,routingType,services'
-                '[healthChecks[type], groupReferences,'
-                ' ipAddress]]]')
+        mask = ('mask[ipAddress,loadBalancerHardware[datacenter],'
+                'virtualServers[serviceGroups[routingMethod,routingType,'
+                'services[groupReferences,healthChecks[type],ipAddress]]]]')
         self.assert_called_with(VIRT_IP_SERVICE, 'getObject',
                                 identifier=22348,
                                 mask=mask)
@@ -207,3 +215,176 @@ class LoadBalancerTests(testing.TestCase):
                    'LoadBalancer_Service_Group')
         self.assert_called_with(service, 'kickAllConnections',
                                 identifier=51758)
+
+    def _mock_load_balancer(self):
+        mock = self.set_mock(VIRT_IP_SERVICE, 'getObject')
+        mock.return_value = copy.deepcopy(LOAD_BALANCER)
+
+    def test_apply_service_changes(self):
+        self._mock_load_balancer()
+        changes = [
+            {'action': 'add', 'group_id': 50718, 'ip_address': '10.0.1.37',
+             'port': 8081},
+            {'action': 'add', 'group_id': 50718, 'ip_address': '10.0.1.37',
+             'weight': 3},
+            {'action': 'edit', 'service_id': 1234, 'weight': 5,
+             'hc_type': 22},
+            {'action': 'toggle', 'service_id': 1234},
+            {'action': 'delete', 'service_id': 1234},
+        ]
+
+        results = self.lb_mgr.apply_service_changes(12345, changes)
+
+        self.assertEqual([result['success'] for result in results],
+                         [True] * 5)
+        self.assertEqual(results[0]['change']['ip_address_id'], 12345)
+        self.assertEqual(
+            len(self.calls('SoftLayer_Network_Subnet_IpAddress',
+                           'getByIpAddress')), 1)
+        self.assertEqual(len(self.calls(VIRT_IP_SERVICE, 'getObject')), 1)
+        self.assertEqual(len(self.calls(VIRT_IP_SERVICE, 'editObject')), 1)
+        self.assert_called_with(SERVICE, 'deleteObject', identifier=1234)
+
+        arg = self.calls(VIRT_IP_SERVICE, 'editObject')[0].args[0]
+        services = arg['virtualServers'][0]['serviceGroups'][0]['services']
+        self.assertEqual(len(services), 3)
+        self.assertEqual(services[0]['enabled'], 0)
+        self.assertEqual(services[0]['groupReferences'][0]['weight'], 5)
+        self.assertEqual(services[0]['healthChecks'][0]['healthCheckTypeId'],
+                         22)
+        self.assertEqual(services[1], {
+            'enabled': 1,
+            'port': 8081,
+            'ipAddressId': 12345,
+            'healthChecks': [{'healthCheckTypeId': 21}],
+            'groupReferences': [{'weight': 1}],
+        })
+        self.assertEqual(services[2]['groupReferences'], [{'weight': 3}])
+
+    def test_apply_service_changes_first_group(self):
+        load_balancer = copy.deepcopy(LOAD_BALANCER)
+        groups = load_balancer['virtualServers'][0]['serviceGroups']
+        groups.append({'id': 1, 'services': []})
+        mock = self.set_mock(VIRT_IP_SERVICE, 'getObject')
+        mock.return_value = load_balancer
+        changes = [{'action': 'add', 'group_id': 50718,
+                    'ip_address_id': 12345, 'port': 8081}]
+
+        results = self.lb_mgr.apply_service_changes(12345, changes)
+
+        self.assertTrue(results[0]['success'])
+        arg = self.calls(VIRT_IP_SERVICE, 'editObject')[0].args[0]
+        groups = arg['virtualServers'][0]['serviceGroups']
+        self.assertEqual(len(groups[0]['services']), 2)
+        self.assertEqual(groups[1]['services'], [])
+
+    def test_apply_service_changes_invalid(self):
+        self._mock_load_balancer()
+        mock = self.set_mock('SoftLayer_Network_Subnet_IpAddress',
+                             'getByIpAddress')
+        mock.return_value = {}
+        changes = [
+            {'action': 'add', 'group_id': 50718, 'ip_address': '10.9.9.9'},
+            {'action': 'add', 'group_id': 1, 'ip_address_id': 1},
+            {'action': 'edit', 'service_id': 1, 'port': 80},
+            {'action': 'delete'},
+            {'action': 'reboot', 'service_id': 1234},
+            {'action': 'edit', 'service_id': 1234, 'port': 80},
+        ]
+
+        results = self.lb_mgr.apply_service_changes(12345, changes)
+
+        self.assertEqual([result['error'] for result in results], [
+            'Unknown IP address 10.9.9.9',
+            'Unknown group 1',
+            'Unknown service 1',
+            'A service id is required to delete a service',
+            'Unknown action reboot',
+            None,
+        ])
+        self.assertEqual([result['success'] for result in results],
+                         [False] * 5 + [True])
+        self.assertEqual(self.calls(SERVICE, 'deleteObject'), [])
+
+    def test_apply_service_changes_dry_run(self):
+        self._mock_load_balancer()
+        changes = [{'action': 'toggle', 'service_id': 1234},
+                   {'action': 'delete', 'service_id': 1234}]
+
+        results = self.lb_mgr.apply_service_changes(12345, changes,
+                                                    dry_run=True)
+
+        self.assertEqual([result['success'] for result in results],
+                         [True, True])
+        self.assertEqual(self.calls(VIRT_IP_SERVICE, 'editObject'), [])
+        self.assertEqual(self.calls(SERVICE, 'deleteObject'), [])
+
+    def test_apply_service_changes_edit_error(self):
+        self._mock_load_balancer()
+        mock = self.set_mock(VIRT_IP_SERVICE, 'editObject')
+        mock.side_effect = SoftLayer.SoftLayerAPIError('SoftLayer_Exception',
+                                                       'Invalid port')
+        changes = [{'action': 'edit', 'service_id': 1234, 'port': 0},
+                   {'action': 'delete', 'service_id': 1234}]
+
+        results = self.lb_mgr.apply_service_changes(12345, changes)
+
+        self.assertEqual(results[0]['error'], 'Invalid port')
+        self.assertFalse(results[0]['success'])
+        self.assertTrue(results[1]['success'])
+
+    def test_get_service_states(self):
+        self._mock_load_balancer()
+        states = self.lb_mgr.get_service_states(12345)
+
+        self.assertEqual(states, {1234: {
+            'service_id': 1234,
+            'group_id': 50718,
+            'ip_address': None,
+            'port': 8080,
+            'enabled': True,
+            'status': 'DOWN',
+            'weight': 2,
+            'health_check': None,
+        }})
+        call = self.calls(VIRT_IP_SERVICE, 'getObject')[0]
+        self.assertEqual(call.identifier, 12345)
+        self.assertIn('services[id,', call.mask)
+
+    @mock.patch('time.sleep')
+    def test_watch_services(self, sleep):
+        def service(service_id, status='UP', **kwargs):
+            return dict({'id': service_id, 'enabled': 1, 'status': status,
+                         'port': 80,
+                         'ipAddress': {'ipAddress': '10.0.0.%d' % service_id},
+                         'groupReferences': [{'weight': 1}],
+                         'healthChecks': [{'type': {'keyname': 'HTTP'}}]},
+                        **kwargs)
+
+        def load_balancer(*services):
+            return {'virtualServers': [{'id': 5, 'serviceGroups': [
+                {'id': 6, 'services': list(services)}]}]}
+
+        mock_get = self.set_mock(VIRT_IP_SERVICE, 'getObject')
+        mock_get.side_effect = [
+            load_balancer(service(1), service(2)),
+            load_balancer(service(1), service(2)),
+            load_balancer(service(1, 'DOWN'), service(3)),
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'Timeout'),
+            load_balancer(service(1, 'DOWN'), service(3)),
+        ]
+
+        events = list(self.lb_mgr.watch_services(12345, interval=2,
+                                                 max_interval=5, polls=5))
+
+        self.assertEqual([(event['event'], event.get('service', {}).get(
+            'service_id')) for event in events], [
+            ('initial', 1), ('initial', 2),
+            ('changed', 1), ('removed', 2), ('added', 3),
+            ('error', None)])
+        self.assertEqual(events[2]['changes'],
+                         {'status': {'old': 'UP', 'new': 'DOWN'}})
+        self.assertEqual(events[5]['error'], 'Timeout')
+        self.assertIn('time', events[0])
+        self.assertEqual([call[0][0] for call in sleep.call_args_list],
+                         [2, 3.0, 2, 4])
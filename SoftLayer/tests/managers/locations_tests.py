@@ -0,0 +1,129 @@
+"""
+    SoftLayer.tests.managers.locations_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import os
+import shutil
+import tempfile
+
+import mock
+
+import SoftLayer
+from SoftLayer.managers import locations
+from SoftLayer import testing
+from SoftLayer.testing import fixtures
+
+
+class LocationRegistryTests(testing.TestCase):
+
+    def set_up(self):
+        self.registry = locations.LocationRegistry(self.client)
+
+    def test_get(self):
+        by_name = self.registry.get('sjc01')
+
+        self.assertEqual(by_name['id'], 168642)
+        self.assertIs(self.registry.get('San Jose 1'), by_name)
+        self.assertIs(self.registry.get('SJC01'), by_name)
+        self.assertIs(self.registry.get(168642), by_name)
+        self.assertIs(self.registry.get('168642'), by_name)
+        self.assertIsNone(self.registry.get('foo01'))
+        self.assert_called_with('SoftLayer_Location_Datacenter',
+                                'getDatacenters',
+                                mask=locations.DATACENTER_MASK)
+
+    def test_get_id(self):
+        self.assertEqual(self.registry.get_id('London 2'), 358694)
+        self.assertIsNone(self.registry.get_id('foo01'))
+
+    def test_datacenters_fetched_once(self):
+        self.registry.get('sjc01')
+        self.registry.get_id('lon02')
+
+        self.assertEqual(self.registry.datacenters(),
+                         fixtures.SoftLayer_Location_Datacenter.getDatacenters)
+        self.assertEqual(len(self.calls('SoftLayer_Location_Datacenter',
+                                        'getDatacenters')), 1)
+
+    @mock.patch('time.time')
+    def test_ttl(self, now):
+        now.return_value = 1000
+        self.registry.get('sjc01')
+
+        now.return_value = 1000 + locations.LOCATION_CACHE_TTL
+        self.registry.get('sjc01')
+
+        self.assertEqual(len(self.calls('SoftLayer_Location_Datacenter',
+                                        'getDatacenters')), 2)
+
+    def test_invalidate(self):
+        self.registry.get('sjc01')
+        self.registry.invalidate()
+        self.registry.get('sjc01')
+
+        self.assertEqual(len(self.calls('SoftLayer_Location_Datacenter',
+                                        'getDatacenters')), 2)
+
+    def test_disk_cache(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, 'locations')
+
+        locations.LocationRegistry(self.client, path=path).get('sjc01')
+        registry = locations.LocationRegistry(self.client, path=path)
+
+        self.assertEqual(registry.get_id('San Jose 1'), 168642)
+        self.assertEqual(len(self.calls('SoftLayer_Location_Datacenter',
+                                        'getDatacenters')), 1)
+
+    def test_disk_cache_unreadable(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as cache_file:
+            cache_file.write('not json')
+        self.addCleanup(os.remove, cache_file.name)
+
+        registry = locations.LocationRegistry(self.client,
+                                              path=cache_file.name)
+
+        self.assertEqual(registry.get_id('sjc01'), 168642)
+
+    def test_get_region_keyname(self):
+        package = fixtures.SoftLayer_Product_Package.getAllObjects[0]
+
+        self.assertEqual(self.registry.get_region_keyname(package, 'wdc01'),
+                         'WASHINGTON_DC')
+        self.assertEqual(
+            self.registry.get_region_keyname(package, 'Washington 1'),
+            'WASHINGTON_DC')
+        self.assertEqual(self.registry.get_region_keyname(package, 37473),
+                         'WASHINGTON_DC')
+        self.assertIsNone(self.registry.get_region_keyname(package, 'sjc01'))
+
+    def test_get_region_keyname_short_name_only(self):
+        package = {'id': 1, 'regions': [{
+            'keyname': 'SAN_JOSE',
+            'location': {'location': {'name': 'sjc01'}},
+        }]}
+
+        self.assertEqual(
+            self.registry.get_region_keyname(package, 'San Jose 1'),
+            'SAN_JOSE')
+
+    def test_shared_between_managers(self):
+        registry = locations.get_location_registry(self.client)
+
+        self.assertIs(SoftLayer.ISCSIManager(self.client).locations, registry)
+        self.assertIs(SoftLayer.LoadBalancerManager(self.client).locations,
+                      registry)
+        self.assertIs(SoftLayer.HardwareManager(self.client).locations,
+                      registry)
+
+        SoftLayer.ISCSIManager(self.client)._get_location_id('dal05')
+        SoftLayer.LoadBalancerManager(self.client)._get_location('sjc01')
+
+        self.assertEqual(len(self.calls('SoftLayer_Location_Datacenter',
+                                        'getDatacenters')), 1)
+        other_client = SoftLayer.BaseClient()
+        self.assertIsNot(locations.get_location_registry(other_client),
+                         registry)
@@ -249,6 +249,55 @@ class NetworkTests(testing.TestCase):
                               'vlanCount': 3}}
         self.assertEqual(expected, result)
 
+    def test_summary_by_datacenter_pages(self):
+        self.network.summary_by_datacenter(chunk=50)
+
+        mask = 'mask[%s]' % SoftLayer.managers.network.SUMMARY_VLAN_MASK
+        self.assert_called_with('SoftLayer_Account', 'getNetworkVlans',
+                                mask=mask, limit=50, offset=0)
+
+    def test_summary_by_datacenter_counts(self):
+        mock = self.set_mock('SoftLayer_Account', 'getNetworkVlans')
+        mock.return_value = [{'id': 1,
+                              'primaryRouter': {
+                                  'datacenter': {'name': 'dal00'}},
+                              'hardwareCount': 2,
+                              'networkComponentCount': 1,
+                              'subnetCount': 3,
+                              'totalPrimaryIpAddressCount': 4,
+                              'virtualGuestCount': 5}]
+
+        result = self.network.summary_by_datacenter(use_counts=True)
+
+        self.assertEqual(result, {'dal00': {'hardwareCount': 2,
+                                            'networkingCount': 1,
+                                            'virtualGuestCount': 5,
+                                            'subnetCount': 3,
+                                            'primaryIpCount': 4,
+                                            'vlanCount': 1}})
+        mask = 'mask[%s]' % SoftLayer.managers.network.SUMMARY_COUNT_MASK
+        self.assert_called_with('SoftLayer_Account', 'getNetworkVlans',
+                                mask=mask)
+
+    def test_summarize_vlans_dedupes_across_datacenters(self):
+        vlans = [
+            {'primaryRouter': {'datacenter': {'name': 'dal00'}},
+             'hardware': [{'id': 1}], 'networkComponents': [],
+             'virtualGuests': [{'id': 10}, {'id': 11}], 'subnets': [],
+             'totalPrimaryIpAddressCount': 1},
+            {'primaryRouter': {'datacenter': {'name': 'dal00'}},
+             'hardware': [{'id': 1}], 'networkComponents': [],
+             'virtualGuests': [{'id': 11}], 'subnets': [{'id': 5}],
+             'totalPrimaryIpAddressCount': 1},
+        ]
+
+        result = SoftLayer.managers.network.summarize_vlans(iter(vlans))
+
+        self.assertEqual(result['dal00']['hardwareCount'], 1)
+        self.assertEqual(result['dal00']['virtualGuestCount'], 2)
+        self.assertEqual(result['dal00']['subnetCount'], 1)
+        self.assertEqual(result['dal00']['vlanCount'], 2)
+
     def test_resolve_global_ip_ids(self):
         _id = self.network.resolve_global_ip_ids('10.0.0.1')
         self.assertEqual(_id, ['200', '201'])
@@ -0,0 +1,118 @@
+"""
+    SoftLayer.tests.managers.power_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import mock
+
+import SoftLayer
+from SoftLayer.managers import power
+from SoftLayer import testing
+
+
+class PowerTests(testing.TestCase):
+
+    def set_up(self):
+        self.power = SoftLayer.PowerManager(self.client)
+
+    def test_find_hosts(self):
+        self.assertEqual(self.power.find_hosts('vs', tags=['web'],
+                                               datacenter='dal05'),
+                         [100, 104])
+        call = self.calls('SoftLayer_Account', 'getVirtualGuests')[0]
+        self.assertEqual(call.mask, 'mask[id]')
+        self.assertEqual(call.filter['virtualGuests']['datacenter'],
+                         {'name': {'operation': '_= dal05'}})
+
+        self.assertEqual(self.power.find_hosts('hardware', tags=['web']),
+                         [1000, 1001, 1002])
+
+    def test_resolve_ids(self):
+        self.assertEqual(self.power.resolve_ids('hardware', '1234'), [1234])
+
+    def test_power(self):
+        results = list(self.power.power('vs', [100, 104], 'reboot'))
+
+        self.assertEqual(sorted(result['id'] for result in results),
+                         [100, 104])
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(
+            sorted(call.identifier for call
+                   in self.calls('SoftLayer_Virtual_Guest', 'rebootDefault')),
+            [100, 104])
+
+    def test_power_hardware(self):
+        list(self.power.power('hardware', [1000], 'cycle'))
+
+        self.assert_called_with('SoftLayer_Hardware_Server', 'powerCycle',
+                                identifier=1000)
+
+    def test_power_unsupported_action(self):
+        self.assertRaises(ValueError, list,
+                          self.power.power('vs', [100], 'cycle'))
+        self.assertRaises(ValueError, list,
+                          self.power.power('bmc', [100], 'on'))
+
+    @mock.patch('time.sleep')
+    def test_power_batches(self, sleep):
+        results = list(self.power.power('hardware', [1, 2, 3, 4, 5], 'on',
+                                        max_workers=1, batch_size=2,
+                                        batch_wait=60))
+
+        self.assertEqual([(result['id'], result['batch'])
+                          for result in results],
+                         [(1, 1), (2, 1), (3, 2), (4, 2), (5, 3)])
+        self.assertEqual(sleep.call_args_list,
+                         [mock.call(60), mock.call(60)])
+
+    def test_power_stops_after_failed_batch(self):
+        reboot = self.set_mock('SoftLayer_Hardware_Server', 'rebootHard')
+        reboot.side_effect = [
+            True,
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'Busy'),
+            True,
+        ]
+
+        results = list(self.power.power('hardware', [1, 2, 3, 4],
+                                        'reboot-hard', max_workers=1,
+                                        batch_size=2))
+
+        self.assertEqual([result['id'] for result in results], [1, 2])
+        self.assertFalse(results[1]['success'])
+        self.assertIsInstance(results[1]['error'],
+                              SoftLayer.SoftLayerAPIError)
+
+    def test_power_keep_going(self):
+        reboot = self.set_mock('SoftLayer_Hardware_Server', 'rebootHard')
+        reboot.side_effect = [
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception', 'Busy'),
+            True,
+        ]
+
+        results = list(self.power.power('hardware', [1, 2], 'reboot-hard',
+                                        max_workers=1, batch_size=1,
+                                        stop_on_failure=False))
+
+        self.assertEqual([result['success'] for result in results],
+                         [False, True])
+
+    @mock.patch('SoftLayer.utils.RateLimiter.wait')
+    def test_power_rate_limited(self, wait):
+        list(self.power.power('vs', [100, 104], 'on', rate=2))
+
+        self.assertEqual(wait.call_count, 2)
+
+
+class ParseBatchSizeTests(testing.TestCase):
+
+    def test_parse_batch_size(self):
+        self.assertEqual(power.parse_batch_size(None, 300), 300)
+        self.assertEqual(power.parse_batch_size('10%', 300), 30)
+        self.assertEqual(power.parse_batch_size('10%', 5), 1)
+        self.assertEqual(power.parse_batch_size('15%', 10), 2)
+        self.assertEqual(power.parse_batch_size('25', 300), 25)
+
+    def test_parse_batch_size_invalid(self):
+        for value in ['0', '-1', '0%', '101%', 'ten']:
+            self.assertRaises(ValueError, power.parse_batch_size, value, 10)
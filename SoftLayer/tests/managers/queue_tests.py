@@ -4,12 +4,19 @@
 
     :license: MIT, see LICENSE for more details.
 """
+import os
+import shutil
+import tempfile
+import threading
+import time
+
 import mock
 
 import SoftLayer
 from SoftLayer import consts
 from SoftLayer.managers import messaging
 from SoftLayer import testing
+from SoftLayer.testing import mq
 
 QUEUE_1 = {
     'expiration': 40000,
@@ -88,6 +95,7 @@ class QueueAuthTests(testing.TestCase):
 
     @mock.patch('SoftLayer.managers.messaging.QueueAuth.auth',
                 mocked_auth_call)
+    @mock.patch('time.sleep', mock.MagicMock())
     def test_handle_error_503(self):
         # Retry once more on 503 error
         request = mock.MagicMock()
@@ -109,6 +117,41 @@ class QueueAuthTests(testing.TestCase):
         self.assertEqual(self.auth.auth_token, 'NEW_AUTH_TOKEN')
         request.connection.send.assert_called_with(request.request)
 
+    @mock.patch('random.uniform')
+    @mock.patch('time.sleep')
+    def test_handle_error_503_backoff(self, sleep, uniform):
+        uniform.side_effect = lambda low, high: high
+        request = mock.MagicMock()
+        request.status_code = 503
+        request.connection.send.return_value = request
+
+        result = self.auth.handle_error(request, timeout=10)
+
+        self.assertEqual(result, request)
+        self.assertEqual(request.connection.send.call_count, 3)
+        request.connection.send.assert_called_with(request.request,
+                                                   timeout=10)
+        self.assertEqual([call[0][0] for call in sleep.call_args_list],
+                         [0.75, 1.5, 3])
+        self.assertEqual([call[0] for call in uniform.call_args_list],
+                         [(0, 0.25), (0, 0.5), (0, 1)])
+
+    def test_handle_error_401_cache(self):
+        cache = messaging.TokenCache()
+        auth = messaging.QueueAuth('endpoint', 'username', 'api_key',
+                                   cache=cache)
+        cache.set(auth.cache_key, 'NEW_AUTH_TOKEN')
+        request = mock.MagicMock()
+        request.status_code = 401
+        request.request.headers = {'X-Auth-Token': 'OLD_AUTH_TOKEN'}
+
+        auth.handle_error(request)
+
+        # Another thread already refreshed the token
+        self.assertEqual(request.request.headers,
+                         {'X-Auth-Token': 'NEW_AUTH_TOKEN'})
+        request.connection.send.assert_called_with(request.request)
+
     @mock.patch('SoftLayer.managers.messaging.QueueAuth.auth',
                 mocked_auth_call)
     def test_call_unauthed(self):
@@ -123,6 +166,124 @@ class QueueAuthTests(testing.TestCase):
         self.assertEqual(request.headers, {'X-Auth-Token': 'NEW_AUTH_TOKEN'})
 
 
+class TokenCacheTests(testing.TestCase):
+
+    def set_up(self):
+        self.cache = messaging.TokenCache(ttl=100, renew_before=10)
+        self.fetched = []
+
+    def fetch(self):
+        self.fetched.append(None)
+        return 'token%d' % len(self.fetched)
+
+    def test_get(self):
+        self.assertEqual(self.cache.get(('endpoint', 'user'), self.fetch),
+                         'token1')
+        self.assertEqual(self.cache.get(('endpoint', 'user'), self.fetch),
+                         'token1')
+        self.assertEqual(self.cache.get(('endpoint', 'other'), self.fetch),
+                         'token2')
+
+    def test_get_single_flight(self):
+        started = threading.Event()
+
+        def slow_fetch():
+            started.set()
+            time.sleep(0.05)
+            return self.fetch()
+
+        tokens = []
+        threads = [threading.Thread(
+            target=lambda: tokens.append(self.cache.get('key', slow_fetch)))
+            for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(tokens, ['token1'] * 10)
+        self.assertEqual(len(self.fetched), 1)
+
+    def test_refresh(self):
+        self.cache.get('key', self.fetch)
+
+        # Another thread already replaced the stale token
+        self.assertEqual(self.cache.refresh('key', self.fetch, stale='old'),
+                         'token1')
+        self.assertEqual(self.cache.refresh('key', self.fetch,
+                                            stale='token1'), 'token2')
+        self.assertEqual(len(self.fetched), 2)
+
+    @mock.patch('time.time')
+    def test_expired(self, now):
+        now.return_value = 1000
+        self.cache.get('key', self.fetch)
+
+        now.return_value = 1100
+        self.assertEqual(self.cache.get('key', self.fetch), 'token2')
+
+    @mock.patch('time.time')
+    def test_renew(self, now):
+        now.return_value = 1000
+        self.cache.get('key', self.fetch)
+        renewed = threading.Event()
+
+        def fetch():
+            renewed.set()
+            return 'renewed'
+
+        now.return_value = 1095
+        self.assertEqual(self.cache.get('key', fetch), 'token1')
+        renewed.wait(5)
+        for _ in range(100):
+            if self.cache.get('key', fetch) == 'renewed':
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.cache.get('key', fetch), 'renewed')
+
+    def test_invalidate(self):
+        self.cache.get('key', self.fetch)
+        self.cache.invalidate('key')
+
+        self.assertEqual(self.cache.get('key', self.fetch), 'token2')
+
+    def test_persist(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, 'tokens')
+        messaging.TokenCache(path).get(('endpoint', 'user'), self.fetch)
+
+        cache = messaging.TokenCache(path)
+
+        self.assertEqual(cache.get(('endpoint', 'user'), self.fetch),
+                         'token1')
+        self.assertEqual(len(self.fetched), 1)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+    def test_persist_expired_and_invalid(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, 'tokens')
+        with open(path, 'w') as token_file:
+            token_file.write('[{"key": ["endpoint", "user"], '
+                             '"token": "old", "expires": 1}]')
+
+        self.assertEqual(messaging.TokenCache(path).get(('endpoint', 'user'),
+                                                        self.fetch),
+                         'token1')
+
+        with open(path, 'w') as token_file:
+            token_file.write('not json')
+        self.assertEqual(messaging.TokenCache(path).get(('endpoint', 'user'),
+                                                        self.fetch),
+                         'token2')
+
+    def test_get_token_cache(self):
+        self.assertIs(messaging.get_token_cache(),
+                      messaging.get_token_cache())
+        self.assertEqual(messaging.get_token_cache('path').path, 'path')
+
+
 class MessagingManagerTests(testing.TestCase):
 
     def set_up(self):
@@ -177,9 +338,19 @@ class MessagingManagerTests(testing.TestCase):
         conn.assert_called_with(
             'QUEUE_ACCOUNT_ID', endpoint='https://dal05.mq.softlayer.net')
         conn().authenticate.assert_called_with(
-            self.client.auth.username, self.client.auth.api_key)
+            self.client.auth.username, self.client.auth.api_key,
+            cache=messaging.get_token_cache())
         self.assertEqual(queue_conn, conn())
 
+    @mock.patch('SoftLayer.managers.messaging.pooled_session')
+    @mock.patch('SoftLayer.managers.messaging.MessagingConnection')
+    def test_get_connection_pooled(self, conn, pooled_session):
+        queue_conn = self.manager.get_connection('QUEUE_ACCOUNT_ID',
+                                                 pool_size=4)
+
+        pooled_session.assert_called_with(4)
+        self.assertEqual(queue_conn.session, pooled_session())
+
     def test_get_connection_no_auth(self):
         self.client.auth = None
         self.assertRaises(SoftLayer.SoftLayerError,
@@ -235,7 +406,7 @@ class MessagingConnectionTests(testing.TestCase):
 
         auth.assert_called_with(
             'endpoint/v1/acount_id/auth', 'username', 'api_key',
-            auth_token='auth_token')
+            auth_token='auth_token', cache=None)
         auth().auth.assert_called_with()
         self.assertEqual(self.conn.auth, auth())
 
@@ -465,3 +636,211 @@ class MessagingConnectionTests(testing.TestCase):
             'delete',
             'topics/example_topic/subscriptions/%s' % SUBSCRIPTION_1['id'])
         self.assertTrue(result)
+
+
+class PushStatsTests(testing.TestCase):
+
+    def test_summary(self):
+        stats = messaging.PushStats()
+        for latency in range(1, 101):
+            stats.add({'error': None, 'latency': latency / 100.0})
+        stats.add({'error': ValueError('failed'), 'latency': 1.0})
+
+        summary = stats.summary()
+
+        self.assertEqual(summary['sent'], 100)
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(summary['latency']['min'], 0.01)
+        self.assertEqual(summary['latency']['p50'], 0.51)
+        self.assertEqual(summary['latency']['p95'], 0.95)
+        self.assertEqual(summary['latency']['max'], 1.0)
+        self.assertAlmostEqual(summary['latency']['mean'], 0.505)
+
+    def test_summary_empty(self):
+        summary = messaging.PushStats().summary()
+
+        self.assertEqual(summary, {'sent': 0, 'failed': 0, 'seconds': 0,
+                                   'rate': 0, 'latency': {}})
+
+
+class QueueWorkerTests(testing.TestCase):
+
+    def set_up(self):
+        self.server = mq.FakeMessageQueueServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.conn = messaging.MessagingConnection(
+            'test', endpoint=self.server.endpoint,
+            session=messaging.pooled_session(4))
+        self.addCleanup(self.conn.session.close)
+        self.conn.authenticate('username', 'api_key')
+
+    def test_make_request_session(self):
+        self.conn.create_queue('example_queue')
+
+        self.assertEqual(self.conn.get_queue('example_queue')['name'],
+                         'example_queue')
+
+    def test_authenticate_invalid(self):
+        self.assertRaises(SoftLayer.Unauthenticated,
+                          self.conn.authenticate, 'username', 'bad_key')
+
+    def test_push_queue_messages(self):
+        bodies = ['message %d' % index for index in range(40)]
+        messages = iter(bodies[:-1] + [{'body': bodies[-1],
+                                        'fields': {'key': 'value'}}])
+
+        results = list(self.conn.push_queue_messages(
+            'example_queue', messages, max_workers=4, window=8))
+
+        self.assertEqual(len(results), 40)
+        self.assertTrue(all(result['id'] and result['error'] is None
+                            for result in results))
+        queued = self.server.messages('example_queue')
+        self.assertEqual(sorted(message['body'] for message in queued),
+                         sorted(bodies))
+        self.assertIn({'key': 'value'},
+                      [message['fields'] for message in queued])
+
+    def test_push_queue_messages_error(self):
+        self.conn.auth.auth_token = 'expired'
+        self.conn.auth.auth = mock.MagicMock()
+
+        results = list(self.conn.push_queue_messages('example_queue',
+                                                     ['message']))
+
+        self.assertIsNone(results[0]['id'])
+        self.assertIsNotNone(results[0]['error'])
+
+    def test_push_topic_messages_stats(self):
+        stats = messaging.PushStats()
+
+        results = list(stats.track(self.conn.push_topic_messages(
+            'example_topic', ('message %d' % index for index in range(25)),
+            max_workers=4)))
+
+        self.assertEqual(len(results), 25)
+        self.assertTrue(all(result['latency'] >= 0 for result in results))
+        self.assertEqual(self.server.count('POST', '/topics/example_topic'),
+                         25)
+        summary = stats.summary()
+        self.assertEqual(summary['sent'], 25)
+        self.assertEqual(summary['failed'], 0)
+        self.assertTrue(summary['rate'] > 0)
+        latency = summary['latency']
+        self.assertTrue(latency['min'] <= latency['p50'] <= latency['p95'] <=
+                        latency['p99'] <= latency['max'])
+
+        self.server.add_messages('example_queue',
+                                 [str(index) for index in range(250)])
+        handled = []
+        lock = threading.Lock()
+
+        def handler(message):
+            with lock:
+                handled.append(message['body'])
+
+        consumer = messaging.QueueConsumer(self.conn, 'example_queue',
+                                           handler, batch_size=20,
+                                           max_workers=4,
+                                           delete_batch_size=50)
+        stats = consumer.run()
+
+        self.assertEqual(sorted(handled, key=int),
+                         [str(index) for index in range(250)])
+        self.assertEqual(stats, {'popped': 250, 'handled': 250, 'failed': 0,
+                                 'deleted': 250, 'delete_failed': 0})
+        self.assertEqual(self.server.messages('example_queue'), [])
+        # 13 batches and the empty pop which stops the consumer
+        self.assertEqual(self.server.count('GET', '/messages'), 14)
+
+    def test_consumer_failures(self):
+        self.server.add_messages('example_queue',
+                                 ['ok', 'fail', 'skip', 'ok'])
+
+        def handler(message):
+            if message['body'] == 'fail':
+                raise ValueError('bad message')
+            return message['body'] != 'skip'
+
+        consumer = messaging.QueueConsumer(self.conn, 'example_queue',
+                                           handler)
+        stats = consumer.run()
+
+        self.assertEqual(stats['handled'], 3)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['deleted'], 2)
+        self.assertEqual(sorted(message['body'] for message
+                                in self.server.messages('example_queue')),
+                         ['fail', 'skip'])
+
+    def test_consumer_max_messages(self):
+        self.server.add_messages('example_queue',
+                                 [str(index) for index in range(30)])
+
+        consumer = messaging.QueueConsumer(self.conn, 'example_queue',
+                                           lambda message: None,
+                                           batch_size=8)
+        stats = consumer.run(max_messages=10)
+
+        self.assertEqual(stats['popped'], 10)
+        self.assertEqual(stats['deleted'], 10)
+        self.assertEqual(len(self.server.messages('example_queue')), 20)
+
+    @mock.patch('time.sleep')
+    def test_consumer_stop(self, sleep):
+        consumer = messaging.QueueConsumer(self.conn, 'example_queue',
+                                           lambda message: None)
+        sleep.side_effect = lambda _: consumer.stop()
+
+        stats = consumer.run(until_empty=False)
+
+        self.assertEqual(stats['popped'], 0)
+        sleep.assert_called_with(consumer.poll_interval)
+
+    def test_shared_token_cache(self):
+        cache = messaging.TokenCache()
+        conns = []
+        for _ in range(3):
+            conn = messaging.MessagingConnection(
+                'test', endpoint=self.server.endpoint,
+                session=self.conn.session)
+            conn.authenticate('username', 'api_key', cache=cache)
+            conns.append(conn)
+        auths = self.server.count('POST', '/auth')
+
+        for conn in conns:
+            conn.get_queue('example_queue')
+
+        # One more for self.conn, which doesn't use the cache
+        self.assertEqual(auths, 2)
+        self.assertEqual(self.server.count('POST', '/auth'), 2)
+
+    def test_shared_token_cache_reauth(self):
+        cache = messaging.TokenCache()
+        self.conn.authenticate('username', 'api_key', cache=cache)
+        self.conn.create_queue('example_queue')
+        with self.server.lock:
+            self.server.tokens.clear()
+
+        results = list(self.conn.push_queue_messages(
+            'example_queue', ['message %d' % index for index in range(20)],
+            max_workers=4))
+
+        self.assertEqual([result['error'] for result in results],
+                         [None] * 20)
+        self.assertEqual(len(self.server.messages('example_queue')), 20)
+        # self.conn's own token, the cached token and one re-auth
+        self.assertEqual(self.server.count('POST', '/auth'), 3)
+
+    def test_delete_messages(self):
+        ids = self.server.add_messages('example_queue', ['one', 'two'])
+
+        results = self.conn.delete_messages('example_queue',
+                                            ids + ['unknown'])
+
+        self.assertEqual([result['id'] for result in results],
+                         ids + ['unknown'])
+        self.assertEqual([result['error'] is None for result in results],
+                         [True, True, False])
+        self.assertEqual(self.server.messages('example_queue'), [])
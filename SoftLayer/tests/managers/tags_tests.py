@@ -0,0 +1,66 @@
+"""
+    SoftLayer.tests.managers.tags_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import SoftLayer
+from SoftLayer.managers import tags
+from SoftLayer import testing
+
+
+class TagTests(testing.TestCase):
+
+    def set_up(self):
+        self.tag_manager = SoftLayer.TagManager(self.client)
+
+    def test_normalize_tags(self):
+        self.assertEqual(tags.normalize_tags(' dev, green,,dev '),
+                         'dev,green')
+        self.assertEqual(tags.normalize_tags(''), '')
+
+    def test_group_by_tags(self):
+        groups = tags.group_by_tags({1: 'dev,green',
+                                     2: 'dev, green',
+                                     3: 'prod',
+                                     4: None})
+
+        self.assertEqual(sorted(groups.keys()), ['dev,green', 'prod'])
+        self.assertEqual(sorted(groups['dev,green']), [1, 2])
+        self.assertEqual(groups['prod'], [3])
+
+    def test_set_tags(self):
+        results = self.tag_manager.set_tags('Virtual_Guest',
+                                            {100: 'dev', 104: 'prod'})
+
+        self.assertEqual(sorted(result['id'] for result in results),
+                         [100, 104])
+        self.assertTrue(all(result['success'] for result in results))
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'setTags',
+                                args=('dev',),
+                                identifier=100)
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'setTags',
+                                args=('prod',),
+                                identifier=104)
+
+    def test_set_tags_partial_failure(self):
+        def _set_tags(call):
+            if call.identifier == 104:
+                raise SoftLayer.SoftLayerAPIError('SoftLayer_Exception',
+                                                  'Unable to tag')
+            return True
+
+        self.set_mock('SoftLayer_Virtual_Guest',
+                      'setTags').side_effect = _set_tags
+
+        results = self.tag_manager.set_tags('Virtual_Guest',
+                                            {100: 'dev', 104: 'dev'})
+
+        by_id = dict((result['id'], result) for result in results)
+        self.assertTrue(by_id[100]['success'])
+        self.assertIsNone(by_id[100]['error'])
+        self.assertFalse(by_id[104]['success'])
+        self.assertIsInstance(by_id[104]['error'],
+                              SoftLayer.SoftLayerAPIError)
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'setTags')), 2)
@@ -5,6 +5,7 @@
     :license: MIT, see LICENSE for more details.
 """
 import SoftLayer
+from SoftLayer.managers import ticket
 from SoftLayer import testing
 from SoftLayer.testing import fixtures
 
@@ -77,3 +78,88 @@ class TicketTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Ticket', 'addUpdate',
                                 args=({'entry': 'Update1'},),
                                 identifier=100)
+
+
+class TicketSyncTests(testing.TestCase):
+
+    def set_up(self):
+        self.ticket = SoftLayer.TicketManager(self.client)
+        self.store = ticket.TicketStore(':memory:')
+        self.addCleanup(self.store.close)
+
+    def test_first_sync(self):
+        result = self.ticket.sync_tickets(self.store)
+
+        self.assertEqual(result, {'changed': 3, 'updated': 3, 'failed': 0,
+                                  'high_water': '2013-08-01T14:16:47-07:00'})
+        call = self.calls('SoftLayer_Account', 'getTickets')[0]
+        self.assertEqual(call.mask, 'mask[%s]' % ticket.SYNC_MASK)
+        self.assertIsNone(call.filter)
+        self.assert_called_with('SoftLayer_Ticket', 'getUpdates',
+                                identifier=100,
+                                mask='mask[%s]' % ticket.UPDATE_MASK)
+        self.assertEqual(self.store.high_water, '2013-08-01T14:16:47-07:00')
+        self.assertEqual(self.store.get_ticket(102)['updates'],
+                         fixtures.SoftLayer_Ticket.getUpdates)
+        self.assertEqual([t['id'] for t in self.store.list_tickets()],
+                         [100, 101, 102])
+
+    def test_incremental_sync(self):
+        self.ticket.sync_tickets(self.store)
+        result = self.ticket.sync_tickets(self.store)
+
+        call = self.calls('SoftLayer_Account', 'getTickets')[1]
+        self.assertEqual(call.filter, {'tickets': {'lastEditDate': {
+            'operation': 'greaterThanDate',
+            'options': [{'name': 'date',
+                         'value': ['08/01/2013 14:16:46']}]}}})
+        # Tickets fetched again by the overlap aren't counted as changed
+        self.assertEqual(result['changed'], 0)
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual(len(self.calls('SoftLayer_Ticket', 'getUpdates')), 3)
+
+    def test_sync_new_updates(self):
+        self.ticket.sync_tickets(self.store)
+        tickets = self.set_mock('SoftLayer_Account', 'getTickets')
+        tickets.return_value = [{
+            'id': 102,
+            'lastEditDate': '2013-08-02T10:00:00-07:00',
+            'status': {'name': 'Closed'},
+            'updateCount': 4,
+        }]
+
+        result = self.ticket.sync_tickets(self.store)
+
+        self.assertEqual(result, {'changed': 1, 'updated': 1, 'failed': 0,
+                                  'high_water': '2013-08-02T10:00:00-07:00'})
+        self.assertEqual([t['id'] for t
+                          in self.store.list_tickets(open_status=False)],
+                         [100, 101, 102])
+        self.assertEqual(self.store.list_tickets(closed_status=False), [])
+
+    def test_sync_failed_updates(self):
+        updates = self.set_mock('SoftLayer_Ticket', 'getUpdates')
+        updates.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'Rate limited')
+
+        result = self.ticket.sync_tickets(self.store)
+
+        self.assertEqual(result, {'changed': 3, 'updated': 0, 'failed': 3,
+                                  'high_water': None})
+        self.assertIsNone(self.store.high_water)
+        self.assertEqual(self.store.list_tickets(), [])
+
+    def test_store_list_tickets(self):
+        self.store.save([
+            {'id': 2, 'status': {'name': 'Open'}, 'updates': [{}]},
+            {'id': 1, 'status': {'name': 'Closed'}, 'updates': []},
+        ])
+
+        self.assertEqual(self.store.list_tickets(),
+                         [{'id': 1, 'status': {'name': 'Closed'}},
+                          {'id': 2, 'status': {'name': 'Open'}}])
+        self.assertEqual(self.store.list_tickets(closed_status=False),
+                         [{'id': 2, 'status': {'name': 'Open'}}])
+        self.assertEqual(self.store.get_ticket(2)['updates'], [{}])
+        self.assertIsNone(self.store.get_ticket(3))
+        self.assertIsNone(self.store.high_water)
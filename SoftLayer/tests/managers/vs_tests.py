@@ -90,8 +90,8 @@ class VSTests(testing.TestCase):
 
     def test_resolve_ids_ip_private(self):
         # Now simulate a private IP test
-        mock = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
-        mock.side_effect = [[], [{'id': 99}]]
+        tag_mock = self.set_mock('SoftLayer_Account', 'getVirtualGuests')
+        tag_mock.side_effect = [[], [{'id': 99}]]
 
         _id = self.vs._get_ids_from_ip('10.0.1.87')
 
@@ -112,6 +112,66 @@ class VSTests(testing.TestCase):
         self.assert_called_with('SoftLayer_Virtual_Guest', 'getObject',
                                 identifier=100)
 
+    def test_get_instance_details(self):
+        guest = self.set_mock('SoftLayer_Virtual_Guest', 'getObject')
+        guest.side_effect = [
+            {'id': 100, 'privateNetworkOnlyFlag': False},
+            {'id': 104, 'privateNetworkOnlyFlag': True},
+        ]
+
+        results = self.vs.get_instance_details([100, 104], max_workers=1)
+
+        self.assertEqual(results, [
+            {'id': 100,
+             'instance': {'id': 100, 'privateNetworkOnlyFlag': False},
+             'ptr_records': ['test.softlayer.com.'],
+             'error': None},
+            {'id': 104,
+             'instance': {'id': 104, 'privateNetworkOnlyFlag': True},
+             'ptr_records': [],
+             'error': None},
+        ])
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'getReverseDomainRecords')), 2)
+
+    def test_get_instance_details_failures(self):
+        guest = self.set_mock('SoftLayer_Virtual_Guest', 'getObject')
+        guest.side_effect = [
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception_NotFound',
+                                        'Unable to find object'),
+            {'id': 104},
+        ]
+        ptr = self.set_mock('SoftLayer_Virtual_Guest',
+                            'getReverseDomainRecords')
+        ptr.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'No reverse DNS')
+
+        results = self.vs.get_instance_details([100, 104], max_workers=1)
+
+        self.assertEqual(results[0]['id'], 100)
+        self.assertIsInstance(results[0]['error'], SoftLayer.SoftLayerAPIError)
+        self.assertEqual(results[1], {'id': 104,
+                                      'instance': {'id': 104},
+                                      'ptr_records': [],
+                                      'error': None})
+
+    def test_get_instance_details_ptr_error(self):
+        guest = self.set_mock('SoftLayer_Virtual_Guest', 'getObject')
+        guest.side_effect = [
+            {'id': 100, 'privateNetworkOnlyFlag': False},
+            {'id': 104, 'privateNetworkOnlyFlag': True},
+        ]
+        ptr = self.set_mock('SoftLayer_Virtual_Guest',
+                            'getReverseDomainRecords')
+        ptr.side_effect = IOError('Connection reset')
+
+        results = self.vs.get_instance_details([100, 104], max_workers=1)
+
+        self.assertIsInstance(results[0]['error'], IOError)
+        # Private only hosts have no PTR records to report
+        self.assertIsNone(results[1]['error'])
+        self.assertEqual(results[1]['ptr_records'], [])
+
     def test_get_create_options(self):
         results = self.vs.get_create_options()
 
@@ -161,6 +221,16 @@ class VSTests(testing.TestCase):
                                 args=('dev,green',),
                                 identifier=100)
 
+    def test_create_instance_tag_failure(self):
+        tag_mock = self.set_mock('SoftLayer_Virtual_Guest', 'setTags')
+        tag_mock.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'Unable to tag')
+
+        self.assertRaises(SoftLayer.SoftLayerAPIError,
+                          self.vs.create_instance,
+                          cpus=1, memory=1024, hostname='server',
+                          domain='example.com', tags='dev')
+
     def test_create_instances(self):
         self.vs.create_instances([{'cpus': 1,
                                    'memory': 1024,
@@ -180,6 +250,39 @@ class VSTests(testing.TestCase):
                                 args=('dev,green',),
                                 identifier=100)
 
+    def test_create_instances_tag_failure(self):
+        tag_mock = self.set_mock('SoftLayer_Virtual_Guest', 'setTags')
+        tag_mock.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception', 'Unable to tag')
+
+        create_mock = self.set_mock('SoftLayer_Virtual_Guest',
+                                    'createObjects')
+        create_mock.return_value = [{'id': 100}, {'id': 101}]
+        config = {'cpus': 1, 'memory': 1024, 'hostname': 'server',
+                  'domain': 'example.com', 'tags': 'dev'}
+
+        try:
+            self.vs.create_instances([dict(config), dict(config)])
+        except SoftLayer.SoftLayerAPIError as ex:
+            self.assertEqual(ex.faultCode, 'SoftLayer_Exception')
+            self.assertIn('100 (', ex.faultString)
+            self.assertIn('101 (', ex.faultString)
+        else:
+            self.fail('SoftLayerAPIError not raised')
+        self.assertEqual(len(self.calls('SoftLayer_Virtual_Guest',
+                                        'setTags')), 2)
+
+    def test_tag_instances(self):
+        result = self.vs.tag_instances({100: 'dev,green'})
+
+        self.assertEqual(result, [{'id': 100,
+                                   'tags': 'dev,green',
+                                   'success': True,
+                                   'error': None}])
+        self.assert_called_with('SoftLayer_Virtual_Guest', 'setTags',
+                                args=('dev,green',),
+                                identifier=100)
+
     def test_generate_os_and_image(self):
         self.assertRaises(
             ValueError,
@@ -603,6 +706,16 @@ class VSTests(testing.TestCase):
                                 args=args,
                                 identifier=1)
 
+    def test_capture_invalidates_images(self):
+        index = SoftLayer.ImageManager(self.client).index
+        self.assertTrue(index.find('test_image', 'private'))
+
+        self.vs.capture(1, 'a')
+        index.find('test_image', 'private')
+
+        self.assertEqual(len(self.calls(
+            'SoftLayer_Account', 'getPrivateBlockDeviceTemplateGroups')), 2)
+
     def test_capture_additional_disks(self):
         # capture all the disks, minus the swap
         # make sure the data is carried along with it
@@ -619,8 +732,8 @@ class VSTests(testing.TestCase):
                                 identifier=1)
 
     def test_upgrade(self):
-        mock = self.set_mock('SoftLayer_Product_Package', 'getAllObjects')
-        mock.return_value = [
+        tag_mock = self.set_mock('SoftLayer_Product_Package', 'getAllObjects')
+        tag_mock.return_value = [
             {'id': 46, 'name': 'Virtual Servers',
              'description': 'Virtual Server Instances',
              'type': {'keyName': 'VIRTUAL_SERVER_INSTANCE'}, 'isActive': 1},
@@ -0,0 +1,140 @@
+"""
+    SoftLayer.tests.masks_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+from SoftLayer import masks
+from SoftLayer import testing
+
+
+class ParseTests(testing.TestCase):
+
+    def test_spellings(self):
+        expected = 'mask[datacenter[name],hostname,id]'
+        for mask in ['id,hostname,datacenter[name]',
+                     'mask[id,hostname,datacenter[name]]',
+                     'mask[ datacenter[name], hostname, id, id ]',
+                     '[mask[hostname,datacenter[name]],mask[id]]',
+                     '  hostname , datacenter [ name ] , id  ']:
+            self.assertEqual(masks.canonical(mask), expected, mask)
+
+    def test_dotted(self):
+        self.assertEqual(masks.canonical('id,datacenter.name'),
+                         'mask[datacenter.name,id]')
+        self.assertEqual(masks.canonical('datacenter.regions.keyname'),
+                         'mask[datacenter.regions.keyname]')
+        self.assertNotEqual(masks.parse('datacenter.name'),
+                            masks.parse('datacenter[name]'))
+
+    def test_nested(self):
+        mask = masks.parse('activeTransaction[id, '
+                           'transactionStatus[friendlyName,name]]')
+
+        self.assertEqual(str(mask),
+                         'mask[activeTransaction[id,transactionStatus['
+                         'friendlyName,name]]]')
+        self.assertEqual(mask.paths(),
+                         ['activeTransaction.id',
+                          'activeTransaction.transactionStatus.friendlyName',
+                          'activeTransaction.transactionStatus.name'])
+
+    def test_type_cast(self):
+        mask = masks.parse('[mask[id,hostname], '
+                           'mask(SoftLayer_Hardware_Server)'
+                           '[activeTransaction.id]]')
+
+        self.assertEqual(mask.paths(), ['hostname', 'id'])
+        self.assertEqual(mask.paths('SoftLayer_Hardware_Server'),
+                         ['activeTransaction', 'activeTransaction.id'])
+        self.assertEqual(str(mask),
+                         '[mask[hostname,id],'
+                         'mask(SoftLayer_Hardware_Server)'
+                         '[activeTransaction.id]]')
+
+    def test_type_cast_only(self):
+        mask = masks.parse('mask(SoftLayer_Hardware_Server)[id]')
+        self.assertEqual(str(mask), '[mask(SoftLayer_Hardware_Server)[id]]')
+
+    def test_empty(self):
+        self.assertEqual(masks.canonical(''), 'mask[]')
+        self.assertEqual(masks.canonical('mask[]'), 'mask[]')
+
+    def test_invalid(self):
+        for mask in ['mask.something.nested', 'a[b', 'a]', 'a,,b', 'a b',
+                     '1a', 'mask(Foo)[id]', 'mask[id', 'a.', None]:
+            self.assertRaises(ValueError, masks.parse, mask)
+
+    def test_parse_copies(self):
+        mask = masks.parse('id')
+        copy = masks.parse(mask)
+        copy.add('hostname')
+
+        self.assertEqual(str(mask), 'mask[id]')
+        self.assertEqual(str(copy), 'mask[hostname,id]')
+
+
+class ObjectMaskTests(testing.TestCase):
+
+    def test_merge(self):
+        mask = masks.merge('id,datacenter[name]',
+                           'mask[id,datacenter[longName]]',
+                           masks.ObjectMask('hostname'))
+
+        self.assertEqual(str(mask),
+                         'mask[datacenter[longName,name],hostname,id]')
+
+    def test_merge_whole_property(self):
+        # 'datacenter' asks for every local property, which the merged mask
+        # must keep asking for
+        self.assertEqual(masks.canonical('datacenter,datacenter[name]'),
+                         'mask[datacenter.name]')
+        self.assertEqual(masks.canonical('datacenter[name],datacenter'),
+                         'mask[datacenter.name]')
+        self.assertEqual(
+            masks.canonical('datacenter,datacenter[name,regions.keyname]'),
+            'mask[datacenter.name,datacenter.regions.keyname]')
+
+    def test_merge_doesnt_narrow(self):
+        # regions may be a relational property, so 'datacenter.regions'
+        # keeps all of datacenter's local properties
+        mask = masks.merge('datacenter[name]', 'datacenter.regions')
+
+        self.assertEqual(str(mask),
+                         'mask[datacenter.name,datacenter.regions]')
+        self.assertEqual(mask, masks.parse(str(mask)))
+        self.assertTrue(mask.issuperset('datacenter.regions'))
+        self.assertTrue(mask.issuperset('datacenter[longName]'))
+
+    def test_add(self):
+        mask = masks.ObjectMask().add('id').add('datacenter.name')
+
+        self.assertEqual(str(mask), 'mask[datacenter.name,id]')
+        self.assertRaises(ValueError, mask.add, 'datacenter[name]')
+        self.assertRaises(ValueError, mask.add, 'datacenter..name')
+
+    def test_issuperset(self):
+        mask = masks.ObjectMask('id,hostname,datacenter',
+                                'billingItem[id,orderItem.id]')
+
+        self.assertTrue(mask.issuperset('id'))
+        self.assertTrue(mask.issuperset('mask[hostname,id]'))
+        self.assertTrue(mask.issuperset('datacenter.name'))
+        self.assertTrue(mask.issuperset('billingItem[orderItem[id]]'))
+        self.assertFalse(mask.issuperset('billingItem.orderItem[id]'))
+        self.assertFalse(mask.issuperset('billingItem'))
+        self.assertFalse(mask.issuperset('datacenter.regions.keyname'))
+        self.assertFalse(mask.issuperset('maxMemory'))
+        self.assertFalse(
+            mask.issuperset('mask(SoftLayer_Hardware_Server)[id]'))
+
+    def test_equality(self):
+        mask = masks.ObjectMask('id,datacenter.name')
+
+        self.assertEqual(mask, 'mask[id,datacenter.name]')
+        self.assertEqual(mask, masks.parse('datacenter.name,id'))
+        self.assertNotEqual(mask, 'id')
+        self.assertNotEqual(mask, 5)
+        self.assertEqual(hash(mask), hash(masks.parse('id,datacenter.name')))
+        self.assertEqual(len(set([mask, masks.parse('datacenter.name,id')])),
+                         1)
@@ -11,6 +11,7 @@ import requests
 
 import SoftLayer
 from SoftLayer import consts
+from SoftLayer import masks
 from SoftLayer import testing
 from SoftLayer import transports
 
@@ -213,6 +214,38 @@ class TestXmlRpcAPICall(testing.TestCase):
             "<value><string>mask[something[nested]]</string></value>",
             kwargs['data'])
 
+    @mock.patch('requests.request')
+    def test_mask_call_canonical(self, request):
+        request.return_value = self.response
+
+        req = transports.Request()
+        req.endpoint = "http://something.com"
+        req.service = "SoftLayer_Service"
+        req.method = "getObject"
+        req.mask = masks.ObjectMask("id, hostname", "mask[id,datacenter]")
+        self.transport(req)
+
+        args, kwargs = request.call_args
+        self.assertIn(
+            "<value><string>mask[datacenter,hostname,id]</string></value>",
+            kwargs['data'])
+
+    @mock.patch('requests.request')
+    def test_mask_call_invalid(self, request):
+        request.return_value = self.response
+
+        req = transports.Request()
+        req.endpoint = "http://something.com"
+        req.service = "SoftLayer_Service"
+        req.method = "getObject"
+        req.mask = "mask[something[nested]"
+        self.transport(req)
+
+        args, kwargs = request.call_args
+        self.assertIn(
+            "<value><string>mask[something[nested]</string></value>",
+            kwargs['data'])
+
     @mock.patch('requests.request')
     def test_mask_call_v2_dot(self, request):
         request.return_value = self.response
@@ -243,6 +276,48 @@ class TestXmlRpcAPICall(testing.TestCase):
 
         self.assertRaises(SoftLayer.TransportError, self.transport, req)
 
+    def test_session(self):
+        session = mock.MagicMock()
+        session.request().content = self.response.content
+        self.transport.session = session
+
+        req = transports.Request()
+        req.service = 'SoftLayer_Service'
+        req.method = 'getObject'
+
+        with mock.patch('requests.request') as request:
+            resp = self.transport(req)
+
+        self.assertEqual(resp, [])
+        self.assertFalse(request.called)
+        session.request.assert_called_with(
+            'POST', 'http://something.com/SoftLayer_Service',
+            data=mock.ANY, headers=mock.ANY, timeout=None, verify=True,
+            cert=None, proxies=None)
+
+
+class TestPooledConnections(testing.TestCase):
+
+    @mock.patch('requests.Session')
+    def test_pooled_connections(self, session):
+        transport = transports.XmlRpcTransport()
+        timing = transports.TimingTransport(transport)
+
+        with transports.pooled_connections(timing):
+            self.assertEqual(transport.session, session.return_value)
+            with transports.pooled_connections(transport):
+                self.assertEqual(transport.session, session.return_value)
+            self.assertFalse(session.return_value.close.called)
+
+        self.assertIsNone(transport.session)
+        session.return_value.close.assert_called_once_with()
+        self.assertEqual(session.call_count, 1)
+
+    def test_pooled_connections_fixture_transport(self):
+        transport = transports.FixtureTransport()
+        with transports.pooled_connections(transport):
+            self.assertFalse(hasattr(transport, 'session'))
+
 
 class TestRestAPICall(testing.TestCase):
 
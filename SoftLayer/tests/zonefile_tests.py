@@ -0,0 +1,257 @@
+"""
+    SoftLayer.tests.zonefile_tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :license: MIT, see LICENSE for more details.
+"""
+import os
+import shutil
+import tempfile
+
+from SoftLayer import testing
+from SoftLayer import zonefile
+
+
+def _parse(text, **kwargs):
+    """Returns the parser and its records for a zone file string."""
+    parser = zonefile.ZoneFileParser(text.splitlines(True), **kwargs)
+    return parser, list(parser)
+
+
+class ZoneFileParserTests(testing.TestCase):
+
+    def test_fixture(self):
+        path = os.path.join(testing.FIXTURE_PATH, 'realtest.com')
+        with open(path) as zone_file:
+            parser = zonefile.ZoneFileParser(zone_file)
+            records = list(parser)
+
+        self.assertEqual(parser.zone, 'realtest.com.')
+        self.assertEqual(parser.errors, [])
+        self.assertEqual(records[0], {
+            'host': '@',
+            'type': 'SOA',
+            'class': 'IN',
+            'ttl': 86400,
+            'data': 'ns1.softlayer.com. support.softlayer.com. '
+                    '2014052300 7200 600 1728000 43200',
+            'line': 3,
+        })
+        self.assertEqual([(r['host'], r['type']) for r in records[1:]],
+                         [('@', 'NS'), ('@', 'NS'), ('@', 'MX'),
+                          ('testing', 'A'), ('testing1', 'A'),
+                          ('server2', 'A'), ('ftp', 'CNAME'),
+                          ('dev.realtest.com', 'TXT'),
+                          ('dev.realtest.com', 'AAAA'), ('spf', 'TXT')])
+
+    def test_origin_and_names(self):
+        parser, records = _parse(
+            '$ORIGIN example.com.\n'
+            'www A 1.1.1.1\n'
+            'www.example.com. A 1.1.1.2\n'
+            'example.com. NS ns1\n'
+            '$ORIGIN sub.example.com.\n'
+            'api A 1.1.1.3\n'
+            '@ A 1.1.1.4\n'
+            '$ORIGIN deeper\n'
+            'x A 1.1.1.5\n')
+
+        self.assertEqual(parser.zone, 'example.com.')
+        self.assertEqual([record['host'] for record in records],
+                         ['www', 'www', '@', 'api.sub', 'sub', 'x.deeper.sub'])
+
+    def test_origin_argument(self):
+        _, records = _parse('www A 1.1.1.1\n'
+                            'mail.example.com. A 1.1.1.2\n',
+                            origin='example.com')
+
+        self.assertEqual([record['host'] for record in records],
+                         ['www', 'mail'])
+
+    def test_no_origin(self):
+        parser, records = _parse('www A 1.1.1.1\n'
+                                 'mail.example.com. A 1.1.1.2\n')
+
+        self.assertEqual([record['host'] for record in records], ['www'])
+        self.assertEqual(parser.errors[0]['line'], 2)
+
+    def test_ttl(self):
+        _, records = _parse('$ORIGIN example.com.\n'
+                            'a A 1.1.1.1\n'
+                            'b 300 A 1.1.1.1\n'
+                            'c A 1.1.1.1\n'
+                            '$TTL 1h30m\n'
+                            'd A 1.1.1.1\n'
+                            'e IN 1W A 1.1.1.1\n'
+                            'f A 1.1.1.1\n', ttl=60)
+
+        self.assertEqual([record['ttl'] for record in records],
+                         [60, 300, 60, 5400, 604800, 5400])
+
+    def test_last_ttl_without_default(self):
+        _, records = _parse('$ORIGIN example.com.\n'
+                            'a A 1.1.1.1\n'
+                            'b 300 A 1.1.1.1\n'
+                            'c A 1.1.1.1\n')
+
+        self.assertEqual([record['ttl'] for record in records],
+                         [None, 300, 300])
+
+    def test_class_and_ttl_order(self):
+        _, records = _parse('$ORIGIN example.com.\n'
+                            'a IN 300 A 1.1.1.1\n'
+                            'b 300 IN A 1.1.1.1\n'
+                            'c CH TXT "x"\n')
+
+        self.assertEqual([(record['ttl'], record['class'])
+                          for record in records],
+                         [(300, 'IN'), (300, 'IN'), (300, 'CH')])
+
+    def test_blank_owner(self):
+        _, records = _parse('$ORIGIN example.com.\n'
+                            'www A 1.1.1.1\n'
+                            '    AAAA ::1\n'
+                            '\tTXT "hi"\n')
+
+        self.assertEqual([record['host'] for record in records],
+                         ['www', 'www', 'www'])
+
+    def test_blank_owner_first(self):
+        parser, records = _parse('  A 1.1.1.1\n')
+
+        self.assertEqual(records, [])
+        self.assertEqual(parser.errors[0]['error'], 'No previous owner name')
+
+    def test_multi_line_and_comments(self):
+        _, records = _parse(
+            '$ORIGIN example.com. ; the zone\n'
+            '; a comment line\n'
+            'txt TXT ( "one ; not a comment" ; a comment\n'
+            '          "two \\" quote" ; another\n'
+            '        )\n'
+            'after A 1.1.1.1\n')
+
+        self.assertEqual(records[0]['data'],
+                         '"one ; not a comment" "two \\" quote"')
+        self.assertEqual(records[0]['line'], 3)
+        self.assertEqual(records[1]['line'], 6)
+
+    def test_mx(self):
+        _, records = _parse('$ORIGIN example.com.\n'
+                            '@ MX 10 mail\n'
+                            '@ MX ( 20\n'
+                            '       backup.example.com. )\n')
+
+        self.assertEqual([(record['mxPriority'], record['data'])
+                          for record in records],
+                         [(10, 'mail'), (20, 'backup.example.com.')])
+
+    def test_errors(self):
+        parser, records = _parse('$ORIGIN example.com.\n'
+                                 'a TXT "open\n'
+                                 'b ) A 1.1.1.1\n'
+                                 'c IN\n'
+                                 'd 1.1.1.1\n'
+                                 '$GENERATE 1-2 host$ A 1.1.1.$\n'
+                                 'e A 1.1.1.1\n'
+                                 'f TXT ( "never closed"\n')
+
+        self.assertEqual([record['host'] for record in records], ['e'])
+        self.assertEqual([(error['line'], error['error'])
+                          for error in parser.errors],
+                         [(2, 'Unterminated quoted string'),
+                          (3, 'Unbalanced parentheses'),
+                          (4, 'Missing record type'),
+                          (5, 'Invalid record type 1.1.1.1'),
+                          (6, 'Invalid directive $GENERATE 1-2 host$ A '
+                              '1.1.1.$'),
+                          (8, 'Unbalanced parentheses')])
+
+    def test_lazy(self):
+        def lines():
+            yield '$ORIGIN example.com.\n'
+            yield 'a A 1.1.1.1\n'
+            raise AssertionError('read too far')
+
+        records = zonefile.ZoneFileParser(lines()).records()
+
+        self.assertEqual(next(records)['host'], 'a')
+
+    def test_parse_ttl(self):
+        self.assertEqual(zonefile.parse_ttl('0'), 0)
+        self.assertEqual(zonefile.parse_ttl('2d12h'), 216000)
+        self.assertRaises(ValueError, zonefile.parse_ttl, '1y')
+        self.assertRaises(ValueError, zonefile.parse_ttl, 'h')
+
+
+class IncludeTests(testing.TestCase):
+
+    def set_up(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tear_down(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, contents):
+        """Writes a zone file and returns its path."""
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as zone_file:
+            zone_file.write(contents)
+        return path
+
+    def test_include(self):
+        self.write('hosts.zone', 'www A 1.1.1.1\n'
+                                 '$ORIGIN other.example.com.\n'
+                                 'x A 1.1.1.2\n')
+        path = self.write('example.com.zone',
+                          '$ORIGIN example.com.\n'
+                          '$INCLUDE hosts.zone\n'
+                          '$INCLUDE "hosts.zone" sub.example.com.\n'
+                          'after A 1.1.1.3\n')
+
+        with open(path) as zone_file:
+            parser = zonefile.ZoneFileParser(zone_file)
+            records = list(parser)
+
+        self.assertEqual(parser.errors, [])
+        self.assertEqual([record['host'] for record in records],
+                         ['www', 'x.other', 'www.sub', 'x.other', 'after'])
+
+    def test_include_missing(self):
+        path = self.write('example.com.zone',
+                          '$ORIGIN example.com.\n'
+                          '$INCLUDE missing.zone\n'
+                          'after A 1.1.1.3\n')
+
+        with open(path) as zone_file:
+            parser = zonefile.ZoneFileParser(zone_file)
+            records = list(parser)
+
+        self.assertEqual([record['host'] for record in records], ['after'])
+        self.assertIn('Unable to $INCLUDE', parser.errors[0]['error'])
+        self.assertEqual(parser.errors[0]['file'], path)
+
+    def test_include_disabled(self):
+        self.write('hosts.zone', 'www A 1.1.1.1\n')
+        path = self.write('example.com.zone',
+                          '$ORIGIN example.com.\n'
+                          '$INCLUDE hosts.zone\n')
+
+        with open(path) as zone_file:
+            parser = zonefile.ZoneFileParser(zone_file, include=False)
+            records = list(parser)
+
+        self.assertEqual(records, [])
+        self.assertEqual(parser.errors[0]['error'], '$INCLUDE is disabled')
+
+    def test_include_loop(self):
+        path = self.write('loop.zone', '$ORIGIN example.com.\n'
+                                       '$INCLUDE loop.zone\n')
+
+        with open(path) as zone_file:
+            parser = zonefile.ZoneFileParser(zone_file)
+            records = list(parser)
+
+        self.assertEqual(records, [])
+        self.assertEqual(parser.errors[0]['error'],
+                         '$INCLUDE nested too deeply')
@@ -7,8 +7,10 @@
 """
 from SoftLayer import consts
 from SoftLayer import exceptions
+from SoftLayer import masks
 from SoftLayer import utils
 
+import contextlib
 import importlib
 import json
 import logging
@@ -26,6 +28,7 @@ __all__ = [
     'RestTransport',
     'TimingTransport',
     'FixtureTransport',
+    'pooled_connections',
 ]
 
 
@@ -82,13 +85,17 @@ class XmlRpcTransport(object):
                  endpoint_url=None,
                  timeout=None,
                  proxy=None,
-                 user_agent=None):
+                 user_agent=None,
+                 session=None):
 
         self.endpoint_url = (endpoint_url or
                              consts.API_PUBLIC_ENDPOINT).rstrip('/')
         self.timeout = timeout or None
         self.proxy = proxy
         self.user_agent = user_agent or consts.USER_AGENT
+        #: requests.Session used to reuse connections between calls. Each
+        #: call uses a new connection when this is None.
+        self.session = session
 
     def __call__(self, request):
         """Makes a SoftLayer API call against the XML-RPC endpoint.
@@ -129,13 +136,13 @@ class XmlRpcTransport(object):
         LOGGER.debug(payload)
 
         try:
-            response = requests.request('POST', url,
-                                        data=payload,
-                                        headers=request.transport_headers,
-                                        timeout=self.timeout,
-                                        verify=request.verify,
-                                        cert=request.cert,
-                                        proxies=_proxies_dict(self.proxy))
+            response = _send(self.session, 'POST', url,
+                             data=payload,
+                             headers=request.transport_headers,
+                             timeout=self.timeout,
+                             verify=request.verify,
+                             cert=request.cert,
+                             proxies=_proxies_dict(self.proxy))
             LOGGER.debug("=== RESPONSE ===")
             LOGGER.debug(response.headers)
             LOGGER.debug(response.content)
@@ -175,13 +182,17 @@ class RestTransport(object):
                  endpoint_url=None,
                  timeout=None,
                  proxy=None,
-                 user_agent=None):
+                 user_agent=None,
+                 session=None):
 
         self.endpoint_url = (endpoint_url or
                              consts.API_PUBLIC_ENDPOINT_REST).rstrip('/')
         self.timeout = timeout or None
         self.proxy = proxy
         self.user_agent = user_agent or consts.USER_AGENT
+        #: requests.Session used to reuse connections between calls. Each
+        #: call uses a new connection when this is None.
+        self.session = session
 
     def __call__(self, request):
         """Makes a SoftLayer API call against the REST endpoint.
@@ -208,12 +219,12 @@ class RestTransport(object):
         LOGGER.info(url)
         LOGGER.debug(request.transport_headers)
         try:
-            resp = requests.request('GET', url,
-                                    headers=request.transport_headers,
-                                    timeout=self.timeout,
-                                    verify=request.verify,
-                                    cert=request.cert,
-                                    proxies=_proxies_dict(self.proxy))
+            resp = _send(self.session, 'GET', url,
+                         headers=request.transport_headers,
+                         timeout=self.timeout,
+                         verify=request.verify,
+                         cert=request.cert,
+                         proxies=_proxies_dict(self.proxy))
             LOGGER.debug("=== RESPONSE ===")
             LOGGER.debug(resp.headers)
             LOGGER.debug(resp.content)
@@ -272,6 +283,43 @@ class FixtureTransport(object):
                                       % (call.service, call.method))
 
 
+@contextlib.contextmanager
+def pooled_connections(transport):
+    """Reuses connections for the calls made through a transport.
+
+    Gives the transport a requests.Session for the duration of the block so
+    that repeated calls, e.g. when polling, go over one kept-alive
+    connection instead of a new one each. Transports wrapped by
+    :class:`TimingTransport` are handled, and transports that don't make
+    HTTP requests are left alone.
+
+    ::
+
+        with pooled_connections(client.transport):
+            ...
+
+    :param transport: the transport of a client
+    """
+    transport = getattr(transport, 'transport', transport)
+    if not hasattr(transport, 'session') or transport.session is not None:
+        yield
+        return
+
+    transport.session = requests.Session()
+    try:
+        yield
+    finally:
+        transport.session.close()
+        transport.session = None
+
+
+def _send(session, method, url, **kwargs):
+    """Makes a request with the session, if there is one."""
+    if session is None:
+        return requests.request(method, url, **kwargs)
+    return session.request(method, url, **kwargs)
+
+
 def _proxies_dict(proxy):
     """Makes a proxy dict appropriate to pass to requests."""
     if not proxy:
@@ -282,7 +330,7 @@ def _proxies_dict(proxy):
 def _format_object_mask(objectmask, service):
     """Format new and old style object masks into proper headers.
 
-    :param objectmask: a string- or dict-based object mask
+    :param objectmask: a string-, ObjectMask- or dict-based object mask
     :param service: a SoftLayer API service name
 
     """
@@ -291,6 +339,8 @@ def _format_object_mask(objectmask, service):
     else:
         mheader = 'SoftLayer_ObjectMask'
 
+        if isinstance(objectmask, masks.ObjectMask):
+            objectmask = objectmask.render()
         objectmask = objectmask.strip()
         if (not objectmask.startswith('mask') and
                 not objectmask.startswith('[')):
@@ -7,6 +7,8 @@
 """
 import datetime
 import re
+import threading
+import time
 
 import six
 
@@ -14,6 +16,7 @@ import six
 
 UUID_RE = re.compile(r'^[0-9a-f\-]{36}$', re.I)
 KNOWN_OPERATIONS = ['<=', '>=', '<', '>', '~', '!~', '*=', '^=', '$=', '_=']
+DEFAULT_MAX_WORKERS = 8
 
 configparser = six.moves.configparser
 string_types = six.string_types
@@ -132,6 +135,196 @@ def query_filter_date(start, end):
     }
 
 
+def query_filter_after(value):
+    """Query filter for dates from an API timestamp on.
+
+    Used to fetch only what changed since a high-water mark, e.g. the
+    newest 'modifyDate' seen. Dates are only compared to the second, so
+    the filter overlaps the mark by a second: whatever changed in the same
+    second as the mark is fetched again rather than missed.
+
+    :param value: an API timestamp, e.g. '2014-03-21T14:07:07-05:00'
+    """
+    try:
+        mark = datetime.datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        pass
+    else:
+        mark -= datetime.timedelta(seconds=1)
+        value = mark.strftime('%m/%d/%Y %H:%M:%S')
+    return {
+        'operation': 'greaterThanDate',
+        'options': [{'name': 'date', 'value': [value]}],
+    }
+
+
+def concurrent_map(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """Calls func on every item using a bounded pool of threads.
+
+    A failure for one item does not stop the others. Each entry of the
+    returned list is a (result, exception) tuple in the same order as the
+    given items; exception is None when the call succeeded.
+
+    ::
+
+        >>> concurrent_map(int, ['1', 'x'])
+        [(1, None), (None, ValueError(...))]
+
+    :param func: function that takes a single item
+    :param items: an iterable of items
+    :param int max_workers: the maximum number of concurrent calls
+    :returns list:
+    """
+    items = list(items)
+    results = [None] * len(items)
+    work = six.moves.queue.Queue()
+    for index, item in enumerate(items):
+        work.put((index, item))
+
+    def worker():
+        """Pulls items off of the work queue until it is empty."""
+        while True:
+            try:
+                index, item = work.get_nowait()
+            except six.moves.queue.Empty:
+                return
+
+            try:
+                results[index] = (func(item), None)
+            except Exception as ex:  # pylint: disable=broad-except
+                results[index] = (None, ex)
+
+    workers = min(max(max_workers, 1), len(items))
+    if workers <= 1:
+        # No need to pay for a thread when there's nothing to overlap
+        worker()
+        return results
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def concurrent_imap(func, items, max_workers=DEFAULT_MAX_WORKERS,
+                    window=None):
+    """Calls func on every item and yields the results as they complete.
+
+    Unlike :func:`concurrent_map`, items are read lazily and results are
+    yielded while later calls are still running, so any number of items
+    can be streamed through with at most window of them in flight, i.e.
+    queued, running or finished but not yet yielded. Each yielded entry is
+    an (item, result, exception) tuple, in the order the calls complete.
+
+    ::
+
+        >>> for item, result, error in concurrent_imap(push, messages):
+        ...     ...
+
+    :param func: function that takes a single item
+    :param items: an iterable of items, consumed lazily
+    :param int max_workers: the maximum number of concurrent calls
+    :param int window: the maximum number of items in flight. Defaults to
+                       twice max_workers.
+    """
+    max_workers = max(max_workers, 1)
+    window = max(window or max_workers * 2, 1)
+    slots = threading.Semaphore(window)
+    work = six.moves.queue.Queue()
+    done = six.moves.queue.Queue()
+    stopped = threading.Event()
+    stop = object()
+    feed_error = []
+
+    def feeder():
+        """Queues the items as slots free up."""
+        try:
+            for item in items:
+                slots.acquire()
+                if stopped.is_set():
+                    break
+                work.put(item)
+        except Exception as ex:  # pylint: disable=broad-except
+            feed_error.append(ex)
+        finally:
+            for _ in range(max_workers):
+                work.put(stop)
+
+    def worker():
+        """Calls func on items until the feeder runs out."""
+        while True:
+            item = work.get()
+            if item is stop:
+                done.put(stop)
+                return
+            try:
+                done.put((item, func(item), None))
+            except Exception as ex:  # pylint: disable=broad-except
+                done.put((item, None, ex))
+
+    threads = [threading.Thread(target=feeder)]
+    threads.extend(threading.Thread(target=worker)
+                   for _ in range(max_workers))
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    running = max_workers
+    try:
+        while running:
+            entry = done.get()
+            if entry is stop:
+                running -= 1
+                continue
+            slots.release()
+            yield entry
+    finally:
+        # Unblock the feeder if the caller stopped iterating early
+        stopped.set()
+        slots.release()
+
+    if feed_error:
+        raise feed_error[0]
+
+
+class RateLimiter(object):
+    """Spaces out calls made from any number of threads.
+
+    :meth:`wait` blocks until the next call is allowed, so calls are never
+    started more often than rate per second.
+
+    ::
+
+        >>> limiter = RateLimiter(5)
+        >>> for item in items:
+        ...     limiter.wait()
+        ...     service.call(item)
+
+    :param float rate: the maximum number of calls per second. None or 0
+                       means no limit.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks until the next call is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
 class IdentifierMixin(object):
     """Mixin used to resolve ids from other names of objects.
 
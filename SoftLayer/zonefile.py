@@ -0,0 +1,310 @@
+"""
+    SoftLayer.zonefile
+    ~~~~~~~~~~~~~~~~~~
+    Streaming parser for BIND/RFC 1035 master (zone) files
+
+    Records are read one logical entry at a time from any iterable of lines,
+    such as an open file, so a zone of any size is parsed in constant memory.
+    The parser handles comments, quoted strings, escapes, parenthesized
+    multi-line entries, blank owners, the optional TTL and class fields in
+    either order, TTL units ('1h30m'), and the $ORIGIN, $TTL and $INCLUDE
+    directives.
+
+    :license: MIT, see LICENSE for more details.
+"""
+import os.path
+import re
+
+# Tokens: a comment, a parenthesis, a quoted string (possibly unterminated)
+# or a run of other characters, any of which may be escaped with '\'.
+TOKEN_RE = re.compile(r';.*|[()]|"(?:[^"\\]|\\.)*"|"(?:[^"\\]|\\.)*|'
+                      r'(?:[^\s;()"\\]|\\.)+|\\')
+TTL_RE = re.compile(r'^(?:\d+[wdhms]?)+$', re.I)
+TTL_PART_RE = re.compile(r'(\d+)([wdhms]?)', re.I)
+TYPE_RE = re.compile(r'^[A-Z][A-Z0-9-]*$')
+TTL_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+CLASSES = ['IN', 'CH', 'CS', 'HS']
+# Characters that need the tokenizer. Lines without them are just split.
+SPECIAL_CHARS = re.compile(r'[;()"\\]')
+MAX_INCLUDE_DEPTH = 10
+
+
+def parse_ttl(value):
+    """Parses a TTL such as '3600' or '1h30m' into seconds.
+
+    :raises ValueError: if the value isn't a TTL
+    """
+    if not TTL_RE.match(value):
+        raise ValueError('Invalid TTL: %r' % value)
+    return sum(int(number) * TTL_UNITS[unit.lower()]
+               for number, unit in TTL_PART_RE.findall(value))
+
+
+class ZoneFileParser(object):
+    """Parses a zone file into resource records, lazily.
+
+    Iterating over the parser yields a dictionary per record with the keys:
+
+    - host: the owner name relative to the zone, '@' for the zone apex
+    - type: the record type, upper case
+    - data: the record data, with tokens separated by a single space
+    - ttl: the TTL in seconds, or None if the file never sets one
+    - class: the record class, e.g. 'IN'
+    - line: the line number the record starts on
+    - mxPriority: the preference of MX records, whose data is then only the
+      exchange
+
+    Entries that can't be parsed don't stop the parser. They are added to
+    :attr:`errors` as dictionaries with the keys 'file', 'line', 'text' and
+    'error'.
+
+    ::
+
+        >>> with open('example.com.zone') as zone_file:
+        ...     parser = ZoneFileParser(zone_file)
+        ...     for record in parser:
+        ...         print record['host'], record['type'], record['data']
+
+    :param lines: an iterable of lines, e.g. an open file
+    :param string origin: the zone name. Defaults to the first $ORIGIN.
+    :param int ttl: the TTL of records which don't set one, until a $TTL
+                    directive is found
+    :param bool include: follow $INCLUDE directives. Relative paths are
+                         resolved against the directory of the including
+                         file.
+    """
+
+    def __init__(self, lines, origin=None, ttl=None, include=True):
+        self.lines = lines
+        self.zone = _absolute(origin, '.') if origin else None
+        self.default_ttl = ttl
+        self.include = include
+        self.errors = []
+        self._last_ttl = None
+
+    def __iter__(self):
+        return self.records()
+
+    def records(self):
+        """Yields the records in the zone file."""
+        return self._parse(self.lines, self.zone, 0)
+
+    def _error(self, filename, line, text, message):
+        """Remembers an entry which couldn't be parsed."""
+        self.errors.append({'file': filename, 'line': line,
+                            'text': text, 'error': message})
+
+    def _parse(self, lines, origin, depth):
+        """Parses one file. $INCLUDE recurses with its own origin."""
+        filename = getattr(lines, 'name', None)
+        state = {'origin': origin, 'owner': None}
+
+        for line, text, tokens, blank_owner, error in _entries(lines):
+            if error:
+                self._error(filename, line, text, error)
+                continue
+            try:
+                if tokens[0].startswith('$'):
+                    included = self._directive(tokens, state, filename,
+                                               depth)
+                    if included is not None:
+                        for record in included:
+                            yield record
+                    continue
+                record = self._record(tokens, blank_owner, state)
+            except ValueError as ex:
+                self._error(filename, line, text, str(ex))
+                continue
+            record['line'] = line
+            yield record
+
+    def _directive(self, tokens, state, filename, depth):
+        """Handles $ORIGIN, $TTL and $INCLUDE.
+
+        Returns a generator of records for $INCLUDE.
+        """
+        directive = tokens[0].upper()
+        if directive == '$ORIGIN' and len(tokens) == 2:
+            state['origin'] = _absolute(tokens[1], state['origin'])
+            if self.zone is None:
+                self.zone = state['origin']
+            return None
+
+        if directive == '$TTL' and len(tokens) == 2:
+            self.default_ttl = parse_ttl(tokens[1])
+            return None
+
+        if directive == '$INCLUDE' and len(tokens) in (2, 3):
+            if not self.include:
+                raise ValueError('$INCLUDE is disabled')
+            if depth >= MAX_INCLUDE_DEPTH:
+                raise ValueError('$INCLUDE nested too deeply')
+            path = _unquote(tokens[1])
+            if filename and not os.path.isabs(path):
+                path = os.path.join(os.path.dirname(filename), path)
+            origin = state['origin']
+            if len(tokens) == 3:
+                origin = _absolute(tokens[2], origin)
+            return self._include(path, origin, depth + 1)
+
+        raise ValueError('Invalid directive %s' % ' '.join(tokens))
+
+    def _include(self, path, origin, depth):
+        """Yields the records of an included file."""
+        try:
+            included = open(path)
+        except IOError as ex:
+            raise ValueError('Unable to $INCLUDE %s: %s' % (path, ex))
+        with included:
+            for record in self._parse(included, origin, depth):
+                yield record
+
+    def _record(self, tokens, blank_owner, state):
+        """Turns the tokens of one entry into a record."""
+        if blank_owner:
+            if state['owner'] is None:
+                raise ValueError('No previous owner name')
+            owner = state['owner']
+        else:
+            owner = _absolute(tokens.pop(0), state['origin'])
+            state['owner'] = owner
+
+        ttl = record_class = None
+        while tokens and (ttl is None or record_class is None):
+            if ttl is None and TTL_RE.match(tokens[0]):
+                ttl = parse_ttl(tokens.pop(0))
+            elif record_class is None and tokens[0].upper() in CLASSES:
+                record_class = tokens.pop(0).upper()
+            else:
+                break
+
+        if not tokens:
+            raise ValueError('Missing record type')
+        record_type = tokens.pop(0).upper()
+        if not TYPE_RE.match(record_type):
+            raise ValueError('Invalid record type %s' % record_type)
+        if not tokens:
+            raise ValueError('Missing %s record data' % record_type)
+
+        if ttl is None:
+            ttl = self.default_ttl
+            if ttl is None:
+                ttl = self._last_ttl
+        else:
+            self._last_ttl = ttl
+
+        record = {
+            'host': self._relative(owner),
+            'type': record_type,
+            'ttl': ttl,
+            'class': record_class or 'IN',
+        }
+        if record_type == 'MX' and len(tokens) == 2:
+            if not tokens[0].isdigit():
+                raise ValueError('Invalid MX preference %s' % tokens[0])
+            record['mxPriority'] = int(tokens[0])
+            tokens = tokens[1:]
+        record['data'] = ' '.join(tokens)
+        return record
+
+    def _relative(self, name):
+        """Returns an owner name relative to the zone."""
+        if self.zone is None:
+            if name.endswith('.'):
+                raise ValueError('%s is absolute but the zone is unknown'
+                                 % name)
+            return name
+        if name.lower() == self.zone.lower():
+            return '@'
+        suffix = '.' + self.zone
+        if name.lower().endswith(suffix.lower()):
+            return name[:-len(suffix)]
+        raise ValueError('%s is outside of the zone %s' % (name, self.zone))
+
+
+def _absolute(name, origin):
+    """Returns a domain name made absolute against the origin.
+
+    Names are absolute when they end with a dot. Relative names are kept
+    relative when there is no origin.
+    """
+    if name == '@':
+        if origin is None:
+            return '@'
+        return origin
+    if name.endswith('.') and not name.endswith('\\.'):
+        return name
+    if origin is None:
+        return name
+    if origin == '.':
+        return name + '.'
+    return '%s.%s' % (name, origin)
+
+
+def _unquote(token):
+    """Removes the quotes around a quoted string token."""
+    if len(token) >= 2 and token[0] == token[-1] == '"':
+        return token[1:-1]
+    return token
+
+
+def _entries(lines):
+    """Yields (line, text, tokens, blank_owner, error) for each entry.
+
+    An entry is a line, or several lines joined by parentheses. Comments and
+    empty entries are skipped.
+    """
+    tokens = []
+    text = []
+    depth = 0
+    start = 0
+    blank_owner = False
+    error = None
+
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not depth:
+            start = number
+            blank_owner = line[:1] in (' ', '\t')
+            text = []
+        text.append(line)
+
+        if not SPECIAL_CHARS.search(line):
+            tokens.extend(line.split())
+        else:
+            for token in TOKEN_RE.findall(line):
+                if token[0] == ';':
+                    break
+                elif token == '(':
+                    depth += 1
+                elif token == ')':
+                    depth -= 1
+                    if depth < 0:
+                        error = 'Unbalanced parentheses'
+                        depth = 0
+                elif token[0] == '"' and (len(token) == 1 or
+                                          not _quote_closed(token)):
+                    error = 'Unterminated quoted string'
+                elif token == '\\':
+                    error = 'Unterminated escape'
+                else:
+                    tokens.append(token)
+
+        if depth:
+            continue
+        if error or tokens:
+            yield start, '\n'.join(text).strip(), tokens, blank_owner, error
+        tokens = []
+        error = None
+
+    if depth or tokens:
+        yield (start, '\n'.join(text).strip(), tokens, blank_owner,
+               error or 'Unbalanced parentheses')
+
+
+def _quote_closed(token):
+    """Returns True if a token starting with a quote ends with one."""
+    if not token.endswith('"'):
+        return False
+    escapes = len(token) - 1 - len(token[:-1].rstrip('\\'))
+    return escapes % 2 == 0
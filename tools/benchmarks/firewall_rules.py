@@ -0,0 +1,80 @@
+"""
+    Benchmark for SoftLayer.firewall_rules.
+
+    Generates an ACL of per-host and per-subnet rules with overlapping port
+    ranges, a few deny rules splitting the permits into runs and rules
+    shadowed by earlier ones, then times parsing, compiling and diffing it.
+
+    Usage:
+
+        $ python tools/benchmarks/firewall_rules.py
+        $ python tools/benchmarks/firewall_rules.py --rules 20000
+
+    :license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+import argparse
+import random
+import time
+
+from SoftLayer import firewall_rules
+
+LINES = [
+    'permit tcp from 10.{0}.{1}.{2} to any on server port {3}-{4}\n',
+    'permit tcp from 10.{0}.{1}.0/25 to any on server port {3}\n',
+    'permit tcp from 10.{0}.{1}.128/25 to any on server port {3}\n',
+    'permit udp from 10.{0}.{1}.{2} to 192.168.{1}.0/24 port {3}\n',
+    'permit icmp from 10.{0}.0.0/16 to any\n',
+]
+DENY = 'deny tcp from 10.{0}.{1}.0/24 to any on server port 22\n'
+
+
+def generate(count, seed):
+    """Returns the text of an ACL with count rules."""
+    rand = random.Random(seed)
+    lines = []
+    for index in range(count):
+        if index % 500 == 499:
+            line = DENY
+        else:
+            line = LINES[rand.randrange(len(LINES))]
+        port = rand.randrange(1, 60000)
+        lines.append(line.format(rand.randrange(4), rand.randrange(64),
+                                 rand.randrange(1, 255), port,
+                                 port + rand.randrange(100)))
+    return ''.join(lines)
+
+
+def timed(func, *args):
+    """Returns the result of func and how long it took in milliseconds."""
+    start = time.time()
+    result = func(*args)
+    return result, (time.time() - start) * 1000
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rules', type=int, default=5000,
+                        help='number of rules in the ACL')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='random seed')
+    args = parser.parse_args()
+
+    text = generate(args.rules, args.seed)
+    rules, parse_ms = timed(firewall_rules.parse_rules, text)
+    compiled, compile_ms = timed(firewall_rules.compile_rules, rules)
+    diff, diff_ms = timed(firewall_rules.diff_rules, rules,
+                          compiled['rules'])
+    _, recompile_ms = timed(firewall_rules.compile_rules, compiled['rules'])
+
+    print('%d rules compiled to %d, %d shadowed'
+          % (len(rules), len(compiled['rules']), len(compiled['shadowed'])))
+    print('parse %.1f ms, compile %.1f ms, diff %.1f ms, '
+          'compile again %.1f ms'
+          % (parse_ms, compile_ms, diff_ms, recompile_ms))
+    assert diff['changed']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+    Benchmark for MessagingConnection.push_topic_messages.
+
+    Starts a local stand-in for the Message Queue API which waits LATENCY
+    milliseconds before answering each request, then publishes the same
+    messages to a topic one at a time with push_topic_message and
+    concurrently with push_topic_messages over a pooled session, printing
+    the throughput and latency of each.
+
+    Usage:
+
+        $ python tools/benchmarks/mq_publish.py
+        $ python tools/benchmarks/mq_publish.py --messages 5000 --latency 20
+        $ python tools/benchmarks/mq_publish.py --workers 4,16,32
+
+    :license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+import argparse
+import time
+
+from SoftLayer.managers import messaging
+from SoftLayer.testing import mq
+
+
+def sequential(server, bodies):
+    """Publishes the messages one at a time without a pooled session."""
+    conn = messaging.MessagingConnection('test', endpoint=server.endpoint)
+    conn.authenticate('username', 'api_key')
+    stats = messaging.PushStats()
+    for body in bodies:
+        start = time.time()
+        error = None
+        try:
+            conn.push_topic_message('benchmark', body)
+        except Exception as ex:  # pylint: disable=broad-except
+            error = ex
+        stats.add({'error': error, 'latency': time.time() - start})
+    stats.end = time.time()
+    return stats.summary()
+
+
+def concurrent(server, bodies, workers):
+    """Publishes the messages with push_topic_messages."""
+    conn = messaging.MessagingConnection(
+        'test', endpoint=server.endpoint,
+        session=messaging.pooled_session(workers))
+    conn.authenticate('username', 'api_key')
+    stats = messaging.PushStats()
+    try:
+        for _ in stats.track(conn.push_topic_messages(
+                'benchmark', iter(bodies), max_workers=workers)):
+            pass
+    finally:
+        conn.session.close()
+    return stats.summary()
+
+
+def report(name, summary):
+    """Prints a line of stats."""
+    latency = summary['latency']
+    print('%-16s %7d %6d %9.2f %10.1f %8.1f %8.1f %8.1f' % (
+        name, summary['sent'], summary['failed'], summary['seconds'],
+        summary['rate'], latency.get('p50', 0) * 1000,
+        latency.get('p95', 0) * 1000, latency.get('max', 0) * 1000))
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--messages', type=int, default=1000,
+                        help='messages to publish (default: 1000)')
+    parser.add_argument('--latency', type=float, default=10,
+                        help='milliseconds the server waits per request '
+                             '(default: 10)')
+    parser.add_argument('--workers', default='8,32',
+                        help='comma separated worker counts (default: 8,32)')
+    parser.add_argument('--skip-sequential', action='store_true',
+                        help="don't publish the messages one at a time")
+    args = parser.parse_args()
+
+    bodies = ['message %d' % index for index in range(args.messages)]
+    print('%-16s %7s %6s %9s %10s %8s %8s %8s' % (
+        'publisher', 'sent', 'failed', 'seconds', 'msgs/s', 'p50 ms',
+        'p95 ms', 'max ms'))
+    with mq.FakeMessageQueueServer(latency=args.latency / 1000.0) as server:
+        if not args.skip_sequential:
+            report('sequential', sequential(server, bodies))
+        for workers in [int(count) for count in args.workers.split(',')]:
+            report('%d workers' % workers,
+                   concurrent(server, bodies, workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+    Benchmark for NetworkManager.summary_by_datacenter aggregation.
+
+    Builds a synthetic account where every guest and server sits on a public
+    and a private VLAN (so de-duplication matters) and times
+    SoftLayer.managers.network.summarize_vlans against the old list based
+    de-duplication.
+
+    Usage:
+
+        $ python tools/benchmarks/network_summary.py
+        $ python tools/benchmarks/network_summary.py --sizes 1000,50000
+
+    :license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+import argparse
+import time
+
+from SoftLayer import utils
+from SoftLayer.managers import network
+
+DATACENTERS = ['dal05', 'dal06', 'sjc01', 'ams01', 'sng01']
+GUESTS_PER_VLAN = 250
+# The list based implementation is quadratic. Past this size it takes
+# minutes, which is the point of this benchmark, but not worth waiting for.
+LEGACY_LIMIT = 10000
+
+
+def make_vlans(guest_count):
+    """Returns VLANs holding guest_count guests and guest_count/10 servers."""
+    vlans = []
+    vlan_id = 0
+    for start in range(0, guest_count, GUESTS_PER_VLAN):
+        guests = [{'id': guest_id} for guest_id in
+                  range(start, min(start + GUESTS_PER_VLAN, guest_count))]
+        hardware = [{'id': guest['id']} for guest in guests
+                    if guest['id'] % 10 == 0]
+        components = [{'id': guest['id']} for guest in guests]
+        datacenter = DATACENTERS[(start // GUESTS_PER_VLAN) %
+                                 len(DATACENTERS)]
+        for _ in ('public', 'private'):
+            vlan_id += 1
+            vlans.append({
+                'id': vlan_id,
+                'primaryRouter': {'datacenter': {'name': datacenter}},
+                'hardware': hardware,
+                'networkComponents': components,
+                'virtualGuests': guests,
+                'subnets': [{'id': vlan_id}],
+                'totalPrimaryIpAddressCount': len(guests),
+            })
+    return vlans
+
+
+def legacy_summary(vlans):
+    """The previous list based implementation, kept for comparison."""
+    datacenters = {}
+    unique_vms = []
+    unique_servers = []
+    unique_network = []
+
+    for vlan in vlans:
+        name = utils.lookup(vlan, 'primaryRouter', 'datacenter', 'name')
+        if name not in datacenters:
+            datacenters[name] = {
+                'hardwareCount': 0,
+                'networkingCount': 0,
+                'primaryIpCount': 0,
+                'subnetCount': 0,
+                'virtualGuestCount': 0,
+                'vlanCount': 0,
+            }
+
+        datacenters[name]['vlanCount'] += 1
+
+        for hardware in vlan['hardware']:
+            if hardware['id'] not in unique_servers:
+                datacenters[name]['hardwareCount'] += 1
+                unique_servers.append(hardware['id'])
+
+        for net in vlan['networkComponents']:
+            if net['id'] not in unique_network:
+                datacenters[name]['networkingCount'] += 1
+                unique_network.append(net['id'])
+
+        for virtual_guest in vlan['virtualGuests']:
+            if virtual_guest['id'] not in unique_vms:
+                datacenters[name]['virtualGuestCount'] += 1
+                unique_vms.append(virtual_guest['id'])
+
+        datacenters[name]['primaryIpCount'] += (
+            vlan['totalPrimaryIpAddressCount'])
+        datacenters[name]['subnetCount'] += len(vlan['subnets'])
+
+    return datacenters
+
+
+def timed(func, *args):
+    """Returns (result, seconds) for func(*args)."""
+    start = time.time()
+    result = func(*args)
+    return result, time.time() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', default='1000,5000,10000,50000',
+                        help='comma separated guest counts')
+    args = parser.parse_args()
+
+    print('%10s %8s %12s %12s' % ('guests', 'vlans', 'sets (s)', 'lists (s)'))
+    for size in [int(size) for size in args.sizes.split(',')]:
+        vlans = make_vlans(size)
+        result, elapsed = timed(network.summarize_vlans, vlans)
+        assert sum(dc['virtualGuestCount'] for dc in result.values()) == size
+
+        legacy = '-'
+        if size <= LEGACY_LIMIT:
+            legacy_result, legacy_elapsed = timed(legacy_summary, vlans)
+            assert legacy_result == result
+            legacy = '%.4f' % legacy_elapsed
+
+        print('%10d %8d %12.4f %12s' % (size, len(vlans), elapsed, legacy))
+
+
+if __name__ == '__main__':
+    main()
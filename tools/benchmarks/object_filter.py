@@ -0,0 +1,94 @@
+"""
+    Benchmark for SoftLayer.filters.
+
+    Builds synthetic virtual server records shaped like the inventory
+    snapshot's and times compiling and evaluating the objectFilters that
+    VSManager.list_instances sends to the API.
+
+    Usage:
+
+        $ python tools/benchmarks/object_filter.py
+        $ python tools/benchmarks/object_filter.py --size 1000000
+
+    :license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+import argparse
+import time
+
+from SoftLayer import filters
+from SoftLayer import utils
+
+DATACENTERS = ['dal05', 'dal06', 'sjc01', 'ams01', 'sng01']
+TAGS = ['web', 'db', 'cache', 'batch']
+
+
+def make_guests(count):
+    """Returns count virtual server records."""
+    guests = []
+    for guest_id in range(count):
+        guests.append({
+            'id': guest_id,
+            'hostname': 'host-%d' % guest_id,
+            'domain': 'example.com',
+            'maxCpu': 1 << (guest_id % 4),
+            'maxMemory': 1024 << (guest_id % 5),
+            'hourlyBillingFlag': guest_id % 2 == 0,
+            'primaryIpAddress': '10.%d.%d.%d' % (guest_id >> 16 & 255,
+                                                 guest_id >> 8 & 255,
+                                                 guest_id & 255),
+            'modifyDate': '2014-%02d-01T00:00:00-05:00' % (guest_id % 12 + 1),
+            'datacenter': {'name': DATACENTERS[guest_id % len(DATACENTERS)]},
+            'tagReferences': [{'tag': {'name': TAGS[guest_id % len(TAGS)]}}],
+        })
+    return guests
+
+
+def guest_filter(**properties):
+    """Builds a virtualGuests objectFilter the way VSManager does."""
+    _filter = utils.NestedDict()
+    for path, value in properties.items():
+        node = _filter['virtualGuests']
+        keys = path.split('__')
+        for key in keys[:-1]:
+            node = node[key]
+        node[keys[-1]] = value
+    return _filter.to_dict()
+
+
+CASES = [
+    ('hostname wildcard', guest_filter(
+        hostname=utils.query_filter('host-1*'))),
+    ('datacenter', guest_filter(datacenter__name=utils.query_filter('dal05'))),
+    ('cpus and memory', guest_filter(
+        maxCpu=utils.query_filter(4),
+        maxMemory=utils.query_filter('>= 4096'))),
+    ('tags', guest_filter(tagReferences__tag__name={
+        'operation': 'in',
+        'options': [{'name': 'data', 'value': ['db', 'cache']}]})),
+    ('modifyDate', guest_filter(modifyDate=utils.query_filter_date(
+        '2014-03-01', '2014-06-30'))),
+]
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=1000000,
+                        help='number of records')
+    args = parser.parse_args()
+
+    guests = make_guests(args.size)
+    print('%-20s %10s %10s %14s' % ('filter', 'matches', 'seconds',
+                                    'records/s'))
+    for name, object_filter in CASES:
+        start = time.time()
+        matches = filters.filter_objects(guests, object_filter,
+                                         root='virtualGuests')
+        elapsed = time.time() - start
+        print('%-20s %10d %10.3f %14d' % (name, len(matches), elapsed,
+                                          args.size / elapsed))
+
+
+if __name__ == '__main__':
+    main()
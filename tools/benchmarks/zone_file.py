@@ -0,0 +1,89 @@
+"""
+    Benchmark for SoftLayer.zonefile.
+
+    Writes a synthetic zone file mixing A, AAAA, CNAME, MX and TXT records,
+    blank owners, comments and multi-line parenthesized entries, then times
+    SoftLayer.zonefile.ZoneFileParser over it and reports records per second
+    and the peak memory of the process.
+
+    Usage:
+
+        $ python tools/benchmarks/zone_file.py
+        $ python tools/benchmarks/zone_file.py --records 2000000
+
+    :license: MIT, see LICENSE for more details.
+"""
+from __future__ import print_function
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from SoftLayer import zonefile
+
+ENTRIES = [
+    'host{0} 300 IN A 10.{1}.{2}.{3}\n',
+    '    IN AAAA 2001:db8::{0:x}\n',
+    'alias{0} IN CNAME host{0}\n',
+    'mail{0} 3600 IN MX 10 host{0}.example.com.\n',
+    'txt{0} IN TXT ( "v=spf1 ip4:10.{1}.{2}.{3}" ; first part\n'
+    '              " -all" )\n',
+    '; comment {0}\n',
+]
+
+
+def write_zone(path, count):
+    """Writes a zone file with count records and returns the line count."""
+    lines = 2
+    with open(path, 'w') as zone_file:
+        zone_file.write('$ORIGIN example.com.\n$TTL 1h\n')
+        records = 0
+        index = 0
+        while records < count:
+            entry = ENTRIES[index % len(ENTRIES)]
+            zone_file.write(entry.format(index, index >> 16 & 255,
+                                         index >> 8 & 255, index & 255))
+            lines += entry.count('\n')
+            if not entry.startswith(';'):
+                records += 1
+            index += 1
+    return lines
+
+
+def peak_memory_mb():
+    """Returns the peak resident memory of the process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--records', type=int, default=1000000,
+                        help='number of records in the zone file')
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix='.zone')
+    os.close(handle)
+    try:
+        lines = write_zone(path, args.records)
+        size = os.path.getsize(path) / 1024.0 / 1024.0
+        before = peak_memory_mb()
+
+        start = time.time()
+        with open(path) as zone_file:
+            zone_parser = zonefile.ZoneFileParser(zone_file)
+            count = sum(1 for _ in zone_parser)
+        elapsed = time.time() - start
+    finally:
+        os.remove(path)
+
+    assert count == args.records, (count, zone_parser.errors[:5])
+    print('%d records, %d lines, %.1f MB' % (count, lines, size))
+    print('%.2f s, %d records/s' % (elapsed, count / elapsed))
+    print('peak memory %.1f MB before parsing, %.1f MB after'
+          % (before, peak_memory_mb()))
+
+
+if __name__ == '__main__':
+    main()